@@ -12,6 +12,26 @@ from .url_resolution import (
     log_resolution,
     validate_no_hardcoded_concat,
 )
+from .link_checker import (
+    LinkChecker,
+    LinkVerdict,
+    VerdictCache,
+)
+from .bulk_writer import (
+    BulkUpsertWriter,
+    BulkWriteResult,
+    RowOutcome,
+)
+from .vehicle_index import (
+    VehicleIdentity,
+    VehicleIndex,
+    VehicleMatch,
+    keys_from_text,
+    normalize_chassi,
+    normalize_placa,
+    normalize_renavam,
+    vehicle_keys,
+)
 
 __all__ = [
     "URLResolutionResult",
@@ -22,4 +42,18 @@ __all__ = [
     "should_log_resolution",
     "log_resolution",
     "validate_no_hardcoded_concat",
+    "LinkChecker",
+    "LinkVerdict",
+    "VerdictCache",
+    "BulkUpsertWriter",
+    "BulkWriteResult",
+    "RowOutcome",
+    "VehicleIdentity",
+    "VehicleIndex",
+    "VehicleMatch",
+    "keys_from_text",
+    "normalize_chassi",
+    "normalize_placa",
+    "normalize_renavam",
+    "vehicle_keys",
 ]
@@ -0,0 +1,312 @@
+"""
+Escrita em Lote via PostgREST (upsert em chunks).
+
+Os conectores persistiam um lote por requisição (POST por linha): milhares
+de round trips por execução. O BulkUpsertWriter:
+
+1. Envia arrays JSON em chunks configuráveis com
+   `Prefer: resolution=merge-duplicates` (upsert por on_conflict)
+2. Mantém vários chunks em voo ao mesmo tempo (pool de threads sobre um
+   único httpx.Client keep-alive)
+3. Bisecta um chunk rejeitado por dado (400/409/422) até isolar as linhas
+   ruins: uma linha inválida não derruba as outras 499 do chunk
+4. Devolve o resultado por linha (RowOutcome)
+
+Erros transitórios (429, 5xx, timeout) são repetidos com backoff; se
+persistirem, o chunk inteiro falha sem bisecção (dividir não ajuda quando
+o servidor está fora). O mesmo vale para os demais status (401, 403, 404):
+autenticação ou tabela erradas falham todas as linhas igualmente.
+
+Uso:
+    from connectors.common.bulk_writer import BulkUpsertWriter
+
+    writer = BulkUpsertWriter.from_env("leiloeiro_lotes", on_conflict="id_interno",
+                                       key_field="id_interno")
+    result = writer.upsert(rows)
+    print(result.written, result.failed_keys)
+
+Data: 2026-02-05
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# CONFIGURAÇÃO
+# ============================================================================
+
+# Linhas por requisição (sobrescrito por BULK_WRITE_CHUNK_SIZE)
+DEFAULT_CHUNK_SIZE = 500
+
+# Chunks em voo ao mesmo tempo (sobrescrito por BULK_WRITE_MAX_IN_FLIGHT)
+DEFAULT_MAX_IN_FLIGHT = 4
+
+# Tentativas para erros transitórios
+DEFAULT_MAX_RETRIES = 3
+
+# Status que indicam erro transitório (repetir o chunk inteiro)
+RETRY_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# Status que apontam linhas ruins (valor inválido, conflito, constraint):
+# só esses justificam bissecção; 401/403/404 etc. falham o chunk inteiro
+ROW_ERROR_STATUS_CODES = {400, 409, 422}
+
+
+# ============================================================================
+# DATACLASSES
+# ============================================================================
+
+@dataclass
+class RowOutcome:
+    """Resultado de uma linha do upsert."""
+    index: int
+    key: Optional[str]
+    ok: bool
+    status: Optional[int] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class BulkWriteResult:
+    """Resultado de um upsert em lote (outcomes na ordem das linhas)."""
+    outcomes: List[RowOutcome] = field(default_factory=list)
+    requests: int = 0
+    bisections: int = 0
+    duration_seconds: float = 0.0
+
+    @property
+    def written(self) -> int:
+        return sum(1 for o in self.outcomes if o.ok)
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for o in self.outcomes if not o.ok)
+
+    @property
+    def failed_keys(self) -> List[str]:
+        return [o.key for o in self.outcomes if not o.ok and o.key is not None]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": len(self.outcomes),
+            "written": self.written,
+            "failed": self.failed,
+            "requests": self.requests,
+            "bisections": self.bisections,
+            "duration_seconds": round(self.duration_seconds, 2),
+        }
+
+
+# ============================================================================
+# WRITER
+# ============================================================================
+
+class BulkUpsertWriter:
+    """
+    Upsert em lote numa tabela PostgREST (Supabase).
+
+    Seguro para threads: o httpx.Client é compartilhado e cada chamada de
+    upsert conta requisições e bisecções no próprio BulkWriteResult
+    (incrementos sob lock), sem estado por chamada no writer.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        table: str,
+        schema: Optional[str] = None,
+        on_conflict: Optional[str] = None,
+        key_field: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        timeout: float = 30.0,
+        transport: Optional[httpx.BaseTransport] = None,
+    ):
+        """
+        Args:
+            base_url: URL do projeto (SUPABASE_URL)
+            api_key: Service key (SUPABASE_SERVICE_KEY)
+            table: Tabela de destino
+            schema: Schema PostgREST (Content-Profile); None = public
+            on_conflict: Coluna(s) únicas do upsert
+            key_field: Campo da linha usado como chave no RowOutcome
+            chunk_size: Linhas por requisição
+            max_in_flight: Chunks enviados em paralelo
+            max_retries: Tentativas para erros transitórios
+            timeout: Timeout por requisição (segundos)
+            transport: Transport httpx (testes: httpx.MockTransport)
+        """
+        self.url = f"{base_url.rstrip('/')}/rest/v1/{table}"
+        self.table = table
+        self.on_conflict = on_conflict
+        self.key_field = key_field
+        self.chunk_size = max(1, chunk_size)
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_retries = max(1, max_retries)
+
+        headers = {
+            "apikey": api_key,
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+            # missing=default: colunas ausentes numa linha usam o DEFAULT da
+            # tabela em vez de NULL (o array usa a união das chaves)
+            "Prefer": "resolution=merge-duplicates,return=minimal,missing=default",
+        }
+        if schema:
+            headers["Content-Profile"] = schema
+
+        self._client = httpx.Client(
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=self.max_in_flight),
+            transport=transport,
+        )
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, table: str, **kwargs) -> "BulkUpsertWriter":
+        """Writer com SUPABASE_URL/SUPABASE_SERVICE_KEY e limites do ambiente."""
+        url = os.getenv("SUPABASE_URL")
+        key = os.getenv("SUPABASE_SERVICE_KEY")
+        if not url or not key:
+            raise ValueError("SUPABASE_URL/SUPABASE_SERVICE_KEY ausentes")
+        kwargs.setdefault("chunk_size", int(os.getenv("BULK_WRITE_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)))
+        kwargs.setdefault("max_in_flight", int(os.getenv("BULK_WRITE_MAX_IN_FLIGHT", DEFAULT_MAX_IN_FLIGHT)))
+        return cls(url, key, table, **kwargs)
+
+    def __enter__(self) -> "BulkUpsertWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._client.close()
+
+    # ------------------------------------------------------------------
+    # Upsert
+    # ------------------------------------------------------------------
+
+    def upsert(self, rows: List[Dict[str, Any]]) -> BulkWriteResult:
+        """
+        Upsert de todas as linhas em chunks paralelos.
+
+        Returns:
+            BulkWriteResult com um RowOutcome por linha, na ordem de entrada
+        """
+        inicio = time.monotonic()
+        result = BulkWriteResult()
+
+        # O Postgres rejeita o mesmo on_conflict duas vezes no mesmo
+        # comando: linhas com chave repetida mandam só a última ocorrência
+        indexed = list(enumerate(rows))
+        repetidas: Dict[int, int] = {}
+        if self.on_conflict and self.key_field:
+            ultima: Dict[Any, int] = {}
+            for i, row in indexed:
+                ultima[row.get(self.key_field)] = i
+            repetidas = {
+                i: ultima[row.get(self.key_field)]
+                for i, row in indexed
+                if ultima[row.get(self.key_field)] != i
+            }
+            indexed = [(i, row) for i, row in indexed if i not in repetidas]
+
+        chunks = [indexed[i:i + self.chunk_size] for i in range(0, len(indexed), self.chunk_size)]
+        outcomes: List[RowOutcome] = []
+
+        if len(chunks) <= 1 or self.max_in_flight == 1:
+            for chunk in chunks:
+                outcomes.extend(self._write_chunk(chunk, result))
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_in_flight) as pool:
+                for resultado in pool.map(lambda chunk: self._write_chunk(chunk, result), chunks):
+                    outcomes.extend(resultado)
+
+        por_indice = {o.index: o for o in outcomes}
+        for i, enviada in repetidas.items():
+            o = por_indice[enviada]
+            outcomes.append(RowOutcome(index=i, key=o.key, ok=o.ok, status=o.status, error=o.error))
+        outcomes.sort(key=lambda o: o.index)
+        result.outcomes = outcomes
+        result.duration_seconds = time.monotonic() - inicio
+        logger.info(
+            f"Bulk upsert {self.table}: {result.written}/{len(rows)} linhas em "
+            f"{result.requests} requisições ({result.failed} falhas, "
+            f"{result.bisections} bisecções)"
+        )
+        return result
+
+    def _write_chunk(self, chunk: List[tuple], result: BulkWriteResult) -> List[RowOutcome]:
+        """Envia um chunk; em erro de dado divide ao meio até isolar as linhas ruins."""
+        status, error = self._post([row for _, row in chunk], result)
+        if error is None:
+            return [self._outcome(i, row, True, status) for i, row in chunk]
+
+        if len(chunk) == 1 or status not in ROW_ERROR_STATUS_CODES:
+            return [self._outcome(i, row, False, status, error) for i, row in chunk]
+
+        with self._lock:
+            result.bisections += 1
+        meio = len(chunk) // 2
+        return self._write_chunk(chunk[:meio], result) + self._write_chunk(chunk[meio:], result)
+
+    def _post(self, rows: List[Dict[str, Any]], result: BulkWriteResult) -> tuple:
+        """
+        POST de um array. Repete erros transitórios com backoff; cada
+        tentativa conta em result.requests.
+
+        Returns:
+            (status, erro) - erro None em caso de sucesso; status None em
+            erro de rede
+        """
+        colunas = sorted({k for row in rows for k in row})
+        params = {"columns": ",".join(colunas)}
+        if self.on_conflict:
+            params["on_conflict"] = self.on_conflict
+
+        status: Optional[int] = None
+        error: Optional[str] = None
+        for tentativa in range(self.max_retries):
+            with self._lock:
+                result.requests += 1
+            try:
+                response = self._client.post(self.url, params=params, json=rows)
+            except httpx.HTTPError as e:
+                status, error = None, f"{type(e).__name__}: {e}"
+            else:
+                status = response.status_code
+                if status < 300:
+                    return status, None
+                error = f"HTTP {status}: {response.text[:200]}"
+                if status not in RETRY_STATUS_CODES:
+                    return status, error
+
+            if tentativa < self.max_retries - 1:
+                time.sleep(2 ** tentativa)
+
+        return status, error
+
+    def _outcome(self, index: int, row: Dict, ok: bool, status: Optional[int], error: Optional[str] = None) -> RowOutcome:
+        key = row.get(self.key_field) if self.key_field else None
+        if not ok:
+            logger.error(f"Falha no upsert de {key or f'linha {index}'} em {self.table}: {error}")
+        return RowOutcome(
+            index=index,
+            key=str(key) if key is not None else None,
+            ok=ok,
+            status=status,
+            error=error,
+        )
@@ -0,0 +1,428 @@
+"""
+Verificador Assíncrono de Links com Cache Persistente.
+
+Valida acessibilidade de milhares de URLs (links de leiloeiro, URLs de lote)
+reaproveitando conexões e vereditos entre execuções.
+
+Características:
+1. Um único httpx.AsyncClient com pool de conexões (HTTP/2 se `h2` instalado),
+   vivo do primeiro check até close() - conexões TLS reaproveitadas entre lotes
+2. Limite de concorrência global e por host (não sobrecarrega leiloeiros)
+3. Uma única requisição HEAD por URL - status inicial vem do histórico de redirects
+4. Cache SQLite de vereditos e redirects com TTL separado para positivos/negativos
+
+Uso:
+    from connectors.common.link_checker import LinkChecker
+
+    checker = LinkChecker(cache_path="out/link_cache.sqlite")
+    vereditos = checker.check_many(["https://a.com/x", "https://b.com/y"])
+
+    for url, v in vereditos.items():
+        print(url, v.ok, v.final_url, v.status_final)
+    checker.close()
+
+Data: 2026-02-03
+"""
+
+import asyncio
+import logging
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+try:
+    import httpx
+except ImportError:
+    httpx = None  # type: ignore
+
+try:
+    import h2  # noqa: F401
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# CONFIGURAÇÃO
+# ============================================================================
+
+REQUEST_TIMEOUT = 10
+MAX_CONCURRENCY = 50
+MAX_PER_HOST = 4
+TTL_OK_SECONDS = 7 * 24 * 3600       # Link acessível: revalida após 7 dias
+TTL_FAIL_SECONDS = 6 * 3600          # Link quebrado/timeout: revalida após 6 horas
+
+# Servidores que não implementam HEAD - refaz com GET (sem ler o corpo)
+STATUS_HEAD_NAO_SUPORTADO = {405, 501}
+
+
+# ============================================================================
+# DATACLASSES
+# ============================================================================
+
+@dataclass
+class LinkVerdict:
+    """Veredito de acessibilidade de uma URL."""
+    url: str
+    ok: bool
+    final_url: Optional[str] = None
+    status_final: Optional[int] = None
+    status_inicial: Optional[int] = None
+    error: Optional[str] = None
+    checked_at: float = 0.0
+    from_cache: bool = False
+
+    def to_dict(self) -> dict:
+        return {
+            "url": self.url,
+            "ok": self.ok,
+            "final_url": self.final_url,
+            "status_final": self.status_final,
+            "status_inicial": self.status_inicial,
+            "error": self.error,
+            "checked_at": self.checked_at,
+            "from_cache": self.from_cache,
+        }
+
+
+# ============================================================================
+# CACHE PERSISTENTE
+# ============================================================================
+
+class VerdictCache:
+    """
+    Cache SQLite de vereditos (url -> status, url final, erro).
+
+    Positivos e negativos expiram com TTLs diferentes: um link que respondeu
+    200 raramente quebra, já um timeout pode ser transitório.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_ok: int = TTL_OK_SECONDS,
+        ttl_fail: int = TTL_FAIL_SECONDS,
+    ):
+        self.path = path
+        self.ttl_ok = ttl_ok
+        self.ttl_fail = ttl_fail
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS link_verdicts (
+                url TEXT PRIMARY KEY,
+                ok INTEGER NOT NULL,
+                final_url TEXT,
+                status_final INTEGER,
+                status_inicial INTEGER,
+                error TEXT,
+                checked_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get_many(self, urls: List[str], now: Optional[float] = None) -> Dict[str, LinkVerdict]:
+        """Retorna vereditos ainda válidos (dentro do TTL) para as URLs."""
+        if not urls:
+            return {}
+        now = now if now is not None else time.time()
+        encontrados: Dict[str, LinkVerdict] = {}
+
+        with self._lock:
+            # SQLite limita o número de parâmetros por query
+            for i in range(0, len(urls), 500):
+                chunk = urls[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    "SELECT url, ok, final_url, status_final, status_inicial, error, checked_at "
+                    f"FROM link_verdicts WHERE url IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for url, ok, final_url, status_final, status_inicial, error, checked_at in rows:
+                    ttl = self.ttl_ok if ok else self.ttl_fail
+                    if now - checked_at > ttl:
+                        continue
+                    encontrados[url] = LinkVerdict(
+                        url=url,
+                        ok=bool(ok),
+                        final_url=final_url,
+                        status_final=status_final,
+                        status_inicial=status_inicial,
+                        error=error,
+                        checked_at=checked_at,
+                        from_cache=True,
+                    )
+        return encontrados
+
+    def put_many(self, vereditos: Iterable[LinkVerdict]):
+        """Grava vereditos (substitui os anteriores da mesma URL)."""
+        rows = [
+            (v.url, int(v.ok), v.final_url, v.status_final, v.status_inicial, v.error, v.checked_at)
+            for v in vereditos
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO link_verdicts "
+                "(url, ok, final_url, status_final, status_inicial, error, checked_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ============================================================================
+# VERIFICADOR
+# ============================================================================
+
+class LinkChecker:
+    """
+    Verificador de links em lote.
+
+    A API síncrona (check_many/check) roda num event loop próprio, numa
+    thread dedicada, com um único AsyncClient para todas as chamadas: quem
+    valida uma URL por vez (ex: auditor) não paga event loop + handshake TLS
+    a cada link. Respeita MAX_PER_HOST requisições simultâneas por domínio.
+    close() encerra o client, o loop e o cache.
+    """
+
+    def __init__(
+        self,
+        cache_path: Optional[str] = None,
+        timeout: float = REQUEST_TIMEOUT,
+        max_concurrency: int = MAX_CONCURRENCY,
+        max_per_host: int = MAX_PER_HOST,
+        ttl_ok: int = TTL_OK_SECONDS,
+        ttl_fail: int = TTL_FAIL_SECONDS,
+        max_retries: int = 2,
+        headers: Optional[Dict[str, str]] = None,
+        transport=None,
+    ):
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self.max_retries = max_retries
+        self.headers = headers or {}
+        # Permite injetar httpx.MockTransport nos testes
+        self.transport = transport
+        self.cache_path = cache_path
+        self.ttl_ok = ttl_ok
+        self.ttl_fail = ttl_fail
+        self._cache: Optional[VerdictCache] = None
+
+        # Event loop + client da API síncrona (criados no primeiro uso)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+        self._client = None
+        self._global_sem: Optional[asyncio.Semaphore] = None
+        self._host_sems: Dict[str, asyncio.Semaphore] = {}
+
+        self.stats = {"cache_hits": 0, "checked": 0, "ok": 0, "failed": 0}
+
+    @property
+    def cache(self) -> Optional[VerdictCache]:
+        """Cache SQLite, aberto só no primeiro uso."""
+        if self._cache is None and self.cache_path:
+            self._cache = VerdictCache(self.cache_path, self.ttl_ok, self.ttl_fail)
+        return self._cache
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def check_many(self, urls: Iterable[str]) -> Dict[str, LinkVerdict]:
+        """
+        Valida URLs em lote (API síncrona).
+
+        Roda no event loop do checker, reaproveitando o client (e as
+        conexões abertas) das chamadas anteriores.
+
+        Returns:
+            Dict url -> LinkVerdict (URLs duplicadas são verificadas uma vez)
+        """
+        futuro = asyncio.run_coroutine_threadsafe(self._check_many_persistente(list(urls)), self._loop_ativo())
+        return futuro.result()
+
+    def check(self, url: str) -> LinkVerdict:
+        """Valida uma única URL (usa o mesmo cache do lote)."""
+        return self.check_many([url])[url]
+
+    async def check_many_async(self, urls: Iterable[str]) -> Dict[str, LinkVerdict]:
+        """
+        Valida URLs em lote (API assíncrona, no event loop de quem chama).
+
+        Um AsyncClient pertence ao loop em que foi criado, então aqui o
+        client vale só para a chamada; para reaproveitar conexões entre
+        chamadas use check_many.
+        """
+        return await self._check_many(urls, None)
+
+    def close(self):
+        """Fecha o client, para o event loop da API síncrona e fecha o cache."""
+        with self._loop_lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is not None:
+            if self._client is not None:
+                asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result()
+                self._client = None
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+        if self._cache:
+            self._cache.close()
+            self._cache = None
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _loop_ativo(self) -> asyncio.AbstractEventLoop:
+        """Event loop da API síncrona, numa thread daemon (criado no primeiro uso)."""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="link_checker", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    async def _check_many_persistente(self, urls: List[str]) -> Dict[str, LinkVerdict]:
+        """check_many no loop do checker, com client e semáforos persistentes."""
+        if httpx and self._client is None:
+            self._client = httpx.AsyncClient(**self._client_kwargs())
+            self._global_sem = asyncio.Semaphore(self.max_concurrency)
+        return await self._check_many(urls, self._client)
+
+    def _client_kwargs(self) -> dict:
+        limits = httpx.Limits(
+            max_connections=self.max_concurrency,
+            max_keepalive_connections=self.max_concurrency,
+        )
+        client_kwargs = {
+            "timeout": self.timeout,
+            "follow_redirects": True,
+            "limits": limits,
+            "headers": self.headers,
+            "http2": H2_AVAILABLE,
+        }
+        if self.transport is not None:
+            client_kwargs["transport"] = self.transport
+        return client_kwargs
+
+    async def _check_many(self, urls: Iterable[str], client) -> Dict[str, LinkVerdict]:
+        """Cache + verificação das pendentes (client None = client só desta chamada)."""
+        unicas = list(dict.fromkeys(u for u in urls if u))
+        if not unicas:
+            return {}
+
+        vereditos: Dict[str, LinkVerdict] = {}
+        if self.cache:
+            vereditos.update(self.cache.get_many(unicas))
+            self.stats["cache_hits"] += len(vereditos)
+
+        pendentes = [u for u in unicas if u not in vereditos]
+        if not pendentes:
+            return vereditos
+
+        if not httpx:
+            logger.warning("httpx não instalado, pulando validação HTTP")
+            return vereditos
+
+        if client is None:
+            async with httpx.AsyncClient(**self._client_kwargs()) as client:
+                novos = await self._verificar_lote(
+                    client, pendentes, asyncio.Semaphore(self.max_concurrency), {}
+                )
+        else:
+            novos = await self._verificar_lote(client, pendentes, self._global_sem, self._host_sems)
+
+        for v in novos:
+            vereditos[v.url] = v
+            self.stats["checked"] += 1
+            self.stats["ok" if v.ok else "failed"] += 1
+
+        if self.cache:
+            self.cache.put_many(novos)
+
+        return vereditos
+
+    async def _verificar_lote(
+        self,
+        client,
+        urls: List[str],
+        global_sem: asyncio.Semaphore,
+        host_sems: Dict[str, asyncio.Semaphore],
+    ) -> List[LinkVerdict]:
+        """Verifica as URLs respeitando os limites por host e global."""
+
+        async def _limitado(url: str) -> LinkVerdict:
+            host = urlparse(url).netloc.lower()
+            if host not in host_sems:
+                host_sems[host] = asyncio.Semaphore(self.max_per_host)
+            # Vaga do host primeiro: quem espera host ocupado não segura
+            # vaga global e não bloqueia os outros hosts
+            async with host_sems[host]:
+                async with global_sem:
+                    return await self._verificar(client, url)
+
+        return await asyncio.gather(*(_limitado(u) for u in urls))
+
+    async def _verificar(self, client, url: str) -> LinkVerdict:
+        """HEAD com retry para erros de rede; GET se o servidor rejeitar HEAD."""
+        url_check = url if url.startswith(("http://", "https://")) else f"https://{url}"
+        last_error = None
+
+        for attempt in range(self.max_retries):
+            try:
+                resp = await client.head(url_check)
+                if resp.status_code in STATUS_HEAD_NAO_SUPORTADO:
+                    async with client.stream("GET", url_check) as resp:
+                        pass
+
+                status_inicial = resp.history[0].status_code if resp.history else resp.status_code
+                return LinkVerdict(
+                    url=url,
+                    ok=resp.status_code < 400,
+                    final_url=str(resp.url),
+                    status_final=resp.status_code,
+                    status_inicial=status_inicial,
+                    checked_at=time.time(),
+                )
+
+            except (httpx.TimeoutException, httpx.ConnectError) as e:
+                # Erros de rede/timeout devem causar retry
+                last_error = e
+                if attempt < self.max_retries - 1:
+                    delay = (1.5 ** attempt) * (0.5 + random.random() * 0.5)
+                    await asyncio.sleep(delay)
+
+            except Exception as e:
+                last_error = e
+                break
+
+        logger.debug(f"URL inacessível {url}: {type(last_error).__name__}")
+        return LinkVerdict(
+            url=url,
+            ok=False,
+            error=type(last_error).__name__ if last_error else "unknown",
+            checked_at=time.time(),
+        )
@@ -54,6 +54,9 @@ _last_request_time = 0.0
 REQUESTS_PER_SECOND = 3.0
 REQUEST_TIMEOUT = 10
 
+# Client HTTP reaproveitado entre chamadas de head_resolve_final_url
+_shared_client = None
+
 
 # ============================================================================
 # DATACLASSES
@@ -163,6 +166,21 @@ def resolve_absolute_url(base: str, href: str) -> Optional[str]:
 # RESOLUÇÃO HTTP
 # ============================================================================
 
+def _get_shared_client(timeout: float):
+    """
+    Retorna o httpx.Client compartilhado (keep-alive entre chamadas).
+
+    Recriado apenas se o timeout pedido mudar.
+    """
+    global _shared_client
+
+    if _shared_client is None or _shared_client.timeout.read != timeout:
+        if _shared_client is not None:
+            _shared_client.close()
+        _shared_client = httpx.Client(timeout=timeout, follow_redirects=True)
+    return _shared_client
+
+
 def head_resolve_final_url(
     url: str,
     timeout: int = REQUEST_TIMEOUT
@@ -180,6 +198,8 @@ def head_resolve_final_url(
 
     Nota:
         Aplica rate limiting global para não sobrecarregar servidores.
+        Para validar muitas URLs de uma vez, use LinkChecker.check_many
+        (connectors.common.link_checker).
     """
     global _last_request_time
 
@@ -201,21 +221,13 @@ def head_resolve_final_url(
     status_final = None
 
     try:
-        # Primeiro request sem seguir redirects (para capturar status inicial)
-        with httpx.Client(timeout=timeout, follow_redirects=False) as client:
-            try:
-                resp = client.head(url)
-                status_inicial = resp.status_code
-            except Exception:
-                pass
-
-        # Request seguindo redirects
-        with httpx.Client(timeout=timeout, follow_redirects=True) as client:
-            resp = client.head(url)
-            _last_request_time = time.time()
-
-            final_url = str(resp.url)
-            status_final = resp.status_code
+        # Uma única requisição: o status inicial vem do histórico de redirects
+        resp = _get_shared_client(timeout).head(url)
+        _last_request_time = time.time()
+
+        final_url = str(resp.url)
+        status_final = resp.status_code
+        status_inicial = resp.history[0].status_code if resp.history else resp.status_code
 
     except httpx.TimeoutException:
         logger.debug(f"Timeout ao acessar {url}")
@@ -0,0 +1,589 @@
+"""
+Índice de Identidade de Veículos (deduplicação entre editais e fontes).
+
+O mesmo veículo aparece em vários editais (releilão, edital republicado),
+no conector leiloesjudiciais e nos scrapers de discovery_veiculos. O índice
+liga cada ocorrência a um vehicle_id canônico pelas chaves normalizadas:
+
+1. Três hash maps em memória (chassi, renavam, placa -> vehicle_id):
+   consulta O(1) no caminho quente da ingestão, sem I/O por lote
+2. Persistência local em SQLite (carregada na abertura, gravada em lote
+   no flush), inclusive das referências já vistas de cada veículo
+3. Espelho opcional no Supabase (veiculos_identidade + chaves), para que
+   execuções em máquinas diferentes compartilhem o mesmo vehicle_id
+
+Normalização:
+- Chassi: 17 caracteres, sem I/O/Q, letras e números
+- Placa: sem hífen/espaço; Mercosul (ABC1D23) vira o formato antigo
+  (ABC1323) - a conversão oficial só troca o 5º caractere, então as duas
+  placas do mesmo veículo colidem na mesma chave
+- Renavam: só dígitos, completado com zeros à esquerda até 11
+
+Prioridade das chaves: chassi > renavam > placa (placa é reaproveitada
+entre veículos ao longo dos anos; chassi não).
+
+Uso:
+    from connectors.common.vehicle_index import VehicleIndex
+
+    indice = VehicleIndex(path="out/vehicle_index.sqlite")
+    match = indice.resolve(placa="ABC-1234", fonte="lotes_leilao", referencia="123|7")
+    if match and match.duplicate:
+        # Reaproveita marca/modelo/ano do veículo canônico
+        print(match.vehicle_id, match.vehicle.marca)
+    indice.close()
+
+Data: 2026-02-04
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, fields
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# CONFIGURAÇÃO
+# ============================================================================
+
+# Caminho padrão do índice local (sobrescrito por VEHICLE_INDEX_PATH)
+DEFAULT_INDEX_PATH = "out/vehicle_index.sqlite"
+
+# Tipos de chave, em ordem de prioridade
+KEY_TYPES = ("chassi", "renavam", "placa")
+
+# Tabelas do espelho no Supabase (migration 019)
+MIRROR_TABLE = "veiculos_identidade"
+MIRROR_KEYS_TABLE = "veiculos_identidade_chaves"
+MIRROR_PAGE_SIZE = 1000
+MIRROR_CHUNK_SIZE = 500
+
+_RE_NAO_ALFANUMERICO = re.compile(r"[^A-Z0-9]")
+_RE_NAO_DIGITO = re.compile(r"\D")
+_RE_CHASSI = re.compile(r"^[A-HJ-NPR-Z0-9]{17}$")
+_RE_PLACA = re.compile(r"^[A-Z]{3}\d[A-Z0-9]\d{2}$")
+
+# Chaves ancoradas em palavra-chave, para texto livre (título/descrição)
+_RE_TEXTO_PLACA = re.compile(r"PLACA[:\s]*([A-Z]{3}[-\s]?\d[A-Z0-9]\d{2})\b")
+_RE_TEXTO_CHASSI = re.compile(r"CHASSI[:\s]*([A-HJ-NPR-Z0-9]{17})\b")
+_RE_TEXTO_RENAVAM = re.compile(r"RENAVA[MN][:\s]*(\d{9,11})\b")
+
+# 5º caractere da placa Mercosul -> dígito da placa antiga
+_MERCOSUL_PARA_DIGITO = {letra: str(i) for i, letra in enumerate("ABCDEFGHIJ")}
+
+
+# ============================================================================
+# NORMALIZAÇÃO
+# ============================================================================
+
+def normalize_chassi(valor: Optional[str]) -> Optional[str]:
+    """Chassi em maiúsculas sem separadores, ou None se inválido."""
+    if not valor:
+        return None
+    chassi = _RE_NAO_ALFANUMERICO.sub("", str(valor).upper())
+    if not _RE_CHASSI.match(chassi) or chassi.isdigit() or chassi.isalpha():
+        return None
+    return chassi
+
+
+def normalize_placa(valor: Optional[str]) -> Optional[str]:
+    """Placa no formato antigo (ABC1234), convertendo Mercosul; None se inválida."""
+    if not valor:
+        return None
+    placa = _RE_NAO_ALFANUMERICO.sub("", str(valor).upper())
+    if not _RE_PLACA.match(placa):
+        return None
+    quinto = placa[4]
+    if not quinto.isdigit():
+        digito = _MERCOSUL_PARA_DIGITO.get(quinto)
+        if digito is None:
+            return None
+        placa = placa[:4] + digito + placa[5:]
+    return placa
+
+
+def normalize_renavam(valor: Optional[str]) -> Optional[str]:
+    """Renavam com 11 dígitos, ou None se inválido."""
+    if not valor:
+        return None
+    renavam = _RE_NAO_DIGITO.sub("", str(valor))
+    if not 9 <= len(renavam) <= 11 or not renavam.strip("0"):
+        return None
+    return renavam.zfill(11)
+
+
+_NORMALIZADORES = {
+    "chassi": normalize_chassi,
+    "renavam": normalize_renavam,
+    "placa": normalize_placa,
+}
+
+
+def vehicle_keys(
+    placa: Optional[str] = None,
+    chassi: Optional[str] = None,
+    renavam: Optional[str] = None,
+) -> List[Tuple[str, str]]:
+    """Chaves normalizadas (tipo, valor) em ordem de prioridade."""
+    brutos = {"chassi": chassi, "renavam": renavam, "placa": placa}
+    chaves = []
+    for tipo in KEY_TYPES:
+        valor = _NORMALIZADORES[tipo](brutos[tipo])
+        if valor:
+            chaves.append((tipo, valor))
+    return chaves
+
+
+def keys_from_text(texto: Optional[str]) -> Dict[str, Optional[str]]:
+    """
+    Placa, chassi e renavam citados em texto livre (só com palavra-chave).
+
+    Para fontes sem campos estruturados (ex: descrição da API de
+    leiloesjudiciais). Sem a palavra PLACA/CHASSI/RENAVAM antes, números
+    soltos geram falso positivo demais para servir de identidade.
+    """
+    encontrados: Dict[str, Optional[str]] = {"placa": None, "chassi": None, "renavam": None}
+    if not texto:
+        return encontrados
+    texto = str(texto).upper()
+    for tipo, padrao in (
+        ("placa", _RE_TEXTO_PLACA),
+        ("chassi", _RE_TEXTO_CHASSI),
+        ("renavam", _RE_TEXTO_RENAVAM),
+    ):
+        m = padrao.search(texto)
+        if m:
+            encontrados[tipo] = m.group(1)
+    return encontrados
+
+
+# ============================================================================
+# DATACLASSES
+# ============================================================================
+
+@dataclass
+class VehicleIdentity:
+    """Veículo canônico: chaves normalizadas + atributos da primeira ocorrência."""
+    vehicle_id: str
+    placa: Optional[str] = None
+    chassi: Optional[str] = None
+    renavam: Optional[str] = None
+    marca: Optional[str] = None
+    modelo: Optional[str] = None
+    ano: Optional[int] = None
+    fonte: str = ""
+    referencia: str = ""
+    ocorrencias: int = 1
+    primeiro_visto: float = 0.0
+    ultimo_visto: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+@dataclass
+class VehicleMatch:
+    """Resultado de VehicleIndex.resolve para uma ocorrência."""
+    vehicle_id: str
+    vehicle: VehicleIdentity
+    duplicate: bool = False          # Referência nova de um veículo já visto (outro edital/lote/fonte)
+    matched_key: Optional[str] = None  # Tipo da chave que encontrou o veículo
+    conflict: bool = False           # Chaves apontam para veículos diferentes
+
+
+_COLUNAS_VEICULO = [f.name for f in fields(VehicleIdentity)]
+
+
+# ============================================================================
+# ÍNDICE
+# ============================================================================
+
+class VehicleIndex:
+    """
+    Índice chassi/renavam/placa -> vehicle_id.
+
+    Todas as consultas são em memória; SQLite e espelho só recebem o que
+    mudou desde o último flush/push. Seguro para threads (um lock), mas
+    pensado para um único escritor por processo - no extrator paralelo,
+    só o processo principal consulta o índice.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: Arquivo SQLite do índice local; None = só memória
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._por_tipo: Dict[str, Dict[str, str]] = {tipo: {} for tipo in KEY_TYPES}
+        self._veiculos: Dict[str, VehicleIdentity] = {}
+        # (vehicle_id, referencia) já registradas: cada referência conta uma vez
+        self._ocorrencias: Set[Tuple[str, str]] = set()
+
+        # Pendências de gravação (local e espelho separados)
+        self._chaves_local: List[Tuple[str, str, str]] = []
+        self._veiculos_local: Set[str] = set()
+        self._ocorrencias_local: List[Tuple[str, str]] = []
+        self._chaves_espelho: List[Tuple[str, str, str]] = []
+        self._veiculos_espelho: Set[str] = set()
+
+        self.stats = {"consultas": 0, "novos": 0, "duplicados": 0, "conflitos": 0, "sem_chave": 0}
+
+        self._conn = None
+        if path:
+            if path != ":memory:":
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS vehicle_identities (
+                    vehicle_id TEXT PRIMARY KEY,
+                    placa TEXT,
+                    chassi TEXT,
+                    renavam TEXT,
+                    marca TEXT,
+                    modelo TEXT,
+                    ano INTEGER,
+                    fonte TEXT,
+                    referencia TEXT,
+                    ocorrencias INTEGER NOT NULL,
+                    primeiro_visto REAL NOT NULL,
+                    ultimo_visto REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS vehicle_keys (
+                    tipo TEXT NOT NULL,
+                    valor TEXT NOT NULL,
+                    vehicle_id TEXT NOT NULL,
+                    PRIMARY KEY (tipo, valor)
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS vehicle_occurrences (
+                    vehicle_id TEXT NOT NULL,
+                    referencia TEXT NOT NULL,
+                    PRIMARY KEY (vehicle_id, referencia)
+                )
+                """
+            )
+            self._conn.commit()
+            self._carregar_local()
+
+    @classmethod
+    def from_env(cls) -> "VehicleIndex":
+        """Índice no caminho de VEHICLE_INDEX_PATH (ou DEFAULT_INDEX_PATH)."""
+        return cls(os.getenv("VEHICLE_INDEX_PATH", DEFAULT_INDEX_PATH))
+
+    def __len__(self) -> int:
+        return len(self._veiculos)
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def lookup(
+        self,
+        placa: Optional[str] = None,
+        chassi: Optional[str] = None,
+        renavam: Optional[str] = None,
+    ) -> Optional[VehicleIdentity]:
+        """Veículo canônico das chaves (sem registrar a ocorrência)."""
+        for tipo, valor in vehicle_keys(placa, chassi, renavam):
+            vehicle_id = self._por_tipo[tipo].get(valor)
+            if vehicle_id is not None:
+                return self._veiculos.get(vehicle_id)
+        return None
+
+    def resolve(
+        self,
+        placa: Optional[str] = None,
+        chassi: Optional[str] = None,
+        renavam: Optional[str] = None,
+        fonte: str = "",
+        referencia: str = "",
+        marca: Optional[str] = None,
+        modelo: Optional[str] = None,
+        ano: Optional[int] = None,
+        now: Optional[float] = None,
+    ) -> Optional[VehicleMatch]:
+        """
+        Liga uma ocorrência ao vehicle_id canônico (criando-o se for nova).
+
+        Args:
+            placa/chassi/renavam: Valores brutos (normalizados aqui)
+            fonte: Origem da ocorrência (ex: "lotes_leilao", "leiloesjudiciais")
+            referencia: Identificador da ocorrência na fonte (id_interno,
+                id_fonte); reprocessar a mesma referência não conta como duplicata
+            marca/modelo/ano: Atributos conhecidos; completam o veículo canônico
+
+        Returns:
+            VehicleMatch, ou None se não houver nenhuma chave válida
+        """
+        chaves = vehicle_keys(placa, chassi, renavam)
+        with self._lock:
+            self.stats["consultas"] += 1
+            if not chaves:
+                self.stats["sem_chave"] += 1
+                return None
+            now = now if now is not None else time.time()
+
+            vehicle_id = None
+            matched_key = None
+            conflict = False
+            for tipo, valor in chaves:
+                existente = self._por_tipo[tipo].get(valor)
+                if existente is None:
+                    continue
+                if vehicle_id is None:
+                    vehicle_id, matched_key = existente, tipo
+                elif existente != vehicle_id:
+                    conflict = True
+
+            if vehicle_id is None:
+                tipo, valor = chaves[0]
+                vehicle_id = "vei_" + hashlib.sha256(f"{tipo}:{valor}".encode()).hexdigest()[:20]
+                veiculo = VehicleIdentity(
+                    vehicle_id=vehicle_id,
+                    fonte=fonte,
+                    referencia=referencia,
+                    primeiro_visto=now,
+                    ultimo_visto=now,
+                )
+                self._veiculos[vehicle_id] = veiculo
+                self.stats["novos"] += 1
+                duplicate = False
+            else:
+                veiculo = self._veiculos[vehicle_id]
+                # Só a primeira vez de cada referência conta: reprocessar um
+                # edital já visto (mesmo não sendo o primeiro) não é duplicata
+                duplicate = bool(referencia) and (vehicle_id, referencia) not in self._ocorrencias
+                if duplicate:
+                    veiculo.ocorrencias += 1
+                    self.stats["duplicados"] += 1
+                veiculo.ultimo_visto = now
+
+            if referencia and (vehicle_id, referencia) not in self._ocorrencias:
+                self._ocorrencias.add((vehicle_id, referencia))
+                self._ocorrencias_local.append((vehicle_id, referencia))
+
+            if conflict:
+                self.stats["conflitos"] += 1
+                logger.debug(f"Chaves de {referencia or fonte} apontam para veículos diferentes; mantido {vehicle_id}")
+
+            # Chaves novas passam a apontar para o canônico; chave que já é
+            # de outro veículo (conflito) não é reatribuída
+            for tipo, valor in chaves:
+                mapa = self._por_tipo[tipo]
+                if valor in mapa:
+                    continue
+                mapa[valor] = vehicle_id
+                self._chaves_local.append((tipo, valor, vehicle_id))
+                self._chaves_espelho.append((tipo, valor, vehicle_id))
+                if getattr(veiculo, tipo) is None:
+                    setattr(veiculo, tipo, valor)
+
+            for nome, valor in (("marca", marca), ("modelo", modelo), ("ano", ano)):
+                if valor and getattr(veiculo, nome) is None:
+                    setattr(veiculo, nome, valor)
+
+            self._veiculos_local.add(vehicle_id)
+            self._veiculos_espelho.add(vehicle_id)
+
+            return VehicleMatch(
+                vehicle_id=vehicle_id,
+                vehicle=veiculo,
+                duplicate=duplicate,
+                matched_key=matched_key,
+                conflict=conflict,
+            )
+
+    # ------------------------------------------------------------------
+    # Persistência local
+    # ------------------------------------------------------------------
+
+    def _carregar_local(self):
+        """Carrega o SQLite inteiro para os hash maps."""
+        for row in self._conn.execute(f"SELECT {', '.join(_COLUNAS_VEICULO)} FROM vehicle_identities"):
+            veiculo = VehicleIdentity(*row)
+            self._veiculos[veiculo.vehicle_id] = veiculo
+            # Índices anteriores à tabela de ocorrências só têm a primeira
+            if veiculo.referencia:
+                self._ocorrencias.add((veiculo.vehicle_id, veiculo.referencia))
+        for vehicle_id, referencia in self._conn.execute("SELECT vehicle_id, referencia FROM vehicle_occurrences"):
+            self._ocorrencias.add((vehicle_id, referencia))
+        for tipo, valor, vehicle_id in self._conn.execute("SELECT tipo, valor, vehicle_id FROM vehicle_keys"):
+            if tipo in self._por_tipo:
+                self._por_tipo[tipo][valor] = vehicle_id
+        logger.debug(f"Índice de veículos: {len(self._veiculos)} veículos carregados de {self.path}")
+
+    def flush(self):
+        """Grava no SQLite os veículos e chaves alterados desde o último flush."""
+        if self._conn is None:
+            return
+        with self._lock:
+            if not self._chaves_local and not self._veiculos_local and not self._ocorrencias_local:
+                return
+            linhas = [
+                tuple(getattr(self._veiculos[vid], c) for c in _COLUNAS_VEICULO)
+                for vid in self._veiculos_local
+            ]
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO vehicle_identities ({', '.join(_COLUNAS_VEICULO)}) "
+                f"VALUES ({', '.join('?' * len(_COLUNAS_VEICULO))})",
+                linhas,
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO vehicle_keys (tipo, valor, vehicle_id) VALUES (?, ?, ?)",
+                self._chaves_local,
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO vehicle_occurrences (vehicle_id, referencia) VALUES (?, ?)",
+                self._ocorrencias_local,
+            )
+            self._conn.commit()
+            self._chaves_local = []
+            self._veiculos_local = set()
+            self._ocorrencias_local = []
+
+    def close(self):
+        """Flush + fecha o SQLite."""
+        if self._conn is None:
+            return
+        self.flush()
+        with self._lock:
+            self._conn.close()
+            self._conn = None
+
+    # ------------------------------------------------------------------
+    # Espelho no Supabase
+    # ------------------------------------------------------------------
+
+    def pull_mirror(self, client, page_size: int = MIRROR_PAGE_SIZE) -> int:
+        """
+        Traz do espelho as chaves que ainda não estão no índice local.
+
+        Chave local nunca é sobrescrita. Veículos do espelho entram com os
+        atributos do banco (para reaproveitar marca/modelo/ano).
+
+        Returns:
+            Quantidade de chaves novas
+        """
+        novas = 0
+        try:
+            inicio = 0
+            while True:
+                pagina = client.table(MIRROR_TABLE).select("*").order("vehicle_id").range(
+                    inicio, inicio + page_size - 1
+                ).execute().data or []
+                with self._lock:
+                    for row in pagina:
+                        if row["vehicle_id"] not in self._veiculos:
+                            veiculo = _veiculo_do_espelho(row)
+                            self._veiculos[veiculo.vehicle_id] = veiculo
+                            self._veiculos_local.add(veiculo.vehicle_id)
+                            if veiculo.referencia:
+                                self._ocorrencias.add((veiculo.vehicle_id, veiculo.referencia))
+                if len(pagina) < page_size:
+                    break
+                inicio += page_size
+
+            inicio = 0
+            while True:
+                pagina = client.table(MIRROR_KEYS_TABLE).select("tipo,valor,vehicle_id").order(
+                    "tipo"
+                ).order("valor").range(inicio, inicio + page_size - 1).execute().data or []
+                with self._lock:
+                    for row in pagina:
+                        mapa = self._por_tipo.get(row["tipo"])
+                        if mapa is None or row["valor"] in mapa or row["vehicle_id"] not in self._veiculos:
+                            continue
+                        mapa[row["valor"]] = row["vehicle_id"]
+                        self._chaves_local.append((row["tipo"], row["valor"], row["vehicle_id"]))
+                        novas += 1
+                if len(pagina) < page_size:
+                    break
+                inicio += page_size
+        except Exception as e:
+            logger.warning(f"Espelho do índice de veículos indisponível: {e}")
+        return novas
+
+    def push_mirror(self, client, chunk_size: int = MIRROR_CHUNK_SIZE) -> int:
+        """
+        Envia ao espelho os veículos e chaves alterados desde o último push.
+
+        Em falha as pendências são mantidas para a próxima tentativa.
+
+        Returns:
+            Quantidade de veículos enviados
+        """
+        with self._lock:
+            veiculos = [_veiculo_para_espelho(self._veiculos[vid]) for vid in self._veiculos_espelho]
+            chaves = [
+                {"tipo": tipo, "valor": valor, "vehicle_id": vehicle_id}
+                for tipo, valor, vehicle_id in self._chaves_espelho
+            ]
+        if not veiculos and not chaves:
+            return 0
+
+        try:
+            # Veículos antes das chaves (FK veiculos_identidade_chaves -> veiculos_identidade)
+            for i in range(0, len(veiculos), chunk_size):
+                client.table(MIRROR_TABLE).upsert(
+                    veiculos[i:i + chunk_size], on_conflict="vehicle_id"
+                ).execute()
+            for i in range(0, len(chaves), chunk_size):
+                client.table(MIRROR_KEYS_TABLE).upsert(
+                    chaves[i:i + chunk_size], on_conflict="tipo,valor", ignore_duplicates=True
+                ).execute()
+        except Exception as e:
+            logger.warning(f"Falha ao espelhar índice de veículos: {e}")
+            return 0
+
+        with self._lock:
+            self._veiculos_espelho.difference_update(v["vehicle_id"] for v in veiculos)
+            del self._chaves_espelho[:len(chaves)]
+        return len(veiculos)
+
+
+def _iso(instante: float) -> Optional[str]:
+    return datetime.fromtimestamp(instante, tz=timezone.utc).isoformat() if instante else None
+
+
+def _timestamp(valor) -> float:
+    if not valor:
+        return 0.0
+    try:
+        return datetime.fromisoformat(str(valor).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def _veiculo_para_espelho(veiculo: VehicleIdentity) -> dict:
+    dados = veiculo.to_dict()
+    dados["primeiro_visto"] = _iso(veiculo.primeiro_visto)
+    dados["ultimo_visto"] = _iso(veiculo.ultimo_visto)
+    return dados
+
+
+def _veiculo_do_espelho(row: dict) -> VehicleIdentity:
+    dados = {nome: row.get(nome) for nome in _COLUNAS_VEICULO}
+    dados["fonte"] = dados["fonte"] or ""
+    dados["referencia"] = dados["referencia"] or ""
+    dados["ocorrencias"] = dados["ocorrencias"] or 1
+    dados["primeiro_visto"] = _timestamp(dados["primeiro_visto"])
+    dados["ultimo_visto"] = _timestamp(dados["ultimo_visto"])
+    return VehicleIdentity(**dados)
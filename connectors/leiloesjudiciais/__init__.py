@@ -11,6 +11,7 @@ from .fetch import LeilaoFetcher
 from .parse import LeilaoParser
 from .normalize import LeilaoNormalizer
 from .emit import LeilaoEmitter
+from .session import SessionManager
 
 __all__ = [
     "Config",
@@ -19,6 +20,7 @@ __all__ = [
     "LeilaoParser",
     "LeilaoNormalizer",
     "LeilaoEmitter",
+    "SessionManager",
 ]
 
 __version__ = "1.0.0"
@@ -9,8 +9,13 @@ Endpoints disponíveis:
 
 Características:
 - Rate limiting configurável (padrão: 1 req/s)
+- Conexão keep-alive reaproveitada entre páginas (SessionManager)
 - Retry com backoff exponencial
 - Paginação automática com critério de parada seguro
+- Paginação concorrente (MAX_CONCURRENT_REQUESTS > 1): página 1 de cada
+  tipo primeiro, depois as demais páginas em um pool limitado, sob o mesmo
+  rate limit
+- iter_pages(): páginas geradas à medida que chegam (memória constante)
 - Hash de conteúdo para idempotência
 
 Uso:
@@ -20,14 +25,18 @@ Uso:
 
 import hashlib
 import logging
+import threading
 import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Set, Tuple
 
 import httpx
 
 from .config import config
+from .session import SessionManager, get_default_session
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +67,8 @@ class FetchStats:
     rate_limited: int = 0
     items_fetched: int = 0
     pages_fetched: int = 0
+    # Tipos interrompidos antes de totalPages (página repetida)
+    truncated: int = 0
     total_time_ms: float = 0.0
     started_at: Optional[str] = None
     finished_at: Optional[str] = None
@@ -87,6 +98,7 @@ class LeiloeiroAPIClient:
 
     Características:
     - Rate limiting configurável
+    - Sessão HTTP compartilhada (keep-alive, HTTP/2 se disponível)
     - Retry com backoff exponencial
     - Paginação automática com critério de parada seguro
     - Hash de conteúdo para idempotência
@@ -108,7 +120,9 @@ class LeiloeiroAPIClient:
         requests_per_second: float = 1.0,
         timeout: int = 30,
         max_retries: int = 3,
-        backoff_factor: float = 2.0
+        backoff_factor: float = 2.0,
+        session: Optional[SessionManager] = None,
+        max_concurrent: Optional[int] = None,
     ):
         """
         Inicializa o cliente.
@@ -118,13 +132,20 @@ class LeiloeiroAPIClient:
             timeout: Timeout em segundos (padrão: 30)
             max_retries: Máximo de retries por request (padrão: 3)
             backoff_factor: Fator de backoff exponencial (padrão: 2.0)
+            session: Sessão HTTP compartilhada (padrão: sessão do processo)
+            max_concurrent: Páginas buscadas em paralelo
+                (padrão: config.MAX_CONCURRENT_REQUESTS; 1 = serial)
         """
         self.rate_limit = requests_per_second
         self.timeout = timeout
         self.max_retries = max_retries
         self.backoff_factor = backoff_factor
+        self.session = session or get_default_session()
+        self.max_concurrent = max(1, max_concurrent or config.MAX_CONCURRENT_REQUESTS)
         self.stats = FetchStats()
         self._last_request_time = 0.0
+        self._rate_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
 
     def get_lotes(
         self,
@@ -155,8 +176,6 @@ class LeiloeiroAPIClient:
         Returns:
             APIResponse com dados e metadata
         """
-        self._apply_rate_limit()
-
         # IMPORTANTE: A API usa query params, não JSON body!
         params = {
             "pg": page,
@@ -179,6 +198,9 @@ class LeiloeiroAPIClient:
         """
         Busca todas as páginas de múltiplos tipos.
 
+        Materializa iter_pages(); para processar página a página sem manter
+        o catálogo inteiro em memória, use iter_pages() diretamente.
+
         Args:
             tipos: Lista de tipos a buscar (padrão: [1, 2] = Veículos + Bens Diversos)
             max_pages_per_tipo: Limite de páginas por tipo (None = sem limite)
@@ -192,38 +214,18 @@ class LeiloeiroAPIClient:
             tipos = [1, 2]  # Veículos + Bens Diversos (exclui Imóveis)
 
         all_items: List[Dict] = []
-        combined_stats = FetchStats(started_at=datetime.utcnow().isoformat())
-
-        for tipo in tipos:
-            logger.info(f"Buscando tipo={tipo}...")
-            items, stats = self.fetch_all_pages(
-                tipo=tipo,
-                max_pages=max_pages_per_tipo,
-                per_page=per_page,
-                progress_callback=lambda p, t, i: progress_callback(tipo, p, t, i) if progress_callback else None,
-            )
-
-            # Adiciona tipo ao item para identificação posterior
-            for item in items:
-                item["_tipo_busca"] = tipo
-
+        por_tipo: Dict[int, int] = {}
+        for tipo, page, total_pages, items in self.iter_pages(tipos, max_pages_per_tipo, per_page):
             all_items.extend(items)
+            por_tipo[tipo] = por_tipo.get(tipo, 0) + len(items)
+            if progress_callback:
+                progress_callback(tipo, page, total_pages, len(all_items))
 
-            # Agrega estatísticas
-            combined_stats.total_requests += stats.total_requests
-            combined_stats.successful += stats.successful
-            combined_stats.failed += stats.failed
-            combined_stats.rate_limited += stats.rate_limited
-            combined_stats.pages_fetched += stats.pages_fetched
-            combined_stats.items_fetched += len(items)
-            combined_stats.total_time_ms += stats.total_time_ms
-
-            logger.info(f"  tipo={tipo}: {len(items)} lotes")
-
-        combined_stats.finished_at = datetime.utcnow().isoformat()
+        for tipo in tipos:
+            logger.info(f"  tipo={tipo}: {por_tipo.get(tipo, 0)} lotes")
         logger.info(f"Total: {len(all_items)} lotes de {len(tipos)} tipos")
 
-        return all_items, combined_stats
+        return all_items, self.stats
 
     def fetch_all_pages(
         self,
@@ -247,15 +249,82 @@ class LeiloeiroAPIClient:
         Returns:
             Tupla (lista de lotes, estatísticas)
         """
-        # Reset stats
+        all_items: List[Dict] = []
+        for _, page, total_pages, items in self.iter_pages([tipo], max_pages, per_page, tag_tipo=False):
+            all_items.extend(items)
+            if progress_callback:
+                progress_callback(page, total_pages, len(all_items))
+
+        return all_items, self.stats
+
+    def iter_pages(
+        self,
+        tipos: List[int] = None,
+        max_pages_per_tipo: Optional[int] = None,
+        per_page: int = 42,
+        tag_tipo: bool = True,
+    ) -> Iterator[Tuple[int, int, int, List[Dict]]]:
+        """
+        Gera as páginas em ordem (tipo, página), à medida que chegam.
+
+        Memória constante: só a página corrente (e, no modo concorrente, a
+        janela de páginas em voo) fica em memória. self.stats acumula as
+        estatísticas de todos os tipos.
+
+        Com max_concurrent > 1, as páginas seguintes são buscadas em um pool
+        enquanto o chamador processa a atual (ver _iter_tipo_concurrent).
+
+        Args:
+            tipos: Tipos a buscar (padrão: [1, 2])
+            max_pages_per_tipo: Limite de páginas por tipo (None = sem limite)
+            per_page: Itens por página
+            tag_tipo: Marca cada item com `_tipo_busca`
+
+        Yields:
+            (tipo, página, total_pages, itens da página)
+        """
+        if tipos is None:
+            tipos = [1, 2]
+
         self.stats = FetchStats(started_at=datetime.utcnow().isoformat())
+        logger.info(
+            f"Iniciando fetch (tipos={tipos}, max_pages={max_pages_per_tipo}, "
+            f"workers={self.max_concurrent})"
+        )
 
-        all_items: List[Dict] = []
+        if self.max_concurrent > 1:
+            with ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix="leiloeiro_api") as pool:
+                # Página 1 de todos os tipos já sai junto (traz totalPages)
+                first_pages = {
+                    tipo: pool.submit(self.get_lotes, page=1, per_page=per_page, tipo=tipo)
+                    for tipo in tipos
+                }
+                for tipo in tipos:
+                    yield from self._iter_tipo_concurrent(
+                        pool, tipo, first_pages[tipo], max_pages_per_tipo, per_page, tag_tipo
+                    )
+        else:
+            for tipo in tipos:
+                yield from self._iter_tipo_serial(tipo, max_pages_per_tipo, per_page, tag_tipo)
+
+        self.stats.finished_at = datetime.utcnow().isoformat()
+        logger.info(
+            f"Fetch concluído: {self.stats.items_fetched} lotes em "
+            f"{self.stats.pages_fetched} páginas "
+            f"({self.stats.success_rate:.1f}% sucesso)"
+        )
+
+    def _iter_tipo_serial(
+        self,
+        tipo: int,
+        max_pages: Optional[int],
+        per_page: int,
+        tag_tipo: bool,
+    ) -> Iterator[Tuple[int, int, int, List[Dict]]]:
+        """Páginas de um tipo, uma requisição por vez."""
         current_page = 1
         total_pages = 1
-        seen_hashes: set = set()  # Para detectar páginas repetidas
-
-        logger.info(f"Iniciando fetch de todas as páginas (tipo={tipo}, max_pages={max_pages})")
+        seen_hashes: Set[int] = set()  # Para detectar páginas repetidas
 
         while current_page <= total_pages:
             # Verifica limite de páginas
@@ -271,8 +340,8 @@ class LeiloeiroAPIClient:
             )
 
             if not response.success:
-                logger.error(f"Erro na página {current_page}: {response.error_message}")
-                self.stats.failed += 1
+                logger.error(f"Erro na página {current_page} (tipo={tipo}): {response.error_message}")
+                self._count(failed=1)
                 # Não quebra - tenta próxima página
                 current_page += 1
                 continue
@@ -280,48 +349,118 @@ class LeiloeiroAPIClient:
             # Atualiza total_pages com valor real da API
             total_pages = response.total_pages
 
-            # Verifica se estamos recebendo páginas repetidas (bug da API)
-            # Usa hash da página inteira (lote_ids de todos os items) para evitar falsos positivos
-            if response.data:
-                page_ids = tuple(sorted(item.get("lote_id") for item in response.data))
-                page_hash = hash(page_ids)
-                if page_hash in seen_hashes:
-                    logger.warning(f"Detectada página repetida em pg={current_page}, parando")
-                    break
-                seen_hashes.add(page_hash)
-
-            # Adiciona items
-            all_items.extend(response.data)
-            self.stats.pages_fetched += 1
-            self.stats.items_fetched += len(response.data)
-            self.stats.total_time_ms += response.response_time_ms
-
-            # Progress callback
-            if progress_callback:
-                progress_callback(current_page, total_pages, len(all_items))
-
-            logger.info(
-                f"Página {current_page}/{total_pages}: "
-                f"{len(response.data)} lotes (total: {len(all_items)})"
-            )
+            items = self._accept_page(response, tipo, current_page, total_pages, seen_hashes, tag_tipo)
+            if items is None:
+                break
+            yield tipo, current_page, total_pages, items
 
             # Próxima página
             current_page += 1
 
-            # Critério de parada: chegou na última página
-            if current_page > total_pages:
-                logger.info(f"Todas as {total_pages} páginas processadas")
-                break
+    def _iter_tipo_concurrent(
+        self,
+        pool: ThreadPoolExecutor,
+        tipo: int,
+        first_page: Future,
+        max_pages: Optional[int],
+        per_page: int,
+        tag_tipo: bool,
+    ) -> Iterator[Tuple[int, int, int, List[Dict]]]:
+        """
+        Páginas de um tipo com até 2 x max_concurrent requisições em voo.
 
-        self.stats.finished_at = datetime.utcnow().isoformat()
+        O rate limit é compartilhado, então o total de req/s não muda - o
+        ganho vem de sobrepor a latência das respostas. As páginas saem em
+        ordem, com a mesma proteção contra páginas repetidas do modo serial.
+        """
+        response = first_page.result()
+        # Falha na página 1: como no modo serial, totalPages fica 1
+        total_pages = response.total_pages if response.success else 1
+        if max_pages:
+            total_pages = min(total_pages, max_pages)
+
+        janela = 2 * self.max_concurrent
+        proximas = iter(range(2, total_pages + 1))
+        em_voo: Deque[Tuple[int, Future]] = deque()
+
+        def completar_janela():
+            while len(em_voo) < janela:
+                page = next(proximas, None)
+                if page is None:
+                    return
+                em_voo.append((page, pool.submit(self.get_lotes, page=page, per_page=per_page, tipo=tipo)))
+
+        completar_janela()
+        seen_hashes: Set[int] = set()
+        page = 1
+        while True:
+            if not response.success:
+                logger.error(f"Erro na página {page} (tipo={tipo}): {response.error_message}")
+                self._count(failed=1)
+            else:
+                items = self._accept_page(response, tipo, page, total_pages, seen_hashes, tag_tipo)
+                if items is None:
+                    for _, future in em_voo:
+                        future.cancel()
+                    return
+                yield tipo, page, total_pages, items
+
+            if not em_voo:
+                return
+            page, future = em_voo.popleft()
+            completar_janela()
+            response = future.result()
+
+    def _accept_page(
+        self,
+        response: APIResponse,
+        tipo: int,
+        page: int,
+        total_pages: int,
+        seen_hashes: Set[int],
+        tag_tipo: bool,
+    ) -> Optional[List[Dict]]:
+        """
+        Registra uma página bem-sucedida.
+
+        Returns:
+            Itens da página, ou None se ela repete uma anterior (bug da
+            API) - parar o tipo
+        """
+        # Verifica se estamos recebendo páginas repetidas (bug da API)
+        # Usa hash da página inteira (lote_ids de todos os items) para evitar falsos positivos
+        if response.data:
+            page_ids = tuple(sorted(item.get("lote_id") for item in response.data))
+            page_hash = hash(page_ids)
+            if page_hash in seen_hashes:
+                logger.warning(f"Detectada página repetida em pg={page} (tipo={tipo}), parando")
+                # Listagem incompleta: o pipeline não pode tratar ausentes como removidos
+                self._count(truncated=1)
+                return None
+            seen_hashes.add(page_hash)
+
+        # Adiciona tipo ao item para identificação posterior
+        if tag_tipo:
+            for item in response.data:
+                item["_tipo_busca"] = tipo
+
+        self._count(
+            pages_fetched=1,
+            items_fetched=len(response.data),
+            total_time_ms=response.response_time_ms,
+        )
 
         logger.info(
-            f"Fetch concluído: {len(all_items)} lotes em "
-            f"{self.stats.pages_fetched} páginas "
-            f"({self.stats.success_rate:.1f}% sucesso)"
+            f"Página {page}/{total_pages} (tipo={tipo}): "
+            f"{len(response.data)} lotes (total: {self.stats.items_fetched})"
         )
+        return response.data
 
-        return all_items, self.stats
+    def _count(self, **increments: float):
+        """Incrementa contadores de self.stats (seguro entre threads)."""
+        with self._stats_lock:
+            for name, value in increments.items():
+                setattr(self.stats, name, getattr(self.stats, name) + value)
 
     def _post_with_query_params(self, endpoint: str, params: Dict) -> APIResponse:
         """
@@ -331,30 +470,29 @@ class LeiloeiroAPIClient:
         last_error: Optional[str] = None
 
         for attempt in range(self.max_retries + 1):
+            # Cada tentativa (inclusive retry) passa pelo rate limit compartilhado
+            self._apply_rate_limit()
             start_time = time.time()
 
             try:
-                with httpx.Client(timeout=self.timeout) as client:
-                    response = client.post(
-                        url,
-                        params=params,  # Query params, não JSON body!
-                        headers={
-                            "Accept": "application/json",
-                            "User-Agent": config.USER_AGENT,
-                        }
-                    )
+                response = self.session.post(
+                    url,
+                    params=params,  # Query params, não JSON body!
+                    headers={"Accept": "application/json"},
+                    timeout=self.timeout,
+                )
 
                 elapsed_ms = (time.time() - start_time) * 1000
-                self.stats.total_requests += 1
+                self._count(total_requests=1)
 
                 # Sucesso
                 if response.status_code == 200:
-                    self.stats.successful += 1
+                    self._count(successful=1)
                     return self._parse_response(response.json(), elapsed_ms, response.status_code)
 
                 # Rate limited - retry com backoff
                 if response.status_code in config.RATE_LIMIT_STATUS_CODES:
-                    self.stats.rate_limited += 1
+                    self._count(rate_limited=1)
                     wait_time = self.backoff_factor ** attempt
                     logger.warning(f"Rate limited (HTTP {response.status_code}), aguardando {wait_time}s")
                     time.sleep(wait_time)
@@ -368,7 +506,7 @@ class LeiloeiroAPIClient:
                     continue
 
                 # Erro do cliente - não retry
-                self.stats.failed += 1
+                self._count(failed=1)
                 return APIResponse(
                     success=False,
                     error_message=f"HTTP {response.status_code}",
@@ -394,7 +532,7 @@ class LeiloeiroAPIClient:
                 break
 
         # Esgotou retries
-        self.stats.failed += 1
+        self._count(failed=1)
         return APIResponse(
             success=False,
             error_message=last_error or "Max retries exceeded"
@@ -408,31 +546,32 @@ class LeiloeiroAPIClient:
         last_error: Optional[str] = None
 
         for attempt in range(self.max_retries + 1):
+            # Cada tentativa (inclusive retry) passa pelo rate limit compartilhado
+            self._apply_rate_limit()
             start_time = time.time()
 
             try:
-                with httpx.Client(timeout=self.timeout) as client:
-                    response = client.post(
-                        url,
-                        json=payload,
-                        headers={
-                            "Content-Type": "application/json",
-                            "Accept": "application/json",
-                            "User-Agent": config.USER_AGENT,
-                        }
-                    )
+                response = self.session.post(
+                    url,
+                    json=payload,
+                    headers={
+                        "Content-Type": "application/json",
+                        "Accept": "application/json",
+                    },
+                    timeout=self.timeout,
+                )
 
                 elapsed_ms = (time.time() - start_time) * 1000
-                self.stats.total_requests += 1
+                self._count(total_requests=1)
 
                 # Sucesso
                 if response.status_code == 200:
-                    self.stats.successful += 1
+                    self._count(successful=1)
                     return self._parse_response(response.json(), elapsed_ms, response.status_code)
 
                 # Rate limited - retry com backoff
                 if response.status_code in config.RATE_LIMIT_STATUS_CODES:
-                    self.stats.rate_limited += 1
+                    self._count(rate_limited=1)
                     wait_time = self.backoff_factor ** attempt
                     logger.warning(f"Rate limited (HTTP {response.status_code}), aguardando {wait_time}s")
                     time.sleep(wait_time)
@@ -446,7 +585,7 @@ class LeiloeiroAPIClient:
                     continue
 
                 # Erro do cliente - não retry
-                self.stats.failed += 1
+                self._count(failed=1)
                 return APIResponse(
                     success=False,
                     error_message=f"HTTP {response.status_code}",
@@ -472,7 +611,7 @@ class LeiloeiroAPIClient:
                 break
 
         # Esgotou retries
-        self.stats.failed += 1
+        self._count(failed=1)
         return APIResponse(
             success=False,
             error_message=last_error or "Max retries exceeded"
@@ -510,14 +649,21 @@ class LeiloeiroAPIClient:
         )
 
     def _apply_rate_limit(self):
-        """Aplica rate limiting entre requests."""
-        if self._last_request_time > 0:
-            elapsed = time.time() - self._last_request_time
-            min_interval = 1.0 / self.rate_limit
-            if elapsed < min_interval:
-                sleep_time = min_interval - elapsed
-                time.sleep(sleep_time)
-        self._last_request_time = time.time()
+        """
+        Aplica rate limiting entre requests.
+
+        Seguro entre threads: cada chamada reserva o próximo horário livre
+        sob lock e dorme fora dele, então N workers somados respeitam
+        `rate_limit` req/s.
+        """
+        with self._rate_lock:
+            now = time.time()
+            scheduled = now
+            if self._last_request_time > 0:
+                scheduled = max(now, self._last_request_time + 1.0 / self.rate_limit)
+            self._last_request_time = scheduled
+        if scheduled > now:
+            time.sleep(scheduled - now)
 
     @staticmethod
     def generate_content_hash(item: Dict) -> str:
@@ -545,12 +691,10 @@ class LeiloeiroAPIClient:
 
 def fetch_tipos_leilao() -> List[Dict]:
     """Busca tipos de leilão disponíveis."""
-    client = LeiloeiroAPIClient()
     try:
-        with httpx.Client(timeout=30) as http:
-            response = http.get(f"{client.BASE_URL}/get-tipos")
-            if response.status_code == 200:
-                return response.json()
+        response = get_default_session().get(f"{LeiloeiroAPIClient.BASE_URL}/get-tipos", timeout=30)
+        if response.status_code == 200:
+            return response.json()
     except Exception as e:
         logger.error(f"Erro ao buscar tipos: {e}")
     return []
@@ -558,12 +702,10 @@ def fetch_tipos_leilao() -> List[Dict]:
 
 def fetch_dados_filtros() -> Dict:
     """Busca dados para filtros (estados, cidades, categorias)."""
-    client = LeiloeiroAPIClient()
     try:
-        with httpx.Client(timeout=30) as http:
-            response = http.get(f"{client.BASE_URL}/get-dados-filtros")
-            if response.status_code == 200:
-                return response.json()
+        response = get_default_session().get(f"{LeiloeiroAPIClient.BASE_URL}/get-dados-filtros", timeout=30)
+        if response.status_code == 200:
+            return response.json()
     except Exception as e:
         logger.error(f"Erro ao buscar dados de filtros: {e}")
     return {}
@@ -81,7 +81,8 @@ class Config:
 
     # === LIMITES ===
     MAX_LOTS_PER_RUN: int = 500  # Limite de lotes por execução
-    MAX_CONCURRENT_REQUESTS: int = 1  # Sem concorrência (respeito ao site)
+    MAX_CONCURRENT_REQUESTS: int = 1  # Páginas em paralelo (1 = serial); o rate limit acima é global
+    FETCH_CONCURRENT_REQUESTS: int = 4  # Páginas de lote em paralelo no fetcher; rate limit por host
 
     # === PATHS DE SAÍDA ===
     OUTPUT_DIR: str = "out"
@@ -0,0 +1,262 @@
+"""
+Estado de Ingestão Incremental (delta) - Leilões Judiciais.
+
+A API devolve o catálogo inteiro a cada execução; quase todos os lotes são
+os mesmos de ontem. O estado local guarda `chave do lote -> content_hash,
+last_seen` (SQLite) e o pipeline classifica cada item buscado:
+
+- new:         chave nunca vista
+- changed:     payload diferente do último processado (ou lote que tinha
+               sumido e voltou)
+- unchanged:   mesmo payload; só atualiza last_seen
+- disappeared: estava ativo e não veio na listagem completa desta execução
+
+Só new/changed passam por normalize -> validate -> persist; disappeared
+vira tombstone (publication_status='archived') no banco.
+
+O hash cobre o payload inteiro da API, exceto campos voláteis (contador de
+visitas) e as marcações internas do client (`_tipo_busca`): o
+generate_content_hash do client só olha id/leilao/título e não enxerga
+mudança de valor, data ou fotos.
+
+Uso:
+    from connectors.leiloesjudiciais.delta_state import DeltaState
+
+    state = DeltaState.from_env()
+    plan = state.classify(items, complete=True)
+    ...  # processa plan.to_process
+    state.commit(processados, id_por_chave)
+    state.touch(plan.unchanged_keys)
+    state.close()
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+# Caminho padrão do estado (sobrescrito por LEILOEIRO_DELTA_STATE_PATH)
+DEFAULT_STATE_PATH = "out/leiloesjudiciais/delta_state.sqlite"
+
+# Campos que mudam a cada visita ao site e não alteram o lote
+VOLATILE_FIELDS = {"nu_visitas"}
+
+# Classes do delta
+NEW = "new"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+
+
+def item_key(item: Dict) -> str:
+    """Chave estável do item da API (mesmos IDs usados no id_interno)."""
+    lote_id = str(item.get("lote_id", item.get("id", "")))
+    leilao_id = str(item.get("leilao_id") or "")
+    return f"{lote_id}|{leilao_id}"
+
+
+def payload_hash(item: Dict) -> str:
+    """SHA-256 do payload canônico (chaves ordenadas, sem campos voláteis)."""
+    conteudo = {
+        k: v for k, v in item.items()
+        if not k.startswith("_") and k not in VOLATILE_FIELDS
+    }
+    serializado = json.dumps(conteudo, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(serializado.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class RemovedLot:
+    """Lote ativo que não veio na listagem."""
+    key: str
+    id_interno: Optional[str]
+    last_seen: float
+
+
+@dataclass
+class DeltaPlan:
+    """Classificação dos itens de uma execução."""
+    new: List[Dict] = field(default_factory=list)
+    changed: List[Dict] = field(default_factory=list)
+    unchanged_keys: List[str] = field(default_factory=list)
+    disappeared: List[RemovedLot] = field(default_factory=list)
+    complete: bool = True
+
+    @property
+    def to_process(self) -> List[Dict]:
+        """Itens que passam pelo pipeline (new + changed, na ordem da API)."""
+        return self.new + self.changed
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "new": len(self.new),
+            "changed": len(self.changed),
+            "unchanged": len(self.unchanged_keys),
+            "disappeared": len(self.disappeared),
+            "listing_complete": self.complete,
+        }
+
+
+class DeltaState:
+    """
+    Estado SQLite `chave -> content_hash, id_interno, first/last_seen`.
+
+    removed_at marca lotes já tombstoned; se voltarem na listagem são
+    reprocessados (changed) para serem republicados.
+    """
+
+    def __init__(self, path: str = DEFAULT_STATE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS lote_state (
+                lote_key TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                id_interno TEXT,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                removed_at REAL
+            )
+            """
+        )
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls) -> "DeltaState":
+        """Estado no caminho de LEILOEIRO_DELTA_STATE_PATH (ou DEFAULT_STATE_PATH)."""
+        return cls(os.getenv("LEILOEIRO_DELTA_STATE_PATH", DEFAULT_STATE_PATH))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM lote_state").fetchone()[0]
+
+    def classify(self, items: List[Dict], complete: bool = True) -> DeltaPlan:
+        """
+        Classifica os itens buscados contra o estado.
+
+        Args:
+            items: Itens da API (a mesma chave repetida conta uma vez)
+            complete: A listagem cobriu o catálogo inteiro (sem max_pages
+                nem páginas com erro). Só assim ausência vira disappeared.
+        """
+        plan = DeltaPlan(complete=complete)
+        vistos: Set[str] = set()
+        for item in items:
+            chave = item_key(item)
+            if chave in vistos:
+                continue
+            vistos.add(chave)
+
+            status = self.classify_item(item)
+            if status == NEW:
+                plan.new.append(item)
+            elif status == CHANGED:
+                plan.changed.append(item)
+            else:
+                plan.unchanged_keys.append(chave)
+
+        if complete:
+            plan.disappeared = self.disappeared(vistos)
+
+        logger.info(
+            f"Delta: {len(plan.new)} novos, {len(plan.changed)} alterados, "
+            f"{len(plan.unchanged_keys)} inalterados, {len(plan.disappeared)} sumiram"
+        )
+        return plan
+
+    def classify_item(self, item: Dict) -> str:
+        """Classe de um item (NEW, CHANGED ou UNCHANGED) - uma consulta por chave."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash, removed_at FROM lote_state WHERE lote_key = ?",
+                (item_key(item),),
+            ).fetchone()
+        if row is None:
+            return NEW
+        content_hash, removed_at = row
+        if removed_at is not None or content_hash != payload_hash(item):
+            return CHANGED
+        return UNCHANGED
+
+    def disappeared(self, seen_keys: Set[str]) -> List[RemovedLot]:
+        """Lotes ativos no estado que não estão em seen_keys."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT lote_key, id_interno, last_seen FROM lote_state WHERE removed_at IS NULL"
+            ).fetchall()
+        return [
+            RemovedLot(key=chave, id_interno=id_interno, last_seen=last_seen)
+            for chave, id_interno, last_seen in rows
+            if chave not in seen_keys
+        ]
+
+    def commit(
+        self,
+        items: Iterable[Dict],
+        id_por_chave: Optional[Dict[str, str]] = None,
+        now: Optional[float] = None,
+    ):
+        """
+        Grava o hash dos itens processados até o fim.
+
+        id_interno só é sobrescrito quando informado (lote persistido), para
+        que um lote que já está no banco continue elegível a tombstone.
+        """
+        now = now if now is not None else time.time()
+        id_por_chave = id_por_chave or {}
+        rows = []
+        for item in items:
+            chave = item_key(item)
+            rows.append((chave, payload_hash(item), id_por_chave.get(chave), now, now))
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                """
+                INSERT INTO lote_state (lote_key, content_hash, id_interno, first_seen, last_seen, removed_at)
+                VALUES (?, ?, ?, ?, ?, NULL)
+                ON CONFLICT(lote_key) DO UPDATE SET
+                    content_hash = excluded.content_hash,
+                    id_interno = COALESCE(excluded.id_interno, lote_state.id_interno),
+                    last_seen = excluded.last_seen,
+                    removed_at = NULL
+                """,
+                rows,
+            )
+            self._conn.commit()
+
+    def touch(self, keys: Iterable[str], now: Optional[float] = None):
+        """Atualiza last_seen dos lotes inalterados."""
+        now = now if now is not None else time.time()
+        self._update_many("UPDATE lote_state SET last_seen = ? WHERE lote_key = ?", keys, now)
+
+    def mark_removed(self, keys: Iterable[str], now: Optional[float] = None):
+        """Marca lotes como tombstoned (não aparecem mais como disappeared)."""
+        now = now if now is not None else time.time()
+        self._update_many("UPDATE lote_state SET removed_at = ? WHERE lote_key = ?", keys, now)
+
+    def _update_many(self, sql: str, keys: Iterable[str], now: float):
+        rows = [(now, chave) for chave in keys]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(sql, rows)
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
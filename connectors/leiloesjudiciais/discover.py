@@ -6,26 +6,55 @@ Responsável por:
 2. Extrair URLs de lotes
 3. Filtrar por categorias de veículos/sucatas
 4. Gerar discovery_report.json (Phase 4)
+
+O sitemap é lido em streaming (XMLPullParser alimentado pelos bytes da
+resposta, elementos descartados logo após o uso): a memória não cresce com
+o tamanho do sitemap. Sitemap-index é suportado - os sitemaps filhos são
+baixados em paralelo e suas URLs chegam por uma fila limitada.
+
+Modo incremental (discover_incremental): uma marca d'água de lastmod por
+leilão (SQLite) faz a descoberta devolver só lotes modificados desde a
+última execução; sitemaps filhos com lastmod anterior à marca nem são
+baixados.
 """
 
+import heapq
 import json
 import os
+import queue
 import re
+import sqlite3
+import threading
+import time
 import xml.etree.ElementTree as ET
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field, asdict
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Optional, Set
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from urllib.parse import urlparse
 import logging
 
-import httpx
-
 from .config import Config, config
+from .session import SessionManager, resolve_session
 
 logger = logging.getLogger(__name__)
 
 
+# Caminho padrão das marcas d'água (sobrescrito por LEILOEIRO_SITEMAP_STATE_PATH)
+DEFAULT_WATERMARK_PATH = "out/leiloesjudiciais/sitemap_watermarks.sqlite"
+
+# Sitemaps filhos de um sitemap-index baixados em paralelo
+SITEMAP_INDEX_WORKERS = 4
+
+# Entradas em trânsito entre os workers e o consumidor
+SITEMAP_QUEUE_SIZE = 1000
+
+# Bytes lidos por vez da resposta
+SITEMAP_CHUNK_BYTES = 64 * 1024
+
+
 @dataclass
 class DiscoveredLot:
     """Representa um lote descoberto no sitemap."""
@@ -49,6 +78,10 @@ class DiscoveryReport:
     # PHASE 4: Additional fields
     sources_used: List[str] = field(default_factory=list)
     top_seeds: List[dict] = field(default_factory=list)
+    # Modo incremental / sitemap-index
+    sitemaps_fetched: int = 0
+    sitemaps_skipped: int = 0
+    lots_unchanged: int = 0
 
     def to_dict(self) -> dict:
         return asdict(self)
@@ -65,6 +98,77 @@ class DiscoveryReport:
         return filepath
 
 
+class SitemapWatermarks:
+    """
+    Marcas d'água de lastmod (SQLite): por leilão e por sitemap filho.
+
+    Carregadas inteiras na abertura (uma linha por leilão/sitemap, não por
+    lote) e gravadas em lote em advance().
+    """
+
+    def __init__(self, path: str = DEFAULT_WATERMARK_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sitemap_watermarks (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                lastmod TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (kind, key)
+            )
+            """
+        )
+        self._conn.commit()
+        self._marks: Dict[Tuple[str, str], datetime] = {}
+        for kind, key, lastmod in self._conn.execute("SELECT kind, key, lastmod FROM sitemap_watermarks"):
+            instante = parse_lastmod(lastmod)
+            if instante is not None:
+                self._marks[(kind, key)] = instante
+
+    @classmethod
+    def from_env(cls) -> "SitemapWatermarks":
+        """Marcas no caminho de LEILOEIRO_SITEMAP_STATE_PATH (ou DEFAULT_WATERMARK_PATH)."""
+        return cls(os.getenv("LEILOEIRO_SITEMAP_STATE_PATH", DEFAULT_WATERMARK_PATH))
+
+    def is_newer(self, kind: str, key: str, lastmod: Optional[str]) -> bool:
+        """True se lastmod é posterior à marca (sem lastmod ou sem marca: True)."""
+        instante = parse_lastmod(lastmod)
+        marca = self._marks.get((kind, key))
+        return instante is None or marca is None or instante > marca
+
+    def advance(self, kind: str, marks: Dict[str, str]):
+        """Avança as marcas (nunca retrocede)."""
+        rows = []
+        agora = time.time()
+        for key, lastmod in marks.items():
+            instante = parse_lastmod(lastmod)
+            if instante is None:
+                continue
+            atual = self._marks.get((kind, key))
+            if atual is not None and atual >= instante:
+                continue
+            self._marks[(kind, key)] = instante
+            rows.append((kind, key, instante.isoformat(), agora))
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sitemap_watermarks (kind, key, lastmod, updated_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
 class LeilaoDiscovery:
     """
     Descoberta de lotes via sitemap.
@@ -76,9 +180,14 @@ class LeilaoDiscovery:
     4. Retorna lista filtrada
     """
 
-    def __init__(self, cfg: Optional[Config] = None):
+    def __init__(self, cfg: Optional[Config] = None, session: Optional[SessionManager] = None):
         self.config = cfg or config
+        self.session = resolve_session(session, self.config)
         self.lot_pattern = re.compile(self.config.LOT_URL_PATTERN)
+        # Marcas d'água candidatas da última descoberta incremental
+        # (leilão -> maior lastmod devolvido); gravadas por commit_watermarks
+        self.pending_watermarks: Dict[str, str] = {}
+        self._pending_sitemaps: Dict[str, str] = {}
 
     def discover_from_sitemap(
         self,
@@ -99,25 +208,22 @@ class LeilaoDiscovery:
         """
         report = DiscoveryReport()
         report.sources_used = ["sitemap.xml"]
-        lots: List[DiscoveredLot] = []
         category_urls: Set[str] = set()
         leilao_counts: dict = {}  # Track lots per leilao_id
+        lot_count = 0
+
+        # Com max_lots só os N mais recentes ficam em memória (heap)
+        heap: List[Tuple[str, int, DiscoveredLot]] = []
+        all_lots: List[DiscoveredLot] = []
+        lots: List[DiscoveredLot] = []
 
         try:
-            # 1. Busca sitemap
+            # 1-2. Busca e parse em streaming (sitemap-index incluso)
             logger.info(f"Fetching sitemap: {self.config.SITEMAP_URL}")
-            xml_content = self._fetch_sitemap()
-            if not xml_content:
-                report.errors.append("Falha ao buscar sitemap")
-                return [], report
-
-            # 2. Parse XML
-            urls_data = self._parse_sitemap(xml_content)
-            report.total_urls_found = len(urls_data)
-            logger.info(f"Found {len(urls_data)} URLs in sitemap")
 
             # 3. Processa cada URL
-            for url_data in urls_data:
+            for url_data in self.iter_sitemap_entries(report=report):
+                report.total_urls_found += 1
                 url = url_data.get("loc", "")
 
                 # Identifica URLs de categorias
@@ -125,25 +231,28 @@ class LeilaoDiscovery:
                     category_urls.add(url)
                     continue
 
-                # Verifica se é URL de lote
-                match = self.lot_pattern.search(url)
-                if not match:
+                lot = self._lot_from_entry(url_data)
+                if lot is None:
                     continue
+                lot_count += 1
 
-                leilao_id, lote_id = match.groups()
-                lot = DiscoveredLot(
-                    url=url,
-                    leilao_id=leilao_id,
-                    lote_id=lote_id,
-                    lastmod=url_data.get("lastmod"),
-                    priority=self._parse_priority(url_data.get("priority")),
-                )
-                lots.append(lot)
+                if max_lots:
+                    chave = (lot.lastmod or "", -lot_count, lot)
+                    if len(heap) < max_lots:
+                        heapq.heappush(heap, chave)
+                    elif chave[:2] > heap[0][:2]:
+                        heapq.heapreplace(heap, chave)
+                else:
+                    all_lots.append(lot)
 
                 # Track lots per leilao for top_seeds
-                leilao_counts[leilao_id] = leilao_counts.get(leilao_id, 0) + 1
+                leilao_counts[lot.leilao_id] = leilao_counts.get(lot.leilao_id, 0) + 1
+
+            if report.total_urls_found == 0 and report.errors:
+                return [], report
+            logger.info(f"Found {report.total_urls_found} URLs in sitemap")
 
-            report.lot_urls_found = len(lots)
+            report.lot_urls_found = lot_count
             report.category_urls = len(category_urls)
 
             # PHASE 4: Calculate top seeds (leiloes with most lots)
@@ -153,12 +262,13 @@ class LeilaoDiscovery:
                 for lid, count in sorted_leiloes
             ]
 
-            # 4. Ordena por data de modificação (mais recentes primeiro)
-            lots.sort(key=lambda x: x.lastmod or "", reverse=True)
-
-            # 5. Aplica limite
+            # 4-5. Ordena por data de modificação (mais recentes primeiro) e
+            # aplica o limite; empate mantém a ordem do sitemap
             if max_lots:
-                lots = lots[:max_lots]
+                lots = [lot for _, _, lot in sorted(heap, key=lambda x: x[:2], reverse=True)]
+            else:
+                all_lots.sort(key=lambda x: x.lastmod or "", reverse=True)
+                lots = all_lots
 
             report.filtered_vehicle_lots = len(lots)
 
@@ -174,6 +284,246 @@ class LeilaoDiscovery:
 
         return lots, report
 
+    def discover_incremental(
+        self,
+        watermarks: SitemapWatermarks,
+        max_lots: Optional[int] = None,
+        report: Optional[DiscoveryReport] = None,
+    ) -> Iterator[DiscoveredLot]:
+        """
+        Gera, em streaming, só os lotes modificados desde a última execução.
+
+        Um lote sai se seu lastmod é posterior à marca d'água do leilão (ou
+        se não tem lastmod/marca). Ao fim, pending_watermarks guarda o maior
+        lastmod devolvido por leilão; o chamador grava com
+        commit_watermarks() depois de buscar os lotes. Leilões com lotes
+        modificados que ficaram de fora por max_lots não avançam a marca.
+
+        Args:
+            watermarks: Marcas d'água persistidas
+            max_lots: Máximo de lotes gerados (o sitemap é lido até o fim
+                mesmo assim, só para saber quais leilões ficaram truncados)
+            report: Relatório a preencher (opcional)
+        """
+        report = report if report is not None else DiscoveryReport()
+        report.sources_used = ["sitemap.xml (incremental)"]
+        self.pending_watermarks = {}
+        self._pending_sitemaps = {}
+        truncated: Set[str] = set()
+        yielded = 0
+
+        for url_data in self.iter_sitemap_entries(report=report, watermarks=watermarks):
+            report.total_urls_found += 1
+            lot = self._lot_from_entry(url_data)
+            if lot is None:
+                continue
+            report.lot_urls_found += 1
+
+            if not watermarks.is_newer("leilao", lot.leilao_id, lot.lastmod):
+                report.lots_unchanged += 1
+                continue
+            if max_lots and yielded >= max_lots:
+                truncated.add(lot.leilao_id)
+                continue
+
+            yielded += 1
+            report.filtered_vehicle_lots = yielded
+            if lot.lastmod and parse_lastmod(lot.lastmod) is not None:
+                atual = self.pending_watermarks.get(lot.leilao_id)
+                if atual is None or parse_lastmod(lot.lastmod) > parse_lastmod(atual):
+                    self.pending_watermarks[lot.leilao_id] = lot.lastmod
+            yield lot
+
+        for leilao_id in truncated:
+            self.pending_watermarks.pop(leilao_id, None)
+        if truncated:
+            # Sitemap filho pode ter lotes truncados: não avança nenhum
+            self._pending_sitemaps = {}
+
+        logger.info(
+            f"Incremental: {yielded} lotes modificados, {report.lots_unchanged} inalterados, "
+            f"{report.sitemaps_skipped} sitemaps pulados, {len(truncated)} leilões truncados"
+        )
+
+    def commit_watermarks(self, watermarks: SitemapWatermarks, failed_leiloes: Iterable[str] = ()):
+        """
+        Grava as marcas da última descoberta incremental.
+
+        Leilões com lote que falhou no fetch ficam de fora (e os sitemaps
+        filhos também, já que a marca deles cobre todos os seus lotes).
+        """
+        falhas = set(failed_leiloes)
+        marcas = {k: v for k, v in self.pending_watermarks.items() if k not in falhas}
+        watermarks.advance("leilao", marcas)
+        if not falhas:
+            watermarks.advance("sitemap", self._pending_sitemaps)
+        logger.info(f"Marcas d'água avançadas: {len(marcas)} leilões")
+
+    # ------------------------------------------------------------------
+    # Sitemap em streaming
+    # ------------------------------------------------------------------
+
+    def iter_sitemap_entries(
+        self,
+        url: Optional[str] = None,
+        report: Optional[DiscoveryReport] = None,
+        watermarks: Optional[SitemapWatermarks] = None,
+    ) -> Iterator[dict]:
+        """
+        Gera as entradas <url> (loc, lastmod, priority) do sitemap.
+
+        Se o documento é um sitemap-index, os filhos são baixados em
+        paralelo (SITEMAP_INDEX_WORKERS); com watermarks, filhos cujo
+        lastmod não mudou desde a última execução são pulados.
+        """
+        url = url or self.config.SITEMAP_URL
+        report = report if report is not None else DiscoveryReport()
+        filhos: List[dict] = []
+
+        try:
+            report.sitemaps_fetched += 1
+            for kind, entry in self._stream_sitemap(url):
+                if kind == "url":
+                    yield entry
+                else:
+                    filhos.append(entry)
+        except Exception as e:
+            logger.error(f"Falha ao ler sitemap {url}: {e}")
+            report.errors.append(f"Falha ao buscar sitemap: {url}")
+            return
+
+        if filhos:
+            yield from self._iter_child_sitemaps(filhos, report, watermarks, {url})
+
+    def _iter_child_sitemaps(
+        self,
+        filhos: List[dict],
+        report: DiscoveryReport,
+        watermarks: Optional[SitemapWatermarks],
+        vistos: Set[str],
+    ) -> Iterator[dict]:
+        """
+        Lê sitemaps filhos em paralelo; as entradas chegam por fila limitada.
+
+        Se o consumidor parar antes do fim, os workers são avisados (stop)
+        e não ficam presos na fila cheia.
+        """
+        fila: "queue.Queue[Tuple[str, object]]" = queue.Queue(maxsize=SITEMAP_QUEUE_SIZE)
+        stop = threading.Event()
+
+        def put(item: Tuple[str, object]) -> bool:
+            while not stop.is_set():
+                try:
+                    fila.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def worker(filho_url: str):
+            try:
+                for kind, entry in self._stream_sitemap(filho_url):
+                    if not put((kind, entry)):
+                        return
+            except Exception as e:
+                put(("error", (filho_url, str(e))))
+            finally:
+                put(("done", filho_url))
+
+        ativos = 0
+        with ThreadPoolExecutor(max_workers=SITEMAP_INDEX_WORKERS, thread_name_prefix="sitemap") as pool:
+
+            def agendar(filho: dict) -> int:
+                loc = filho.get("loc")
+                if not loc or loc in vistos:
+                    return 0
+                vistos.add(loc)
+                if watermarks is not None:
+                    if not watermarks.is_newer("sitemap", loc, filho.get("lastmod")):
+                        report.sitemaps_skipped += 1
+                        return 0
+                    if filho.get("lastmod"):
+                        self._pending_sitemaps[loc] = filho["lastmod"]
+                report.sitemaps_fetched += 1
+                pool.submit(worker, loc)
+                return 1
+
+            try:
+                for filho in filhos:
+                    ativos += agendar(filho)
+                while ativos:
+                    kind, payload = fila.get()
+                    if kind == "url":
+                        yield payload
+                    elif kind == "sitemap":
+                        ativos += agendar(payload)
+                    elif kind == "error":
+                        filho_url, erro = payload
+                        logger.error(f"Falha ao ler sitemap filho {filho_url}: {erro}")
+                        report.errors.append(f"Falha ao buscar sitemap: {filho_url}")
+                        # Marca do sitemap com erro não pode avançar
+                        self._pending_sitemaps.pop(filho_url, None)
+                    elif kind == "done":
+                        ativos -= 1
+            finally:
+                stop.set()
+
+    def _stream_sitemap(self, url: str) -> Iterator[Tuple[str, dict]]:
+        """
+        Baixa e faz parsing de um sitemap em streaming.
+
+        Gera ("url", entrada) para <url> e ("sitemap", entrada) para
+        <sitemap> (sitemap-index). Cada elemento é limpo logo após virar
+        dicionário, então só o elemento corrente fica em memória. Aceita
+        sitemap gzip (.xml.gz servido sem Content-Encoding).
+        """
+        parser = ET.XMLPullParser(events=("start", "end"))
+        raiz = None
+        gunzip = None
+
+        with self.session.stream("GET", url) as response:
+            if response.status_code != 200:
+                raise RuntimeError(f"HTTP {response.status_code}")
+            for i, chunk in enumerate(response.iter_bytes(SITEMAP_CHUNK_BYTES)):
+                # Corpo ainda comprimido (magic bytes do gzip)
+                if i == 0 and chunk[:2] == b"\x1f\x8b":
+                    gunzip = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                parser.feed(gunzip.decompress(chunk) if gunzip else chunk)
+                for event, elem in parser.read_events():
+                    if event == "start":
+                        if raiz is None:
+                            raiz = elem
+                        continue
+                    tag = _local_name(elem.tag)
+                    if tag not in ("url", "sitemap"):
+                        continue
+                    entry = {}
+                    for child in elem:
+                        nome = _local_name(child.tag)
+                        if nome in ("loc", "lastmod", "priority") and child.text:
+                            entry[nome] = child.text.strip()
+                    elem.clear()
+                    if raiz is not None:
+                        raiz.clear()
+                    if "loc" in entry:
+                        yield tag, entry
+            parser.close()
+
+    def _lot_from_entry(self, url_data: dict) -> Optional[DiscoveredLot]:
+        """DiscoveredLot de uma entrada do sitemap (None se não é URL de lote)."""
+        url = url_data.get("loc", "")
+        match = self.lot_pattern.search(url)
+        if not match:
+            return None
+        leilao_id, lote_id = match.groups()
+        return DiscoveredLot(
+            url=url,
+            leilao_id=leilao_id,
+            lote_id=lote_id,
+            lastmod=url_data.get("lastmod"),
+            priority=self._parse_priority(url_data.get("priority")),
+        )
+
     def discover_from_category_pages(
         self,
         categories: Optional[List[str]] = None
@@ -209,67 +559,16 @@ class LeilaoDiscovery:
         report.lot_urls_found = len(lot_urls)
         return list(lot_urls), report
 
-    def _fetch_sitemap(self) -> Optional[str]:
-        """Busca conteúdo do sitemap."""
-        try:
-            with httpx.Client(timeout=self.config.REQUEST_TIMEOUT_SECONDS) as client:
-                response = client.get(
-                    self.config.SITEMAP_URL,
-                    headers=self.config.get_headers()
-                )
-                if response.status_code == 200:
-                    return response.text
-        except Exception:
-            pass
-        return None
-
     def _fetch_page(self, url: str) -> Optional[str]:
         """Busca conteúdo de uma página."""
         try:
-            with httpx.Client(timeout=self.config.REQUEST_TIMEOUT_SECONDS) as client:
-                response = client.get(url, headers=self.config.get_headers())
-                if response.status_code == 200:
-                    return response.text
+            response = self.session.get(url)
+            if response.status_code == 200:
+                return response.text
         except Exception:
             pass
         return None
 
-    def _parse_sitemap(self, xml_content: str) -> List[dict]:
-        """
-        Faz parsing do sitemap XML.
-
-        Returns:
-            Lista de dicionários com loc, lastmod, priority
-        """
-        urls = []
-        try:
-            # Remove namespace para facilitar parsing
-            xml_content = re.sub(r'\sxmlns="[^"]+"', '', xml_content)
-            root = ET.fromstring(xml_content)
-
-            for url_elem in root.findall(".//url"):
-                url_data = {}
-
-                loc = url_elem.find("loc")
-                if loc is not None and loc.text:
-                    url_data["loc"] = loc.text.strip()
-
-                lastmod = url_elem.find("lastmod")
-                if lastmod is not None and lastmod.text:
-                    url_data["lastmod"] = lastmod.text.strip()
-
-                priority = url_elem.find("priority")
-                if priority is not None and priority.text:
-                    url_data["priority"] = priority.text.strip()
-
-                if "loc" in url_data:
-                    urls.append(url_data)
-
-        except ET.ParseError:
-            pass
-
-        return urls
-
     def _parse_priority(self, priority_str: Optional[str]) -> Optional[float]:
         """Converte string de prioridade para float."""
         if not priority_str:
@@ -304,6 +603,24 @@ class LeilaoDiscovery:
         return list(set(urls))
 
 
+def _local_name(tag: str) -> str:
+    """Nome do elemento sem namespace ({http://...}url -> url)."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_lastmod(lastmod: Optional[str]) -> Optional[datetime]:
+    """lastmod do sitemap (data ou data-hora W3C) como datetime UTC."""
+    if not lastmod:
+        return None
+    try:
+        instante = datetime.fromisoformat(lastmod.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if instante.tzinfo is None:
+        instante = instante.replace(tzinfo=timezone.utc)
+    return instante.astimezone(timezone.utc)
+
+
 # Função de conveniência
 def discover_lots(
     filter_vehicles: bool = True,
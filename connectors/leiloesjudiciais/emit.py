@@ -17,6 +17,8 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional
 import logging
 
+from connectors.common.bulk_writer import BulkUpsertWriter
+
 from .config import Config, config
 from .normalize import NormalizedLot
 
@@ -119,9 +121,6 @@ class LeilaoEmitter:
         # PHASE 5: Category stats
         self._category_stats = CategoryStats()
 
-        # Supabase client (lazy init)
-        self._supabase = None
-
     def _generate_run_id(self) -> str:
         """Gera ID único para a execução."""
         ts = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
@@ -371,54 +370,34 @@ class LeilaoEmitter:
         """
         Persiste itens no Supabase usando a tabela raw.leiloes.
 
+        Upsert em lote por id_interno (BulkUpsertWriter): chunks em
+        paralelo, e um item rejeitado é isolado por bisecção sem derrubar
+        o resto do chunk.
+
         Returns:
-            Tupla (inseridos, erros)
+            Tupla (gravados, erros)
         """
         if not self.config.supabase_enabled:
             logger.warning("Supabase não configurado, pulando persistência")
             return 0, 0
 
         try:
-            from supabase import create_client
-
-            if self._supabase is None:
-                self._supabase = create_client(
-                    self.config.supabase_url,
-                    self.config.supabase_key
-                )
+            rows = [self._map_to_db_schema(item) for item in self._emitted_items]
+            with BulkUpsertWriter(
+                self.config.supabase_url,
+                self.config.supabase_key,
+                table="leiloes",
+                schema="raw",
+                on_conflict="id_interno",
+                key_field="id_interno",
+            ) as writer:
+                result = writer.upsert(rows)
+
+            logger.info(f"Supabase: {result.written} gravados, {result.failed} erros")
+            return result.written, result.failed
 
-            inserted = 0
-            updated = 0
-            errors = 0
-
-            for item in self._emitted_items:
-                try:
-                    # Map to database schema
-                    db_record = self._map_to_db_schema(item)
-
-                    # Upsert baseado no id_interno na tabela raw.leiloes
-                    # Note: Supabase client uses schema prefix in table name
-                    self._supabase.schema("raw").table("leiloes").upsert(
-                        db_record,
-                        on_conflict="id_interno"
-                    ).execute()
-                    inserted += 1
-                except Exception as e:
-                    error_msg = str(e)
-                    if "duplicate" in error_msg.lower():
-                        updated += 1
-                    else:
-                        logger.error(f"Erro ao inserir {item.get('id_interno')}: {e}")
-                        errors += 1
-
-            logger.info(f"Supabase: {inserted} inseridos, {updated} atualizados, {errors} erros")
-            return inserted + updated, errors
-
-        except ImportError:
-            logger.error("Módulo supabase não instalado")
-            return 0, len(self._emitted_items)
         except Exception as e:
-            logger.error(f"Erro ao conectar Supabase: {e}")
+            logger.error(f"Erro ao persistir no Supabase: {e}")
             return 0, len(self._emitted_items)
 
     def _map_to_db_schema(self, item: Dict) -> Dict:
@@ -0,0 +1,443 @@
+"""
+Arquivo de Evidências HTML - Leilões Judiciais.
+
+Responsável por:
+1. Gravar o HTML de cada página buscada em shards append-only comprimidos
+   (JSONL: url, fetched_at, sha256, leilao_id, lote_id, body)
+2. Manter um índice SQLite (url/sha256 -> shard, bloco, posição) para
+   acesso direto a uma página
+3. Ler as evidências de volta (EvidenceReader) para extraction_proof e
+   reprocessamentos em lote
+
+Antes cada página virava um .html separado: dezenas de milhares de arquivos
+pequenos por execução, varreduras de diretório lentas e um inode (mais
+open/write/close) por página. Aqui as páginas são agrupadas em blocos de
+até BLOCK_MAX_RECORDS registros; cada bloco é um frame comprimido
+independente (zstd se `zstandard` estiver instalado, senão gzip) gravado
+com um único write no fim do shard. Páginas do mesmo site compartilham
+quase todo o HTML, então comprimir o bloco inteiro rende muito mais que
+comprimir página a página, e o acesso direto só descomprime um bloco.
+
+A mesma página (url + sha256) não é gravada duas vezes: reprocessar um 304
+do cache de fetch não duplica a evidência.
+
+Uso:
+    from connectors.leiloesjudiciais.evidence_archive import EvidenceArchive, EvidenceReader
+
+    archive = EvidenceArchive.from_env()
+    archive.append(url, html, leilao_id, lote_id)
+    archive.close()  # grava o bloco pendente
+
+    reader = EvidenceReader.from_env()
+    record = reader.get(url)
+    for record in reader.iter_records():
+        ...
+    reader.close()
+"""
+
+import atexit
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+# Erros ao descomprimir um bloco danificado
+READ_ERRORS: tuple = (EOFError, OSError, zlib.error)
+if HAS_ZSTD:
+    READ_ERRORS += (zstandard.ZstdError,)
+
+logger = logging.getLogger(__name__)
+
+
+# Diretório padrão do arquivo (sobrescrito por LEILOEIRO_EVIDENCE_DIR)
+DEFAULT_ARCHIVE_DIR = "out/leiloesjudiciais/evidence"
+
+INDEX_FILENAME = "index.sqlite"
+
+# Um bloco (frame comprimido) fecha com N registros ou N bytes de JSONL
+BLOCK_MAX_RECORDS = 64
+BLOCK_MAX_BYTES = 4 * 1024 * 1024
+
+# Tamanho (comprimido) a partir do qual o próximo bloco abre outro shard
+SHARD_MAX_BYTES = 256 * 1024 * 1024
+
+ZSTD_LEVEL = 10
+GZIP_LEVEL = 6
+
+# Extensão do shard -> codec (o leitor decide pelo nome do arquivo)
+ZSTD_SUFFIX = ".jsonl.zst"
+GZIP_SUFFIX = ".jsonl.gz"
+
+
+@dataclass
+class EvidenceRecord:
+    """Uma página arquivada."""
+    url: str
+    fetched_at: str
+    sha256: str
+    body: str
+    leilao_id: str = ""
+    lote_id: str = ""
+
+    def to_dict(self) -> Dict[str, str]:
+        return {
+            "url": self.url,
+            "fetched_at": self.fetched_at,
+            "sha256": self.sha256,
+            "leilao_id": self.leilao_id,
+            "lote_id": self.lote_id,
+            "body": self.body,
+        }
+
+
+@dataclass
+class EvidenceRef:
+    """Onde um registro foi (ou será, se ainda no bloco pendente) gravado."""
+    url: str
+    sha256: str
+    shard: str
+    duplicate: bool = False
+
+
+def body_hash(body: str) -> str:
+    """SHA-256 do HTML (identifica a versão da página)."""
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def _open_index(directory: str) -> sqlite3.Connection:
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(directory, INDEX_FILENAME), check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS evidence (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT NOT NULL,
+            sha256 TEXT NOT NULL,
+            leilao_id TEXT,
+            lote_id TEXT,
+            fetched_at TEXT NOT NULL,
+            shard TEXT NOT NULL,
+            block_offset INTEGER NOT NULL,
+            block_length INTEGER NOT NULL,
+            position INTEGER NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_evidence_url ON evidence (url)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_evidence_sha256 ON evidence (sha256)")
+    conn.commit()
+    return conn
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _decompress(frame: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(frame)
+    return gzip.decompress(frame)
+
+
+def _codec_for(shard: str) -> str:
+    return "zstd" if shard.endswith(ZSTD_SUFFIX) else "gzip"
+
+
+class EvidenceArchive:
+    """
+    Escritor append-only do arquivo de evidências (thread-safe).
+
+    Registros ficam num bloco em memória até BLOCK_MAX_RECORDS/BYTES; o
+    bloco é comprimido, anexado ao shard atual e indexado numa transação.
+    Cada processo escreve nos próprios shards (nome com timestamp e pid),
+    então execuções simultâneas não disputam o mesmo arquivo.
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_ARCHIVE_DIR,
+        codec: Optional[str] = None,
+        block_max_records: int = BLOCK_MAX_RECORDS,
+        shard_max_bytes: int = SHARD_MAX_BYTES,
+    ):
+        """
+        Args:
+            directory: Diretório dos shards e do índice
+            codec: "zstd" ou "gzip" (padrão: zstd se instalado)
+            block_max_records: Registros por bloco comprimido
+            shard_max_bytes: Tamanho comprimido que fecha o shard
+        """
+        if codec == "zstd" and not HAS_ZSTD:
+            logger.warning("zstandard não instalado; evidências em gzip")
+            codec = "gzip"
+        self.directory = directory
+        self.codec = codec or ("zstd" if HAS_ZSTD else "gzip")
+        self.block_max_records = max(1, block_max_records)
+        self.shard_max_bytes = shard_max_bytes
+
+        self._lock = threading.Lock()
+        self._conn = _open_index(directory)
+        self._prefix = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+        self._shard_seq = 0
+        self._shard: Optional[str] = None
+        self._shard_size = 0
+        self._block: List[EvidenceRecord] = []
+        self._block_bytes = 0
+        self._pending: set = set()  # (url, sha256) no bloco pendente
+        self._closed = False
+
+        self.records_written = 0
+        self.duplicates = 0
+        self.bytes_raw = 0
+        self.bytes_compressed = 0
+        atexit.register(self.close)
+
+    @classmethod
+    def from_env(cls) -> "EvidenceArchive":
+        """Arquivo em LEILOEIRO_EVIDENCE_DIR (ou DEFAULT_ARCHIVE_DIR)."""
+        return cls(os.getenv("LEILOEIRO_EVIDENCE_DIR", DEFAULT_ARCHIVE_DIR))
+
+    def append(
+        self,
+        url: str,
+        body: str,
+        leilao_id: str = "",
+        lote_id: str = "",
+        fetched_at: Optional[str] = None,
+    ) -> EvidenceRef:
+        """
+        Adiciona uma página ao bloco pendente.
+
+        Returns:
+            EvidenceRef (duplicate=True se a mesma versão já estava arquivada)
+        """
+        sha256 = body_hash(body)
+        with self._lock:
+            if self._closed:
+                raise ValueError("EvidenceArchive fechado")
+            chave = (url, sha256)
+            if chave in self._pending:
+                self.duplicates += 1
+                return EvidenceRef(url, sha256, self._shard_name(), duplicate=True)
+            row = self._conn.execute(
+                "SELECT shard FROM evidence WHERE url = ? AND sha256 = ? LIMIT 1", chave
+            ).fetchone()
+            if row is not None:
+                self.duplicates += 1
+                return EvidenceRef(url, sha256, row[0], duplicate=True)
+
+            record = EvidenceRecord(
+                url=url,
+                fetched_at=fetched_at or datetime.utcnow().isoformat(),
+                sha256=sha256,
+                body=body,
+                leilao_id=leilao_id or "",
+                lote_id=lote_id or "",
+            )
+            self._block.append(record)
+            self._pending.add(chave)
+            self._block_bytes += len(body)
+            shard = self._shard_name()
+
+            if len(self._block) >= self.block_max_records or self._block_bytes >= BLOCK_MAX_BYTES:
+                self._flush_block()
+        return EvidenceRef(url, sha256, shard)
+
+    def flush(self):
+        """Grava o bloco pendente (se houver)."""
+        with self._lock:
+            self._flush_block()
+
+    def close(self):
+        """Grava o bloco pendente e fecha o índice (idempotente)."""
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_block()
+            self._closed = True
+            self._conn.close()
+        atexit.unregister(self.close)
+
+    def __enter__(self) -> "EvidenceArchive":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def compression_ratio(self) -> float:
+        return self.bytes_raw / self.bytes_compressed if self.bytes_compressed else 0.0
+
+    # ------------------------------------------------------------------
+    # Internos (chamados com o lock)
+    # ------------------------------------------------------------------
+
+    def _shard_name(self) -> str:
+        """Shard que recebe o próximo bloco (abre outro se o atual encheu)."""
+        if self._shard is None or self._shard_size >= self.shard_max_bytes:
+            self._shard_seq += 1
+            sufixo = ZSTD_SUFFIX if self.codec == "zstd" else GZIP_SUFFIX
+            self._shard = f"{self._prefix}-{self._shard_seq:04d}{sufixo}"
+            self._shard_size = 0
+        return self._shard
+
+    def _flush_block(self):
+        if not self._block:
+            return
+        linhas = b"".join(
+            json.dumps(r.to_dict(), ensure_ascii=False).encode("utf-8") + b"\n"
+            for r in self._block
+        )
+        frame = _compress(linhas, self.codec)
+        shard = self._shard_name()
+        caminho = os.path.join(self.directory, shard)
+
+        # Um write por bloco; o índice só aponta para blocos já no disco
+        with open(caminho, "ab") as f:
+            offset = f.tell()
+            f.write(frame)
+        self._conn.executemany(
+            """
+            INSERT INTO evidence (url, sha256, leilao_id, lote_id, fetched_at,
+                                  shard, block_offset, block_length, position)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (r.url, r.sha256, r.leilao_id, r.lote_id, r.fetched_at, shard, offset, len(frame), i)
+                for i, r in enumerate(self._block)
+            ],
+        )
+        self._conn.commit()
+
+        self.records_written += len(self._block)
+        self.bytes_raw += len(linhas)
+        self.bytes_compressed += len(frame)
+        self._shard_size = offset + len(frame)
+        logger.debug(
+            f"Evidências: {len(self._block)} páginas -> {shard}@{offset} "
+            f"({len(linhas)} -> {len(frame)} bytes)"
+        )
+        self._block = []
+        self._block_bytes = 0
+        self._pending.clear()
+
+
+class EvidenceReader:
+    """
+    Leitura do arquivo de evidências.
+
+    get/get_by_hash usam o índice e descomprimem só o bloco do registro
+    (o último bloco lido fica em cache: registros vizinhos saem de graça).
+    iter_records percorre os blocos indexados em ordem de gravação, um
+    frame por vez (memória constante); um bloco danificado é pulado.
+    """
+
+    def __init__(self, directory: str = DEFAULT_ARCHIVE_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._conn = _open_index(directory)
+        self._cached_block: Optional[Tuple[str, int]] = None
+        self._cached_lines: List[bytes] = []
+
+    @classmethod
+    def from_env(cls) -> "EvidenceReader":
+        """Leitor de LEILOEIRO_EVIDENCE_DIR (ou DEFAULT_ARCHIVE_DIR)."""
+        return cls(os.getenv("LEILOEIRO_EVIDENCE_DIR", DEFAULT_ARCHIVE_DIR))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM evidence").fetchone()[0]
+
+    def __enter__(self) -> "EvidenceReader":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, url: str) -> Optional[EvidenceRecord]:
+        """Versão mais recente da página."""
+        return self._get_one("WHERE url = ? ORDER BY id DESC LIMIT 1", (url,))
+
+    def get_by_hash(self, sha256: str) -> Optional[EvidenceRecord]:
+        """Página com esse conteúdo (sha256 do HTML)."""
+        return self._get_one("WHERE sha256 = ? ORDER BY id DESC LIMIT 1", (sha256,))
+
+    def urls(self) -> List[str]:
+        """URLs arquivadas (distintas, em ordem de gravação)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url FROM evidence GROUP BY url ORDER BY MIN(id)"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def iter_records(self, leilao_id: Optional[str] = None) -> Iterator[EvidenceRecord]:
+        """Todos os registros, bloco a bloco (opcionalmente só de um leilão)."""
+        filtro, params = "", ()
+        if leilao_id is not None:
+            filtro, params = "WHERE leilao_id = ?", (leilao_id,)
+        with self._lock:
+            blocos = self._conn.execute(
+                f"SELECT DISTINCT shard, block_offset, block_length FROM evidence {filtro} "
+                "ORDER BY shard, block_offset",
+                params,
+            ).fetchall()
+
+        aberto: Optional[str] = None
+        f = None
+        try:
+            for shard, offset, length in blocos:
+                if shard != aberto:
+                    if f is not None:
+                        f.close()
+                    f = open(os.path.join(self.directory, shard), "rb")
+                    aberto = shard
+                f.seek(offset)
+                try:
+                    linhas = _decompress(f.read(length), _codec_for(shard)).splitlines()
+                except READ_ERRORS as e:
+                    logger.warning(f"Bloco {shard}@{offset} danificado: {e}")
+                    continue
+                for linha in linhas:
+                    dados = json.loads(linha)
+                    if leilao_id is None or dados["leilao_id"] == leilao_id:
+                        yield EvidenceRecord(**dados)
+        finally:
+            if f is not None:
+                f.close()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _get_one(self, where: str, params: tuple) -> Optional[EvidenceRecord]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT shard, block_offset, block_length, position FROM evidence {where}", params
+            ).fetchone()
+            if row is None:
+                return None
+            shard, offset, length, position = row
+            if self._cached_block != (shard, offset):
+                with open(os.path.join(self.directory, shard), "rb") as f:
+                    f.seek(offset)
+                    frame = f.read(length)
+                self._cached_lines = _decompress(frame, _codec_for(shard)).splitlines()
+                self._cached_block = (shard, offset)
+            return EvidenceRecord(**json.loads(self._cached_lines[position]))
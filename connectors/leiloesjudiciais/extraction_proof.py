@@ -7,10 +7,13 @@ of leiloesjudiciais.com.br lot pages.
 
 It:
 1. Fetches 3 real lot URLs from the sitemap
-2. Saves the HTML to out/leiloesjudiciais/html/
+2. Saves the HTML to the evidence archive (out/leiloesjudiciais/evidence/)
 3. Extracts data from the HTML
 4. Generates a proof report at out/leiloesjudiciais/reports/extraction_proof.md
 
+With --from-archive, steps 1-2 are skipped and the samples are read back
+from the evidence archive (no network).
+
 LIMITATION: The site is a SPA (Vue.js), so values/dates are NOT available
 in the static HTML. Only title (vehicle + location) can be extracted.
 """
@@ -24,16 +27,31 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from connectors.leiloesjudiciais.config import config
 from connectors.leiloesjudiciais.discover import LeilaoDiscovery
+from connectors.leiloesjudiciais.evidence_archive import EvidenceReader
 from connectors.leiloesjudiciais.fetch import LeilaoFetcher, FetchStatus
 from connectors.leiloesjudiciais.parse import LeilaoParser
 
 
-def run_extraction_proof(num_samples: int = 3):
+def load_archived_samples(num_samples: int) -> list:
+    """Latest archived version of the first `num_samples` URLs, as (url, html)."""
+    reader = EvidenceReader.from_env()
+    try:
+        samples = []
+        for url in reader.urls()[:num_samples]:
+            record = reader.get(url)
+            samples.append((record.url, record.body))
+        return samples
+    finally:
+        reader.close()
+
+
+def run_extraction_proof(num_samples: int = 3, from_archive: bool = False):
     """
     Run extraction proof for Phase 3.
 
     Args:
         num_samples: Number of lot pages to sample (default 3)
+        from_archive: Reparse archived evidence instead of fetching
     """
     print("=" * 70)
     print("PHASE 3: EXTRACTION PROOF")
@@ -42,14 +60,24 @@ def run_extraction_proof(num_samples: int = 3):
     print()
 
     # Initialize components
-    discovery = LeilaoDiscovery(config)
-    fetcher = LeilaoFetcher(config)
-    parser = LeilaoParser(config, html_output_dir="out/leiloesjudiciais/html")
+    parser = LeilaoParser(config)
 
     # Create output directories
-    Path("out/leiloesjudiciais/html").mkdir(parents=True, exist_ok=True)
     Path("out/leiloesjudiciais/reports").mkdir(parents=True, exist_ok=True)
 
+    if from_archive:
+        print(f"[1-2/4] Loading {num_samples} samples from the evidence archive...")
+        samples = load_archived_samples(num_samples)
+        print(f"  Loaded {len(samples)} archived pages")
+        if not samples:
+            print("ERROR: Evidence archive is empty")
+            return
+        # Already archived: save_html only references the existing record
+        return _parse_and_report(parser, samples)
+
+    discovery = LeilaoDiscovery(config)
+    fetcher = LeilaoFetcher(config)
+
     # Step 1: Discover lots from sitemap
     print("[1/4] Discovering lots from sitemap...")
     lots, discovery_report = discovery.discover_from_sitemap(
@@ -78,7 +106,7 @@ def run_extraction_proof(num_samples: int = 3):
         result = fetcher.fetch(lot.url)
 
         if result.status == FetchStatus.SUCCESS:
-            samples.append((lot, result))
+            samples.append((lot.url, result.content))
             print(f"  [{len(samples)}/{num_samples}] OK: {lot.url}")
         else:
             print(f"  SKIP ({result.status.value}): {lot.url}")
@@ -89,17 +117,21 @@ def run_extraction_proof(num_samples: int = 3):
         print("ERROR: Could not fetch any valid lot pages")
         return
 
-    # Step 3: Parse and extract data
+    return _parse_and_report(parser, samples)
+
+
+def _parse_and_report(parser: LeilaoParser, samples: list) -> list:
+    """Steps 3-4: parse (url, html) samples and write the proof report."""
     print(f"\n[3/4] Parsing and extracting data from {len(samples)} samples...")
     extraction_results = []
 
-    for lot, fetch_result in samples:
-        parsed = parser.parse(fetch_result.url, fetch_result.content, save_html=True)
+    for url, html in samples:
+        parsed = parser.parse(url, html, save_html=True)
 
         extraction_results.append({
-            "url": lot.url,
-            "leilao_id": lot.leilao_id,
-            "lote_id": lot.lote_id,
+            "url": url,
+            "leilao_id": parsed.leilao_id,
+            "lote_id": parsed.lote_id,
             "titulo_completo": parsed.titulo_completo,
             "descricao_veiculo": parsed.descricao_veiculo,
             "cidade": parsed.cidade,
@@ -116,6 +148,9 @@ def run_extraction_proof(num_samples: int = 3):
 
         print(f"  Parsed: {parsed.descricao_veiculo or 'N/A'} - {parsed.cidade}/{parsed.uf}")
 
+    # Flush the last evidence block before listing it in the report
+    parser.close()
+
     # Step 4: Generate proof report
     print("\n[4/4] Generating extraction proof report...")
     report_path = generate_proof_report(extraction_results, parser.get_saved_htmls())
@@ -207,12 +242,16 @@ def generate_proof_report(results: list, saved_htmls: list) -> str:
     report_lines.extend([
         "## HTML Evidence Files",
         "",
-        "The following HTML files were saved as evidence:",
+        "The following pages were saved to the evidence archive "
+        "(read back with `EvidenceReader.get(url)`):",
         "",
     ])
 
     for html_info in saved_htmls:
-        report_lines.append(f"- `{html_info['filepath']}` (Lote {html_info['leilao_id']}/{html_info['lote_id']})")
+        report_lines.append(
+            f"- `{html_info['url']}` -> `{html_info['filepath']}` "
+            f"(Lote {html_info['leilao_id']}/{html_info['lote_id']}, sha256 {html_info['sha256'][:12]})"
+        )
 
     report_lines.extend([
         "",
@@ -263,6 +302,7 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description="Generate extraction proof for Phase 3")
     parser.add_argument("--samples", type=int, default=3, help="Number of samples to extract")
+    parser.add_argument("--from-archive", action="store_true", help="Reparse archived evidence (no fetch)")
     args = parser.parse_args()
 
-    run_extraction_proof(args.samples)
+    run_extraction_proof(args.samples, from_archive=args.from_archive)
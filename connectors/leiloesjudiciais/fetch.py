@@ -2,26 +2,48 @@
 Módulo de Fetch - Leilões Judiciais.
 
 Responsável por:
-1. Fazer requisições HTTP com rate limiting
+1. Fazer requisições HTTP com rate limiting (sessão keep-alive compartilhada)
 2. Implementar retry com backoff exponencial
 3. Tratar erros HTTP (403, 429, 404, 410)
 4. Registrar métricas de requisições
+
+fetch_many busca em paralelo (FETCH_CONCURRENT_REQUESTS threads sobre a
+mesma sessão) com um token bucket por host: cada host continua recebendo
+no máximo REQUESTS_PER_SECOND, o ganho vem de sobrepor a latência das
+respostas. Com um FetchCache, tombstones (404/410) persistem entre
+execuções e páginas já vistas são revalidadas com GET condicional
+(ETag/Last-Modified): 304 devolve o HTML do cache.
 """
 
+import os
+import sqlite3
+import threading
 import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
 import logging
 
 import httpx
 
 from .config import Config, config
+from .session import SessionManager, resolve_session
 
 logger = logging.getLogger(__name__)
 
 
+# Caminho padrão do cache (sobrescrito por LEILOEIRO_FETCH_CACHE_PATH)
+DEFAULT_CACHE_PATH = "out/leiloesjudiciais/fetch_cache.sqlite"
+
+# Tombstones expiram (um 404 pode ser lote ainda não publicado)
+TOMBSTONE_TTL_SECONDS = 30 * 24 * 3600
+
+
 class FetchStatus(str, Enum):
     """Status do fetch."""
     SUCCESS = "success"
@@ -42,6 +64,8 @@ class FetchResult:
     response_time_ms: float = 0.0
     retries: int = 0
     timestamp: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    # 304 (GET condicional): conteúdo veio do FetchCache
+    from_cache: bool = False
 
 
 @dataclass
@@ -55,6 +79,8 @@ class FetchStats:
     timeouts: int = 0
     total_retries: int = 0
     total_time_ms: float = 0.0
+    not_modified: int = 0  # 304 servidos do cache
+    tombstones_skipped: int = 0  # tombstones conhecidos (sem requisição)
 
     @property
     def success_rate(self) -> float:
@@ -69,6 +95,133 @@ class FetchStats:
         return self.total_time_ms / self.successful
 
 
+class HostRateLimiter:
+    """
+    Token bucket por host (thread-safe).
+
+    Cada host recebe no máximo `rate` req/s (rajada de `burst`). O slot é
+    reservado sob o lock e a espera acontece fora dele, então threads de
+    hosts diferentes não se bloqueiam.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # host -> (tokens, instante)
+
+    def acquire(self, url: str):
+        """Bloqueia até haver token para o host da URL."""
+        if self.rate <= 0:
+            return
+        host = urlsplit(url).netloc
+        with self._lock:
+            agora = time.monotonic()
+            tokens, instante = self._buckets.get(host, (float(self.burst), agora))
+            tokens = min(float(self.burst), tokens + (agora - instante) * self.rate)
+            tokens -= 1.0
+            self._buckets[host] = (tokens, agora)
+            espera = -tokens / self.rate if tokens < 0 else 0.0
+        if espera > 0:
+            time.sleep(espera)
+
+
+class FetchCache:
+    """
+    Cache SQLite de respostas (validadores + HTML comprimido) e tombstones.
+
+    - responses: url -> etag, last_modified, html (zlib) para GET condicional
+    - tombstones: url -> status (404/410), expiram após TOMBSTONE_TTL_SECONDS
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, tombstone_ttl: int = TOMBSTONE_TTL_SECONDS):
+        self.path = path
+        self.tombstone_ttl = tombstone_ttl
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content BLOB NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tombstones (
+                url TEXT PRIMARY KEY,
+                status_code INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls) -> "FetchCache":
+        """Cache no caminho de LEILOEIRO_FETCH_CACHE_PATH (ou DEFAULT_CACHE_PATH)."""
+        return cls(os.getenv("LEILOEIRO_FETCH_CACHE_PATH", DEFAULT_CACHE_PATH))
+
+    def is_tombstone(self, url: str, now: Optional[float] = None) -> bool:
+        now = now if now is not None else time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT created_at FROM tombstones WHERE url = ?", (url,)).fetchone()
+        return row is not None and now - row[0] <= self.tombstone_ttl
+
+    def add_tombstone(self, url: str, status_code: int):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tombstones (url, status_code, created_at) VALUES (?, ?, ?)",
+                (url, status_code, time.time()),
+            )
+            # Página que virou tombstone não precisa mais de revalidação
+            self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            self._conn.commit()
+
+    def validators(self, url: str) -> Dict[str, str]:
+        """Headers de GET condicional (If-None-Match / If-Modified-Since)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        headers = {}
+        if row is not None:
+            if row[0]:
+                headers["If-None-Match"] = row[0]
+            if row[1]:
+                headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def get_content(self, url: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT content FROM responses WHERE url = ?", (url,)).fetchone()
+        return zlib.decompress(row[0]).decode("utf-8") if row is not None else None
+
+    def store(self, url: str, content: str, etag: Optional[str], last_modified: Optional[str]):
+        """Guarda a resposta se ela tiver validador (sem validador não há 304)."""
+        if not etag and not last_modified:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (url, etag, last_modified, content, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, zlib.compress(content.encode("utf-8")), time.time()),
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
 class LeilaoFetcher:
     """
     Fetcher HTTP com rate limiting e retry.
@@ -76,14 +229,34 @@ class LeilaoFetcher:
     Características:
     - Rate limit configurável (padrão: 1 req/seg)
     - Retry com backoff exponencial
-    - Tratamento de tombstones (404/410)
+    - Tratamento de tombstones (404/410), persistentes com FetchCache
     - Tratamento de rate limiting (429/503)
+    - GET condicional (ETag/Last-Modified) com FetchCache
+    - fetch_many concorrente, com rate limit por host
     """
 
-    def __init__(self, cfg: Optional[Config] = None):
+    def __init__(
+        self,
+        cfg: Optional[Config] = None,
+        session: Optional[SessionManager] = None,
+        cache: Optional[FetchCache] = None,
+        max_workers: Optional[int] = None,
+    ):
+        """
+        Args:
+            cfg: Configuração (padrão: config global)
+            session: Sessão HTTP compartilhada
+            cache: Cache de respostas/tombstones (None = só em memória)
+            max_workers: Requisições simultâneas em fetch_many
+                (padrão: FETCH_CONCURRENT_REQUESTS)
+        """
         self.config = cfg or config
+        self.session = resolve_session(session, self.config)
+        self.cache = cache
+        self.max_workers = max(1, max_workers or self.config.FETCH_CONCURRENT_REQUESTS)
         self.stats = FetchStats()
-        self._last_request_time: float = 0
+        self._limiter = HostRateLimiter(self.config.REQUESTS_PER_SECOND)
+        self._stats_lock = threading.Lock()
         self._tombstones: set = set()  # URLs que retornaram 404/410
 
     def fetch(self, url: str) -> FetchResult:
@@ -97,16 +270,15 @@ class LeilaoFetcher:
             FetchResult com conteúdo ou erro
         """
         # Verifica se é tombstone conhecido
-        if url in self._tombstones:
+        if url in self._tombstones or (self.cache is not None and self.cache.is_tombstone(url)):
+            with self._stats_lock:
+                self.stats.tombstones_skipped += 1
             return FetchResult(
                 url=url,
                 status=FetchStatus.TOMBSTONE,
                 error_message="URL marcada como tombstone (404/410 anterior)"
             )
 
-        # Aplica rate limiting
-        self._apply_rate_limit()
-
         result = self._fetch_with_retry(url)
         self._update_stats(result)
 
@@ -118,38 +290,40 @@ class LeilaoFetcher:
         progress_callback: Optional[callable] = None
     ) -> Tuple[List[FetchResult], FetchStats]:
         """
-        Faz fetch de múltiplas URLs sequencialmente.
+        Faz fetch de múltiplas URLs, até max_workers em paralelo.
+
+        O rate limit é por host (token bucket), então a cortesia com cada
+        site não muda com o número de workers.
 
         Args:
             urls: Lista de URLs
-            progress_callback: Função chamada após cada URL (url, index, total)
+            progress_callback: Função chamada após cada URL (url, concluídas, total)
 
         Returns:
-            Tupla (lista de resultados, estatísticas)
+            Tupla (lista de resultados na ordem de `urls`, estatísticas)
         """
-        results = []
         total = len(urls)
-
-        for i, url in enumerate(urls):
-            result = self.fetch(url)
-            results.append(result)
-
-            if progress_callback:
-                progress_callback(url, i + 1, total)
+        if self.max_workers == 1 or total <= 1:
+            results = []
+            for i, url in enumerate(urls):
+                result = self.fetch(url)
+                results.append(result)
+
+                if progress_callback:
+                    progress_callback(url, i + 1, total)
+            return results, self.stats
+
+        results: List[Optional[FetchResult]] = [None] * total
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="leilao_fetch") as pool:
+            futures = {pool.submit(self.fetch, url): i for i, url in enumerate(urls)}
+            for done, future in enumerate(as_completed(futures), start=1):
+                i = futures[future]
+                results[i] = future.result()
+                if progress_callback:
+                    progress_callback(urls[i], done, total)
 
         return results, self.stats
 
-    def _apply_rate_limit(self):
-        """Aplica rate limiting entre requisições."""
-        if self._last_request_time > 0:
-            elapsed = time.time() - self._last_request_time
-            min_interval = 1.0 / self.config.REQUESTS_PER_SECOND
-            if elapsed < min_interval:
-                sleep_time = min_interval - elapsed
-                time.sleep(sleep_time)
-
-        self._last_request_time = time.time()
-
     def _fetch_with_retry(self, url: str) -> FetchResult:
         """
         Faz fetch com retry e backoff exponencial.
@@ -162,21 +336,44 @@ class LeilaoFetcher:
         """
         retries = 0
         last_error = None
+        headers = self.cache.validators(url) if self.cache is not None else {}
 
         while retries <= self.config.MAX_RETRIES:
             try:
+                # Rate limit por host (cada tentativa conta)
+                self._limiter.acquire(url)
                 start_time = time.time()
 
-                with httpx.Client(
-                    timeout=self.config.REQUEST_TIMEOUT_SECONDS,
-                    follow_redirects=True
-                ) as client:
-                    response = client.get(url, headers=self.config.get_headers())
+                response = self.session.get(url, follow_redirects=True, headers=headers)
 
                 elapsed_ms = (time.time() - start_time) * 1000
 
+                # Não modificado: HTML do cache
+                if response.status_code == 304 and headers:
+                    content = self.cache.get_content(url)
+                    if content is not None:
+                        return FetchResult(
+                            url=url,
+                            status=FetchStatus.SUCCESS,
+                            status_code=304,
+                            content=content,
+                            response_time_ms=elapsed_ms,
+                            retries=retries,
+                            from_cache=True,
+                        )
+                    # Cache sumiu entre a consulta e a resposta: GET normal
+                    headers = {}
+                    continue
+
                 # Sucesso
                 if response.status_code == 200:
+                    if self.cache is not None:
+                        self.cache.store(
+                            url,
+                            response.text,
+                            response.headers.get("etag"),
+                            response.headers.get("last-modified"),
+                        )
                     return FetchResult(
                         url=url,
                         status=FetchStatus.SUCCESS,
@@ -189,6 +386,8 @@ class LeilaoFetcher:
                 # Tombstone (404, 410)
                 if response.status_code in self.config.TOMBSTONE_STATUS_CODES:
                     self._tombstones.add(url)
+                    if self.cache is not None:
+                        self.cache.add_tombstone(url, response.status_code)
                     return FetchResult(
                         url=url,
                         status=FetchStatus.TOMBSTONE,
@@ -270,21 +469,24 @@ class LeilaoFetcher:
         )
 
     def _update_stats(self, result: FetchResult):
-        """Atualiza estatísticas."""
-        self.stats.total_requests += 1
-        self.stats.total_retries += result.retries
-
-        if result.status == FetchStatus.SUCCESS:
-            self.stats.successful += 1
-            self.stats.total_time_ms += result.response_time_ms
-        elif result.status == FetchStatus.TOMBSTONE:
-            self.stats.tombstones += 1
-        elif result.status == FetchStatus.RATE_LIMITED:
-            self.stats.rate_limited += 1
-        elif result.status == FetchStatus.TIMEOUT:
-            self.stats.timeouts += 1
-        else:
-            self.stats.errors += 1
+        """Atualiza estatísticas (thread-safe)."""
+        with self._stats_lock:
+            self.stats.total_requests += 1
+            self.stats.total_retries += result.retries
+
+            if result.status == FetchStatus.SUCCESS:
+                self.stats.successful += 1
+                self.stats.total_time_ms += result.response_time_ms
+                if result.from_cache:
+                    self.stats.not_modified += 1
+            elif result.status == FetchStatus.TOMBSTONE:
+                self.stats.tombstones += 1
+            elif result.status == FetchStatus.RATE_LIMITED:
+                self.stats.rate_limited += 1
+            elif result.status == FetchStatus.TIMEOUT:
+                self.stats.timeouts += 1
+            else:
+                self.stats.errors += 1
 
     def get_stats_dict(self) -> Dict:
         """Retorna estatísticas como dicionário."""
@@ -296,6 +498,8 @@ class LeilaoFetcher:
             "errors": self.stats.errors,
             "timeouts": self.stats.timeouts,
             "total_retries": self.stats.total_retries,
+            "not_modified": self.stats.not_modified,
+            "tombstones_skipped": self.stats.tombstones_skipped,
             "success_rate_percent": round(self.stats.success_rate, 2),
             "avg_response_time_ms": round(self.stats.avg_response_time_ms, 2),
         }
@@ -0,0 +1,229 @@
+"""
+Backends de Parsing HTML - Leilões Judiciais.
+
+Responsável por:
+1. Escolher o backend mais rápido instalado: selectolax (lexbor) > lxml >
+   BeautifulSoup (LEILOEIRO_HTML_BACKEND força um deles)
+2. Extrair numa passada só os nós que o LeilaoParser usa (title, meta,
+   JSON-LD, img e texto visível) em um PageNodes
+3. Cair para BeautifulSoup se o backend rápido falhar num documento
+
+Antes o LeilaoParser montava a árvore BeautifulSoup (html.parser, em
+Python puro) de cada página e fazia várias buscas nela; era a etapa mais
+lenta ao reprocessar HTML salvo em lote. Os backends em C montam a árvore
+em uma fração do tempo e o PageNodes tem o mesmo conteúdo nos três, então
+o resultado do parser não depende do backend.
+
+Uso:
+    from connectors.leiloesjudiciais.html_backend import extract_nodes, resolve_backend
+
+    backend = resolve_backend()  # "selectolax", "lxml", "bs4" ou None
+    nodes = extract_nodes(html, backend)
+"""
+
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    HAS_SELECTOLAX = False
+    LexborHTMLParser = None
+
+try:
+    import lxml.etree
+    import lxml.html
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    from bs4 import BeautifulSoup
+    HAS_BS4 = True
+except ImportError:
+    HAS_BS4 = False
+    BeautifulSoup = None
+
+logger = logging.getLogger(__name__)
+
+
+# Ordem de preferência do modo "auto"
+BACKEND_ORDER = ("selectolax", "lxml", "bs4")
+
+# Meta tags lidas (property=og:* e name=description)
+META_PROPERTIES = ("og:title", "og:description", "og:image")
+META_NAMES = ("description",)
+
+JSON_LD_TYPE = "application/ld+json"
+
+# Elementos cujo texto não é visível (o get_text do BeautifulSoup também os ignora)
+INVISIBLE_TAGS = ("script", "style", "template")
+
+
+@dataclass
+class PageNodes:
+    """Nós extraídos de uma página de lote (independente do backend)."""
+    # Texto do primeiro <title> (None se vazio)
+    title: Optional[str] = None
+    # Chave (og:title, description...) -> content da PRIMEIRA tag com ela
+    meta: Dict[str, Optional[str]] = field(default_factory=dict)
+    # Conteúdo dos <script type="application/ld+json"> não vazios
+    json_ld: List[str] = field(default_factory=list)
+    # src (ou data-src) de cada <img>, na ordem do documento
+    images: List[str] = field(default_factory=list)
+    # Texto visível do documento (sem script/style/template/comentários)
+    text: str = ""
+    backend: str = ""
+
+
+def available_backends() -> List[str]:
+    """Backends instalados, na ordem de preferência."""
+    instalados = {"selectolax": HAS_SELECTOLAX, "lxml": HAS_LXML, "bs4": HAS_BS4}
+    return [nome for nome in BACKEND_ORDER if instalados[nome]]
+
+
+def resolve_backend(name: Optional[str] = None) -> Optional[str]:
+    """
+    Backend a usar.
+
+    Args:
+        name: "auto", "selectolax", "lxml", "bs4" ou "regex"
+            (padrão: LEILOEIRO_HTML_BACKEND ou "auto")
+
+    Returns:
+        Nome do backend, ou None para o parsing só por regex
+    """
+    name = (name or os.getenv("LEILOEIRO_HTML_BACKEND") or "auto").lower()
+    if name == "regex":
+        return None
+    disponiveis = available_backends()
+    if name == "auto":
+        return disponiveis[0] if disponiveis else None
+    if name not in BACKEND_ORDER:
+        raise ValueError(f"Backend HTML desconhecido: {name}")
+    if name not in disponiveis:
+        fallback = disponiveis[0] if disponiveis else None
+        logger.warning(f"Backend HTML {name} não instalado; usando {fallback or 'regex'}")
+        return fallback
+    return name
+
+
+def extract_nodes(html: str, backend: str) -> PageNodes:
+    """
+    Extrai os nós da página com o backend escolhido.
+
+    Se um backend rápido falhar no documento (ex.: lxml com declaração de
+    encoding em str), refaz com BeautifulSoup.
+    """
+    try:
+        return _EXTRACTORS[backend](html)
+    except Exception as e:
+        if backend == "bs4" or not HAS_BS4:
+            raise
+        logger.debug(f"Backend {backend} falhou ({type(e).__name__}: {e}); usando bs4")
+        return _extract_bs4(html)
+
+
+def _add_meta(nodes: PageNodes, prop: Optional[str], name: Optional[str], content: Optional[str]):
+    """Registra a meta tag se for uma das lidas (só a primeira ocorrência vale)."""
+    if prop in META_PROPERTIES:
+        nodes.meta.setdefault(prop, content or None)
+    if name in META_NAMES:
+        nodes.meta.setdefault(name, content or None)
+
+
+# ============================================================================
+# BACKENDS
+# ============================================================================
+
+def _extract_selectolax(html: str) -> PageNodes:
+    """selectolax/lexbor: parser HTML5 em C, seletores CSS direto nos nós."""
+    tree = LexborHTMLParser(html)
+    nodes = PageNodes(backend="selectolax")
+
+    title = tree.css_first("title")
+    if title is not None:
+        nodes.title = title.text(deep=True) or None
+
+    for meta in tree.css("meta"):
+        attrs = meta.attributes
+        _add_meta(nodes, attrs.get("property"), attrs.get("name"), attrs.get("content"))
+
+    for script in tree.css("script"):
+        if script.attributes.get("type") == JSON_LD_TYPE:
+            conteudo = script.text(deep=True)
+            if conteudo:
+                nodes.json_ld.append(conteudo)
+
+    for img in tree.css("img"):
+        attrs = img.attributes
+        src = attrs.get("src") or attrs.get("data-src")
+        if src:
+            nodes.images.append(src)
+
+    tree.strip_tags(list(INVISIBLE_TAGS))
+    if tree.root is not None:
+        nodes.text = tree.root.text(deep=True, separator="", strip=False)
+    return nodes
+
+
+def _extract_lxml(html: str) -> PageNodes:
+    """lxml (libxml2): árvore em C, uma iteração filtrada pelas tags lidas."""
+    doc = lxml.html.document_fromstring(html)
+    nodes = PageNodes(backend="lxml")
+
+    titulo_lido = False
+    for el in doc.iter("title", "meta", "script", "img"):
+        tag = el.tag
+        if tag == "title":
+            if not titulo_lido:
+                nodes.title = el.text_content() or None
+                titulo_lido = True
+        elif tag == "meta":
+            _add_meta(nodes, el.get("property"), el.get("name"), el.get("content"))
+        elif tag == "script":
+            if el.get("type") == JSON_LD_TYPE and el.text:
+                nodes.json_ld.append(el.text)
+        else:
+            src = el.get("src") or el.get("data-src")
+            if src:
+                nodes.images.append(src)
+
+    lxml.etree.strip_elements(doc, *INVISIBLE_TAGS, with_tail=False)
+    nodes.text = doc.text_content()
+    return nodes
+
+
+def _extract_bs4(html: str) -> PageNodes:
+    """BeautifulSoup (html.parser): Python puro, sempre disponível com bs4."""
+    soup = BeautifulSoup(html, "html.parser")
+    nodes = PageNodes(backend="bs4")
+
+    title = soup.find("title")
+    if title is not None:
+        nodes.title = title.get_text() or None
+
+    for meta in soup.find_all("meta"):
+        _add_meta(nodes, meta.get("property"), meta.get("name"), meta.get("content"))
+
+    for script in soup.find_all("script", type=JSON_LD_TYPE):
+        if script.string:
+            nodes.json_ld.append(script.string)
+
+    for img in soup.find_all("img"):
+        src = img.get("src") or img.get("data-src")
+        if src:
+            nodes.images.append(src)
+
+    nodes.text = soup.get_text()
+    return nodes
+
+
+_EXTRACTORS = {
+    "selectolax": _extract_selectolax,
+    "lxml": _extract_lxml,
+    "bs4": _extract_bs4,
+}
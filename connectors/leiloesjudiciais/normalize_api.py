@@ -110,6 +110,9 @@ class NormalizedAPILot:
     is_valid: bool = True
     validation_errors: List[str] = field(default_factory=list)
 
+    # === IDENTIDADE DO VEÍCULO (índice entre editais/fontes) ===
+    vehicle_id: Optional[str] = None
+
 
 # ============================================================================
 # NORMALIZADOR
@@ -5,32 +5,28 @@ Responsável por:
 1. Extrair dados do HTML das páginas de lotes
 2. Identificar campos relevantes (título, valor, cidade, etc.)
 3. Extrair metadados (title, meta tags, JSON-LD)
-4. Salvar HTML como evidência (Phase 3 requirement)
+4. Salvar HTML como evidência (Phase 3 requirement) no EvidenceArchive
+
+A árvore HTML vem do backend mais rápido instalado (html_backend:
+selectolax > lxml > BeautifulSoup); sem nenhum deles, só regex.
 
 NOTA: O site leiloesjudiciais.com.br é uma SPA (Vue.js).
 O conteúdo dinâmico é carregado via JavaScript/API.
 Este parser extrai o máximo possível do HTML estático.
 """
 
-import hashlib
 import os
 import re
 from dataclasses import dataclass, field
 from datetime import datetime
-from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 import json
 import logging
 
-try:
-    from bs4 import BeautifulSoup
-    HAS_BS4 = True
-except ImportError:
-    HAS_BS4 = False
-    BeautifulSoup = None
-
 from .config import Config, config
+from .evidence_archive import DEFAULT_ARCHIVE_DIR, EvidenceArchive
+from .html_backend import PageNodes, extract_nodes, resolve_backend
 
 logger = logging.getLogger(__name__)
 
@@ -107,9 +103,39 @@ class LeilaoParser:
     # Padrão para valores monetários
     MONEY_PATTERN = re.compile(r'R\$\s*([\d.,]+)')
 
-    def __init__(self, cfg: Optional[Config] = None, html_output_dir: Optional[str] = None):
+    # Fallback sem backend HTML
+    TITLE_TAG_PATTERN = re.compile(r'<title>([^<]+)</title>', re.IGNORECASE)
+    OG_PATTERNS = {
+        prop: re.compile(
+            rf'<meta[^>]+property=["\']{prop}["\'][^>]+content=["\']([^"\']+)["\']',
+            re.IGNORECASE
+        )
+        for prop in ('og:title', 'og:description', 'og:image')
+    }
+
+    def __init__(
+        self,
+        cfg: Optional[Config] = None,
+        html_output_dir: Optional[str] = None,
+        backend: Optional[str] = None,
+        archive: Optional[EvidenceArchive] = None,
+    ):
+        """
+        Args:
+            cfg: Configuração (padrão: config global)
+            html_output_dir: Diretório do arquivo de evidências HTML
+                (padrão: LEILOEIRO_EVIDENCE_DIR ou DEFAULT_ARCHIVE_DIR)
+            backend: Backend HTML ("auto", "selectolax", "lxml", "bs4",
+                "regex"); padrão: LEILOEIRO_HTML_BACKEND ou "auto"
+            archive: EvidenceArchive compartilhado (padrão: aberto no
+                primeiro HTML salvo e fechado em close())
+        """
         self.config = cfg or config
-        self.html_output_dir = html_output_dir or "out/leiloesjudiciais/html"
+        self.html_output_dir = html_output_dir or os.getenv("LEILOEIRO_EVIDENCE_DIR", DEFAULT_ARCHIVE_DIR)
+        self._archive = archive
+        self._owns_archive = archive is None
+        self.backend = resolve_backend(backend)
+        self._url_pattern = re.compile(self.config.LOT_URL_PATTERN)
         self._saved_htmls: List[Dict[str, str]] = []  # Track saved HTMLs for reporting
 
     def parse(self, url: str, html: str, save_html: bool = True) -> ParsedLot:
@@ -139,10 +165,9 @@ class LeilaoParser:
             if html_path:
                 result.warnings.append(f"HTML salvo: {html_path}")
 
-        # Tenta usar BeautifulSoup se disponível
-        if HAS_BS4 and html:
-            soup = BeautifulSoup(html, 'html.parser')
-            self._parse_with_bs4(soup, result)
+        # Backend HTML (selectolax/lxml/bs4) se disponível
+        if self.backend and html:
+            self._parse_nodes(extract_nodes(html, self.backend), result)
         else:
             # Fallback para regex
             self._parse_with_regex(html, result)
@@ -169,27 +194,19 @@ class LeilaoParser:
             lote_id: ID do lote
 
         Returns:
-            Caminho do arquivo salvo ou None se erro
+            Caminho do shard que recebe o HTML ou None se erro
         """
         try:
-            # Cria diretório se não existir
-            Path(self.html_output_dir).mkdir(parents=True, exist_ok=True)
-
-            # Gera hash único para o arquivo
-            url_hash = hashlib.md5(url.encode()).hexdigest()[:12]
-            filename = f"{leilao_id}_{lote_id}_{url_hash}.html"
-            filepath = os.path.join(self.html_output_dir, filename)
-
-            # Salva HTML
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(f"<!-- URL: {url} -->\n")
-                f.write(f"<!-- Timestamp: {datetime.utcnow().isoformat()} -->\n")
-                f.write(html)
+            if self._archive is None:
+                self._archive = EvidenceArchive(self.html_output_dir)
+            ref = self._archive.append(url, html, leilao_id, lote_id)
+            filepath = os.path.join(self._archive.directory, ref.shard)
 
             # Registra para relatório
             self._saved_htmls.append({
                 "url": url,
                 "filepath": filepath,
+                "sha256": ref.sha256,
                 "leilao_id": leilao_id,
                 "lote_id": lote_id,
                 "timestamp": datetime.utcnow().isoformat()
@@ -206,61 +223,60 @@ class LeilaoParser:
         """Retorna lista de HTMLs salvos."""
         return self._saved_htmls.copy()
 
+    def close(self):
+        """Grava o bloco pendente de evidências (fecha o arquivo se for próprio)."""
+        if self._archive is None:
+            return
+        if self._owns_archive:
+            self._archive.close()
+            self._archive = None
+        else:
+            self._archive.flush()
+
     def _extract_ids_from_url(self, url: str) -> Tuple[str, str]:
         """Extrai leilao_id e lote_id da URL."""
-        pattern = re.compile(self.config.LOT_URL_PATTERN)
-        match = pattern.search(url)
+        match = self._url_pattern.search(url)
         if match:
             return match.groups()
         return "", ""
 
-    def _parse_with_bs4(self, soup: BeautifulSoup, result: ParsedLot):
-        """Faz parsing usando BeautifulSoup."""
+    def _parse_nodes(self, nodes: PageNodes, result: ParsedLot):
+        """Faz parsing dos nós extraídos pelo backend HTML."""
         # 1. Título da página
-        title_tag = soup.find('title')
-        if title_tag and title_tag.string:
-            result.titulo_completo = title_tag.string.strip()
+        if nodes.title:
+            result.titulo_completo = nodes.title.strip()
             self._parse_title(result.titulo_completo, result)
 
         # 2. Meta tags
-        self._parse_meta_tags(soup, result)
+        self._parse_meta_tags(nodes, result)
 
         # 3. JSON-LD
-        self._parse_json_ld(soup, result)
+        self._parse_json_ld(nodes, result)
 
         # 4. Busca valores no HTML
-        self._search_values_in_html(soup, result)
+        self._search_values_in_html(nodes, result)
 
         # 5. Busca imagens
-        self._search_images(soup, result)
+        self._search_images(nodes, result)
 
     def _parse_with_regex(self, html: str, result: ParsedLot):
         """Faz parsing usando apenas regex (fallback)."""
         # Título
-        title_match = re.search(r'<title>([^<]+)</title>', html, re.IGNORECASE)
+        title_match = self.TITLE_TAG_PATTERN.search(html)
         if title_match:
             result.titulo_completo = title_match.group(1).strip()
             self._parse_title(result.titulo_completo, result)
 
         # Meta OG
-        og_title = re.search(
-            r'<meta[^>]+property=["\']og:title["\'][^>]+content=["\']([^"\']+)["\']',
-            html, re.IGNORECASE
-        )
+        og_title = self.OG_PATTERNS['og:title'].search(html)
         if og_title:
             result.og_title = og_title.group(1)
 
-        og_desc = re.search(
-            r'<meta[^>]+property=["\']og:description["\'][^>]+content=["\']([^"\']+)["\']',
-            html, re.IGNORECASE
-        )
+        og_desc = self.OG_PATTERNS['og:description'].search(html)
         if og_desc:
             result.og_description = og_desc.group(1)
 
-        og_image = re.search(
-            r'<meta[^>]+property=["\']og:image["\'][^>]+content=["\']([^"\']+)["\']',
-            html, re.IGNORECASE
-        )
+        og_image = self.OG_PATTERNS['og:image'].search(html)
         if og_image:
             result.og_image = og_image.group(1)
 
@@ -288,36 +304,31 @@ class LeilaoParser:
                 parts = title.split(" - ")
                 result.descricao_veiculo = parts[0].strip()
 
-    def _parse_meta_tags(self, soup: BeautifulSoup, result: ParsedLot):
+    def _parse_meta_tags(self, nodes: PageNodes, result: ParsedLot):
         """Extrai dados de meta tags."""
         # OG Title
-        og_title = soup.find('meta', property='og:title')
-        if og_title and og_title.get('content'):
-            result.og_title = og_title['content']
+        if nodes.meta.get('og:title'):
+            result.og_title = nodes.meta['og:title']
 
         # OG Description
-        og_desc = soup.find('meta', property='og:description')
-        if og_desc and og_desc.get('content'):
-            result.og_description = og_desc['content']
+        if nodes.meta.get('og:description'):
+            result.og_description = nodes.meta['og:description']
 
         # OG Image
-        og_image = soup.find('meta', property='og:image')
-        if og_image and og_image.get('content'):
-            result.og_image = og_image['content']
-            result.imagens.append(og_image['content'])
+        if nodes.meta.get('og:image'):
+            result.og_image = nodes.meta['og:image']
+            result.imagens.append(nodes.meta['og:image'])
 
         # Description padrão
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        if meta_desc and meta_desc.get('content') and not result.og_description:
-            result.og_description = meta_desc['content']
+        if nodes.meta.get('description') and not result.og_description:
+            result.og_description = nodes.meta['description']
 
-    def _parse_json_ld(self, soup: BeautifulSoup, result: ParsedLot):
+    def _parse_json_ld(self, nodes: PageNodes, result: ParsedLot):
         """Extrai dados de JSON-LD (schema.org)."""
-        scripts = soup.find_all('script', type='application/ld+json')
-        for script in scripts:
+        for script in nodes.json_ld:
             try:
-                if script.string:
-                    data = json.loads(script.string)
+                if script:
+                    data = json.loads(script)
                     result.json_ld_data = data
 
                     # Tenta extrair informações úteis
@@ -336,26 +347,23 @@ class LeilaoParser:
             except json.JSONDecodeError:
                 result.warnings.append("JSON-LD inválido encontrado")
 
-    def _search_values_in_html(self, soup: BeautifulSoup, result: ParsedLot):
-        """Busca valores monetários no HTML."""
-        text = soup.get_text()
-
-        # Busca valores de avaliação/lance
-        money_matches = self.MONEY_PATTERN.findall(text)
-        if money_matches:
+    def _search_values_in_html(self, nodes: PageNodes, result: ParsedLot):
+        """Busca valores monetários no texto visível."""
+        # Só o primeiro valor é usado: search para no primeiro match
+        money_match = self.MONEY_PATTERN.search(nodes.text)
+        if money_match:
             try:
                 # Converte primeiro valor encontrado
-                value_str = money_matches[0].replace('.', '').replace(',', '.')
+                value_str = money_match.group(1).replace('.', '').replace(',', '.')
                 result.valor_avaliacao = float(value_str)
             except ValueError:
                 pass
 
-    def _search_images(self, soup: BeautifulSoup, result: ParsedLot):
+    def _search_images(self, nodes: PageNodes, result: ParsedLot):
         """Busca imagens do lote."""
         # Busca imagens com padrões comuns
-        for img in soup.find_all('img'):
-            src = img.get('src') or img.get('data-src')
-            if src and not any(kw in src.lower() for kw in ['logo', 'icon', 'avatar']):
+        for src in nodes.images:
+            if not any(kw in src.lower() for kw in ['logo', 'icon', 'avatar']):
                 if src.startswith('http'):
                     result.imagens.append(src)
                 elif src.startswith('/'):
@@ -401,6 +409,33 @@ class LeilaoParser:
         return min(score, 100.0)
 
 
+# Cabeçalho dos .html avulsos gravados antes do EvidenceArchive
+EVIDENCE_URL_PATTERN = re.compile(r'^<!-- URL: (.*?) -->\n')
+EVIDENCE_TIMESTAMP_PATTERN = re.compile(r'^<!-- Timestamp: .*? -->\n')
+
+
+def read_html_evidence(filepath: str) -> Tuple[str, str]:
+    """
+    Lê um .html avulso (formato anterior ao EvidenceArchive).
+
+    Returns:
+        Tupla (url, html) - html sem os comentários de cabeçalho; url vazia
+        se o arquivo não tiver o cabeçalho
+    """
+    with open(filepath, 'r', encoding='utf-8') as f:
+        conteudo = f.read()
+
+    url = ""
+    url_match = EVIDENCE_URL_PATTERN.match(conteudo)
+    if url_match:
+        url = url_match.group(1)
+        conteudo = conteudo[url_match.end():]
+        ts_match = EVIDENCE_TIMESTAMP_PATTERN.match(conteudo)
+        if ts_match:
+            conteudo = conteudo[ts_match.end():]
+    return url, conteudo
+
+
 def parse_lot(url: str, html: str) -> ParsedLot:
     """Função de conveniência para parsing."""
     parser = LeilaoParser()
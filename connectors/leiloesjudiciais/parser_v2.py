@@ -12,15 +12,18 @@ Extração de dados adicionais:
 - Descrição: <meta name="description">
 - Valores: JSON embutido (avaliacao, lance, valorAvaliacao)
 - Imagens: <img> dentro de .imagem-wrapper ou .imagens-lote
+
+HTML salvo (save_html=True) vai para o EvidenceArchive.
+
+Todos os padrões são compilados uma vez, os de valor começam na
+palavra-chave (sem prefixo opcional) e as imagens param na décima aceita.
 """
 
-import hashlib
 import json
 import os
 import re
 from dataclasses import dataclass, field
 from datetime import datetime
-from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 import logging
 
@@ -30,6 +33,8 @@ try:
 except ImportError:
     HAS_BS4 = False
 
+from .evidence_archive import DEFAULT_ARCHIVE_DIR, EvidenceArchive
+
 logger = logging.getLogger(__name__)
 
 
@@ -82,18 +87,29 @@ class ParserV2:
     LOCATION_PATTERN = re.compile(r'-\s*([A-Za-zÀ-ÿ\s]+)/([A-Z]{2})\s*(?:-\s*Leil|$)', re.IGNORECASE)
 
     # Value patterns in JSON
+    # Começam na palavra-chave: um prefixo opcional (aspas, "valor_") não
+    # muda o grupo capturado nem qual ocorrência vem primeiro, mas obrigava
+    # o regex a tentar o padrão em cada posição do HTML (~8x mais lento)
     VALUE_PATTERNS = {
-        'avaliacao': re.compile(r'["\']?(?:valor_?)?avaliacao["\']?\s*[":]\s*([0-9.,]+)', re.IGNORECASE),
-        'lance_minimo': re.compile(r'["\']?lance_?minimo["\']?\s*[":]\s*([0-9.,]+)', re.IGNORECASE),
-        'lance_atual': re.compile(r'["\']?lance_?atual["\']?\s*[":]\s*([0-9.,]+)', re.IGNORECASE),
-        'valor': re.compile(r'["\']?valor["\']?\s*[":]\s*([0-9.,]+)', re.IGNORECASE),
+        'avaliacao': re.compile(r'avaliacao["\']?\s*[":]\s*([0-9.,]+)', re.IGNORECASE),
+        'lance_minimo': re.compile(r'lance_?minimo["\']?\s*[":]\s*([0-9.,]+)', re.IGNORECASE),
+        'lance_atual': re.compile(r'lance_?atual["\']?\s*[":]\s*([0-9.,]+)', re.IGNORECASE),
+        'valor': re.compile(r'valor["\']?\s*[":]\s*([0-9.,]+)', re.IGNORECASE),
     }
 
     # Image patterns
     IMG_PATTERN = re.compile(r'<img[^>]*src=["\']([^"\']+)["\']', re.IGNORECASE)
+    IMG_SECTION_PATTERN = re.compile(r'class=["\']imagens?-lote["\'][^>]*>(.*?)</div>', re.DOTALL | re.IGNORECASE)
+    MAX_IMAGES = 10
 
-    def __init__(self, html_output_dir: Optional[str] = None):
-        self.html_output_dir = html_output_dir or "out/leiloesjudiciais/html"
+    # Sufixo do <title> e IDs da URL
+    TITLE_SUFFIX_PATTERN = re.compile(r'\s*-\s*Leil[õo]es Judiciais\s*$', re.IGNORECASE)
+    URL_IDS_PATTERN = re.compile(r'/lote/(\d+)/(\d+)')
+
+    def __init__(self, html_output_dir: Optional[str] = None, archive: Optional[EvidenceArchive] = None):
+        self.html_output_dir = html_output_dir or os.getenv("LEILOEIRO_EVIDENCE_DIR", DEFAULT_ARCHIVE_DIR)
+        self._archive = archive
+        self._owns_archive = archive is None
         self._stats = {
             'title_from_h2': 0,
             'title_from_title_tag': 0,
@@ -127,7 +143,9 @@ class ParserV2:
             self._save_html(url, html, leilao_id, lote_id)
 
         # 1. Extract title (multiple fallbacks)
-        self._extract_title(html, result)
+        # <meta name="description"> serve ao título e à descrição: busca uma vez
+        meta_match = self.META_DESC_PATTERN.search(html)
+        self._extract_title(html, result, meta_match)
 
         # 2. Check if page is valid (not "undefined")
         if result.titulo and result.titulo.lower().strip() in ['undefined', 'null', '']:
@@ -136,7 +154,7 @@ class ParserV2:
             self._stats['invalid_pages'] += 1
 
         # 3. Extract description
-        self._extract_description(html, result)
+        self._extract_description(html, result, meta_match)
 
         # 4. Extract location from title or description
         self._extract_location(result)
@@ -158,12 +176,12 @@ class ParserV2:
 
     def _extract_ids(self, url: str) -> Tuple[str, str]:
         """Extract leilao_id and lote_id from URL."""
-        match = re.search(r'/lote/(\d+)/(\d+)', url)
+        match = self.URL_IDS_PATTERN.search(url)
         if match:
             return match.groups()
         return "", ""
 
-    def _extract_title(self, html: str, result: ExtractedLot):
+    def _extract_title(self, html: str, result: ExtractedLot, meta_match: Optional[re.Match] = None):
         """Extract title from multiple sources."""
         # 1. Try <h2 class="titulo-lote"> (most reliable)
         h2_match = self.H2_TITULO_PATTERN.search(html)
@@ -181,7 +199,7 @@ class ParserV2:
         if title_match:
             raw_title = title_match.group(1).strip()
             # Remove " - Leilões Judiciais" suffix
-            titulo = re.sub(r'\s*-\s*Leil[õo]es Judiciais\s*$', '', raw_title, flags=re.IGNORECASE)
+            titulo = self.TITLE_SUFFIX_PATTERN.sub('', raw_title)
             if titulo and titulo.lower() != 'undefined':
                 result.titulo = titulo
                 result.title_source = "title"
@@ -190,7 +208,6 @@ class ParserV2:
                 return
 
         # 3. Try <meta name="description">
-        meta_match = self.META_DESC_PATTERN.search(html)
         if meta_match:
             desc = meta_match.group(1).strip()
             if desc and desc.lower() != 'undefined' and 'undefined' not in desc.lower()[:20]:
@@ -205,9 +222,8 @@ class ParserV2:
 
         self._stats['title_missing'] += 1
 
-    def _extract_description(self, html: str, result: ExtractedLot):
+    def _extract_description(self, html: str, result: ExtractedLot, meta_match: Optional[re.Match] = None):
         """Extract description from meta tag."""
-        meta_match = self.META_DESC_PATTERN.search(html)
         if meta_match:
             desc = meta_match.group(1).strip()
             if desc and 'undefined' not in desc.lower()[:20]:
@@ -249,38 +265,39 @@ class ParserV2:
     def _extract_images(self, html: str, result: ExtractedLot):
         """Extract image URLs from HTML."""
         # Look for images in lot image containers
-        img_section = re.search(r'class=["\']imagens?-lote["\'][^>]*>(.*?)</div>', html, re.DOTALL | re.IGNORECASE)
-        if img_section:
-            imgs = self.IMG_PATTERN.findall(img_section.group(1))
-        else:
-            imgs = self.IMG_PATTERN.findall(html)
+        img_section = self.IMG_SECTION_PATTERN.search(html)
+        imgs = self.IMG_PATTERN.finditer(img_section.group(1) if img_section else html)
 
-        # Filter and clean URLs
-        for img in imgs:
+        # Filter and clean URLs (stop at MAX_IMAGES)
+        for img_match in imgs:
+            img = img_match.group(1)
             if img and not any(x in img.lower() for x in ['logo', 'icon', 'avatar', 'placeholder']):
                 if img.startswith('http'):
                     result.imagens.append(img)
                 elif img.startswith('//'):
                     result.imagens.append(f"https:{img}")
-
-        # Limit to 10 images
-        result.imagens = result.imagens[:10]
+                if len(result.imagens) >= self.MAX_IMAGES:
+                    break
 
     def _save_html(self, url: str, html: str, leilao_id: str, lote_id: str):
-        """Save HTML as evidence."""
+        """Save HTML as evidence (EvidenceArchive)."""
         try:
-            Path(self.html_output_dir).mkdir(parents=True, exist_ok=True)
-            url_hash = hashlib.md5(url.encode()).hexdigest()[:12]
-            filename = f"{leilao_id}_{lote_id}_{url_hash}.html"
-            filepath = os.path.join(self.html_output_dir, filename)
-
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(f"<!-- URL: {url} -->\n")
-                f.write(f"<!-- Timestamp: {datetime.utcnow().isoformat()} -->\n")
-                f.write(html)
+            if self._archive is None:
+                self._archive = EvidenceArchive(self.html_output_dir)
+            self._archive.append(url, html, leilao_id, lote_id)
         except Exception as e:
             logger.warning(f"Erro ao salvar HTML: {e}")
 
+    def close(self):
+        """Flush pending evidence (closes the archive if owned)."""
+        if self._archive is None:
+            return
+        if self._owns_archive:
+            self._archive.close()
+            self._archive = None
+        else:
+            self._archive.flush()
+
     def get_stats(self) -> Dict[str, int]:
         """Return extraction statistics."""
         return self._stats.copy()
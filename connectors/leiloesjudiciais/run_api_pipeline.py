@@ -6,6 +6,14 @@ Pipeline em 2 fases:
 1. FETCH: Busca dados da API e persiste no raw (staging)
 2. NORMALIZE: Normaliza dados e persiste lotes válidos / quarentena
 
+As fases rodam em streaming: cada página segue para pré-filtro,
+normalização, validação e emissão assim que chega, com memória constante.
+
+Ingestão incremental: o estado local (delta_state.py) separa os lotes em
+novos, alterados, inalterados e removidos; só novos/alterados são
+normalizados e persistidos, e removidos viram tombstone. --full ignora o
+estado e reprocessa tudo.
+
 Uso:
     # Dry run (não persiste no banco)
     python -m connectors.leiloesjudiciais.run_api_pipeline --dry-run --max-pages 5
@@ -16,6 +24,9 @@ Uso:
     # Apenas tipo 1 (presencial)
     python -m connectors.leiloesjudiciais.run_api_pipeline --tipo 1 --max-pages 10
 
+    # Reprocessa todos os lotes (ignora o estado incremental)
+    python -m connectors.leiloesjudiciais.run_api_pipeline --persist --full
+
 Saídas:
     - out/leiloesjudiciais/valid_{run_id}.jsonl - Lotes válidos
     - out/leiloesjudiciais/quarantine_{run_id}.jsonl - Lotes rejeitados
@@ -27,15 +38,16 @@ import json
 import logging
 import os
 import sys
+import time
 from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 # Adiciona diretório raiz ao path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from connectors.leiloesjudiciais.api_client import LeiloeiroAPIClient, FetchStats
+from connectors.leiloesjudiciais.api_client import LeiloeiroAPIClient
 from connectors.leiloesjudiciais.normalize_api import APILotNormalizer, NormalizedAPILot
 from connectors.leiloesjudiciais.validators import (
     LoteValidator,
@@ -46,6 +58,17 @@ from connectors.leiloesjudiciais.validators import (
     is_vehicle_category
 )
 from connectors.leiloesjudiciais.config import config
+from connectors.leiloesjudiciais.session import SessionManager
+from connectors.leiloesjudiciais.delta_state import (
+    CHANGED,
+    NEW,
+    UNCHANGED,
+    DeltaState,
+    RemovedLot,
+    item_key,
+)
+from connectors.common.bulk_writer import BulkUpsertWriter
+from connectors.common.vehicle_index import VehicleIndex, keys_from_text
 
 # Configuração de logging
 logging.basicConfig(
@@ -72,6 +95,9 @@ class PipelineReport:
     # Fase 1: Fetch
     fetch: Dict[str, Any] = field(default_factory=dict)
 
+    # Delta (novos/alterados/inalterados/removidos)
+    delta: Dict[str, Any] = field(default_factory=dict)
+
     # Fase 2: Normalize
     normalize: Dict[str, Any] = field(default_factory=dict)
 
@@ -103,16 +129,26 @@ def run_pipeline(
     output_dir: str = "out/leiloesjudiciais",
     filter_vehicles: bool = True,
     check_expiration: bool = False,
+    vehicle_index: bool = True,
+    concurrency: Optional[int] = None,
+    delta: bool = True,
 ) -> PipelineReport:
     """
     Executa pipeline de ingestão via API.
 
-    Fluxo:
-    1. FETCH: Busca todas as páginas da API
+    Fluxo (streaming, página a página):
+    1. FETCH: Gera as páginas da API à medida que chegam e classifica cada
+       lote contra o estado incremental (novo/alterado/inalterado/removido)
     2. PRE-FILTER: Filtra id_categoria=3 (Imóveis) e categorias fora do escopo
-    3. NORMALIZE: Converte para contrato canônico
+    3. NORMALIZE: Converte para contrato canônico e liga cada lote ao
+       veículo canônico do índice de identidade (placa/chassi/renavam)
     4. VALIDATE: Aplica regras de negócio
-    5. EMIT: Salva arquivos e (opcionalmente) persiste no banco
+    5. EMIT: Acrescenta cada lote ao JSONL assim que sai da validação e
+       (opcionalmente) persiste em lotes pequenos no banco
+
+    Nenhuma fase materializa o catálogo inteiro: a memória fica limitada à
+    página corrente e ao lote pendente de persistência, e os contadores do
+    relatório são agregados incrementalmente.
 
     NOTA: A API não suporta filtro por categoria server-side.
     Categorias retornadas (id_categoria):
@@ -127,6 +163,13 @@ def run_pipeline(
         output_dir: Diretório de saída
         filter_vehicles: Se True, filtra apenas veículos (id_categoria=1)
         check_expiration: Se True, rejeita leilões passados
+        vehicle_index: Se True, consulta o índice de identidade de veículos
+            (VEHICLE_INDEX_PATH) para ligar duplicatas de outros editais/fontes
+        concurrency: Páginas da API buscadas em paralelo
+            (padrão: config.MAX_CONCURRENT_REQUESTS); o rate limit é global
+        delta: Se True, processa só lotes novos/alterados (estado em
+            LEILOEIRO_DELTA_STATE_PATH). O estado só avança em execuções
+            com persistência; dry runs mostram o delta sem gravá-lo.
 
     Returns:
         PipelineReport com métricas completas
@@ -138,117 +181,172 @@ def run_pipeline(
     logger.info("=" * 60)
     logger.info(f"PIPELINE INICIADO: {run_id}")
     logger.info("=" * 60)
-    logger.info(f"Configuração: dry_run={dry_run}, max_pages={max_pages}")
+    concurrency = max(1, concurrency or config.MAX_CONCURRENT_REQUESTS)
+    logger.info(f"Configuração: dry_run={dry_run}, max_pages={max_pages}, concurrency={concurrency}")
     logger.info(f"Filtros: filter_vehicles={filter_vehicles}, check_expiration={check_expiration}")
 
-    # Inicializa componentes
+    # Inicializa componentes (pool de conexões do tamanho da concorrência)
+    session = SessionManager(max_connections=concurrency)
     client = LeiloeiroAPIClient(
         requests_per_second=config.REQUESTS_PER_SECOND,
         timeout=config.REQUEST_TIMEOUT_SECONDS,
-        max_retries=config.MAX_RETRIES
+        max_retries=config.MAX_RETRIES,
+        session=session,
+        max_concurrent=concurrency,
     )
     normalizer = APILotNormalizer()
     validator = LoteValidator(check_expiration=check_expiration)
+    state = DeltaState.from_env() if delta else None
+    index = VehicleIndex.from_env() if vehicle_index else None
+    persister = _StreamPersister(run_id, state, enabled=persist and not dry_run)
+
+    # Cria diretório de saída
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    files_created = {}
+    valid_file = output_path / f"valid_{run_id}.jsonl"
+    quarantine_file = output_path / f"quarantine_{run_id}.jsonl"
+
+    # Contadores agregados incrementalmente
+    items_fetched = 0
+    delta_counts = {NEW: 0, CHANGED: 0, UNCHANGED: 0}
+    seen_keys: Set[str] = set()
+    tipo_counts: Dict[int, int] = {}
+    cat_counts: Dict[int, int] = {}
+    pre_filter_counts: Dict[str, int] = {}
+    sucata_accepted = 0
+    filtered_count = 0
+    normalized_count = 0
+    normalize_error_count = 0
+    vehicle_identified = 0
+    vehicle_duplicates = 0
+    valid_count = 0
+    validation_quarantine = 0
 
     # ========================================================================
-    # FASE 1: FETCH
+    # FASES 1-5: FETCH -> PRE-FILTER -> NORMALIZE -> VALIDATE -> EMIT
     # ========================================================================
     logger.info("")
-    logger.info("--- FASE 1: FETCH ---")
+    logger.info("--- FETCH -> PRE-FILTER -> NORMALIZE -> VALIDATE -> EMIT (streaming) ---")
 
     # Busca tipo=1 (Veículos) + tipo=2 (Bens Diversos para sucatas)
     # Tipo=3 (Imóveis) é excluído
-    logger.info("Buscando lotes da API (tipos 1 e 2)...")
-    all_items, stats = client.fetch_all_tipos(
-        tipos=[1, 2],  # Veículos + Bens Diversos
-        max_pages_per_tipo=max_pages,
-        progress_callback=lambda t, p, total, items: logger.debug(f"  Tipo {t} - Página {p}/{total}")
-    )
+    try:
+        with open(valid_file, 'w', encoding='utf-8') as valid_out, \
+                open(quarantine_file, 'w', encoding='utf-8') as quarantine_out:
+
+            def quarantine(record: Dict[str, Any]):
+                quarantine_out.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+            pages = client.iter_pages(tipos=[1, 2], max_pages_per_tipo=max_pages)  # Veículos + Bens Diversos
+            for tipo, page, total_pages, items in pages:
+                logger.debug(f"  Tipo {tipo} - Página {page}/{total_pages}")
+                unchanged_keys: List[str] = []
+
+                for item in items:
+                    items_fetched += 1
+
+                    # DELTA: inalterados não passam pelo pipeline
+                    if state is not None:
+                        key = item_key(item)
+                        if key in seen_keys:
+                            continue
+                        seen_keys.add(key)
+                        status = state.classify_item(item)
+                        delta_counts[status] += 1
+                        if status == UNCHANGED:
+                            unchanged_keys.append(key)
+                            continue
+
+                    # PRE-FILTER
+                    tipo_busca = item.get("_tipo_busca", 1)
+                    id_categoria = item.get("id_categoria")
+                    tipo_counts[tipo_busca] = tipo_counts.get(tipo_busca, 0) + 1
+                    cat_counts[id_categoria] = cat_counts.get(id_categoria, 0) + 1
+
+                    reason = _pre_filter_reason(item, filter_vehicles)
+                    if reason is not None:
+                        pre_filter_counts[reason] = pre_filter_counts.get(reason, 0) + 1
+                        quarantine({
+                            "lote_id_original": str(item.get("id", "")),
+                            "rejection_code": reason,
+                            "rejection_reason": REJECTION_DESCRIPTIONS.get(reason, reason),
+                            "payload_original": item,
+                            "stage": "pre_filter",
+                        })
+                        persister.add_done(item)
+                        continue
+                    filtered_count += 1
+                    if filter_vehicles and tipo_busca == 2:
+                        sucata_accepted += 1
+
+                    # NORMALIZE (erros não avançam o estado: voltam na próxima execução)
+                    try:
+                        lot = normalizer.normalize(item)
+                    except Exception as e:
+                        logger.warning(f"Erro normalizando lote {item.get('id')}: {e}")
+                        normalize_error_count += 1
+                        quarantine({
+                            "lote_id_original": str(item.get("id", "")),
+                            "rejection_code": "NORMALIZE_ERROR",
+                            "rejection_reason": f"NORMALIZE_ERROR: {e}",
+                            "payload_original": item,
+                            "stage": "normalize",
+                        })
+                        continue
+                    normalized_count += 1
+
+                    if index is not None:
+                        vehicle_duplicates += _link_vehicle_identities([lot], index)
+                        if lot.vehicle_id:
+                            vehicle_identified += 1
+
+                    # VALIDATE + EMIT
+                    result = validator.validate(lot)
+                    if result.is_valid:
+                        valid_count += 1
+                        valid_out.write(json.dumps(_lot_to_dict(lot), ensure_ascii=False) + '\n')
+                        persister.add_valid(lot, item)
+                    else:
+                        validation_quarantine += 1
+                        quarantine({
+                            "id_interno": lot.id_interno,
+                            "lote_id_original": lot.lote_id_original,
+                            "rejection_code": result.primary_error or "UNKNOWN",
+                            "rejection_reason": result.error_description,
+                            "validation_errors": result.errors,
+                            "normalized_data": _lot_to_dict(lot),
+                            "stage": "validation",
+                        })
+                        persister.add_done(item)
+
+                # Fim da página: arquivos e banco acompanham o fetch
+                valid_out.flush()
+                quarantine_out.flush()
+                persister.touch(unchanged_keys)
+                persister.maybe_flush()
+
+        persister.flush()
+    finally:
+        persister.close()
+        session.close()
+        if index is not None:
+            index.close()
+
+    files_created["valid"] = str(valid_file)
+    files_created["quarantine"] = str(quarantine_file)
 
     fetch_stats = {
         "total_requests": client.stats.total_requests,
         "successful": client.stats.successful,
         "failed": client.stats.failed,
+        "truncated": client.stats.truncated,
         "rate_limited": client.stats.rate_limited,
         "pages_fetched": client.stats.pages_fetched,
-        "items_fetched": len(all_items),
+        "items_fetched": items_fetched,
         "avg_response_time_ms": round(client.stats.avg_response_time_ms, 2),
     }
-
-    logger.info(f"Total bruto: {len(all_items)} lotes")
-
-    # ========================================================================
-    # FASE 2: PRE-FILTER
-    # ========================================================================
-    logger.info("")
-    logger.info("--- FASE 2: PRE-FILTER ---")
-
-    filtered_items: List[Dict] = []
-    pre_rejected: List[Tuple[Dict, str]] = []
-
-    # Contadores por tipo de busca e categoria
-    tipo_counts: Dict[int, int] = {}
-    cat_counts: Dict[int, int] = {}
-    sucata_accepted = 0
-
-    # Palavras-chave para identificar veículos em sucatas
-    VEHICLE_KEYWORDS = [
-        "veículo", "veiculo", "carro", "moto", "motocicleta",
-        "caminhão", "caminhao", "ônibus", "onibus", "automóvel",
-        "automovel", "chassi", "placa", "renavam", "trator",
-        "reboque", "carreta", "van", "utilitário", "pickup",
-        # Marcas comuns
-        "fiat", "volkswagen", "vw", "chevrolet", "gm", "ford",
-        "honda", "yamaha", "toyota", "hyundai", "jeep", "nissan",
-        "mercedes", "bmw", "audi", "peugeot", "citroen", "renault",
-        "scania", "volvo", "iveco", "man", "daf", "kia", "mitsubishi",
-    ]
-
-    def is_sucata_veiculo(item: Dict) -> bool:
-        """Verifica se item é sucata de veículo."""
-        titulo = (item.get("nm_titulo_lote") or "").lower()
-        descricao = (item.get("nm_descricao") or "").lower()
-        texto = f"{titulo} {descricao}"
-
-        # Deve ter "sucata" no texto
-        if "sucata" not in texto:
-            return False
-
-        # E deve ter alguma palavra-chave de veículo
-        return any(kw in texto for kw in VEHICLE_KEYWORDS)
-
-    for item in all_items:
-        tipo_busca = item.get("_tipo_busca", 1)
-        id_categoria = item.get("id_categoria")
-
-        tipo_counts[tipo_busca] = tipo_counts.get(tipo_busca, 0) + 1
-        cat_counts[id_categoria] = cat_counts.get(id_categoria, 0) + 1
-
-        if filter_vehicles:
-            # Tipo 1 (Veículos): aceita todos
-            if tipo_busca == 1:
-                filtered_items.append(item)
-                continue
-
-            # Tipo 2 (Bens Diversos): aceita apenas sucata + veículo
-            if tipo_busca == 2:
-                if is_sucata_veiculo(item):
-                    filtered_items.append(item)
-                    sucata_accepted += 1
-                else:
-                    pre_rejected.append((item, RejectionCode.CATEGORY_EXCLUDED))
-                continue
-
-            # Tipo 3 (Imóveis): rejeita
-            if tipo_busca == 3:
-                pre_rejected.append((item, RejectionCode.TIPO_3))
-                continue
-
-            # Outros tipos: rejeita
-            pre_rejected.append((item, RejectionCode.CATEGORY_EXCLUDED))
-        else:
-            # Modo permissivo: aceita todas as categorias
-            filtered_items.append(item)
+    logger.info(f"Total bruto: {items_fetched} lotes")
 
     # Log dos tipos buscados
     logger.info("Tipos buscados:")
@@ -259,136 +357,74 @@ def run_pipeline(
 
     # Log das categorias encontradas
     logger.info("Categorias encontradas:")
-    for cat_id, count in sorted(cat_counts.items()):
+    for cat_id, count in sorted(cat_counts.items(), key=lambda x: (x[0] is None, x[0] or 0)):
         cat_name = {1: "Veículos", 2: "Bens Diversos", 3: "Imóveis"}.get(cat_id, f"Cat {cat_id}")
         logger.info(f"  - {cat_name} (id={cat_id}): {count} lotes")
 
+    pre_rejected_count = sum(pre_filter_counts.values())
     logger.info(f"Sucatas de veículos aceitas do tipo 2: {sucata_accepted}")
-    logger.info(f"Após pré-filtro: {len(filtered_items)} lotes (rejeitados: {len(pre_rejected)})")
-
-    # ========================================================================
-    # FASE 3: NORMALIZE
-    # ========================================================================
-    logger.info("")
-    logger.info("--- FASE 3: NORMALIZE ---")
-
-    normalized: List[NormalizedAPILot] = []
-    normalize_errors: List[Tuple[Dict, str]] = []
-
-    for item in filtered_items:
-        try:
-            lot = normalizer.normalize(item)
-            normalized.append(lot)
-        except Exception as e:
-            logger.warning(f"Erro normalizando lote {item.get('id')}: {e}")
-            normalize_errors.append((item, f"NORMALIZE_ERROR: {e}"))
+    logger.info(f"Após pré-filtro: {filtered_count} lotes (rejeitados: {pre_rejected_count})")
 
     normalize_stats = {
-        "total_input": len(filtered_items),
-        "normalized_ok": len(normalized),
-        "normalize_errors": len(normalize_errors),
+        "total_input": filtered_count,
+        "normalized_ok": normalized_count,
+        "normalize_errors": normalize_error_count,
     }
-
-    logger.info(f"Normalizados: {len(normalized)} lotes")
-
-    # ========================================================================
-    # FASE 4: VALIDATE
-    # ========================================================================
-    logger.info("")
-    logger.info("--- FASE 4: VALIDATE ---")
-
-    valid_lots, quarantine_lots = validator.filter_valid(normalized)
+    if index is not None:
+        normalize_stats["vehicle_duplicates"] = vehicle_duplicates
+        normalize_stats["vehicle_identified"] = vehicle_identified
+        logger.info(
+            f"Índice de veículos: {vehicle_identified} identificados, "
+            f"{vehicle_duplicates} já vistos em outros editais/fontes"
+        )
+    logger.info(f"Normalizados: {normalized_count} lotes")
 
     validate_stats = {
-        "total_input": len(normalized),
-        "valid": len(valid_lots),
-        "quarantine": len(quarantine_lots),
+        "total_input": normalized_count,
+        "valid": valid_count,
+        "quarantine": validation_quarantine,
         "valid_rate": round(validator.stats.valid_rate, 2),
         "errors_by_code": dict(validator.stats.errors_by_code),
     }
+    logger.info(f"Válidos: {valid_count}, Quarentena: {validation_quarantine}")
 
-    logger.info(f"Válidos: {len(valid_lots)}, Quarentena: {len(quarantine_lots)}")
-
-    # ========================================================================
-    # FASE 5: EMIT
-    # ========================================================================
-    logger.info("")
-    logger.info("--- FASE 5: EMIT ---")
-
-    # Cria diretório de saída
-    output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
-
-    files_created = {}
-
-    # Salva lotes válidos
-    valid_file = output_path / f"valid_{run_id}.jsonl"
-    with open(valid_file, 'w', encoding='utf-8') as f:
-        for lot in valid_lots:
-            record = _lot_to_dict(lot)
-            f.write(json.dumps(record, ensure_ascii=False) + '\n')
-    files_created["valid"] = str(valid_file)
-    logger.info(f"Salvos {len(valid_lots)} lotes válidos em {valid_file}")
-
-    # Salva quarentena (lotes rejeitados na validação)
-    quarantine_file = output_path / f"quarantine_{run_id}.jsonl"
-    with open(quarantine_file, 'w', encoding='utf-8') as f:
-        # Adiciona rejeitados no pré-filtro
-        for item, reason in pre_rejected:
-            record = {
-                "lote_id_original": str(item.get("id", "")),
-                "rejection_code": reason,
-                "rejection_reason": REJECTION_DESCRIPTIONS.get(reason, reason),
-                "payload_original": item,
-                "stage": "pre_filter",
-            }
-            f.write(json.dumps(record, ensure_ascii=False) + '\n')
-
-        # Adiciona erros de normalização
-        for item, error in normalize_errors:
-            record = {
-                "lote_id_original": str(item.get("id", "")),
-                "rejection_code": "NORMALIZE_ERROR",
-                "rejection_reason": error,
-                "payload_original": item,
-                "stage": "normalize",
-            }
-            f.write(json.dumps(record, ensure_ascii=False) + '\n')
-
-        # Adiciona rejeitados na validação
-        for lot, result in quarantine_lots:
-            record = {
-                "id_interno": lot.id_interno,
-                "lote_id_original": lot.lote_id_original,
-                "rejection_code": result.primary_error or "UNKNOWN",
-                "rejection_reason": result.error_description,
-                "validation_errors": result.errors,
-                "normalized_data": _lot_to_dict(lot),
-                "stage": "validation",
-            }
-            f.write(json.dumps(record, ensure_ascii=False) + '\n')
-
-    total_quarantine = len(pre_rejected) + len(normalize_errors) + len(quarantine_lots)
-    files_created["quarantine"] = str(quarantine_file)
+    total_quarantine = pre_rejected_count + normalize_error_count + validation_quarantine
+    logger.info(f"Salvos {valid_count} lotes válidos em {valid_file}")
     logger.info(f"Salvos {total_quarantine} lotes em quarentena em {quarantine_file}")
 
     # ========================================================================
-    # PERSISTÊNCIA (opcional)
+    # PERSISTÊNCIA (opcional) E DELTA
     # ========================================================================
-    if persist and not dry_run:
-        logger.info("")
-        logger.info("--- PERSISTÊNCIA SUPABASE ---")
-        try:
-            inserted, errors = _persist_to_supabase(valid_lots, run_id)
-            logger.info(f"Supabase: {inserted} inseridos, {errors} erros")
-            validate_stats["persisted"] = inserted
-            validate_stats["persist_errors"] = errors
-        except Exception as e:
-            logger.error(f"Erro na persistência: {e}")
-            validate_stats["persist_error"] = str(e)
+    if persister.enabled:
+        logger.info(f"Supabase: {persister.inserted} inseridos, {persister.errors} erros")
+        validate_stats["persisted"] = persister.inserted
+        validate_stats["persist_errors"] = persister.errors
+        if persister.error:
+            validate_stats["persist_error"] = persister.error
     else:
         logger.info("Persistência desabilitada (dry_run=True ou persist=False)")
 
+    delta_stats: Dict[str, Any] = {"enabled": delta}
+    disappeared: List[RemovedLot] = []
+    if state is not None:
+        # Ausência só conta como remoção se a listagem cobriu o catálogo
+        # inteiro (sem max_pages, sem páginas com erro e sem tipo
+        # interrompido por página repetida)
+        complete = max_pages is None and client.stats.failed == 0 and client.stats.truncated == 0
+        if complete:
+            disappeared = state.disappeared(seen_keys)
+        delta_stats.update({
+            "new": delta_counts[NEW],
+            "changed": delta_counts[CHANGED],
+            "unchanged": delta_counts[UNCHANGED],
+            "disappeared": len(disappeared),
+            "listing_complete": complete,
+        })
+        if persister.enabled:
+            delta_stats["committed"] = persister.committed
+            delta_stats["tombstoned"] = _tombstone_disappeared(state, disappeared)
+        state.close()
+
     # ========================================================================
     # RELATÓRIO
     # ========================================================================
@@ -405,9 +441,6 @@ def run_pipeline(
         })
 
     # Adiciona erros de pré-filtro
-    pre_filter_counts: Dict[str, int] = {}
-    for _, reason in pre_rejected:
-        pre_filter_counts[reason] = pre_filter_counts.get(reason, 0) + 1
     for code, count in pre_filter_counts.items():
         top_errors.append({
             "code": code,
@@ -426,6 +459,7 @@ def run_pipeline(
         duration_seconds=round(duration, 2),
         dry_run=dry_run,
         fetch=fetch_stats,
+        delta=delta_stats,
         normalize=normalize_stats,
         validate=validate_stats,
         files=files_created,
@@ -449,9 +483,14 @@ def run_pipeline(
     logger.info("=" * 60)
     logger.info(f"Run ID: {run_id}")
     logger.info(f"Duração: {duration:.2f}s")
-    logger.info(f"Total bruto: {len(all_items)}")
-    logger.info(f"Após filtros: {len(filtered_items)}")
-    logger.info(f"Válidos: {len(valid_lots)}")
+    logger.info(f"Total bruto: {items_fetched}")
+    if state is not None:
+        logger.info(
+            f"Delta: {delta_counts[NEW]} novos, {delta_counts[CHANGED]} alterados, "
+            f"{delta_counts[UNCHANGED]} inalterados, {len(disappeared)} removidos"
+        )
+    logger.info(f"Após filtros: {filtered_count}")
+    logger.info(f"Válidos: {valid_count}")
     logger.info(f"Quarentena: {total_quarantine}")
     logger.info(f"Taxa de aprovação: {validator.stats.valid_rate:.1f}%")
     logger.info("=" * 60)
@@ -463,6 +502,212 @@ def run_pipeline(
 # FUNÇÕES AUXILIARES
 # ============================================================================
 
+# Palavras-chave para identificar veículos em sucatas
+SUCATA_VEHICLE_KEYWORDS = [
+    "veículo", "veiculo", "carro", "moto", "motocicleta",
+    "caminhão", "caminhao", "ônibus", "onibus", "automóvel",
+    "automovel", "chassi", "placa", "renavam", "trator",
+    "reboque", "carreta", "van", "utilitário", "pickup",
+    # Marcas comuns
+    "fiat", "volkswagen", "vw", "chevrolet", "gm", "ford",
+    "honda", "yamaha", "toyota", "hyundai", "jeep", "nissan",
+    "mercedes", "bmw", "audi", "peugeot", "citroen", "renault",
+    "scania", "volvo", "iveco", "man", "daf", "kia", "mitsubishi",
+]
+
+# Lotes válidos acumulados antes de um upsert em lote
+PERSIST_BATCH_ROWS = 200
+
+# Intervalo máximo entre upserts (o primeiro lote chega ao banco logo)
+PERSIST_FLUSH_SECONDS = 5.0
+
+
+def _is_sucata_veiculo(item: Dict) -> bool:
+    """Verifica se item é sucata de veículo."""
+    titulo = (item.get("nm_titulo_lote") or "").lower()
+    descricao = (item.get("nm_descricao") or "").lower()
+    texto = f"{titulo} {descricao}"
+
+    # Deve ter "sucata" no texto
+    if "sucata" not in texto:
+        return False
+
+    # E deve ter alguma palavra-chave de veículo
+    return any(kw in texto for kw in SUCATA_VEHICLE_KEYWORDS)
+
+
+def _pre_filter_reason(item: Dict, filter_vehicles: bool) -> Optional[str]:
+    """Código de rejeição do pré-filtro, ou None se o item segue no pipeline."""
+    if not filter_vehicles:
+        # Modo permissivo: aceita todas as categorias
+        return None
+
+    tipo_busca = item.get("_tipo_busca", 1)
+
+    # Tipo 1 (Veículos): aceita todos
+    if tipo_busca == 1:
+        return None
+
+    # Tipo 2 (Bens Diversos): aceita apenas sucata + veículo
+    if tipo_busca == 2:
+        return None if _is_sucata_veiculo(item) else RejectionCode.CATEGORY_EXCLUDED
+
+    # Tipo 3 (Imóveis): rejeita
+    if tipo_busca == 3:
+        return RejectionCode.TIPO_3
+
+    # Outros tipos: rejeita
+    return RejectionCode.CATEGORY_EXCLUDED
+
+
+def _lot_key(lot: NormalizedAPILot) -> str:
+    """Chave do estado incremental a partir do lote normalizado."""
+    return f"{lot.lote_id_original}|{lot.leilao_id_original or ''}"
+
+
+class _StreamPersister:
+    """
+    Persistência em lotes pequenos durante o streaming.
+
+    Acumula lotes válidos e faz o upsert a cada PERSIST_BATCH_ROWS ou
+    PERSIST_FLUSH_SECONDS; depois de cada upsert avança o estado
+    incremental só com o que terminou o pipeline:
+
+    - Persistidos e itens descartados (pré-filtro/quarentena) gravam o novo
+      hash; falhas de persistência ficam de fora e voltam como
+      novos/alterados na próxima execução
+    - Inalterados só atualizam last_seen
+
+    Desabilitado (dry run, persist=False ou Supabase não configurado), não
+    acumula nada e não avança o estado.
+    """
+
+    def __init__(self, run_id: str, state: Optional[DeltaState], enabled: bool):
+        if enabled and not config.supabase_enabled:
+            logger.warning("Supabase não configurado (SUPABASE_URL/SUPABASE_SERVICE_KEY ausentes)")
+            enabled = False
+        self.run_id = run_id
+        self.state = state
+        self.enabled = enabled
+        self.inserted = 0
+        self.errors = 0
+        self.committed = 0
+        self.error: Optional[str] = None
+        self._lots: List[Tuple[NormalizedAPILot, Dict]] = []
+        self._done: List[Dict] = []
+        self._last_flush = time.monotonic()
+        self._writer = (
+            BulkUpsertWriter.from_env("leiloeiro_lotes", on_conflict="id_interno", key_field="id_interno")
+            if enabled else None
+        )
+
+    def add_valid(self, lot: NormalizedAPILot, item: Dict):
+        if self.enabled:
+            self._lots.append((lot, item))
+
+    def add_done(self, item: Dict):
+        if self.enabled and self.state is not None:
+            self._done.append(item)
+
+    def touch(self, keys: List[str]):
+        if self.enabled and self.state is not None:
+            self.state.touch(keys)
+
+    def maybe_flush(self):
+        pendentes = len(self._lots) + len(self._done)
+        if pendentes and (
+            len(self._lots) >= PERSIST_BATCH_ROWS
+            or time.monotonic() - self._last_flush >= PERSIST_FLUSH_SECONDS
+        ):
+            self.flush()
+
+    def flush(self):
+        if not self.enabled:
+            return
+        lots, done = self._lots, self._done
+        self._lots, self._done = [], []
+        self._last_flush = time.monotonic()
+
+        failed_ids: Set[str] = set()
+        if lots:
+            try:
+                inserted, errors = _persist_to_supabase(
+                    [lot for lot, _ in lots], self.run_id, failed_ids, writer=self._writer
+                )
+                self.inserted += inserted
+                self.errors += errors
+            except Exception as e:
+                logger.error(f"Erro na persistência: {e}")
+                self.error = str(e)
+                self.errors += len(lots)
+                failed_ids = {lot.id_interno for lot, _ in lots}
+
+        if self.state is None:
+            return
+        id_por_chave = {
+            _lot_key(lot): lot.id_interno for lot, _ in lots if lot.id_interno not in failed_ids
+        }
+        committed = done + [item for lot, item in lots if lot.id_interno not in failed_ids]
+        self.state.commit(committed, id_por_chave)
+        self.committed += len(committed)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _tombstone_disappeared(state: DeltaState, disappeared: List[RemovedLot]) -> int:
+    """
+    Arquiva no banco os lotes que sumiram da listagem.
+
+    Removidos com id_interno (já persistidos) viram tombstone; sem
+    id_interno o lote nunca chegou ao banco e só sai do estado ativo.
+    """
+    if not disappeared:
+        return 0
+    id_internos = [r.id_interno for r in disappeared if r.id_interno]
+    try:
+        tombstoned = _tombstone_in_supabase(id_internos)
+    except Exception as e:
+        logger.error(f"Erro marcando tombstones: {e}")
+        return 0
+    state.mark_removed(r.key for r in disappeared)
+    logger.info(f"Tombstones: {tombstoned} lotes arquivados")
+    return tombstoned
+
+
+def _link_vehicle_identities(lots: List[NormalizedAPILot], index: VehicleIndex) -> int:
+    """
+    Liga cada lote ao vehicle_id canônico do índice de identidade.
+
+    A API não tem campos de placa/chassi/renavam: as chaves vêm do título e
+    da descrição (só quando acompanhadas da palavra-chave).
+
+    Returns:
+        Quantidade de lotes cujo veículo já estava no índice
+    """
+    duplicates = 0
+    for lot in lots:
+        chaves = keys_from_text(f"{lot.titulo} {lot.descricao or ''}")
+        match = index.resolve(
+            placa=chaves["placa"],
+            chassi=chaves["chassi"],
+            renavam=chaves["renavam"],
+            fonte="leiloesjudiciais",
+            referencia=lot.id_interno,
+        )
+        if match is None:
+            continue
+        lot.vehicle_id = match.vehicle_id
+        if match.duplicate:
+            duplicates += 1
+            lot.metadata["vehicle_first_seen"] = {
+                "fonte": match.vehicle.fonte,
+                "referencia": match.vehicle.referencia,
+            }
+    return duplicates
+
+
 def _lot_to_dict(lot: NormalizedAPILot) -> Dict[str, Any]:
     """Converte NormalizedAPILot para dicionário serializável."""
     return {
@@ -488,6 +733,7 @@ def _lot_to_dict(lot: NormalizedAPILot) -> Dict[str, Any]:
         "imagens": lot.imagens,
         "metadata": lot.metadata,
         "confidence_score": lot.confidence_score,
+        "vehicle_id": lot.vehicle_id,
         "source_type": "leiloeiro",
         "source_name": "Leiloes Judiciais",
     }
@@ -495,78 +741,110 @@ def _lot_to_dict(lot: NormalizedAPILot) -> Dict[str, Any]:
 
 def _persist_to_supabase(
     lots: List[NormalizedAPILot],
-    run_id: str
+    run_id: str,
+    failed_ids: Optional[Set[str]] = None,
+    writer: Optional[BulkUpsertWriter] = None,
 ) -> Tuple[int, int]:
     """
-    Persiste lotes no Supabase.
+    Persiste lotes no Supabase (upsert em lote por id_interno).
+
+    Usa o BulkUpsertWriter: chunks em paralelo e bisecção de chunks
+    rejeitados, então um lote inválido não derruba os demais.
 
-    TODO: Implementar quando as migrations estiverem aplicadas.
+    Args:
+        failed_ids: Se informado, recebe o id_interno dos lotes que falharam
+        writer: Writer aberto a reaproveitar (streaming); None = abre um
     """
     # Verifica se Supabase está configurado
     if not config.supabase_enabled:
         logger.warning("Supabase não configurado (SUPABASE_URL/SUPABASE_SERVICE_KEY ausentes)")
         return 0, 0
 
-    # Usa httpx diretamente (compatível com novas API keys)
+    rows = [
+        {
+            "id_interno": lot.id_interno,
+            "lote_id_original": lot.lote_id_original,
+            "leilao_id_original": lot.leilao_id_original,
+            "titulo": lot.titulo,
+            "descricao": lot.descricao,
+            "objeto_resumido": lot.objeto_resumido,
+            "cidade": lot.cidade,
+            "uf": lot.uf,
+            "data_leilao": lot.data_leilao,
+            "data_publicacao": lot.data_publicacao,
+            "valor_avaliacao": lot.valor_avaliacao,
+            "link_leiloeiro": lot.link_leiloeiro,
+            "link_edital": lot.link_edital,
+            "tags": lot.tags,
+            "categoria": lot.categoria,
+            "tipo_leilao": lot.tipo_leilao,
+            "nome_leiloeiro": lot.nome_leiloeiro,
+            "imagens": lot.imagens,
+            "metadata": lot.metadata,
+            "confidence_score": lot.confidence_score,
+            "vehicle_id": lot.vehicle_id,
+            # Lote que voltou à listagem sai do tombstone
+            "publication_status": "published",
+        }
+        for lot in lots
+    ]
+
+    if writer is not None:
+        result = writer.upsert(rows)
+    else:
+        with BulkUpsertWriter.from_env(
+            "leiloeiro_lotes", on_conflict="id_interno", key_field="id_interno"
+        ) as writer:
+            result = writer.upsert(rows)
+
+    if failed_ids is not None:
+        failed_ids.update(result.failed_keys)
+    return result.written, result.failed
+
+
+def _tombstone_in_supabase(id_internos: List[str], chunk_size: int = 100) -> int:
+    """
+    Arquiva (publication_status='archived') lotes que sumiram da API.
+
+    Returns:
+        Quantidade de lotes enviados para arquivamento
+    """
+    if not id_internos:
+        return 0
+    if not config.supabase_enabled:
+        logger.warning("Supabase não configurado (SUPABASE_URL/SUPABASE_SERVICE_KEY ausentes)")
+        return 0
+
     import httpx
 
     headers = {
         "apikey": config.supabase_key,
         "Authorization": f"Bearer {config.supabase_key}",
         "Content-Type": "application/json",
-        "Prefer": "resolution=merge-duplicates",  # Upsert behavior
+        "Prefer": "return=minimal",
     }
-
     base_url = f"{config.supabase_url}/rest/v1/leiloeiro_lotes"
+    data = {
+        "publication_status": "archived",
+        "updated_at": datetime.now().astimezone().isoformat(),
+    }
 
-    inserted = 0
-    errors = 0
-
+    archived = 0
     with httpx.Client(timeout=30) as client:
-        for lot in lots:
-            try:
-                data = {
-                    "id_interno": lot.id_interno,
-                    "lote_id_original": lot.lote_id_original,
-                    "leilao_id_original": lot.leilao_id_original,
-                    "titulo": lot.titulo,
-                    "descricao": lot.descricao,
-                    "objeto_resumido": lot.objeto_resumido,
-                    "cidade": lot.cidade,
-                    "uf": lot.uf,
-                    "data_leilao": lot.data_leilao,
-                    "data_publicacao": lot.data_publicacao,
-                    "valor_avaliacao": lot.valor_avaliacao,
-                    "link_leiloeiro": lot.link_leiloeiro,
-                    "link_edital": lot.link_edital,
-                    "tags": lot.tags,
-                    "categoria": lot.categoria,
-                    "tipo_leilao": lot.tipo_leilao,
-                    "nome_leiloeiro": lot.nome_leiloeiro,
-                    "imagens": lot.imagens,
-                    "metadata": lot.metadata,
-                    "confidence_score": lot.confidence_score,
-                }
-
-                # Upsert via POST com on_conflict
-                response = client.post(
-                    base_url,
-                    headers=headers,
-                    json=data,
-                    params={"on_conflict": "id_interno"}
-                )
-
-                if response.status_code in (200, 201):
-                    inserted += 1
-                else:
-                    logger.error(f"Erro ao persistir {lot.id_interno}: HTTP {response.status_code} - {response.text[:100]}")
-                    errors += 1
-
-            except Exception as e:
-                logger.error(f"Erro ao persistir {lot.id_interno}: {e}")
-                errors += 1
-
-    return inserted, errors
+        for i in range(0, len(id_internos), chunk_size):
+            chunk = id_internos[i:i + chunk_size]
+            # id_interno tem "|": valores entre aspas no filtro in.()
+            valores = ",".join(f'"{v}"' for v in chunk)
+            response = client.patch(
+                base_url,
+                headers=headers,
+                json=data,
+                params={"id_interno": f"in.({valores})"},
+            )
+            response.raise_for_status()
+            archived += len(chunk)
+
+    return archived
 
 
 # ============================================================================
@@ -623,6 +901,22 @@ Exemplos:
         action="store_true",
         help="Rejeita leilões já encerrados"
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Páginas da API em paralelo (padrão: MAX_CONCURRENT_REQUESTS; o rate limit continua global)"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignora o estado incremental e reprocessa todos os lotes"
+    )
+    parser.add_argument(
+        "--no-vehicle-index",
+        action="store_true",
+        help="Não consulta o índice de identidade de veículos"
+    )
     parser.add_argument(
         "-v", "--verbose",
         action="store_true",
@@ -646,10 +940,13 @@ Exemplos:
         output_dir=args.output_dir,
         filter_vehicles=not args.no_filter_vehicles,
         check_expiration=args.check_expiration,
+        vehicle_index=not args.no_vehicle_index,
+        concurrency=args.concurrency,
+        delta=not args.full,
     )
 
-    # Retorna código de saída
-    if report.validate.get("valid", 0) > 0:
+    # Retorna código de saída (execução incremental sem mudanças também é sucesso)
+    if report.validate.get("valid", 0) > 0 or report.delta.get("unchanged", 0) > 0:
         sys.exit(0)
     else:
         logger.error("Nenhum lote válido processado")
@@ -26,12 +26,18 @@ from typing import List, Optional
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from connectors.leiloesjudiciais.config import config, Config
-from connectors.leiloesjudiciais.discover import LeilaoDiscovery, DiscoveredLot
-from connectors.leiloesjudiciais.fetch import LeilaoFetcher, FetchStatus
+from connectors.leiloesjudiciais.discover import (
+    DiscoveredLot,
+    DiscoveryReport,
+    LeilaoDiscovery,
+    SitemapWatermarks,
+)
+from connectors.leiloesjudiciais.fetch import FetchCache, LeilaoFetcher, FetchStatus
 from connectors.leiloesjudiciais.parse import LeilaoParser
 from connectors.leiloesjudiciais.parser_v2 import ParserV2  # New improved parser
 from connectors.leiloesjudiciais.normalize import LeilaoNormalizer
 from connectors.leiloesjudiciais.emit import LeilaoEmitter, RunReport
+from connectors.leiloesjudiciais.session import resolve_session
 
 
 # Cria diretório de logs se não existir
@@ -64,16 +70,22 @@ class LeiloesjudiciaisScraper:
         cfg: Optional[Config] = None,
         max_lots: int = 100,
         persist_to_supabase: bool = False,
-        dry_run: bool = False
+        dry_run: bool = False,
+        mode: str = "full",
     ):
         self.config = cfg or config
         self.max_lots = max_lots
         self.persist_to_supabase = persist_to_supabase
         self.dry_run = dry_run
-
-        # Componentes
-        self.discovery = LeilaoDiscovery(self.config)
-        self.fetcher = LeilaoFetcher(self.config)
+        # incremental: só lotes com lastmod posterior à marca d'água do leilão
+        self.mode = mode
+
+        # Componentes (sitemap e páginas de lote no mesmo client keep-alive)
+        self.session = resolve_session(None, self.config)
+        self.discovery = LeilaoDiscovery(self.config, session=self.session)
+        # Cache de respostas/tombstones persiste entre execuções (não em dry run)
+        self.fetch_cache = None if dry_run else FetchCache.from_env()
+        self.fetcher = LeilaoFetcher(self.config, session=self.session, cache=self.fetch_cache)
         self.parser = ParserV2()  # Use V2 parser with improved extraction
         self.normalizer = LeilaoNormalizer(self.config)
         self.emitter = LeilaoEmitter(self.config)
@@ -94,15 +106,27 @@ class LeiloesjudiciaisScraper:
         logger.info(f"Max lots: {self.max_lots}")
         logger.info(f"Persist: {self.persist_to_supabase}")
         logger.info(f"Dry run: {self.dry_run}")
+        logger.info(f"Modo: {self.mode}")
         logger.info("=" * 60)
 
         # 1. DESCOBERTA
         logger.info("[1/5] Descobrindo URLs via sitemap...")
-        lots, discovery_report = self.discovery.discover_from_sitemap(
-            filter_vehicles_only=True,
-            max_lots=self.max_lots,
-            save_report=not self.dry_run
-        )
+        watermarks: Optional[SitemapWatermarks] = None
+        if self.mode == "incremental":
+            watermarks = SitemapWatermarks.from_env()
+            discovery_report = DiscoveryReport()
+            lots = list(self.discovery.discover_incremental(
+                watermarks, max_lots=self.max_lots, report=discovery_report
+            ))
+            logger.info(f"  - Lotes inalterados (marca d'água): {discovery_report.lots_unchanged}")
+            if not self.dry_run:
+                discovery_report.save()
+        else:
+            lots, discovery_report = self.discovery.discover_from_sitemap(
+                filter_vehicles_only=True,
+                max_lots=self.max_lots,
+                save_report=not self.dry_run
+            )
         logger.info(f"  - URLs no sitemap: {discovery_report.total_urls_found}")
         logger.info(f"  - Lotes encontrados: {discovery_report.lot_urls_found}")
         logger.info(f"  - Lotes filtrados: {len(lots)}")
@@ -111,25 +135,42 @@ class LeiloesjudiciaisScraper:
 
         if not lots:
             logger.warning("Nenhum lote encontrado!")
+            if watermarks is not None:
+                watermarks.close()
+            if self.fetch_cache is not None:
+                self.fetch_cache.close()
             return self._finalize_report({}, {})
 
         # 2. FETCH
         logger.info(f"[2/5] Buscando {len(lots)} páginas...")
         fetch_results = []
-        for i, lot in enumerate(lots):
-            if self.dry_run:
+        if self.dry_run:
+            for lot in lots:
                 logger.info(f"  [DRY RUN] Pulando fetch de {lot.url}")
-                continue
-
-            result = self.fetcher.fetch(lot.url)
-            fetch_results.append((lot, result))
+        else:
+            def progresso(url: str, concluidas: int, total: int):
+                if concluidas % 10 == 0:
+                    logger.info(f"  Progresso: {concluidas}/{total}")
 
-            if (i + 1) % 10 == 0:
-                logger.info(f"  Progresso: {i + 1}/{len(lots)}")
+            results, _ = self.fetcher.fetch_many([lot.url for lot in lots], progress_callback=progresso)
+            fetch_results = list(zip(lots, results, strict=True))
+            self.fetch_cache.close()
 
         fetch_stats = self.fetcher.get_stats_dict()
+
+        # Marca d'água só avança para leilões cujos lotes foram todos buscados
+        # (tombstone conta como buscado: o lote não existe mais)
+        if watermarks is not None:
+            if not self.dry_run:
+                failed_leiloes = {
+                    lot.leilao_id for lot, result in fetch_results
+                    if result.status not in (FetchStatus.SUCCESS, FetchStatus.TOMBSTONE)
+                }
+                self.discovery.commit_watermarks(watermarks, failed_leiloes)
+            watermarks.close()
         logger.info(f"  - Sucesso: {fetch_stats['successful']}")
-        logger.info(f"  - Tombstone: {fetch_stats['tombstones']}")
+        logger.info(f"  - Tombstone: {fetch_stats['tombstones']} (+{fetch_stats['tombstones_skipped']} conhecidos)")
+        logger.info(f"  - Não modificados (304): {fetch_stats['not_modified']}")
         logger.info(f"  - Erros: {fetch_stats['errors']}")
 
         # 3. PARSE
@@ -150,6 +191,9 @@ class LeiloesjudiciaisScraper:
             else:
                 invalid_pages += 1
 
+        # Grava o último bloco de evidências HTML no EvidenceArchive
+        self.parser.close()
+
         logger.info(f"  - Lotes parseados: {len(parsed_lots)}")
         logger.info(f"  - Páginas válidas: {valid_pages}")
         logger.info(f"  - Páginas inválidas (undefined): {invalid_pages}")
@@ -301,7 +345,8 @@ def main():
         scraper = LeiloesjudiciaisScraper(
             max_lots=args.max_lots,
             persist_to_supabase=args.persist,
-            dry_run=args.dry_run
+            dry_run=args.dry_run,
+            mode=args.mode,
         )
 
         report = scraper.run()
@@ -0,0 +1,197 @@
+"""
+Sessão HTTP compartilhada - Leilões Judiciais.
+
+Responsável por:
+1. Manter um httpx.Client de vida longa por host (pool keep-alive)
+2. Negociar HTTP/2 quando `h2` está instalado (ALPN; cai para HTTP/1.1)
+3. Aplicar os headers de Config.get_headers() em todas as requisições
+4. Anunciar só as compressões que o httpx consegue decodificar
+
+O mesmo SessionManager é injetado em LeiloeiroAPIClient, LeilaoFetcher e
+LeilaoDiscovery. Antes cada requisição abria um client novo (TCP + TLS a
+cada página); a ~1 req/s, o handshake era boa parte do tempo de cada
+requisição.
+
+Uso:
+    from connectors.leiloesjudiciais.session import SessionManager
+
+    with SessionManager() as session:
+        api = LeiloeiroAPIClient(session=session)
+        fetcher = LeilaoFetcher(session=session)
+"""
+
+import atexit
+import logging
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from .config import Config, config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+try:
+    import brotli  # noqa: F401
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+
+# Conexões ociosas mantidas abertas por host
+MAX_KEEPALIVE_CONNECTIONS = 4
+KEEPALIVE_EXPIRY_SECONDS = 60.0
+
+# Headers de conexão não existem em HTTP/2 (o h2 rejeita a requisição);
+# em HTTP/1.1 o httpx já mantém a conexão aberta por padrão
+HOP_BY_HOP_HEADERS = {"connection", "keep-alive"}
+
+
+def session_headers(cfg: Config) -> Dict[str, str]:
+    """Headers de Config.get_headers() válidos em HTTP/1.1 e HTTP/2."""
+    headers = {
+        nome: valor
+        for nome, valor in cfg.get_headers().items()
+        if nome.lower() not in HOP_BY_HOP_HEADERS
+    }
+    # "br" sem brotli instalado faria o servidor mandar um corpo ilegível
+    headers["Accept-Encoding"] = "gzip, deflate, br" if BROTLI_AVAILABLE else "gzip, deflate"
+    return headers
+
+
+class SessionManager:
+    """
+    Um httpx.Client por host (scheme + host + porta), criado sob demanda.
+
+    Seguro para threads: a criação dos clients é protegida por lock e o
+    httpx.Client pode ser usado por várias threads ao mesmo tempo.
+    """
+
+    def __init__(
+        self,
+        cfg: Optional[Config] = None,
+        http2: Optional[bool] = None,
+        max_connections: Optional[int] = None,
+        transport: Optional[httpx.BaseTransport] = None,
+    ):
+        """
+        Args:
+            cfg: Configuração (headers e timeout); padrão: config global
+            http2: Negocia HTTP/2; None = sim, se `h2` estiver instalado
+            max_connections: Conexões simultâneas por host
+                (padrão: maior entre MAX_CONCURRENT_REQUESTS e
+                FETCH_CONCURRENT_REQUESTS)
+            transport: Transport httpx (testes: httpx.MockTransport)
+        """
+        self.config = cfg or config
+        self.http2 = H2_AVAILABLE if http2 is None else (http2 and H2_AVAILABLE)
+        self.max_connections = max(1, max_connections or max(
+            self.config.MAX_CONCURRENT_REQUESTS, self.config.FETCH_CONCURRENT_REQUESTS
+        ))
+        self.headers = session_headers(self.config)
+        self._transport = transport
+        self._clients: Dict[str, httpx.Client] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "SessionManager":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def client_for(self, url: str) -> httpx.Client:
+        """Client de vida longa do host da URL."""
+        partes = urlsplit(url)
+        origem = f"{partes.scheme}://{partes.netloc}"
+        client = self._clients.get(origem)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(origem)
+            if client is None:
+                client = httpx.Client(
+                    headers=self.headers,
+                    timeout=self.config.REQUEST_TIMEOUT_SECONDS,
+                    http2=self.http2,
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=min(self.max_connections, MAX_KEEPALIVE_CONNECTIONS),
+                        keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+                    ),
+                    transport=self._transport,
+                )
+                self._clients[origem] = client
+                logger.debug(f"Sessão HTTP aberta para {origem} (http2={self.http2})")
+        return client
+
+    def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Requisição pelo client do host (kwargs repassados ao httpx)."""
+        return self.client_for(url).request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    def stream(self, method: str, url: str, **kwargs):
+        """Resposta em streaming (context manager do httpx; corpo via iter_bytes)."""
+        return self.client_for(url).stream(method, url, **kwargs)
+
+    @property
+    def hosts(self) -> int:
+        """Quantidade de hosts com client aberto."""
+        return len(self._clients)
+
+    def close(self):
+        """Fecha todos os clients (e as conexões do pool)."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+
+# ============================================================================
+# SESSÃO PADRÃO DO PROCESSO
+# ============================================================================
+
+_default_session: Optional[SessionManager] = None
+_default_lock = threading.Lock()
+
+
+def get_default_session() -> SessionManager:
+    """Sessão compartilhada pelo processo (config global), fechada no exit."""
+    global _default_session
+    if _default_session is None:
+        with _default_lock:
+            if _default_session is None:
+                _default_session = SessionManager(config)
+                atexit.register(_default_session.close)
+    return _default_session
+
+
+def resolve_session(session: Optional[SessionManager], cfg: Config) -> SessionManager:
+    """
+    Sessão a usar por um componente do conector.
+
+    Sessão injetada > sessão padrão do processo (se o componente usa a
+    config global) > sessão própria com os headers da config recebida.
+    """
+    if session is not None:
+        return session
+    if cfg is config:
+        return get_default_session()
+    return SessionManager(cfg)
@@ -50,6 +50,14 @@ try:
 except ImportError:
     HAS_PALACIO_LEILOES = False
 
+# Indice de identidade de veiculos (connectors/common, na raiz do projeto)
+sys.path.insert(1, str(Path(__file__).parent.parent.parent))
+try:
+    from connectors.common.vehicle_index import VehicleIndex
+    HAS_VEHICLE_INDEX = True
+except ImportError:
+    HAS_VEHICLE_INDEX = False
+
 # ============================================================
 # CONFIGURACAO
 # ============================================================
@@ -88,6 +96,9 @@ def persist_to_supabase(veiculos: list[VeiculoLeilao], table: str = "discovery_v
     # Converter para dicts
     records = [v.to_dict() for v in veiculos]
 
+    if HAS_VEHICLE_INDEX:
+        link_vehicle_identities(records, client)
+
     # Upsert usando id_fonte como chave
     try:
         result = client.table(table).upsert(
@@ -104,6 +115,37 @@ def persist_to_supabase(veiculos: list[VeiculoLeilao], table: str = "discovery_v
         return 0
 
 
+def link_vehicle_identities(records: list[dict], client=None) -> int:
+    """
+    Preenche vehicle_id de cada registro pelo indice de identidade.
+
+    O mesmo veiculo (placa) reaparece em outros leiloes, no PNCP e no
+    conector leiloesjudiciais; o espelho no Supabase compartilha os ids.
+    """
+    index = VehicleIndex.from_env()
+    duplicados = 0
+    try:
+        if client:
+            index.pull_mirror(client)
+        for record in records:
+            match = index.resolve(
+                placa=record.get("placa"),
+                fonte=record.get("fonte", ""),
+                referencia=record["id_fonte"],
+                ano=record.get("ano"),
+            )
+            record["vehicle_id"] = match.vehicle_id if match else None
+            if match and match.duplicate:
+                duplicados += 1
+        if client:
+            index.push_mirror(client)
+    finally:
+        index.close()
+
+    print(f"Indice de veiculos: {duplicados} ja vistos em outros leiloes/fontes")
+    return duplicados
+
+
 # ============================================================
 # RUNNER
 # ============================================================
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK - EXTRAÇÃO DE CAMPOS DE VEÍCULO (LoteExtraido)
+
+Mede o custo por linha de LoteExtraido (limpeza + placa/chassi/renavam/
+ano/marca/modelo) em tabelas sintéticas com milhares de linhas e,
+opcionalmente, a extração completa de PDFs reais.
+
+Uso:
+    python scripts/benchmark_campos_veiculo.py                 # 5000 linhas sintéticas
+    python scripts/benchmark_campos_veiculo.py --linhas 20000 --repeticoes 5
+    python scripts/benchmark_campos_veiculo.py --pdf editais/*.pdf
+
+Data: 2026-02-04
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.extractors.lotes_extractor_v1 import ExtratorTabelas, LoteExtraido  # noqa: E402
+
+MARCAS_MODELOS = [
+    ('FIAT', 'UNO MILLE'), ('VW', 'GOL 1.0'), ('VOLKSWAGEN', 'SAVEIRO CS'),
+    ('CHEVROLET', 'S10 LT'), ('GM', 'CORSA SEDAN'), ('FORD', 'KA SE'),
+    ('MERCEDES-BENZ', 'ACCELO 815'), ('HONDA', 'CG 150 FAN'), ('YAMAHA', 'FAZER 250'),
+    ('TOYOTA', 'HILUX CD'), ('RENAULT', 'SANDERO EXP'), ('SCANIA', 'P 310'),
+    ('IVECO', 'DAILY 35S14'), ('MARCOPOLO', 'VOLARE W8'), ('AGRALE', 'MA 8.5'),
+]
+
+SEM_VEICULO = [
+    'SUCATA DE MOVEIS DE ESCRITORIO DIVERSOS',
+    'LOTE DE COMPUTADORES E MONITORES INSERVIVEIS',
+    'SUCATA FERROSA APROXIMADAMENTE 2.000 KG',
+    'MATERIAL DE INFORMATICA SEM CONDICOES DE USO',
+]
+
+LETRAS_CHASSI = 'ABCDEFGHJKLMNPRSTUVWXYZ0123456789'
+
+
+def gerar_linhas(quantidade: int, semente: int = 42):
+    """Gera (numero, descricao, valor) no formato das tabelas de DETRAN/prefeituras."""
+    rnd = random.Random(semente)
+    linhas = []
+    for i in range(1, quantidade + 1):
+        if rnd.random() < 0.15:
+            descricao = rnd.choice(SEM_VEICULO)
+        else:
+            marca, modelo = rnd.choice(MARCAS_MODELOS)
+            letras = ''.join(rnd.choice('ABCDEFGHJKLMNPRSTUVWXYZ') for _ in range(3))
+            if rnd.random() < 0.5:
+                placa = f"{letras}{rnd.randint(1000, 9999)}"
+            else:
+                placa = f"{letras}{rnd.randint(0, 9)}{rnd.choice('ABCDEFGHIJ')}{rnd.randint(10, 99)}"
+            chassi = '9' + ''.join(rnd.choice(LETRAS_CHASSI) for _ in range(16))
+            ano = rnd.randint(1995, 2022)
+            partes = [
+                f"{marca}/{modelo}",
+                f"ANO {ano}/{ano + 1}",
+                f"PLACA {placa}",
+                f"CHASSI {chassi}" if rnd.random() < 0.7 else chassi,
+                f"RENAVAM {rnd.randint(10**8, 10**11 - 1)}" if rnd.random() < 0.6 else '',
+                rnd.choice(['COR BRANCA', 'COR PRATA', 'COMB. FLEX', '']),
+                'SUCATA APROVEITAVEL' if rnd.random() < 0.3 else 'CONSERVADO',
+            ]
+            descricao = ', '.join(p for p in partes if p)
+        valor = f"R$ {rnd.randint(300, 90000):,}".replace(',', '.') + ',00'
+        linhas.append((f"Lote {i:04d}", descricao, valor))
+    return linhas
+
+
+def medir(funcao, repeticoes: int):
+    """Executa `funcao` N vezes e retorna os tempos em segundos."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def benchmark_sintetico(quantidade: int, repeticoes: int):
+    linhas = gerar_linhas(quantidade)
+
+    def construir():
+        return [
+            LoteExtraido(numero_lote_raw=n, descricao_raw=d, valor_raw=v, texto_fonte_completo=d)
+            for n, d, v in linhas
+        ]
+
+    lotes = construir()  # aquecimento (cache do módulo re, imports)
+    tempos = medir(construir, repeticoes)
+    mediana = statistics.median(tempos)
+
+    com_placa = sum(1 for lote in lotes if lote.placa)
+    com_marca = sum(1 for lote in lotes if lote.marca)
+
+    print(f"Linhas sintéticas: {quantidade} | repetições: {repeticoes}")
+    print(f"  mediana: {mediana * 1000:.1f} ms  ({mediana / quantidade * 1e6:.1f} us/linha, "
+          f"{quantidade / mediana:,.0f} linhas/s)")
+    print(f"  min/max: {min(tempos) * 1000:.1f} / {max(tempos) * 1000:.1f} ms")
+    print(f"  com placa: {com_placa} | com marca: {com_marca}")
+
+
+def benchmark_pdfs(caminhos, repeticoes: int):
+    extrator = ExtratorTabelas()
+    for caminho in caminhos:
+        resultado = extrator.extrair(caminho, edital_id=0)
+        tempos = medir(lambda caminho=caminho: extrator.extrair(caminho, edital_id=0), repeticoes)
+        mediana = statistics.median(tempos)
+        total = len(resultado.lotes)
+        taxa = f"{total / mediana:,.0f} lotes/s" if total else "sem lotes"
+        print(f"{Path(caminho).name}: {total} lotes em {mediana * 1000:.0f} ms ({taxa})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark da extração de campos de veículo')
+    parser.add_argument('--linhas', type=int, default=5000, help='Linhas sintéticas')
+    parser.add_argument('--repeticoes', type=int, default=3, help='Repetições por medida')
+    parser.add_argument('--pdf', nargs='*', default=[], help='PDFs reais para medir a extração completa')
+    args = parser.parse_args()
+
+    benchmark_sintetico(args.linhas, args.repeticoes)
+    if args.pdf:
+        print()
+        benchmark_pdfs(args.pdf, args.repeticoes)
+
+
+if __name__ == '__main__':
+    main()
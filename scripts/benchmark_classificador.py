@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK - CLASSIFICADOR DE PDF (modo rápido x completo)
+
+Classifica cada PDF nos dois modos do ClassificadorPDF e mede:
+- tempo de classificação e páginas que passaram por extract_tables()
+- concordância de família entre os modos
+- cobertura: páginas com tabela no modo completo que o rápido sinalizou
+- lotes extraídos pela cascata completa em cada modo
+
+Uso:
+    python scripts/benchmark_classificador.py --pdf editais/*.pdf
+    python scripts/benchmark_classificador.py --diretorio pdfs_editais --sem-extracao
+
+Data: 2026-02-04
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.extractors.lotes_extractor_v1 import (  # noqa: E402
+    MODO_CLASSIFICACAO_COMPLETO,
+    MODO_CLASSIFICACAO_RAPIDO,
+    ClassificadorPDF,
+    ExtratorTabelas,
+    ParsedPDF,
+)
+
+
+def classificar(caminho: str, modo: str):
+    """Classifica com um ParsedPDF novo (sem memoização entre modos)."""
+    with ParsedPDF(caminho) as documento:
+        inicio = time.perf_counter()
+        resultado = ClassificadorPDF(modo).classificar(documento)
+        return resultado, time.perf_counter() - inicio
+
+
+def contar_lotes(caminho: str, modo: str) -> int:
+    resultado = ExtratorTabelas(modo).extrair(caminho, edital_id=0)
+    return len(resultado.lotes)
+
+
+def comparar(caminhos, extrair: bool):
+    concordantes = 0
+    tempos = {MODO_CLASSIFICACAO_RAPIDO: [], MODO_CLASSIFICACAO_COMPLETO: []}
+    paginas_completo = paginas_cobertas = 0
+    lotes_iguais = 0
+
+    for caminho in caminhos:
+        completo, t_completo = classificar(caminho, MODO_CLASSIFICACAO_COMPLETO)
+        rapido, t_rapido = classificar(caminho, MODO_CLASSIFICACAO_RAPIDO)
+        tempos[MODO_CLASSIFICACAO_COMPLETO].append(t_completo)
+        tempos[MODO_CLASSIFICACAO_RAPIDO].append(t_rapido)
+
+        mesma_familia = completo.familia == rapido.familia
+        concordantes += mesma_familia
+        paginas_completo += len(completo.paginas_com_tabelas)
+        paginas_cobertas += len(set(completo.paginas_com_tabelas) & set(rapido.paginas_com_tabelas))
+
+        linha = (
+            f"{Path(caminho).name}: {completo.total_paginas} págs | "
+            f"completo {t_completo * 1000:.0f} ms ({completo.familia.value}) | "
+            f"rápido {t_rapido * 1000:.0f} ms ({rapido.familia.value}, "
+            f"{rapido.paginas_amostradas} págs com extract_tables)"
+        )
+        if extrair:
+            lotes_completo = contar_lotes(caminho, MODO_CLASSIFICACAO_COMPLETO)
+            lotes_rapido = contar_lotes(caminho, MODO_CLASSIFICACAO_RAPIDO)
+            lotes_iguais += lotes_completo == lotes_rapido
+            linha += f" | lotes {lotes_completo} x {lotes_rapido}"
+        print(linha + ("" if mesma_familia else "  <-- FAMÍLIA DIVERGENTE"))
+
+    total = len(caminhos)
+    print()
+    print(f"PDFs: {total}")
+    print(f"  concordância de família: {concordantes}/{total} ({concordantes / total:.1%})")
+    if paginas_completo:
+        print(f"  páginas com tabela cobertas: {paginas_cobertas}/{paginas_completo} "
+              f"({paginas_cobertas / paginas_completo:.1%})")
+    if extrair:
+        print(f"  mesma quantidade de lotes: {lotes_iguais}/{total} ({lotes_iguais / total:.1%})")
+    for modo, valores in tempos.items():
+        print(f"  {modo}: mediana {statistics.median(valores) * 1000:.0f} ms, "
+              f"máx {max(valores) * 1000:.0f} ms, total {sum(valores):.1f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do ClassificadorPDF (rápido x completo)')
+    parser.add_argument('--pdf', nargs='*', default=[], help='PDFs a comparar')
+    parser.add_argument('--diretorio', type=str, help='Diretório com PDFs (busca recursiva)')
+    parser.add_argument('--sem-extracao', action='store_true', help='Compara só a classificação')
+    args = parser.parse_args()
+
+    caminhos = list(args.pdf)
+    if args.diretorio:
+        caminhos.extend(str(p) for p in sorted(Path(args.diretorio).rglob('*.pdf')))
+    if not caminhos:
+        parser.error('informe --pdf ou --diretorio')
+
+    comparar(caminhos, extrair=not args.sem_extracao)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BENCHMARK - PARSING HTML DOS LOTES (leiloesjudiciais)
+
+Reprocessa as evidências HTML (EvidenceArchive em out/leiloesjudiciais/evidence,
+ou um diretório de .html avulsos do formato antigo) com cada backend
+instalado do LeilaoParser e com o ParserV2, e mede:
+- tempo por página (mediana, p95) e páginas/s
+- custo relativo ao intervalo do fetch (1 / REQUESTS_PER_SECOND por página)
+- concordância dos backends rápidos com o BeautifulSoup (campos do ParsedLot)
+
+Uso:
+    python scripts/benchmark_parser_html.py
+    python scripts/benchmark_parser_html.py --diretorio out/leiloesjudiciais/html --repeticoes 3  # .html avulsos
+    python scripts/benchmark_parser_html.py --backends lxml bs4 --limite 500
+
+Data: 2026-02-06
+"""
+
+import argparse
+import dataclasses
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from connectors.leiloesjudiciais.config import config  # noqa: E402
+from connectors.leiloesjudiciais.evidence_archive import DEFAULT_ARCHIVE_DIR, INDEX_FILENAME, EvidenceReader  # noqa: E402
+from connectors.leiloesjudiciais.html_backend import available_backends  # noqa: E402
+from connectors.leiloesjudiciais.parse import LeilaoParser, read_html_evidence  # noqa: E402
+from connectors.leiloesjudiciais.parser_v2 import ParserV2  # noqa: E402
+
+# Campos que mudam a cada parse (não entram na concordância)
+CAMPOS_IGNORADOS = {"extraction_timestamp"}
+
+
+def carregar(diretorio: str, limite: int):
+    """(url, html) do EvidenceArchive ou dos .html avulsos do diretório."""
+    if (Path(diretorio) / INDEX_FILENAME).exists():
+        paginas = []
+        with EvidenceReader(diretorio) as reader:
+            for record in reader.iter_records():
+                paginas.append((record.url, record.body))
+                if limite and len(paginas) >= limite:
+                    break
+        return paginas
+
+    caminhos = sorted(Path(diretorio).glob("*.html"))
+    if limite:
+        caminhos = caminhos[:limite]
+    return [read_html_evidence(str(c)) for c in caminhos]
+
+
+def campos(resultado) -> dict:
+    return {k: v for k, v in dataclasses.asdict(resultado).items() if k not in CAMPOS_IGNORADOS}
+
+
+def medir(nome: str, parser, paginas, repeticoes: int):
+    """Parse de todas as páginas; tempo por página = melhor das repetições."""
+    tempos = [float("inf")] * len(paginas)
+    resultados = []
+    for rodada in range(repeticoes):
+        for i, (url, html) in enumerate(paginas):
+            inicio = time.perf_counter()
+            resultado = parser.parse(url, html, save_html=False)
+            tempos[i] = min(tempos[i], time.perf_counter() - inicio)
+            if rodada == 0:
+                resultados.append(campos(resultado))
+
+    total = sum(tempos)
+    intervalo_fetch = 1.0 / config.REQUESTS_PER_SECOND
+    p95 = sorted(tempos)[int(len(tempos) * 0.95) - 1] if len(tempos) >= 20 else max(tempos)
+    print(
+        f"  {nome:<12} mediana {statistics.median(tempos) * 1000:7.2f} ms | "
+        f"p95 {p95 * 1000:7.2f} ms | {len(paginas) / total:8.0f} págs/s | "
+        f"{statistics.mean(tempos) / intervalo_fetch:.2%} do intervalo do fetch"
+    )
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do parsing HTML (LeilaoParser por backend e ParserV2)")
+    parser.add_argument("--diretorio", default=DEFAULT_ARCHIVE_DIR, help="EvidenceArchive ou diretório de .html")
+    parser.add_argument("--backends", nargs="*", default=None, help="Backends do LeilaoParser (padrão: todos instalados)")
+    parser.add_argument("--repeticoes", type=int, default=1, help="Rodadas por parser (vale o melhor tempo)")
+    parser.add_argument("--limite", type=int, default=0, help="Máximo de páginas (0 = todas)")
+    args = parser.parse_args()
+
+    paginas = carregar(args.diretorio, args.limite)
+    if not paginas:
+        parser.error(f"nenhum .html em {args.diretorio}")
+
+    backends = args.backends or available_backends()
+    tamanho = sum(len(html) for _, html in paginas)
+    print(f"Páginas: {len(paginas)} ({tamanho / 1024 / 1024:.1f} MiB) | backends: {', '.join(backends)}")
+    print()
+
+    por_backend = {}
+    for backend in backends:
+        por_backend[backend] = medir(f"v1/{backend}", LeilaoParser(backend=backend), paginas, args.repeticoes)
+    medir("v2/regex", ParserV2(), paginas, args.repeticoes)
+
+    referencia = por_backend.get("bs4")
+    if referencia is not None:
+        print()
+        for backend, resultados in por_backend.items():
+            if backend == "bs4":
+                continue
+            iguais = sum(a == b for a, b in zip(referencia, resultados, strict=True))
+            print(f"  concordância {backend} x bs4: {iguais}/{len(paginas)} ({iguais / len(paginas):.1%})")
+            for (url, _), a, b in zip(paginas, referencia, resultados, strict=True):
+                if a != b:
+                    divergentes = sorted(k for k in a if a[k] != b[k])
+                    print(f"    {url}: {', '.join(divergentes)}")
+
+
+if __name__ == "__main__":
+    main()
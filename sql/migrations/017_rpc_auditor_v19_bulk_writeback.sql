@@ -0,0 +1,99 @@
+-- ============================================
+-- Migration 017: RPC de write-back em lote do Auditor V19
+-- Data: 2026-02-02
+-- Objetivo: Reduzir round trips do Auditor V19 ao banco
+-- ============================================
+-- PROBLEMA:
+-- Cada edital auditado gera 1 UPDATE em editais_leilao
+-- (atualizar_link_leiloeiro_v19 / marcar_processado_v19) e ate 2 requests
+-- extras em leiloeiros_urls (SELECT + INSERT/UPDATE). ~3 requests por edital.
+--
+-- SOLUCAO:
+-- Uma unica RPC recebe N resultados (JSONB) e aplica tudo em uma transacao:
+-- - UPDATE em editais_leilao apenas nas colunas presentes em cada item
+-- - UPSERT agregado em leiloeiros_urls (qtd_ocorrencias += qtd do lote)
+--
+-- CONTRATO (p_resultados):
+--   [{"pncp_id": "...", "dados": {<colunas de editais_leilao>}}, ...]
+-- CONTRATO (p_leiloeiros):
+--   [{"dominio": "...", "url_exemplo": "...", "fonte": "auditor", "qtd": 2}, ...]
+-- ============================================
+
+CREATE OR REPLACE FUNCTION public.auditor_v19_aplicar_resultados(
+    p_resultados JSONB,
+    p_leiloeiros JSONB DEFAULT '[]'::jsonb
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    v_atualizados INTEGER := 0;
+BEGIN
+    WITH r AS (
+        SELECT
+            item->>'pncp_id' AS pncp_id,
+            item->'dados' AS d
+        FROM jsonb_array_elements(COALESCE(p_resultados, '[]'::jsonb)) AS item
+    )
+    UPDATE public.editais_leilao e SET
+        link_leiloeiro = CASE WHEN r.d ? 'link_leiloeiro'
+            THEN r.d->>'link_leiloeiro' ELSE e.link_leiloeiro END,
+        link_leiloeiro_raw = CASE WHEN r.d ? 'link_leiloeiro_raw'
+            THEN r.d->>'link_leiloeiro_raw' ELSE e.link_leiloeiro_raw END,
+        link_leiloeiro_valido = CASE WHEN r.d ? 'link_leiloeiro_valido'
+            THEN (r.d->>'link_leiloeiro_valido')::BOOLEAN ELSE e.link_leiloeiro_valido END,
+        link_leiloeiro_origem_tipo = CASE WHEN r.d ? 'link_leiloeiro_origem_tipo'
+            THEN r.d->>'link_leiloeiro_origem_tipo' ELSE e.link_leiloeiro_origem_tipo END,
+        link_leiloeiro_origem_ref = CASE WHEN r.d ? 'link_leiloeiro_origem_ref'
+            THEN r.d->>'link_leiloeiro_origem_ref' ELSE e.link_leiloeiro_origem_ref END,
+        link_leiloeiro_evidencia_trecho = CASE WHEN r.d ? 'link_leiloeiro_evidencia_trecho'
+            THEN r.d->>'link_leiloeiro_evidencia_trecho' ELSE e.link_leiloeiro_evidencia_trecho END,
+        link_leiloeiro_confianca = CASE WHEN r.d ? 'link_leiloeiro_confianca'
+            THEN (r.d->>'link_leiloeiro_confianca')::INTEGER ELSE e.link_leiloeiro_confianca END,
+        versao_auditor = CASE WHEN r.d ? 'versao_auditor'
+            THEN r.d->>'versao_auditor' ELSE e.versao_auditor END,
+        updated_at = CASE WHEN r.d ? 'updated_at'
+            THEN (r.d->>'updated_at')::TIMESTAMPTZ ELSE e.updated_at END,
+        auditor_v19_processed_at = CASE WHEN r.d ? 'auditor_v19_processed_at'
+            THEN (r.d->>'auditor_v19_processed_at')::TIMESTAMPTZ ELSE e.auditor_v19_processed_at END,
+        auditor_v19_run_id = CASE WHEN r.d ? 'auditor_v19_run_id'
+            THEN r.d->>'auditor_v19_run_id' ELSE e.auditor_v19_run_id END,
+        auditor_v19_result = CASE WHEN r.d ? 'auditor_v19_result'
+            THEN r.d->>'auditor_v19_result' ELSE e.auditor_v19_result END
+    FROM r
+    WHERE e.pncp_id = r.pncp_id;
+
+    GET DIAGNOSTICS v_atualizados = ROW_COUNT;
+
+    INSERT INTO public.leiloeiros_urls (
+        dominio, url_exemplo, fonte, qtd_ocorrencias, primeiro_visto, ultimo_visto
+    )
+    SELECT
+        l->>'dominio',
+        l->>'url_exemplo',
+        COALESCE(l->>'fonte', 'auditor'),
+        COALESCE((l->>'qtd')::INTEGER, 1),
+        NOW(),
+        NOW()
+    FROM jsonb_array_elements(COALESCE(p_leiloeiros, '[]'::jsonb)) AS l
+    WHERE l->>'dominio' IS NOT NULL
+    ON CONFLICT (dominio) DO UPDATE SET
+        qtd_ocorrencias = public.leiloeiros_urls.qtd_ocorrencias + EXCLUDED.qtd_ocorrencias,
+        ultimo_visto = EXCLUDED.ultimo_visto;
+
+    RETURN v_atualizados;
+END;
+$$;
+
+COMMENT ON FUNCTION public.auditor_v19_aplicar_resultados(JSONB, JSONB) IS
+'Write-back em lote do Auditor V19: aplica N resultados em editais_leilao e agrega leiloeiros_urls';
+
+-- Apenas o service_role (Auditor) pode chamar
+REVOKE ALL ON FUNCTION public.auditor_v19_aplicar_resultados(JSONB, JSONB) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.auditor_v19_aplicar_resultados(JSONB, JSONB) FROM anon;
+GRANT EXECUTE ON FUNCTION public.auditor_v19_aplicar_resultados(JSONB, JSONB) TO service_role;
+
+-- ============================================
+-- FIM DA MIGRATION 017
+-- ============================================
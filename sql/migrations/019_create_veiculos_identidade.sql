@@ -0,0 +1,102 @@
+-- ============================================
+-- Migration 019: Indice de identidade de veiculos (deduplicacao entre editais)
+-- Data: 2026-02-04
+-- Objetivo: ligar o mesmo veiculo (placa/chassi/renavam) a um vehicle_id
+--           canonico em lotes_leilao, leiloeiro_lotes e discovery_veiculos
+-- ============================================
+-- PROBLEMA:
+-- O mesmo veiculo aparece em varios editais (releilao, edital republicado),
+-- no conector leiloesjudiciais e nos scrapers de discovery. Cada copia e
+-- armazenada e processada de forma independente.
+--
+-- SOLUCAO:
+-- O indice vive em memoria/SQLite em cada execucao
+-- (connectors/common/vehicle_index.py) e e espelhado aqui para que
+-- execucoes em maquinas diferentes gerem o mesmo vehicle_id:
+--   veiculos_identidade         -> veiculo canonico (atributos da 1a ocorrencia)
+--   veiculos_identidade_chaves  -> (tipo, valor normalizado) -> vehicle_id
+-- Chaves normalizadas: chassi (17), renavam (11 digitos), placa no formato
+-- antigo (Mercosul convertido).
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS public.veiculos_identidade (
+    vehicle_id TEXT PRIMARY KEY,
+    placa TEXT,
+    chassi TEXT,
+    renavam TEXT,
+    marca TEXT,
+    modelo TEXT,
+    ano INTEGER,
+    fonte TEXT,
+    referencia TEXT,
+    ocorrencias INTEGER NOT NULL DEFAULT 1,
+    primeiro_visto TIMESTAMPTZ,
+    ultimo_visto TIMESTAMPTZ
+);
+
+CREATE TABLE IF NOT EXISTS public.veiculos_identidade_chaves (
+    tipo TEXT NOT NULL CHECK (tipo IN ('chassi', 'renavam', 'placa')),
+    valor TEXT NOT NULL,
+    vehicle_id TEXT NOT NULL REFERENCES public.veiculos_identidade(vehicle_id) ON DELETE CASCADE,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (tipo, valor)
+);
+
+CREATE INDEX IF NOT EXISTS idx_veiculos_identidade_chaves_vehicle
+    ON public.veiculos_identidade_chaves(vehicle_id);
+
+COMMENT ON TABLE public.veiculos_identidade IS 'Veiculo canonico do indice de identidade (espelho do SQLite local)';
+COMMENT ON TABLE public.veiculos_identidade_chaves IS 'Chave normalizada (chassi/renavam/placa) -> vehicle_id canonico';
+
+-- vehicle_id nas tabelas de lotes/veiculos
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM information_schema.tables WHERE table_name = 'lotes_leilao')
+       AND NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'lotes_leilao' AND column_name = 'vehicle_id'
+    ) THEN
+        ALTER TABLE public.lotes_leilao ADD COLUMN vehicle_id TEXT;
+        CREATE INDEX idx_lotes_leilao_vehicle_id ON public.lotes_leilao(vehicle_id);
+    END IF;
+
+    IF EXISTS (SELECT 1 FROM information_schema.tables WHERE table_name = 'leiloeiro_lotes')
+       AND NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'leiloeiro_lotes' AND column_name = 'vehicle_id'
+    ) THEN
+        ALTER TABLE public.leiloeiro_lotes ADD COLUMN vehicle_id TEXT;
+        CREATE INDEX idx_leiloeiro_lotes_vehicle_id ON public.leiloeiro_lotes(vehicle_id);
+    END IF;
+
+    IF EXISTS (SELECT 1 FROM information_schema.tables WHERE table_name = 'discovery_veiculos')
+       AND NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'discovery_veiculos' AND column_name = 'vehicle_id'
+    ) THEN
+        ALTER TABLE public.discovery_veiculos ADD COLUMN vehicle_id TEXT;
+        CREATE INDEX idx_discovery_veiculos_vehicle_id ON public.discovery_veiculos(vehicle_id);
+    END IF;
+END $$;
+
+-- RLS: so o service_role (pipelines) le e escreve
+ALTER TABLE public.veiculos_identidade ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.veiculos_identidade_chaves ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role full access veiculos_identidade"
+    ON public.veiculos_identidade
+    FOR ALL
+    TO service_role
+    USING (true)
+    WITH CHECK (true);
+
+CREATE POLICY "Service role full access veiculos_identidade_chaves"
+    ON public.veiculos_identidade_chaves
+    FOR ALL
+    TO service_role
+    USING (true)
+    WITH CHECK (true);
+
+-- ============================================
+-- FIM DA MIGRATION 019
+-- ============================================
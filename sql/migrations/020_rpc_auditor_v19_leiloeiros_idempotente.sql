@@ -0,0 +1,144 @@
+-- ============================================
+-- Migration 020: Contagem idempotente de leiloeiros no write-back V19
+-- Data: 2026-02-05
+-- Objetivo: reaplicar o mesmo lote nao soma qtd_ocorrencias de novo
+-- ============================================
+-- PROBLEMA:
+-- A RPC auditor_v19_aplicar_resultados (migrations 017/018) faz
+-- qtd_ocorrencias += qtd. Um crash depois da RPC e antes de truncar o
+-- journal, ou um timeout que na verdade confirmou e e repetido, reaplica o
+-- lote e conta os mesmos editais duas vezes.
+--
+-- SOLUCAO:
+-- Cada ocorrencia vira um par (dominio, pncp_id) em leiloeiros_urls_editais.
+-- A RPC insere os pares com ON CONFLICT DO NOTHING e soma em
+-- qtd_ocorrencias so os pares novos.
+--
+-- CONTRATO (p_leiloeiros):
+--   [{"dominio": "...", "url_exemplo": "...", "fonte": "auditor",
+--     "qtd": 2, "pncp_ids": ["...", "..."]}, ...]
+-- Itens sem pncp_ids mantem o comportamento anterior (soma qtd).
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS public.leiloeiros_urls_editais (
+    dominio TEXT NOT NULL,
+    pncp_id TEXT NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (dominio, pncp_id)
+);
+
+COMMENT ON TABLE public.leiloeiros_urls_editais IS 'Editais ja contados em leiloeiros_urls.qtd_ocorrencias (write-back idempotente)';
+
+-- RLS: so o service_role (Auditor) le e escreve
+ALTER TABLE public.leiloeiros_urls_editais ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role full access leiloeiros_urls_editais"
+    ON public.leiloeiros_urls_editais
+    FOR ALL
+    TO service_role
+    USING (true)
+    WITH CHECK (true);
+
+-- RPC de write-back (migration 018) passa a contar cada edital uma vez
+CREATE OR REPLACE FUNCTION public.auditor_v19_aplicar_resultados(
+    p_resultados JSONB,
+    p_leiloeiros JSONB DEFAULT '[]'::jsonb
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    v_atualizados INTEGER := 0;
+BEGIN
+    WITH r AS (
+        SELECT
+            item->>'pncp_id' AS pncp_id,
+            item->'dados' AS d
+        FROM jsonb_array_elements(COALESCE(p_resultados, '[]'::jsonb)) AS item
+    )
+    UPDATE public.editais_leilao e SET
+        link_leiloeiro = CASE WHEN r.d ? 'link_leiloeiro'
+            THEN r.d->>'link_leiloeiro' ELSE e.link_leiloeiro END,
+        link_leiloeiro_raw = CASE WHEN r.d ? 'link_leiloeiro_raw'
+            THEN r.d->>'link_leiloeiro_raw' ELSE e.link_leiloeiro_raw END,
+        link_leiloeiro_valido = CASE WHEN r.d ? 'link_leiloeiro_valido'
+            THEN (r.d->>'link_leiloeiro_valido')::BOOLEAN ELSE e.link_leiloeiro_valido END,
+        link_leiloeiro_origem_tipo = CASE WHEN r.d ? 'link_leiloeiro_origem_tipo'
+            THEN r.d->>'link_leiloeiro_origem_tipo' ELSE e.link_leiloeiro_origem_tipo END,
+        link_leiloeiro_origem_ref = CASE WHEN r.d ? 'link_leiloeiro_origem_ref'
+            THEN r.d->>'link_leiloeiro_origem_ref' ELSE e.link_leiloeiro_origem_ref END,
+        link_leiloeiro_evidencia_trecho = CASE WHEN r.d ? 'link_leiloeiro_evidencia_trecho'
+            THEN r.d->>'link_leiloeiro_evidencia_trecho' ELSE e.link_leiloeiro_evidencia_trecho END,
+        link_leiloeiro_confianca = CASE WHEN r.d ? 'link_leiloeiro_confianca'
+            THEN (r.d->>'link_leiloeiro_confianca')::INTEGER ELSE e.link_leiloeiro_confianca END,
+        versao_auditor = CASE WHEN r.d ? 'versao_auditor'
+            THEN r.d->>'versao_auditor' ELSE e.versao_auditor END,
+        updated_at = CASE WHEN r.d ? 'updated_at'
+            THEN (r.d->>'updated_at')::TIMESTAMPTZ ELSE e.updated_at END,
+        auditor_v19_processed_at = CASE WHEN r.d ? 'auditor_v19_processed_at'
+            THEN (r.d->>'auditor_v19_processed_at')::TIMESTAMPTZ ELSE e.auditor_v19_processed_at END,
+        auditor_v19_run_id = CASE WHEN r.d ? 'auditor_v19_run_id'
+            THEN r.d->>'auditor_v19_run_id' ELSE e.auditor_v19_run_id END,
+        auditor_v19_result = CASE WHEN r.d ? 'auditor_v19_result'
+            THEN r.d->>'auditor_v19_result' ELSE e.auditor_v19_result END,
+        auditor_v19_manifest_hash = CASE WHEN r.d ? 'auditor_v19_manifest_hash'
+            THEN r.d->>'auditor_v19_manifest_hash' ELSE e.auditor_v19_manifest_hash END
+    FROM r
+    WHERE e.pncp_id = r.pncp_id;
+
+    GET DIAGNOSTICS v_atualizados = ROW_COUNT;
+
+    WITH l AS (
+        SELECT
+            item->>'dominio' AS dominio,
+            item->>'url_exemplo' AS url_exemplo,
+            COALESCE(item->>'fonte', 'auditor') AS fonte,
+            COALESCE((item->>'qtd')::INTEGER, 1) AS qtd,
+            item->'pncp_ids' AS pncp_ids
+        FROM jsonb_array_elements(COALESCE(p_leiloeiros, '[]'::jsonb)) AS item
+        WHERE item->>'dominio' IS NOT NULL
+    ),
+    novos AS (
+        INSERT INTO public.leiloeiros_urls_editais (dominio, pncp_id)
+        SELECT l.dominio, p.pncp_id
+        FROM l
+        CROSS JOIN LATERAL jsonb_array_elements_text(l.pncp_ids) AS p(pncp_id)
+        WHERE jsonb_typeof(l.pncp_ids) = 'array'
+        ON CONFLICT (dominio, pncp_id) DO NOTHING
+        RETURNING dominio
+    ),
+    contagem AS (
+        SELECT dominio, COUNT(*)::INTEGER AS qtd FROM novos GROUP BY dominio
+    )
+    INSERT INTO public.leiloeiros_urls (
+        dominio, url_exemplo, fonte, qtd_ocorrencias, primeiro_visto, ultimo_visto
+    )
+    SELECT
+        l.dominio,
+        l.url_exemplo,
+        l.fonte,
+        CASE WHEN jsonb_typeof(l.pncp_ids) = 'array' THEN COALESCE(c.qtd, 0) ELSE l.qtd END,
+        NOW(),
+        NOW()
+    FROM l
+    LEFT JOIN contagem c ON c.dominio = l.dominio
+    ON CONFLICT (dominio) DO UPDATE SET
+        qtd_ocorrencias = public.leiloeiros_urls.qtd_ocorrencias + EXCLUDED.qtd_ocorrencias,
+        ultimo_visto = EXCLUDED.ultimo_visto;
+
+    RETURN v_atualizados;
+END;
+$$;
+
+COMMENT ON FUNCTION public.auditor_v19_aplicar_resultados(JSONB, JSONB) IS
+'Write-back em lote do Auditor V19: aplica N resultados em editais_leilao e agrega leiloeiros_urls (idempotente por dominio + pncp_id)';
+
+-- Apenas o service_role (Auditor) pode chamar
+REVOKE ALL ON FUNCTION public.auditor_v19_aplicar_resultados(JSONB, JSONB) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.auditor_v19_aplicar_resultados(JSONB, JSONB) FROM anon;
+GRANT EXECUTE ON FUNCTION public.auditor_v19_aplicar_resultados(JSONB, JSONB) TO service_role;
+
+-- ============================================
+-- FIM DA MIGRATION 020
+-- ============================================
@@ -0,0 +1,38 @@
+-- ============================================
+-- Migration 021: Tentativas por arquivo no manifesto do extrator de lotes
+-- Data: 2026-02-05
+-- Objetivo: parar de reenfileirar para sempre PDFs que falham em toda execucao
+-- ============================================
+-- PROBLEMA:
+-- O planejador do extrator (LotesRepository.planejar_reextracao) reprocessa
+-- todo arquivo com status 'erro' ou 'pendente'. Um PDF que falha de forma
+-- deterministica e baixado e extraido de novo em toda execucao.
+--
+-- SOLUCAO:
+--   tentativas      -> falhas seguidas do mesmo hash na mesma versao do
+--                      extrator (zerada no sucesso). O planejador espera um
+--                      backoff exponencial entre tentativas e desiste ao
+--                      atingir MAX_TENTATIVAS_ARQUIVO.
+--   parcial         -> lotes gravados, mas blocos do LLM falharam ou ficaram
+--                      fora do orcamento; reprocessado como 'erro'.
+--   erro_permanente -> novo status para falhas que se repetem com o mesmo
+--                      arquivo (escaneado, corrompido, tipo nao suportado);
+--                      so volta a ser processado com nova VERSAO_EXTRATOR.
+-- ============================================
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'arquivos_processados_lotes' AND column_name = 'tentativas'
+    ) THEN
+        ALTER TABLE public.arquivos_processados_lotes ADD COLUMN tentativas INTEGER NOT NULL DEFAULT 0;
+        COMMENT ON COLUMN public.arquivos_processados_lotes.tentativas IS 'Falhas seguidas deste hash na versao_extrator atual (0 apos sucesso)';
+    END IF;
+END $$;
+
+COMMENT ON COLUMN public.arquivos_processados_lotes.status IS '''pendente'', ''processado'', ''erro'' ou ''parcial'' (reprocessados com backoff), ''erro_permanente''';
+
+-- ============================================
+-- FIM DA MIGRATION 021
+-- ============================================
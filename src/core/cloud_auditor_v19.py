@@ -19,6 +19,12 @@ Changelog:
     - V19.2: Skip de editais ja processados (exceto com --force)
     - V19.5: FIX - run_report gravado SEMPRE via try/finally (inclusive 0 editais)
     - V19.5: --strict para levantar excecao se run_report falhar (util para CI)
+    - V19.6: Write-back em lote (RPC auditor_v19_aplicar_resultados) com journal local
+    - V19.6: Fila de editais em streaming (colunas projetadas + keyset em created_at, id)
+    - V19.6: Validacao de acessibilidade via LinkChecker (async, pool, cache SQLite)
+    - V19.6: Excel/CSV lidos em streaming (openpyxl read-only / csv) com parada antecipada
+    - V19.6: Fila por prazo (data_leilao mais proxima + score/valor) e --deadline
+    - V19.6: Cache negativo por manifesto (pula no_link sem arquivo novo nem versao nova)
 
 Baseado em: V18 (CASCATA EXTRACAO)
 Autor: Claude Code
@@ -27,18 +33,22 @@ Autor: Claude Code
 from __future__ import annotations
 
 import argparse
+import csv
 import hashlib
+import io
 import json
 import logging
 import os
+import queue
 import re
 import tempfile
+import threading
 import time
 from dataclasses import dataclass, field
 from datetime import datetime, date
 from io import BytesIO
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 from urllib.parse import urlparse
 
 import httpx
@@ -46,14 +56,30 @@ import pandas as pd
 import pdfplumber
 from dotenv import load_dotenv
 
+from duracao import parse_duracao
+
 load_dotenv()
 
+# V19.6: Trava do journal de write-back (POSIX; no Windows o journal fica sem trava)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# V19.6: openpyxl read-only para leitura de .xlsx em streaming
+try:
+    import openpyxl
+    OPENPYXL_DISPONIVEL = True
+except ImportError:
+    OPENPYXL_DISPONIVEL = False
+
 # Import do integrador de lotes (V19.1)
 try:
-    from src.extractors.lotes_integration import LotesIntegration
+    from src.extractors.lotes_integration import LotesIntegration, VERSAO_EXTRATOR as VERSAO_EXTRATOR_LOTES
     LOTES_INTEGRATION_DISPONIVEL = True
 except ImportError:
     LOTES_INTEGRATION_DISPONIVEL = False
+    VERSAO_EXTRATOR_LOTES = ""
 
 # V19.2: Import do módulo de resiliência
 try:
@@ -67,6 +93,13 @@ try:
 except ImportError:
     RESILIENCE_DISPONIVEL = False
 
+# V19.6: Verificador de links compartilhado (async + cache SQLite persistente)
+try:
+    from connectors.common.link_checker import LinkChecker
+    LINK_CHECKER_DISPONIVEL = True
+except ImportError:
+    LINK_CHECKER_DISPONIVEL = False
+
 
 # ============================================================
 # LOGGING
@@ -102,6 +135,26 @@ class AuditorConfig:
 
     batch_size: int = 50
 
+    # V19.6: Write-back em lote (resultados acumulados e gravados a cada N editais)
+    writeback_batch_size: int = 100
+    writeback_journal_path: str = "out/auditor_v19/writeback_journal.jsonl"
+
+    # V19.6: Fila em streaming (paginas keyset + prefetch limitado)
+    fila_page_size: int = 200
+    fila_prefetch_paginas: int = 2
+
+    # V19.6: Ordem da fila - "prazo" (leilao mais proximo primeiro, vencidos no fim)
+    # ou "recentes" (created_at desc, comportamento anterior)
+    ordem_fila: str = "prazo"
+    # V19.6: Orcamento de tempo da execucao em segundos (None = sem limite)
+    deadline_segundos: Optional[float] = None
+
+    # V19.6: Cache negativo - pula editais "no_link" com o mesmo manifesto de arquivos
+    usar_cache_manifesto: bool = True
+
+    # V19.6: Cache persistente de vereditos de acessibilidade (LinkChecker)
+    link_cache_path: str = "out/auditor_v19/link_cache.sqlite"
+
     versao_auditor: str = "V19.5_RUN_REPORT_FIX"
 
 
@@ -296,12 +349,17 @@ class URLValidatorV19:
         re.IGNORECASE
     )
 
-    def __init__(self, timeout: int = 10):
+    def __init__(self, timeout: int = 10, link_cache_path: Optional[str] = None):
         self.timeout = timeout
         self.logger = logging.getLogger(__name__)
         self.cache: Dict[str, bool] = {}
         self.whitelist = set(PLATAFORMAS_LEILAO["dominios_validos"])
 
+        # V19.6: Com LinkChecker, vereditos sobrevivem entre execucoes (SQLite)
+        self.link_checker = None
+        if LINK_CHECKER_DISPONIVEL:
+            self.link_checker = LinkChecker(cache_path=link_cache_path, timeout=timeout)
+
     def _tem_tld_colado(self, texto: str) -> bool:
         """
         Verifica se o texto contem TLD colado em palavra.
@@ -429,6 +487,9 @@ class URLValidatorV19:
         if url in self.cache:
             return self.cache[url]
 
+        if self.link_checker:
+            return self.validar_acessibilidade_lote([url]).get(url, False)
+
         url_check = url
         if not url_check.startswith("http"):
             url_check = "https://" + url_check
@@ -464,6 +525,32 @@ class URLValidatorV19:
         self.cache[url] = False
         return False
 
+    def validar_acessibilidade_lote(self, urls: List[str]) -> Dict[str, bool]:
+        """
+        Verifica acessibilidade de varias URLs de uma vez (V19.6).
+
+        Usa um unico client HTTP com pool, limite de concorrencia por host
+        e cache SQLite de vereditos. Sem LinkChecker, cai para o modo serial.
+
+        Returns:
+            Dict url -> acessivel
+        """
+        pendentes = [u for u in dict.fromkeys(urls) if u and u not in self.cache]
+
+        if pendentes and self.link_checker:
+            for url, veredito in self.link_checker.check_many(pendentes).items():
+                self.cache[url] = veredito.ok
+        elif pendentes:
+            for url in pendentes:
+                self.validar_acessibilidade(url)
+
+        return {u: self.cache.get(u, False) for u in urls if u}
+
+    def fechar(self):
+        """Encerra o LinkChecker (client HTTP e event loop da execucao)."""
+        if self.link_checker:
+            self.link_checker.close()
+
 
 # ============================================================
 # METRICAS
@@ -499,6 +586,7 @@ class AuditorMetrics:
 
     editais_data_passada: int = 0
     editais_excluidos: int = 0
+    editais_manifesto_inalterado: int = 0  # V19.6: pulados pelo cache negativo
 
     pdfs_processados: int = 0
     excels_processados: int = 0
@@ -510,6 +598,7 @@ class AuditorMetrics:
     pdfs_com_lotes: int = 0
 
     erros: int = 0
+    interrompido_deadline: bool = False  # V19.6: execucao parou pelo --deadline
     start_time: datetime = field(default_factory=datetime.now)
 
     def print_summary(self):
@@ -546,6 +635,7 @@ class AuditorMetrics:
         logger.info(f"  |- PDFs: {self.pdfs_processados}")
         logger.info(f"  |- Excels: {self.excels_processados}")
         logger.info(f"  |- CSVs: {self.csvs_processados}")
+        logger.info(f"  |- Editais pulados (manifesto inalterado): {self.editais_manifesto_inalterado}")
         logger.info("-" * 70)
         logger.info("EXTRACAO DE LOTES (V19.1):")
         logger.info(f"  |- Lotes extraidos: {self.lotes_extraidos}")
@@ -866,12 +956,22 @@ class ExcelExtractorV19:
         excel_bytesio: BytesIO,
         arquivo_nome: str
     ) -> List[LinkProveniencia]:
-        """Extrai URLs de arquivo Excel em memoria com proveniencia."""
+        """
+        Extrai URLs de arquivo Excel em memoria com proveniencia.
+
+        V19.6: .xlsx e lido em streaming (openpyxl read-only), sem DataFrame.
+        .xls (formato antigo, nao suportado pelo openpyxl) continua via pandas.
+        """
         resultados = []
 
         try:
-            df = pd.read_excel(excel_bytesio)
-            resultados = self._extrair_urls_dataframe(df, arquivo_nome, "xlsx_anexo")
+            if OPENPYXL_DISPONIVEL and not arquivo_nome.lower().endswith(".xls"):
+                resultados = self._extrair_urls_linhas(
+                    self._iterar_linhas_xlsx(excel_bytesio), arquivo_nome, "xlsx_anexo"
+                )
+            else:
+                df = pd.read_excel(excel_bytesio)
+                resultados = self._extrair_urls_dataframe(df, arquivo_nome, "xlsx_anexo")
         except Exception as e:
             self.logger.warning(f"Erro lendo Excel: {e}")
 
@@ -882,21 +982,57 @@ class ExcelExtractorV19:
         csv_bytesio: BytesIO,
         arquivo_nome: str
     ) -> List[LinkProveniencia]:
-        """Extrai URLs de arquivo CSV em memoria com proveniencia."""
+        """
+        Extrai URLs de arquivo CSV em memoria com proveniencia.
+
+        V19.6: Leitura linha a linha (modulo csv), sem DataFrame.
+        """
         resultados = []
         encodings = ["utf-8", "latin-1", "cp1252"]
 
         for encoding in encodings:
             try:
                 csv_bytesio.seek(0)
-                df = pd.read_csv(csv_bytesio, encoding=encoding, on_bad_lines="skip")
-                resultados = self._extrair_urls_dataframe(df, arquivo_nome, "csv_anexo")
+                resultados = self._extrair_urls_linhas(
+                    self._iterar_linhas_csv(csv_bytesio, encoding), arquivo_nome, "csv_anexo"
+                )
                 break
             except Exception:
                 continue
 
         return resultados
 
+    @staticmethod
+    def _nomes_colunas(cabecalho) -> List[str]:
+        """Nomes de coluna como o pandas geraria (vazias viram 'Unnamed: N')."""
+        return [
+            str(valor) if valor not in (None, "") else f"Unnamed: {idx}"
+            for idx, valor in enumerate(cabecalho)
+        ]
+
+    def _iterar_linhas_xlsx(self, excel_bytesio: BytesIO) -> Iterator[Tuple[List[str], tuple]]:
+        """Itera (colunas, valores) da primeira planilha em modo read-only."""
+        wb = openpyxl.load_workbook(excel_bytesio, read_only=True, data_only=True)
+        try:
+            linhas = wb.worksheets[0].iter_rows(values_only=True)
+            colunas = self._nomes_colunas(next(linhas, ()))
+            for valores in linhas:
+                yield colunas, valores
+        finally:
+            wb.close()
+
+    def _iterar_linhas_csv(self, csv_bytesio: BytesIO, encoding: str) -> Iterator[Tuple[List[str], tuple]]:
+        """Itera (colunas, valores) de um CSV sem carregar o arquivo decodificado."""
+        texto = io.TextIOWrapper(csv_bytesio, encoding=encoding, newline="")
+        try:
+            linhas = csv.reader(texto)
+            colunas = self._nomes_colunas(next(linhas, []))
+            for valores in linhas:
+                yield colunas, valores
+        finally:
+            # Nao fechar o BytesIO do chamador (permite nova tentativa de encoding)
+            texto.detach()
+
     def _extrair_urls_dataframe(
         self,
         df: pd.DataFrame,
@@ -904,21 +1040,44 @@ class ExcelExtractorV19:
         origem_tipo: str
     ) -> List[LinkProveniencia]:
         """Extrai URLs de um DataFrame com proveniencia."""
+        colunas = [str(c) for c in df.columns]
+        linhas = (
+            (colunas, tuple(None if pd.isna(v) else v for v in valores))
+            for valores in df.itertuples(index=False, name=None)
+        )
+        return self._extrair_urls_linhas(linhas, arquivo_nome, origem_tipo)
+
+    def _extrair_urls_linhas(
+        self,
+        linhas,
+        arquivo_nome: str,
+        origem_tipo: str,
+        parar_no_whitelist: bool = True,
+    ) -> List[LinkProveniencia]:
+        """
+        Extrai URLs de linhas (colunas, valores) com proveniencia.
+
+        V19.6: So aplica as regex em celulas que contem "http" ou "www."
+        e, com parar_no_whitelist, encerra a leitura no primeiro link
+        valido de confianca 100 (whitelist) - nenhum candidato posterior
+        passaria na frente dele na ordenacao por confianca.
+        """
         resultados = []
         urls_vistas = set()
 
-        colunas_interesse = [
-            "link", "url", "site", "endereco", "endereço",
-            "portal", "plataforma", "leilao", "leilão"
-        ]
-
-        for row_idx, row in df.iterrows():
-            for col_idx, col in enumerate(df.columns):
-                valor = row[col]
-                if pd.isna(valor):
+        for row_idx, (colunas, valores) in enumerate(linhas):
+            for col_idx, valor in enumerate(valores):
+                if valor is None:
                     continue
 
                 valor_str = str(valor)
+                valor_lower = valor_str.lower()
+                if "http" not in valor_lower and "www." not in valor_lower:
+                    continue
+
+                col = colunas[col_idx] if col_idx < len(colunas) else f"Unnamed: {col_idx}"
+                inicio_celula = len(resultados)
+                origem_ref = f"{origem_tipo}:{arquivo_nome}:row={row_idx+1}:col={col}"
 
                 # Buscar URLs com http
                 for match in self.regex_url.finditer(valor_str):
@@ -935,7 +1094,7 @@ class ExcelExtractorV19:
                         url_validada=url_candidata if valido else None,
                         valido=valido,
                         origem_tipo=origem_tipo,
-                        origem_ref=f"{origem_tipo}:{arquivo_nome}:row={row_idx+1}:col={col}",
+                        origem_ref=origem_ref,
                         evidencia_trecho=valor_str[:200],
                         confianca=confianca,
                         motivo_rejeicao=motivo,
@@ -961,12 +1120,20 @@ class ExcelExtractorV19:
                         url_validada=url_normalizada,
                         valido=valido,
                         origem_tipo=origem_tipo,
-                        origem_ref=f"{origem_tipo}:{arquivo_nome}:row={row_idx+1}:col={col}",
+                        origem_ref=origem_ref,
                         evidencia_trecho=valor_str[:200],
                         confianca=confianca,
                         motivo_rejeicao=motivo,
                     ))
 
+                if parar_no_whitelist and any(
+                    r.valido and r.confianca >= 100 for r in resultados[inicio_celula:]
+                ):
+                    if hasattr(linhas, "close"):
+                        linhas.close()  # Libera o workbook/arquivo imediatamente
+                    resultados.sort(key=lambda x: x.confianca, reverse=True)
+                    return resultados
+
         # Ordenar por confianca
         resultados.sort(key=lambda x: x.confianca, reverse=True)
 
@@ -977,6 +1144,34 @@ class ExcelExtractorV19:
 # REPOSITORIO SUPABASE V19
 # ============================================================
 
+# V19.6: Colunas que _processar_edital realmente le (+ cursor keyset).
+# Evita trafegar colunas grandes (texto extraido, json do PNCP, etc).
+COLUNAS_FILA_AUDITOR = (
+    "id, pncp_id, titulo, descricao, data_leilao, score, valor_estimado, created_at, "
+    "auditor_v19_result, auditor_v19_manifest_hash"
+)
+
+# V19.6: Versao das regras de extracao de links (cascata PDF/Excel/CSV/descricao
+# + gate). Entra no hash do manifesto: INCREMENTAR ao mudar regras de extracao,
+# para que editais "no_link" antigos voltem a ser processados.
+VERSAO_EXTRATOR_LINKS = "links_v19.6"
+
+
+def prioridade_edital(edital: dict) -> Tuple[str, float, float]:
+    """
+    Chave de ordenacao da fila por prazo (V19.6).
+
+    Dia do leilao primeiro (mais proximo = mais urgente); no mesmo dia,
+    maior score e maior valor_estimado (valor esperado para o usuario).
+    """
+    data_leilao = str(edital.get("data_leilao") or "9999-12-31")[:10]
+    score = edital.get("score") or 0
+    valor = edital.get("valor_estimado") or 0
+    try:
+        return (data_leilao, -float(score), -float(valor))
+    except (TypeError, ValueError):
+        return (data_leilao, 0.0, 0.0)
+
 class SupabaseRepositoryV19:
     """Repositorio para persistencia no Supabase com campos V19."""
 
@@ -985,6 +1180,8 @@ class SupabaseRepositoryV19:
         self.client = None
         self.logger = logging.getLogger(__name__)
         self.enable_supabase = False
+        self._rpc_writeback_disponivel = True  # V19.6: cai para UPDATE individual se RPC ausente
+        self._manifesto_disponivel = True  # V19.6: False se migration 018 nao aplicada
 
         if not config.supabase_url or not config.supabase_key:
             self.logger.warning("Credenciais Supabase nao configuradas")
@@ -1006,6 +1203,7 @@ class SupabaseRepositoryV19:
 
         V19.2 IDEMPOTENCIA: Por padrao, exclui editais ja processados pelo V19.
         Use incluir_ja_processados=True para reprocessar (flag --force).
+        V19.6: Wrapper sobre iterar_editais (colunas projetadas).
 
         Args:
             limite: Numero maximo de editais
@@ -1014,54 +1212,182 @@ class SupabaseRepositoryV19:
         Returns:
             Lista de editais pendentes
         """
-        if not self.enable_supabase:
-            return []
+        return list(self.iterar_editais(
+            limite=limite,
+            apenas_sem_link=True,
+            incluir_ja_processados=incluir_ja_processados,
+        ))
 
-        try:
-            query = (
-                self.client.table("editais_leilao")
-                .select("*")
-                .or_("link_leiloeiro.is.null,link_leiloeiro.eq.N/D")
-            )
+    def buscar_todos_editais(self, limite: int = None) -> List[dict]:
+        """Busca todos os editais (V19.6: wrapper sobre iterar_editais)."""
+        return list(self.iterar_editais(
+            limite=limite,
+            apenas_sem_link=False,
+            incluir_ja_processados=True,
+        ))
+
+    def iterar_editais(
+        self,
+        limite: Optional[int] = None,
+        apenas_sem_link: bool = True,
+        incluir_ja_processados: bool = False,
+        page_size: int = 200,
+        max_retries: int = 3,
+        ordem: str = "recentes",
+        pular_passados: bool = False,
+        hoje: Optional[str] = None,
+    ) -> Iterator[dict]:
+        """
+        Itera editais em paginas keyset (created_at desc, id desc).
 
-            # V19.2: Filtro de idempotencia - exclui ja processados pelo V19
-            if not incluir_ja_processados:
-                query = query.is_("auditor_v19_processed_at", "null")
-                self.logger.debug("Filtrando editais ja processados pelo V19 (idempotencia ativa)")
+        V19.6 PRAZO: Com ordem="prazo", primeiro os editais com leilao a partir
+        de hoje (data_leilao asc, id asc; cada pagina reordenada por
+        prioridade_edital) e depois os vencidos/sem data no fim da fila, ou
+        nem isso se pular_passados (filtro no servidor).
 
-            response = (
-                query
-                .order("created_at", desc=True)
-                .limit(limite)
-                .execute()
-            )
-            return response.data
+        V19.6 STREAMING: Seleciona apenas COLUNAS_FILA_AUDITOR e busca uma
+        pagina por vez, entao auditar a tabela inteira roda em memoria
+        constante e o primeiro edital sai apos a primeira pagina.
 
-        except Exception as e:
-            self.logger.error(f"Erro ao buscar editais pendentes: {e}")
-            return []
+        Keyset (e nao offset) e obrigatorio aqui: editais marcados como
+        processados durante a execucao saem do filtro de idempotencia, o
+        que deslocaria as paginas de um OFFSET e pularia editais.
 
-    def buscar_todos_editais(self, limite: int = None) -> List[dict]:
-        """Busca todos os editais."""
+        Args:
+            limite: Numero maximo de editais (None/0 = sem limite)
+            apenas_sem_link: Se True, apenas link_leiloeiro nulo ou 'N/D'
+            incluir_ja_processados: Se True, ignora filtro de idempotencia V19
+            page_size: Editais por pagina
+            max_retries: Tentativas por pagina
+            ordem: "recentes" ou "prazo"
+            pular_passados: Com ordem="prazo", nao busca leiloes vencidos/sem data
+            hoje: Data de corte ISO (default: hoje)
+
+        Yields:
+            Dicts com as colunas de COLUNAS_FILA_AUDITOR
+        """
         if not self.enable_supabase:
-            return []
+            return
 
-        try:
-            query = (
-                self.client.table("editais_leilao")
-                .select("*")
-                .order("created_at", desc=True)
+        # Fases: (por_prazo, filtro da fase)
+        if ordem == "prazo":
+            hoje = hoje or date.today().isoformat()
+            fases = [(True, f'data_leilao.gte."{hoje}"')]
+            if not pular_passados:
+                fases.append((False, f'or(data_leilao.lt."{hoje}",data_leilao.is.null)'))
+        else:
+            fases = [(False, None)]
+
+        entregues = 0
+        for por_prazo, filtro_fase in fases:
+            cursor: Optional[Tuple[str, int]] = None
+
+            while True:
+                tamanho = page_size
+                if limite:
+                    tamanho = min(page_size, limite - entregues)
+                    if tamanho <= 0:
+                        return
+
+                pagina = self._buscar_pagina_editais(
+                    cursor, tamanho, apenas_sem_link, incluir_ja_processados, max_retries,
+                    por_prazo=por_prazo, filtro_fase=filtro_fase,
+                )
+                if pagina is None:
+                    return
+
+                # Cursor sai da ordem do servidor (antes de reordenar a pagina)
+                if pagina:
+                    ultimo = pagina[-1]
+                    chave = "data_leilao" if por_prazo else "created_at"
+                    cursor = (ultimo[chave], ultimo["id"])
+                if por_prazo:
+                    pagina = sorted(pagina, key=prioridade_edital)
+
+                for edital in pagina:
+                    yield edital
+                    entregues += 1
+
+                if len(pagina) < tamanho:
+                    break
+
+    def _buscar_pagina_editais(
+        self,
+        cursor: Optional[Tuple[str, int]],
+        tamanho: int,
+        apenas_sem_link: bool,
+        incluir_ja_processados: bool,
+        max_retries: int = 3,
+        por_prazo: bool = False,
+        filtro_fase: Optional[str] = None,
+    ) -> Optional[List[dict]]:
+        """Busca uma pagina keyset. Retorna None se todas as tentativas falharem."""
+        filtros = []
+        if apenas_sem_link:
+            filtros.append("or(link_leiloeiro.is.null,link_leiloeiro.eq.N/D)")
+        if filtro_fase:
+            filtros.append(filtro_fase)
+        if cursor and por_prazo:
+            data_leilao, edital_id = cursor
+            filtros.append(
+                f'or(data_leilao.gt."{data_leilao}",'
+                f'and(data_leilao.eq."{data_leilao}",id.gt.{edital_id}))'
+            )
+        elif cursor:
+            created_at, edital_id = cursor
+            filtros.append(
+                f'or(created_at.lt."{created_at}",'
+                f'and(created_at.eq."{created_at}",id.lt.{edital_id}))'
             )
 
-            if limite:
-                query = query.limit(limite)
+        last_error = None
+        for attempt in range(max_retries):
+            try:
+                colunas = COLUNAS_FILA_AUDITOR
+                if not self._manifesto_disponivel:
+                    colunas = colunas.replace(", auditor_v19_manifest_hash", "")
+
+                query = (
+                    self.client.table("editais_leilao")
+                    .select(colunas)
+                )
 
-            response = query.execute()
-            return response.data
+                # Um unico parametro "or" com and(...) interno combina os filtros
+                if filtros:
+                    query = query.or_(f"and({','.join(filtros)})")
 
-        except Exception as e:
-            self.logger.error(f"Erro ao buscar editais: {e}")
-            return []
+                # V19.2: Filtro de idempotencia - exclui ja processados pelo V19
+                if not incluir_ja_processados:
+                    query = query.is_("auditor_v19_processed_at", "null")
+
+                if por_prazo:
+                    query = query.order("data_leilao").order("id")
+                else:
+                    query = query.order("created_at", desc=True).order("id", desc=True)
+
+                response = query.limit(tamanho).execute()
+                return response.data or []
+
+            except Exception as e:
+                last_error = e
+                # V19.6: Sem migration 018 - segue sem cache de manifesto
+                if self._manifesto_disponivel and "auditor_v19_manifest_hash" in str(e):
+                    self.logger.warning(
+                        "[MANIFESTO] Coluna auditor_v19_manifest_hash ausente "
+                        "(aplique migration 018); cache negativo desativado"
+                    )
+                    self._manifesto_disponivel = False
+                    continue
+                if attempt < max_retries - 1:
+                    delay = (2 ** attempt) * (0.5 + __import__('random').random() * 0.5)
+                    self.logger.warning(
+                        f"[RETRY] iterar_editais tentativa {attempt + 1}/{max_retries} "
+                        f"falhou: {e}. Retry em {delay:.1f}s"
+                    )
+                    time.sleep(delay)
+
+        self.logger.error(f"Erro ao buscar pagina de editais apos {max_retries} tentativas: {last_error}")
+        return None
 
     def listar_arquivos_storage(self, pncp_id: str, max_retries: int = 3) -> List[dict]:
         """
@@ -1082,8 +1408,15 @@ class SupabaseRepositoryV19:
                 response = self.client.storage.from_(
                     self.config.storage_bucket
                 ).list(folder_name)
+                # V19.6: eTag/tamanho entram no hash do manifesto (cache negativo)
                 return [
-                    {"path": f"{folder_name}/{item['name']}", "name": item["name"]}
+                    {
+                        "path": f"{folder_name}/{item['name']}",
+                        "name": item["name"],
+                        "etag": (item.get("metadata") or {}).get("eTag"),
+                        "size": (item.get("metadata") or {}).get("size"),
+                        "updated_at": item.get("updated_at"),
+                    }
                     for item in response
                 ]
             except Exception as e:
@@ -1134,6 +1467,7 @@ class SupabaseRepositoryV19:
         proveniencia: LinkProveniencia,
         run_id: str = None,
         max_retries: int = 3,
+        manifest_hash: Optional[str] = None,
     ) -> bool:
         """
         Atualiza link do leiloeiro com campos de proveniencia V19.
@@ -1146,6 +1480,7 @@ class SupabaseRepositoryV19:
             proveniencia: Objeto LinkProveniencia com dados completos
             run_id: ID unico da execucao atual (opcional)
             max_retries: Numero maximo de tentativas
+            manifest_hash: Manifesto inspecionado (gravado se o link foi rejeitado)
 
         Returns:
             True se sucesso
@@ -1153,23 +1488,7 @@ class SupabaseRepositoryV19:
         if not self.enable_supabase:
             return False
 
-        dados = {
-            "link_leiloeiro": proveniencia.url_validada,
-            "link_leiloeiro_raw": proveniencia.candidato_raw,
-            "link_leiloeiro_valido": proveniencia.valido,
-            "link_leiloeiro_origem_tipo": proveniencia.origem_tipo,
-            "link_leiloeiro_origem_ref": proveniencia.origem_ref,
-            "link_leiloeiro_evidencia_trecho": proveniencia.evidencia_trecho[:200] if proveniencia.evidencia_trecho else None,
-            "link_leiloeiro_confianca": proveniencia.confianca,
-            "versao_auditor": self.config.versao_auditor,
-            "updated_at": datetime.now().isoformat(),
-        }
-
-        # V19.2: Campos de idempotencia
-        if run_id:
-            dados["auditor_v19_processed_at"] = datetime.now().isoformat()
-            dados["auditor_v19_run_id"] = run_id
-            dados["auditor_v19_result"] = "found_link" if proveniencia.valido else "no_link"
+        dados = self.montar_dados_link_v19(proveniencia, run_id, manifest_hash)
 
         last_error = None
         for attempt in range(max_retries):
@@ -1182,7 +1501,8 @@ class SupabaseRepositoryV19:
                 if proveniencia.valido and proveniencia.url_validada:
                     self.registrar_leiloeiro_url(
                         url=proveniencia.url_validada,
-                        fonte="auditor"
+                        fonte="auditor",
+                        pncp_ids=[pncp_id],
                     )
 
                 return True
@@ -1200,6 +1520,44 @@ class SupabaseRepositoryV19:
         self.logger.error(f"Erro atualizando edital {pncp_id} apos {max_retries} tentativas: {last_error}")
         return False
 
+    def montar_dados_link_v19(
+        self,
+        proveniencia: LinkProveniencia,
+        run_id: str = None,
+        manifest_hash: Optional[str] = None,
+    ) -> dict:
+        """
+        Monta o payload de UPDATE de link do leiloeiro (V19.6).
+
+        Compartilhado entre o caminho direto (atualizar_link_leiloeiro_v19)
+        e o write-back em lote (WriteBackV19). Candidato rejeitado vira
+        "no_link" e grava manifest_hash como em montar_dados_processado_v19;
+        link valido limpa o hash de um no_link anterior.
+        """
+        dados = {
+            "link_leiloeiro": proveniencia.url_validada,
+            "link_leiloeiro_raw": proveniencia.candidato_raw,
+            "link_leiloeiro_valido": proveniencia.valido,
+            "link_leiloeiro_origem_tipo": proveniencia.origem_tipo,
+            "link_leiloeiro_origem_ref": proveniencia.origem_ref,
+            "link_leiloeiro_evidencia_trecho": proveniencia.evidencia_trecho[:200] if proveniencia.evidencia_trecho else None,
+            "link_leiloeiro_confianca": proveniencia.confianca,
+            "versao_auditor": self.config.versao_auditor,
+            "updated_at": datetime.now().isoformat(),
+        }
+
+        # V19.2: Campos de idempotencia
+        if run_id:
+            dados["auditor_v19_processed_at"] = datetime.now().isoformat()
+            dados["auditor_v19_run_id"] = run_id
+            dados["auditor_v19_result"] = "found_link" if proveniencia.valido else "no_link"
+
+            # V19.6: Manifesto inspecionado (cache negativo para execucoes forcadas)
+            if self._manifesto_disponivel:
+                dados["auditor_v19_manifest_hash"] = None if proveniencia.valido else manifest_hash
+
+        return dados
+
     def marcar_processado_v19(
         self,
         pncp_id: str,
@@ -1230,22 +1588,7 @@ class SupabaseRepositoryV19:
         if not self.enable_supabase:
             return False
 
-        # V19.4 LINEAGE FIX: Apenas atualiza campos de idempotencia quando no_link.
-        # NAO sobrescreve link_leiloeiro_origem_tipo - pode ter vindo do Miner (pncp_api).
-        # Apenas define origem_tipo se o edital realmente nao tinha nenhum link
-        # E o resultado e "no_link" (confirma que processamos e nao encontramos).
-        dados = {
-            "versao_auditor": self.config.versao_auditor,
-            "updated_at": datetime.now().isoformat(),
-            # V19.2: Campos de idempotencia
-            "auditor_v19_processed_at": datetime.now().isoformat(),
-            "auditor_v19_run_id": run_id,
-            "auditor_v19_result": resultado,
-        }
-
-        # V19.4: So define confianca zero se resultado for no_link
-        if resultado == "no_link":
-            dados["link_leiloeiro_confianca"] = 0
+        dados = self.montar_dados_processado_v19(run_id, resultado)
 
         last_error = None
         for attempt in range(max_retries):
@@ -1270,6 +1613,42 @@ class SupabaseRepositoryV19:
         self.logger.error(f"Erro marcando edital {pncp_id} como processado apos {max_retries} tentativas: {last_error}")
         return False
 
+    def montar_dados_processado_v19(
+        self,
+        run_id: str,
+        resultado: str = "no_link",
+        manifest_hash: Optional[str] = None,
+    ) -> dict:
+        """
+        Monta o payload de UPDATE de idempotencia (V19.6).
+
+        Compartilhado entre o caminho direto (marcar_processado_v19)
+        e o write-back em lote (WriteBackV19). manifest_hash so e gravado
+        em "no_link" (e o que alimenta o cache negativo).
+        """
+        # V19.4 LINEAGE FIX: Apenas atualiza campos de idempotencia quando no_link.
+        # NAO sobrescreve link_leiloeiro_origem_tipo - pode ter vindo do Miner (pncp_api).
+        # Apenas define origem_tipo se o edital realmente nao tinha nenhum link
+        # E o resultado e "no_link" (confirma que processamos e nao encontramos).
+        dados = {
+            "versao_auditor": self.config.versao_auditor,
+            "updated_at": datetime.now().isoformat(),
+            # V19.2: Campos de idempotencia
+            "auditor_v19_processed_at": datetime.now().isoformat(),
+            "auditor_v19_run_id": run_id,
+            "auditor_v19_result": resultado,
+        }
+
+        # V19.4: So define confianca zero se resultado for no_link
+        if resultado == "no_link":
+            dados["link_leiloeiro_confianca"] = 0
+
+        # V19.6: Manifesto inspecionado (cache negativo para execucoes forcadas)
+        if self._manifesto_disponivel:
+            dados["auditor_v19_manifest_hash"] = manifest_hash if resultado == "no_link" else None
+
+        return dados
+
     def inserir_run_report(
         self,
         run_id: str,
@@ -1410,7 +1789,9 @@ class SupabaseRepositoryV19:
     def registrar_leiloeiro_url(
         self,
         url: str,
-        fonte: str = "auditor"
+        fonte: str = "auditor",
+        qtd: int = 1,
+        pncp_ids: Optional[List[str]] = None,
     ) -> bool:
         """
         Registra um domínio de leiloeiro na tabela leiloeiros_urls.
@@ -1421,6 +1802,9 @@ class SupabaseRepositoryV19:
         Args:
             url: URL completa do leiloeiro
             fonte: Origem do registro (auditor, miner, manual)
+            qtd: Ocorrências a somar (V19.6: agregado por lote)
+            pncp_ids: Editais da ocorrência; se informados, só os que ainda
+                não foram contados para o domínio somam (qtd é ignorado)
 
         Returns:
             True se sucesso
@@ -1433,12 +1817,15 @@ class SupabaseRepositoryV19:
             return False
 
         try:
+            if pncp_ids:
+                qtd = self._contar_editais_novos(dominio, pncp_ids)
+
             # Tentar inserir ou atualizar usando upsert
             dados = {
                 "dominio": dominio,
                 "url_exemplo": url,
                 "fonte": fonte,
-                "qtd_ocorrencias": 1,
+                "qtd_ocorrencias": qtd,
                 "ultimo_visto": datetime.now().isoformat(),
             }
 
@@ -1452,7 +1839,7 @@ class SupabaseRepositoryV19:
 
             if response.data:
                 # Já existe - incrementar contagem
-                nova_qtd = response.data[0]["qtd_ocorrencias"] + 1
+                nova_qtd = response.data[0]["qtd_ocorrencias"] + qtd
                 self.client.table("leiloeiros_urls").update({
                     "qtd_ocorrencias": nova_qtd,
                     "ultimo_visto": datetime.now().isoformat(),
@@ -1473,23 +1860,438 @@ class SupabaseRepositoryV19:
             self.logger.debug(f"Erro registrando leiloeiro {dominio}: {e}")
             return False
 
+    def _contar_editais_novos(self, dominio: str, pncp_ids: List[str]) -> int:
+        """
+        Registra os pares (dominio, pncp_id) e devolve quantos eram novos.
+
+        Reaplicar o mesmo lote (journal, retry apos timeout) nao conta o
+        mesmo edital duas vezes. Sem a tabela (migration 020 nao aplicada),
+        conta todos, como antes.
+        """
+        linhas = [{"dominio": dominio, "pncp_id": pncp_id} for pncp_id in sorted(set(pncp_ids))]
+        try:
+            response = self.client.table("leiloeiros_urls_editais").upsert(
+                linhas, on_conflict="dominio,pncp_id", ignore_duplicates=True
+            ).execute()
+            return len(response.data or [])
+        except Exception as e:
+            self.logger.debug(f"leiloeiros_urls_editais indisponivel (migration 020): {e}")
+            return len(linhas)
+
+    def aplicar_resultados_lote(
+        self,
+        itens: List[dict],
+        leiloeiros: List[dict],
+        max_retries: int = 3,
+    ) -> bool:
+        """
+        Aplica N resultados do auditor em uma unica chamada.
+
+        V19.6 WRITE-BACK EM LOTE: Usa a RPC auditor_v19_aplicar_resultados
+        (migration 017). Se a RPC nao existir no banco, cai para UPDATEs
+        individuais (mesmo comportamento de antes da V19.6).
+
+        Args:
+            itens: Lista de {"pncp_id": str, "dados": dict}
+            leiloeiros: Lista agregada de {"dominio", "url_exemplo", "fonte", "qtd", "pncp_ids"}
+            max_retries: Numero maximo de tentativas da RPC
+
+        Returns:
+            True se todos os itens foram aplicados
+        """
+        if not self.enable_supabase:
+            return False
+
+        if not itens and not leiloeiros:
+            return True
+
+        if self._rpc_writeback_disponivel:
+            last_error = None
+            for attempt in range(max_retries):
+                try:
+                    self.client.rpc("auditor_v19_aplicar_resultados", {
+                        "p_resultados": itens,
+                        "p_leiloeiros": leiloeiros,
+                    }).execute()
+                    self.logger.debug(f"[WRITE-BACK] {len(itens)} resultados aplicados via RPC")
+                    return True
+
+                except Exception as e:
+                    last_error = e
+                    erro_str = str(e)
+                    if "PGRST202" in erro_str or "Could not find the function" in erro_str:
+                        self.logger.warning(
+                            "[WRITE-BACK] RPC auditor_v19_aplicar_resultados indisponivel "
+                            "(migration 017 nao aplicada). Usando UPDATEs individuais."
+                        )
+                        self._rpc_writeback_disponivel = False
+                        break
+                    if attempt < max_retries - 1:
+                        delay = (2 ** attempt) * (0.5 + __import__('random').random() * 0.5)
+                        self.logger.warning(
+                            f"[RETRY] aplicar_resultados_lote tentativa {attempt + 1}/{max_retries} "
+                            f"falhou: {e}. Retry em {delay:.1f}s"
+                        )
+                        time.sleep(delay)
+            else:
+                self.logger.error(
+                    f"Erro aplicando {len(itens)} resultados via RPC apos {max_retries} tentativas: {last_error}"
+                )
+                return False
+
+        # Fallback: UPDATEs individuais + registro agregado por dominio
+        todos_ok = True
+        for item in itens:
+            try:
+                self.client.table("editais_leilao").update(item["dados"]).eq(
+                    "pncp_id", item["pncp_id"]
+                ).execute()
+            except Exception as e:
+                self.logger.error(f"Erro atualizando edital {item['pncp_id']} (write-back): {e}")
+                todos_ok = False
+
+        for leiloeiro in leiloeiros:
+            self.registrar_leiloeiro_url(
+                url=leiloeiro["url_exemplo"],
+                fonte=leiloeiro.get("fonte", "auditor"),
+                qtd=leiloeiro.get("qtd", 1),
+                pncp_ids=leiloeiro.get("pncp_ids"),
+            )
+
+        return todos_ok
+
+
+# ============================================================
+# WRITE-BACK EM LOTE V19 (V19.6)
+# ============================================================
+
+class WriteBackV19:
+    """
+    Acumula resultados por edital e grava no banco em lotes.
+
+    Cada resultado e anotado em um journal local (JSONL, com fsync) ANTES
+    de entrar no buffer. O journal so e truncado apos o flush confirmar.
+    Se o processo morrer no meio de um lote, a proxima execucao reaplica
+    o journal antes de buscar editais - a garantia de idempotencia de
+    auditor_v19_processed_at continua valendo.
+
+    Cada execucao tem o proprio journal (<base>.<execucao>.jsonl), travado
+    enquanto ela roda: execucoes simultaneas nao truncam as pendencias uma
+    da outra, e a recuperacao so reaplica journals sem dono vivo.
+    """
+
+    def __init__(self, repo: SupabaseRepositoryV19, batch_size: int = 100, journal_path: str = ""):
+        self.repo = repo
+        self.batch_size = max(1, batch_size)
+        self.journal_base = Path(journal_path) if journal_path else None
+        self.journal_path = None
+        if self.journal_base:
+            execucao = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{id(self):x}"
+            self.journal_path = self.journal_base.with_name(
+                f"{self.journal_base.stem}.{execucao}{self.journal_base.suffix}"
+            )
+        self.logger = logging.getLogger("WriteBackV19")
+        self.buffer: List[dict] = []
+        self._journal = None
+
+        self.total_registrados = 0
+        self.total_flushes = 0
+        self.total_falhas = 0
+
+    @property
+    def ativo(self) -> bool:
+        return self.repo.enable_supabase
+
+    def _abrir_journal(self):
+        if self._journal is None and self.journal_path:
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+            _travar_journal(self._journal)
+        return self._journal
+
+    def _anotar_journal(self, item: dict):
+        journal = self._abrir_journal()
+        if journal is None:
+            return
+        journal.write(json.dumps(item, ensure_ascii=False) + "\n")
+        journal.flush()
+        os.fsync(journal.fileno())
+
+    def _truncar_journal(self):
+        # Trunca pelo proprio handle: a trava da execucao continua valendo
+        if self._journal is None:
+            return
+        self._journal.truncate(0)
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    def _journals_pendentes(self) -> List[Path]:
+        """Journals de outras execucoes (inclui o caminho fixo de versoes anteriores)."""
+        base = self.journal_base
+        candidatos = [base] + sorted(base.parent.glob(f"{base.stem}.*{base.suffix}"))
+        return [c for c in candidatos if c != self.journal_path and c.exists()]
+
+    def recuperar_journal(self) -> int:
+        """
+        Reaplica resultados de execucoes anteriores que nao chegaram ao flush.
+
+        Journals travados pertencem a execucoes em andamento e sao pulados.
+        Os recuperados passam para o journal desta execucao antes de o
+        arquivo antigo ser removido.
+
+        Returns:
+            Numero de resultados recuperados dos journals
+        """
+        if not self.ativo or not self.journal_base:
+            return 0
+
+        recuperados = []
+        for caminho in self._journals_pendentes():
+            try:
+                f = open(caminho, "r", encoding="utf-8")
+            except FileNotFoundError:
+                continue
+            with f:
+                if not _travar_journal(f):
+                    self.logger.debug(f"[WRITE-BACK] Journal em uso por outra execucao: {caminho}")
+                    continue
+                itens = []
+                for linha in f:
+                    linha = linha.strip()
+                    if not linha:
+                        continue
+                    try:
+                        itens.append(json.loads(linha))
+                    except json.JSONDecodeError:
+                        # Ultima linha truncada por crash no meio do write
+                        self.logger.warning("[WRITE-BACK] Linha corrompida ignorada no journal")
+                for item in itens:
+                    self._anotar_journal(item)
+            caminho.unlink(missing_ok=True)
+            recuperados.extend(itens)
+
+        if not recuperados:
+            return 0
+
+        self.logger.info(f"[WRITE-BACK] Recuperando {len(recuperados)} resultados pendentes do journal")
+        self.buffer.extend(recuperados)
+        self.flush()
+        return len(recuperados)
+
+    def registrar(self, pncp_id: str, dados: dict, leiloeiro_url: Optional[str] = None) -> bool:
+        """
+        Registra o resultado de um edital (journal + buffer).
+
+        Returns:
+            True se o resultado foi aceito (sera gravado no proximo flush)
+        """
+        if not self.ativo:
+            return False
+
+        item = {"pncp_id": pncp_id, "dados": dados}
+        if leiloeiro_url:
+            item["leiloeiro_url"] = leiloeiro_url
+
+        self._anotar_journal(item)
+        self.buffer.append(item)
+        self.total_registrados += 1
+
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+        return True
+
+    def registrar_link(
+        self,
+        pncp_id: str,
+        proveniencia: LinkProveniencia,
+        run_id: str,
+        manifest_hash: Optional[str] = None,
+    ) -> bool:
+        """Equivalente em lote de SupabaseRepositoryV19.atualizar_link_leiloeiro_v19."""
+        dados = self.repo.montar_dados_link_v19(proveniencia, run_id, manifest_hash)
+        leiloeiro_url = proveniencia.url_validada if proveniencia.valido else None
+        return self.registrar(pncp_id, dados, leiloeiro_url)
+
+    def registrar_processado(
+        self,
+        pncp_id: str,
+        run_id: str,
+        resultado: str = "no_link",
+        manifest_hash: Optional[str] = None,
+    ) -> bool:
+        """Equivalente em lote de SupabaseRepositoryV19.marcar_processado_v19."""
+        dados = self.repo.montar_dados_processado_v19(run_id, resultado, manifest_hash)
+        return self.registrar(pncp_id, dados)
+
+    def _agregar_leiloeiros(self, itens: List[dict]) -> List[dict]:
+        """
+        Agrupa URLs de leiloeiro por dominio (1 upsert por dominio no lote).
+
+        Cada dominio leva os pncp_ids que o citaram: o banco so soma os
+        editais ainda nao contados (migration 020), entao reaplicar o lote
+        nao infla qtd_ocorrencias.
+        """
+        por_dominio: Dict[str, dict] = {}
+        for item in itens:
+            url = item.get("leiloeiro_url")
+            dominio = self.repo._extrair_dominio(url) if url else None
+            if not dominio:
+                continue
+            if dominio not in por_dominio:
+                por_dominio[dominio] = {
+                    "dominio": dominio,
+                    "url_exemplo": url,
+                    "fonte": "auditor",
+                    "pncp_ids": [],
+                }
+            if item["pncp_id"] not in por_dominio[dominio]["pncp_ids"]:
+                por_dominio[dominio]["pncp_ids"].append(item["pncp_id"])
+        for leiloeiro in por_dominio.values():
+            leiloeiro["qtd"] = len(leiloeiro["pncp_ids"])
+        return list(por_dominio.values())
+
+    def flush(self) -> bool:
+        """
+        Grava o buffer no banco. Em caso de falha o buffer e o journal sao
+        mantidos para nova tentativa (proximo flush ou proxima execucao).
+        """
+        if not self.buffer:
+            return True
+
+        # Ultimo resultado por edital vence (journal recuperado + execucao atual)
+        por_edital: Dict[str, dict] = {}
+        for item in self.buffer:
+            por_edital[item["pncp_id"]] = item
+        itens = list(por_edital.values())
+
+        leiloeiros = self._agregar_leiloeiros(self.buffer)
+        payload = [{"pncp_id": i["pncp_id"], "dados": i["dados"]} for i in itens]
+
+        ok = self.repo.aplicar_resultados_lote(payload, leiloeiros)
+        self.total_flushes += 1
+
+        if ok:
+            self.logger.debug(f"[WRITE-BACK] Flush OK: {len(itens)} editais, {len(leiloeiros)} dominios")
+            self.buffer = []
+            self._truncar_journal()
+        else:
+            self.total_falhas += 1
+            self.logger.error(
+                f"[WRITE-BACK] Flush falhou ({len(itens)} editais). "
+                f"Resultados mantidos no journal: {self.journal_path}"
+            )
+
+        return ok
+
+    def fechar(self) -> bool:
+        """Flush final e fechamento do journal (removido se nao ficou pendencia)."""
+        ok = self.flush()
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+            if ok:
+                self.journal_path.unlink(missing_ok=True)
+        return ok
+
+
+def _travar_journal(arquivo) -> bool:
+    """
+    Trava exclusiva (sem esperar) no journal, liberada ao fechar o arquivo.
+
+    Returns:
+        False se outra execucao viva ja tem a trava
+    """
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+# ============================================================
+# FILA COM PREFETCH LIMITADO (V19.6)
+# ============================================================
+
+_FIM_FILA = object()
+
+
+def prefetch_limitado(itens: Iterator[dict], max_itens: int) -> Iterator[dict]:
+    """
+    Consome um iterador em uma thread produtora com buffer limitado.
+
+    Enquanto o auditor processa um edital, a proxima pagina ja esta sendo
+    buscada; o buffer (Queue com maxsize) impede que a produtora avance
+    mais que max_itens a frente do consumo. Excecoes da produtora sao
+    repassadas ao consumidor.
+    """
+    fila: "queue.Queue" = queue.Queue(maxsize=max(1, max_itens))
+    parar = threading.Event()
+
+    def entregar(item) -> bool:
+        """put com timeout: consumidor que parou (parar) nao prende a thread."""
+        while not parar.is_set():
+            try:
+                fila.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produtora():
+        try:
+            for item in itens:
+                if not entregar(item):
+                    return
+            entregar(_FIM_FILA)
+        except Exception as e:  # repassa erro para o consumidor
+            entregar(e)
+
+    thread = threading.Thread(target=produtora, name="auditor_v19_prefetch", daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item = fila.get()
+            if item is _FIM_FILA:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        parar.set()
+
 
 # ============================================================
 # AUDITOR V19 PRINCIPAL
 # ============================================================
 
+# V19.6: Retorno de _processar_edital quando o cache negativo pula o edital
+EDITAL_INALTERADO = object()
+
+
 class AuditorV19:
     """Auditor de editais - Versao 19 com gate de validacao e proveniencia."""
 
     def __init__(self, config: AuditorConfig, extrair_lotes: bool = True):
         self.config = config
         self.repo = SupabaseRepositoryV19(config)
-        self.url_validator = URLValidatorV19(timeout=config.timeout_seconds)
+        self.url_validator = URLValidatorV19(
+            timeout=config.timeout_seconds,
+            link_cache_path=config.link_cache_path,
+        )
         self.pdf_extractor = PDFExtractorV19(self.url_validator)
         self.excel_extractor = ExcelExtractorV19(self.url_validator)
         self.logger = logging.getLogger("AuditorV19")
         self.metrics = AuditorMetrics()
         self.temp_dir = tempfile.mkdtemp(prefix="auditor_v19_")
+        self.writeback = WriteBackV19(
+            self.repo,
+            batch_size=config.writeback_batch_size,
+            journal_path=config.writeback_journal_path,
+        )
 
         # Integrador de lotes (V19.1)
         self.extrair_lotes = extrair_lotes and LOTES_INTEGRATION_DISPONIVEL
@@ -1504,6 +2306,33 @@ class AuditorV19:
                 self.logger.warning(f"Falha ao inicializar integrador de lotes: {e}")
                 self.extrair_lotes = False
 
+        # V19.6: Hash do manifesto do edital em processamento (gravado com no_link)
+        self._manifesto_atual: Optional[str] = None
+
+    def _hash_manifesto(self, edital: dict, arquivos: List[dict]) -> str:
+        """
+        Hash de tudo que a cascata le de um edital (V19.6).
+
+        Versao do extrator + (nome, eTag ou tamanho/data) de cada arquivo do
+        Storage + titulo/descricao. Anexo novo, arquivo substituido ou nova
+        versao do extrator geram outro hash.
+        """
+        versoes = [VERSAO_EXTRATOR_LINKS]
+        if self.extrair_lotes:
+            versoes.append(VERSAO_EXTRATOR_LOTES)
+
+        manifesto = {
+            "versoes": versoes,
+            "arquivos": sorted(
+                [a["name"], a.get("etag") or f"{a.get('size')}:{a.get('updated_at')}"]
+                for a in arquivos
+            ),
+            "texto": [edital.get("titulo") or "", edital.get("descricao") or ""],
+        }
+        return hashlib.sha256(
+            json.dumps(manifesto, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+
     def _is_data_passada(self, data_leilao) -> bool:
         """Verifica se a data do leilao ja passou."""
         if not data_leilao:
@@ -1561,6 +2390,7 @@ class AuditorV19:
         """
         pncp_id = edital.get("pncp_id")
         edital_id = edital.get("id")
+        self._manifesto_atual = None
 
         if not pncp_id:
             return None
@@ -1574,6 +2404,18 @@ class AuditorV19:
 
         arquivos = self.repo.listar_arquivos_storage(pncp_id)
 
+        # V19.6: Cache negativo - mesmo manifesto ja resultou em no_link
+        if arquivos:
+            self._manifesto_atual = self._hash_manifesto(edital, arquivos)
+            if (
+                self.config.usar_cache_manifesto
+                and edital.get("auditor_v19_result") == "no_link"
+                and edital.get("auditor_v19_manifest_hash") == self._manifesto_atual
+            ):
+                self.metrics.editais_manifesto_inalterado += 1
+                self.logger.debug(f"  [MANIFESTO] {pncp_id} inalterado desde o ultimo no_link, pulando")
+                return EDITAL_INALTERADO
+
         pdfs = [a for a in arquivos if a["name"].lower().endswith(".pdf")]
         excels = [a for a in arquivos if a["name"].lower().endswith((".xlsx", ".xls"))]
         csvs = [a for a in arquivos if a["name"].lower().endswith(".csv")]
@@ -1747,9 +2589,16 @@ class AuditorV19:
         V19.2 IDEMPOTENCIA: Gera run_id unico e rastreia processamento.
         V19.4 RUN REPORT: Persiste metricas ao final da execucao.
         V19.5 FIX: Garante inserir_run_report SEMPRE via try/finally (mesmo 0 editais).
+        V19.6 STREAMING: Editais chegam paginados (keyset) com prefetch limitado;
+              resultados sao gravados em lote pelo WriteBackV19.
+        V19.6 MANIFESTO: Editais "no_link" cujo manifesto (arquivos + versao do
+              extrator) nao mudou sao pulados, inclusive com --force.
+        V19.6 PRAZO: Fila ordenada por proximidade do leilao; com
+              config.deadline_segundos, para de puxar editais quando o
+              orcamento de tempo acaba (write-back e run_report seguem normais).
 
         Args:
-            limite: Numero maximo de editais a processar
+            limite: Numero maximo de editais a processar (None/0 = sem limite)
             reprocessar_todos: Se True, reprocessa todos os editais (ignora filtro de link)
             force_reprocess: Se True, reprocessa mesmo editais ja processados pelo V19
             git_sha: SHA do commit git para rastreamento
@@ -1774,91 +2623,142 @@ class AuditorV19:
         self.logger.info(f"Validar URLs: {'SIM' if self.config.validar_urls else 'NAO'}")
         self.logger.info(f"Force Reprocess: {'SIM' if force_reprocess else 'NAO'}")
         self.logger.info(f"Strict Mode: {'SIM' if strict else 'NAO'}")
+        self.logger.info(f"Ordem da fila: {self.config.ordem_fila}")
+        if self.config.deadline_segundos:
+            self.logger.info(f"Deadline: {self.config.deadline_segundos:.0f}s")
         self.logger.info("=" * 70)
 
+        inicio_execucao = time.monotonic()
+
         try:
+            # V19.6: Reaplicar resultados de execucao anterior interrompida antes do flush
+            # (precisa vir ANTES da busca para que o filtro de idempotencia os exclua)
+            self.writeback.recuperar_journal()
+
             if reprocessar_todos:
                 self.logger.info("Modo: Reprocessar TODOS os editais (ignora filtro de link)")
-                editais = self.repo.buscar_todos_editais(limite)
             else:
                 self.logger.info("Modo: Editais pendentes (sem link_leiloeiro)")
-                # V19.2: Passa flag de force para incluir ja processados
-                editais = self.repo.buscar_editais_pendentes(limite, incluir_ja_processados=force_reprocess)
 
-            if not editais:
-                self.logger.info("Nenhum edital para processar (0 editais pendentes)")
-                # V19.5: NAO retorna cedo - continua para finally gravar run_report
-            else:
-                self.logger.info(f"Encontrados {len(editais)} editais para processar")
+            # V19.6: Fila em streaming - colunas projetadas, keyset e prefetch limitado.
+            # V19.2: --force inclui editais ja processados pelo V19.
+            fila = prefetch_limitado(
+                self.repo.iterar_editais(
+                    limite=limite,
+                    apenas_sem_link=not reprocessar_todos,
+                    incluir_ja_processados=reprocessar_todos or force_reprocess,
+                    page_size=self.config.fila_page_size,
+                    ordem=self.config.ordem_fila,
+                    # V19.6: Leiloes vencidos nem saem do banco quando serao descartados
+                    pular_passados=self.config.filtrar_data_passada or self.config.excluir_data_passada,
+                ),
+                max_itens=self.config.fila_page_size * self.config.fila_prefetch_paginas,
+            )
+            total_str = str(limite) if limite else "?"
+
+            for i, edital in enumerate(fila, 1):
+                # V19.6: Orcamento de tempo - para limpo antes do proximo edital
+                if (
+                    self.config.deadline_segundos
+                    and time.monotonic() - inicio_execucao >= self.config.deadline_segundos
+                ):
+                    self.metrics.interrompido_deadline = True
+                    self.logger.warning(
+                        f"[DEADLINE] Orcamento de {self.config.deadline_segundos:.0f}s esgotado "
+                        f"apos {i - 1} editais; restantes ficam para a proxima execucao"
+                    )
+                    fila.close()
+                    break
 
-                for i, edital in enumerate(editais, 1):
-                    self.metrics.total_processados += 1
-                    pncp_id = edital.get("pncp_id", "?")
+                self.metrics.total_processados += 1
+                pncp_id = edital.get("pncp_id", "?")
 
-                    self.logger.info(f"[{i}/{len(editais)}] Processando {pncp_id}")
+                self.logger.info(f"[{i}/{total_str}] Processando {pncp_id}")
 
-                    try:
-                        resultado = self._processar_edital(edital)
+                try:
+                    resultado = self._processar_edital(edital)
+
+                    if resultado is EDITAL_INALTERADO:
+                        # V19.6: Nada mudou - resultado gravado anteriormente continua valido
+                        continue
 
-                        if resultado:
-                            proveniencia = resultado["proveniencia"]
+                    if resultado:
+                        proveniencia = resultado["proveniencia"]
 
-                            # V19.2: Passa run_id para rastreamento de idempotencia
-                            sucesso = self.repo.atualizar_link_leiloeiro_v19(
-                                pncp_id=resultado["pncp_id"],
-                                proveniencia=proveniencia,
-                                run_id=run_id,
-                            )
+                        # V19.2: Passa run_id para rastreamento de idempotencia
+                        # V19.6: Gravado em lote via write-back (journal + flush a cada N)
+                        sucesso = self.writeback.registrar_link(
+                            pncp_id=resultado["pncp_id"],
+                            proveniencia=proveniencia,
+                            run_id=run_id,
+                            manifest_hash=self._manifesto_atual,
+                        )
 
-                            if sucesso:
-                                self.metrics.sucessos += 1
-                                if proveniencia.valido:
-                                    self.logger.info(
-                                        f"  Link VALIDO ({resultado['fonte']}, conf={proveniencia.confianca}): "
-                                        f"{proveniencia.url_validada}"
-                                    )
-                                else:
-                                    self.logger.info(
-                                        f"  Link REJEITADO ({proveniencia.motivo_rejeicao}): "
-                                        f"{proveniencia.candidato_raw}"
-                                    )
+                        if sucesso:
+                            self.metrics.sucessos += 1
+                            if proveniencia.valido:
+                                self.logger.info(
+                                    f"  Link VALIDO ({resultado['fonte']}, conf={proveniencia.confianca}): "
+                                    f"{proveniencia.url_validada}"
+                                )
                             else:
-                                self.metrics.falhas += 1
+                                self.logger.info(
+                                    f"  Link REJEITADO ({proveniencia.motivo_rejeicao}): "
+                                    f"{proveniencia.candidato_raw}"
+                                )
                         else:
-                            # V19.2: Marcar como processado com run_id para idempotencia
-                            self.repo.marcar_processado_v19(
-                                pncp_id=pncp_id,
-                                run_id=run_id,
-                                resultado="no_link",
-                                motivo="sem_link"
-                            )
-                            self.metrics.url_nao_encontrada += 1
-                            self.logger.debug(f"  [IDEMPOTENCIA] Marcado como processado (no_link)")
-
-                    except Exception as e:
-                        self.logger.error(f"Erro processando {pncp_id}: {e}")
-                        # V19.2: Marcar erro para nao reprocessar infinitamente
-                        self.repo.marcar_processado_v19(
+                            self.metrics.falhas += 1
+                    else:
+                        # V19.2: Marcar como processado com run_id para idempotencia
+                        self.writeback.registrar_processado(
                             pncp_id=pncp_id,
                             run_id=run_id,
-                            resultado="error",
-                            motivo=str(e)[:100]
-                        )
-                        self.metrics.erros += 1
-                        self.metrics.falhas += 1
-
-                    if i % 10 == 0:
-                        self.logger.info(
-                            f"  Progresso: {i}/{len(editais)} | "
-                            f"Sucesso: {self.metrics.sucessos} | "
-                            f"URLs: PDF={self.metrics.url_extraida_pdf}, "
-                            f"Excel={self.metrics.url_extraida_excel}, "
-                            f"Descr={self.metrics.url_extraida_descricao}"
+                            resultado="no_link",
+                            manifest_hash=self._manifesto_atual,
                         )
+                        self.metrics.url_nao_encontrada += 1
+                        self.logger.debug(f"  [IDEMPOTENCIA] Marcado como processado (no_link)")
+
+                except Exception as e:
+                    self.logger.error(f"Erro processando {pncp_id}: {e}")
+                    # V19.2: Marcar erro para nao reprocessar infinitamente
+                    self.writeback.registrar_processado(
+                        pncp_id=pncp_id,
+                        run_id=run_id,
+                        resultado="error",
+                    )
+                    self.metrics.erros += 1
+                    self.metrics.falhas += 1
+
+                if i % 10 == 0:
+                    self.logger.info(
+                        f"  Progresso: {i}/{total_str} | "
+                        f"Sucesso: {self.metrics.sucessos} | "
+                        f"URLs: PDF={self.metrics.url_extraida_pdf}, "
+                        f"Excel={self.metrics.url_extraida_excel}, "
+                        f"Descr={self.metrics.url_extraida_descricao}"
+                    )
+
+            if self.metrics.total_processados == 0:
+                self.logger.info("Nenhum edital para processar (0 editais pendentes)")
+                # V19.5: NAO retorna cedo - continua para finally gravar run_report
 
             self.metrics.print_summary()
 
         finally:
+            self.url_validator.fechar()
+
+            # V19.6: Flush final do write-back (se falhar, journal fica para a proxima execucao)
+            if not self.writeback.fechar():
+                self.logger.error(
+                    f"[WRITE-BACK] {len(self.writeback.buffer)} resultados nao gravados; "
+                    f"serao reaplicados na proxima execucao"
+                )
+            self.logger.info(
+                f"[WRITE-BACK] {self.writeback.total_registrados} resultados em "
+                f"{self.writeback.total_flushes} flushes"
+            )
+
             # V19.5 FIX: SEMPRE gravar run_report, mesmo com 0 editais ou excecao
             self.logger.info(f"[RUN REPORT] Gravando relatorio para run_id={self.current_run_id}")
             run_report_ok = self.repo.inserir_run_report(
@@ -1887,6 +2787,7 @@ class AuditorV19:
             "links_validados": self.metrics.urls_validadas,
             "links_rejeitados_tld_colado": self.metrics.urls_rejeitadas_tld_colado,
             "erros": self.metrics.erros,
+            "interrompido_deadline": self.metrics.interrompido_deadline,
             "run_id": self.current_run_id,
         }
 
@@ -1941,6 +2842,29 @@ def main():
         action="store_true",
         help="V19.5: Levanta excecao se run_report falhar (util para CI)"
     )
+    parser.add_argument(
+        "--deadline",
+        type=parse_duracao,
+        default=None,
+        help="V19.6: Orcamento de tempo da execucao (ex: 20m, 1h30m, 90s)"
+    )
+    parser.add_argument(
+        "--ordem",
+        choices=["prazo", "recentes"],
+        default="prazo",
+        help="V19.6: Ordem da fila - prazo (leilao mais proximo) ou recentes (default: prazo)"
+    )
+    parser.add_argument(
+        "--ignorar-manifesto",
+        action="store_true",
+        help="V19.6: Reprocessa editais no_link mesmo sem mudanca nos arquivos"
+    )
+    parser.add_argument(
+        "--writeback-batch",
+        type=int,
+        default=100,
+        help="V19.6: Editais por flush do write-back em lote (default: 100)"
+    )
 
     args = parser.parse_args()
 
@@ -1956,6 +2880,10 @@ def main():
         supabase_key=os.environ.get("SUPABASE_SERVICE_KEY", os.environ.get("SUPABASE_KEY", "")),
         validar_urls=not args.sem_validacao,
         excluir_data_passada=args.excluir_data_passada,
+        writeback_batch_size=args.writeback_batch,
+        ordem_fila=args.ordem,
+        deadline_segundos=args.deadline,
+        usar_cache_manifesto=not args.ignorar_manifesto,
     )
 
     limite = args.limite
@@ -0,0 +1,32 @@
+"""
+Parser de duracao compartilhado pelos CLIs (--deadline).
+
+Usado pelo cloud_auditor_v19 e pelo lotes_extractor_v1 para converter
+"20m", "1h30m", "90s", "2h" ou segundos puros em segundos.
+
+Uso:
+    from duracao import parse_duracao
+
+    parser.add_argument("--deadline", type=parse_duracao)
+"""
+
+import argparse
+import re
+
+
+def parse_duracao(valor: str) -> float:
+    """
+    Converte duracao em segundos para o --deadline.
+
+    Aceita "20m", "1h30m", "90s", "2h" ou numero puro (segundos).
+    """
+    texto = str(valor).strip().lower()
+    if re.fullmatch(r"\d+(\.\d+)?", texto):
+        return float(texto)
+
+    partes = re.fullmatch(r"(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s)?", texto)
+    if not texto or not partes:
+        raise argparse.ArgumentTypeError(f"Duracao invalida: {valor!r} (use ex: 20m, 1h30m, 90s)")
+
+    horas, minutos, segundos = (int(p) if p else 0 for p in partes.groups())
+    return float(horas * 3600 + minutos * 60 + segundos)
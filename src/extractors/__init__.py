@@ -9,7 +9,11 @@ from .lotes_extractor_v1 import (
     LotesExtractorV1,
     ExtratorTabelas,
     ClassificadorPDF,
+    ParsedPDF,
     LotesRepository,
+    GravadorLotes,
+    ResultadoGravacao,
+    PlanoReextracao,
     LoteExtraido,
     ResultadoExtracao,
     ResultadoClassificacao,
@@ -20,6 +24,11 @@ from .lotes_extractor_v1 import (
     VERSAO_EXTRATOR,
 )
 
+from .campos_veiculo import (
+    CamposVeiculo,
+    extrair_campos_veiculo,
+)
+
 from .lotes_integration import (
     LotesIntegration,
     criar_integrador_lotes,
@@ -30,7 +39,11 @@ __all__ = [
     'LotesExtractorV1',
     'ExtratorTabelas',
     'ClassificadorPDF',
+    'ParsedPDF',
     'LotesRepository',
+    'GravadorLotes',
+    'ResultadoGravacao',
+    'PlanoReextracao',
     'LoteExtraido',
     'ResultadoExtracao',
     'ResultadoClassificacao',
@@ -39,6 +52,9 @@ __all__ = [
     'EstagioFalha',
     'CodigoErro',
     'VERSAO_EXTRATOR',
+    # Campos de veículo
+    'CamposVeiculo',
+    'extrair_campos_veiculo',
     # Integração
     'LotesIntegration',
     'criar_integrador_lotes',
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=============================================================================
+CAMPOS DE VEÍCULO - Extração pré-compilada para LoteExtraido
+=============================================================================
+Extrai placa, chassi, renavam, ano, marca e modelo da descrição de um lote.
+
+Versão: 1.2.0
+Data: 2026-02-04
+
+Chamado uma vez por linha de tabela - editais de DETRAN têm milhares de
+linhas, então o custo por linha importa:
+- Todos os padrões são compilados uma única vez, no import do módulo
+- Placa/chassi/renavam/ano saem de uma única varredura do texto (regex
+  combinada com lookaheads, que não consomem texto entre campos)
+- Marcas são detectadas por uma regex montada a partir de uma trie dos
+  nomes (prefixos compartilhados), em vez de ~35 buscas por linha
+
+Regras de prioridade (mesmas da versão por campo):
+- Placa: "PLACA ABC1234" > "PLACA ABC1D23" (Mercosul) > ABC1234 solta
+- Chassi: "CHASSI <17>" > 17 caracteres soltos com letras e números
+- Marca: ordem de MARCAS_CONHECIDAS (não a posição no texto)
+=============================================================================
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+# Lista de marcas conhecidas (ordenadas por especificidade/prioridade)
+MARCAS_CONHECIDAS = (
+    'MERCEDES-BENZ', 'MERCEDES',  # Mais específico primeiro
+    'VOLKSWAGEN', 'VW',
+    'CHEVROLET', 'GM',
+    'FIAT', 'FORD', 'TOYOTA', 'HONDA', 'HYUNDAI', 'RENAULT',
+    'NISSAN', 'JEEP', 'BMW', 'AUDI', 'PEUGEOT', 'CITROEN',
+    'MITSUBISHI', 'KIA', 'SUZUKI', 'YAMAHA', 'SCANIA',
+    'VOLVO', 'IVECO', 'MAN', 'DAF', 'AGRALE', 'MARCOPOLO',
+    'COMIL', 'MASCARELLO', 'CAIO', 'NEOBUS'
+)
+
+# Prefixos de 3 letras que não são placa
+PREFIXOS_PLACA_INVALIDOS = frozenset({'ANO', 'COR', 'CEP', 'RUA', 'NUM'})
+
+
+# =============================================================================
+# PADRÕES COMPILADOS
+# =============================================================================
+
+# Uma varredura, um grupo nomeado por campo. Cada alternativa é um lookahead
+# (largura zero): o match de um campo não "engole" o texto de outro, e cada
+# posição do texto é testada contra todos os padrões em C, dentro do re.
+_RE_CAMPOS = re.compile(
+    r'(?='
+    r'PLACA[:\s]+(?P<placa_l>[A-Z]{3})\s*[-]?\s*(?P<placa_n>\d{4})\b'
+    r'|PLACA[:\s]+(?P<placa_mercosul>[A-Z]{3}\d[A-Z]\d{2})\b'
+    r'|CHASSI[:\s]+(?P<chassi>[A-HJ-NPR-Z0-9]{17})\b'
+    r'|RENAVA[MN][:\s]+(?P<renavam>\d{9,11})\b'  # RENAVAM ou RENAVAN (typo comum)
+    r'|ANO[:\s]+(?P<ano>\d{4})'
+    r')'
+)
+
+# Fallbacks sem palavra-chave: só rodam se a varredura não achou o campo
+_RE_PLACA_SOLTA = re.compile(r'\b(?!ANO|COR|CEP|UNO|GOL|KIA)([A-Z]{3})\s*[-]?\s*(\d{4})\b')
+_RE_CHASSI_SOLTO = re.compile(r'\b([A-HJ-NPR-Z0-9]{17})\b')
+
+# Marca/modelo genéricos após tipo de veículo (quando nenhuma marca conhecida aparece)
+_RE_TIPO_VEICULO = re.compile(
+    r'(?:VEICULO|AUTOMOVEL|CARRO|CAMINH[AÃ]O|MOTO|ONIBUS|VAN|FURG[AÃ]O|PICKUP|UTILITARIO)[:\s]+'
+    r'([A-Z]+)\s*[/\s]\s*([A-Z0-9][A-Z0-9\s\-\.]+?)(?:,|\s+ANO|\s+PLACA|$)'
+)
+
+# Padrões de bloco (_extrair_via_regex): case-insensitive, placa mais permissiva
+_RE_BLOCO_PLACA = re.compile(r'PLACA\s*[:\s]?\s*([A-Z]{2,3}[-\s]?\d[A-Z0-9]?\d{2,4})', re.IGNORECASE)
+_RE_BLOCO_CHASSI = re.compile(r'CHASSI[:\s]+([A-HJ-NPR-Z0-9]{17})', re.IGNORECASE)
+_RE_BLOCO_RENAVAM = re.compile(r'RENAVA[MN]?\s*[:\s]*(\d{9,11})', re.IGNORECASE)
+_RE_BLOCO_RENAVAM_LINHA = re.compile(r'RENAVA[MN]\s*\n(\d{9,11})', re.IGNORECASE)
+
+
+def _regex_de_trie(palavras: Iterable[str]) -> str:
+    """
+    Monta uma alternação a partir da trie das palavras.
+
+    Ex: MAN, MARCOPOLO, MASCARELLO -> MA(?:N|RCOPOLO|SCARELLO). Nó terminal
+    com filhos vira grupo opcional guloso: MERCEDES(?:\\-BENZ)? tenta o nome
+    mais longo primeiro.
+    """
+    trie: Dict[str, dict] = {}
+    for palavra in palavras:
+        no = trie
+        for letra in palavra:
+            no = no.setdefault(letra, {})
+        no[''] = {}
+
+    def _montar(no: Dict[str, dict]) -> str:
+        terminal = '' in no
+        ramos = [re.escape(letra) + _montar(filho) for letra, filho in sorted(no.items()) if letra]
+        if not ramos:
+            return ''
+        corpo = ramos[0] if len(ramos) == 1 else '(?:' + '|'.join(ramos) + ')'
+        if terminal:
+            return '(?:' + corpo + ')?'
+        return corpo
+
+    return _montar(trie)
+
+
+_RE_MARCAS = re.compile(r'\b(' + _regex_de_trie(MARCAS_CONHECIDAS) + r')\b')
+_PRIORIDADE_MARCA = {marca: i for i, marca in enumerate(MARCAS_CONHECIDAS)}
+
+# Modelo após a marca: MARCA/MODELO ou MARCA MODELO (um padrão por marca, compilado no import)
+_RE_MODELO_POR_MARCA = {
+    marca: re.compile(
+        rf'\b{re.escape(marca)}\s*[/\s]\s*([A-Z0-9][A-Z0-9\s\-\.]+?)(?:,|\s+ANO|\s+PLACA|\s+COR|\s+CHASSI|\s+COMB|$)'
+    )
+    for marca in MARCAS_CONHECIDAS
+}
+
+
+# =============================================================================
+# EXTRAÇÃO
+# =============================================================================
+
+@dataclass(slots=True)
+class CamposVeiculo:
+    """Campos de veículo encontrados no texto (None = não encontrado)."""
+    placa: Optional[str] = None
+    chassi: Optional[str] = None
+    renavam: Optional[str] = None
+    ano_fabricacao: Optional[int] = None
+    marca: Optional[str] = None
+    modelo: Optional[str] = None
+    marca_conhecida: bool = False   # marca veio de MARCAS_CONHECIDAS (não do padrão genérico)
+
+
+def _limpar_modelo(modelo: str) -> Optional[str]:
+    """Limita tamanho e limpa pontuação final do modelo."""
+    modelo = modelo.strip()
+    if 2 <= len(modelo) <= 50:
+        return modelo.rstrip(' ,.-')
+    return None
+
+
+def extrair_campos_veiculo(texto: str) -> CamposVeiculo:
+    """
+    Extrai todos os campos de veículo de um texto JÁ EM MAIÚSCULAS.
+
+    Padrões suportados:
+    - Placa: ABC1234, ABC-1234, ABC1D23 (Mercosul)
+    - Chassi: 17 caracteres alfanuméricos (exceto I, O, Q)
+    - Renavam: 9-11 dígitos após RENAVAM (normalizado para 11)
+    - Ano: formatos 2013, 2013/2014, ANO 2013
+    - Marca/Modelo: marca conhecida (+ modelo após ela) ou padrão genérico
+    """
+    campos = CamposVeiculo()
+
+    # === PLACA / CHASSI / RENAVAM / ANO: uma varredura ===
+    # Guarda a primeira ocorrência de cada padrão (equivale a re.search por campo)
+    placa_classica = placa_mercosul = chassi = renavam = ano = None
+    for m in _RE_CAMPOS.finditer(texto):
+        grupo = m.lastgroup
+        if grupo == 'placa_n':
+            if placa_classica is None:
+                placa_classica = m.group('placa_l') + m.group('placa_n')
+        elif grupo == 'placa_mercosul':
+            if placa_mercosul is None:
+                placa_mercosul = m.group('placa_mercosul')
+        elif grupo == 'chassi':
+            if chassi is None:
+                chassi = m.group('chassi')
+        elif grupo == 'renavam':
+            if renavam is None:
+                renavam = m.group('renavam')
+        elif grupo == 'ano':
+            if ano is None:
+                ano = m.group('ano')
+        if placa_classica and chassi and renavam and ano:
+            break
+
+    # IMPORTANTE: Exigir palavra PLACA antes para evitar falsos positivos;
+    # sem ela, aceita placa solta que não comece com palavra comum (ANO, COR...)
+    if placa_classica:
+        campos.placa = placa_classica
+    elif placa_mercosul:
+        campos.placa = placa_mercosul
+    else:
+        m = _RE_PLACA_SOLTA.search(texto)
+        if m and m.group(1) not in PREFIXOS_PLACA_INVALIDOS:
+            campos.placa = m.group(1) + m.group(2)
+
+    if chassi:
+        campos.chassi = chassi
+    else:
+        m = _RE_CHASSI_SOLTO.search(texto)
+        if m:
+            candidato = m.group(1)
+            # Verificar se tem mix de letras e números (chassi real)
+            if not candidato.isdigit() and not candidato.isalpha():
+                campos.chassi = candidato
+
+    if renavam:
+        campos.renavam = renavam.zfill(11)  # Pad to 11 digits
+
+    if ano:
+        valor_ano = int(ano)
+        if 1900 <= valor_ano <= 2100:
+            campos.ano_fabricacao = valor_ano
+
+    # === MARCA E MODELO ===
+    marcas = {m.group(1) for m in _RE_MARCAS.finditer(texto)}
+    if marcas:
+        marca = min(marcas, key=_PRIORIDADE_MARCA.__getitem__)
+        campos.marca = marca
+        campos.marca_conhecida = True
+        m = _RE_MODELO_POR_MARCA[marca].search(texto)
+        if m:
+            campos.modelo = _limpar_modelo(m.group(1))
+    else:
+        # Padrão: MARCA/MODELO após tipo de veículo
+        m = _RE_TIPO_VEICULO.search(texto)
+        if m:
+            campos.marca = m.group(1).strip()
+            campos.modelo = _limpar_modelo(m.group(2))
+
+    return campos
+
+
+def extrair_campos_bloco(bloco: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    Placa, chassi e renavam de um bloco de texto livre (padrão Fátima/BA).
+
+    Returns:
+        (placa, chassi, renavam) - None para campo não encontrado
+    """
+    m = _RE_BLOCO_PLACA.search(bloco)
+    placa = m.group(1).replace(' ', '').replace('-', '') if m else None
+
+    m = _RE_BLOCO_CHASSI.search(bloco)
+    chassi = m.group(1) if m else None
+
+    # Número de 9-11 dígitos após RENAVAM ou em linha própria
+    m = _RE_BLOCO_RENAVAM.search(bloco) or _RE_BLOCO_RENAVAM_LINHA.search(bloco)
+    renavam = m.group(1) if m else None
+
+    return placa, chassi, renavam
@@ -31,21 +31,44 @@ Dependências:
 """
 
 import hashlib
+import io
 import json
 import logging
+import multiprocessing
 import os
 import re
+import shutil
+import signal
+import sqlite3
+import sys
 import tempfile
+import threading
 import time
 import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Set, Tuple, Union
 
 import pdfplumber
 from supabase import create_client, Client
 
+try:
+    from .campos_veiculo import extrair_campos_bloco, extrair_campos_veiculo
+except ImportError:
+    # Executado como script ou com src/extractors no sys.path
+    from campos_veiculo import extrair_campos_bloco, extrair_campos_veiculo
+
+try:
+    from src.core.duracao import parse_duracao
+except ImportError:
+    # Executado como script: parser de --deadline compartilhado com o auditor
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'core'))
+    from duracao import parse_duracao
+
 # =============================================================================
 # V1.1: VERIFICAR DISPONIBILIDADE DO OPENAI (LLM FALLBACK)
 # =============================================================================
@@ -57,6 +80,18 @@ except ImportError:
     OPENAI_AVAILABLE = False
     OpenAI = None
 
+# =============================================================================
+# V1.2: ÍNDICE DE IDENTIDADE DE VEÍCULOS (DEDUPLICAÇÃO ENTRE EDITAIS)
+# =============================================================================
+
+try:
+    from connectors.common.vehicle_index import VehicleIndex
+    INDICE_VEICULOS_DISPONIVEL = True
+except ImportError:
+    # Executado como script, sem a raiz do projeto no sys.path
+    INDICE_VEICULOS_DISPONIVEL = False
+    VehicleIndex = None
+
 # =============================================================================
 # CONFIGURAÇÃO DE LOGGING
 # =============================================================================
@@ -106,6 +141,48 @@ CABECALHOS_VEICULOS = [
     ['n', 'placa', 'renavam', 'chassi', 'marca'],
 ]
 
+# V1.2: Execução paralela (--workers)
+TIMEOUT_ARQUIVO_SEGUNDOS = 120     # Tempo máximo de extração por PDF
+TAREFAS_POR_WORKER = 20            # Recicla o processo após N PDFs (pdfplumber vaza memória)
+DOWNLOADS_SIMULTANEOS = 4          # Threads de download do Storage
+
+# V1.2: Linhas por upsert em lotes_leilao (GravadorLotes)
+TAMANHO_CHUNK_LOTES = 500
+# Classes SQLSTATE de erro de dado (22 = valor inválido, 23 = integridade):
+# só essas apontam linhas ruins e justificam bissecção do chunk
+CLASSES_SQLSTATE_LINHA = ('22', '23')
+
+# V1.2: Classificação por amostragem (ClassificadorPDF modo 'rapido')
+MODO_CLASSIFICACAO_RAPIDO = 'rapido'
+MODO_CLASSIFICACAO_COMPLETO = 'completo'
+LIMITE_PAGINAS_CLASSIFICACAO_COMPLETA = 30   # Até aqui, extract_tables() em todas as páginas
+AMOSTRA_PAGINAS_TABELA = 12                 # extract_tables() após PAGINA_LIMITE_FAMILIA (máximo)
+MIN_KEYWORDS_PAGINA_CANDIDATA = 2           # Keywords distintas de KEYWORDS_LOTES no texto da página
+MIN_CARACTERES_PAGINA_CANDIDATA = 200       # Densidade mínima de texto de uma página com tabela de lotes
+
+# V1.2: Extração paralela das páginas de um mesmo PDF (--workers-paginas)
+MIN_PAGINAS_EXTRACAO_PARALELA = 40   # Páginas pendentes de extract_tables() para compensar o pool
+PAGINAS_POR_FAIXA = 20               # Páginas contíguas por tarefa do pool
+
+# V1.2: Plano de (re)extração a partir do manifesto de arquivos_processados_lotes
+STATUS_ARQUIVO_REPROCESSAR = ('erro', 'pendente', 'parcial')
+STATUS_ERRO_PERMANENTE = 'erro_permanente'  # Só volta com outro VERSAO_EXTRATOR
+CODIGOS_ERRO_PERMANENTE = frozenset({       # Mesmo arquivo + mesma versão = mesma falha
+    'PDF_ESCANEADO', 'PDF_CORROMPIDO', 'TIPO_NAO_SUPORTADO',
+})
+MOTIVOS_REEXTRACAO = ('novo', 'versao_antiga', 'com_falha')
+MAX_TENTATIVAS_ARQUIVO = 5           # Falhas seguidas do mesmo hash antes de desistir
+BACKOFF_TENTATIVA_HORAS = 1          # Espera após a 1ª falha; dobra a cada tentativa
+TAMANHO_PAGINA_CONSULTA = 1000       # Linhas por request (max-rows padrão do PostgREST)
+
+# V1.2: LLM em blocos (documentos longos não são mais truncados em 8000 caracteres)
+VERSAO_PROMPT_LLM = "lotes_v1"       # Mudar ao alterar os prompts (invalida o cache)
+CHARS_POR_TOKEN = 4                  # Estimativa sem tokenizer (texto em português)
+MAX_TOKENS_BLOCO_LLM = 2000          # Tokens de entrada por bloco
+MAX_BLOCOS_LLM = 20                  # Orçamento de blocos por documento
+LLM_BLOCOS_SIMULTANEOS = 4           # Chamadas concorrentes por documento
+LLM_REQUISICOES_POR_MINUTO = 60      # Limite de taxa do LLMExtractor (todas as threads)
+
 
 # =============================================================================
 # ENUMS E TIPOS
@@ -178,9 +255,21 @@ class ValidacaoError(LotesExtractorError):
 # DATA CLASSES
 # =============================================================================
 
-@dataclass
+# V1.2: Limpeza de campos por linha (compilados uma única vez)
+_RE_ESPACOS = re.compile(r'\s+')
+_RE_QUEBRAS = re.compile(r'\n+')
+_RE_PREFIXO_LOTE = re.compile(r'^(lote|item|n[°º.]?)\s*', re.IGNORECASE)
+_RE_NAO_NUMERICO = re.compile(r'[^\d.]')
+
+
+@dataclass(slots=True)
 class LoteExtraido:
-    """Representa um lote extraído de um PDF."""
+    """
+    Representa um lote extraído de um PDF.
+
+    V1.2: slots=True - editais de DETRAN geram milhares de instâncias por
+    arquivo; sem __dict__ por linha.
+    """
     numero_lote_raw: str
     descricao_raw: str
     valor_raw: Optional[str] = None
@@ -199,6 +288,9 @@ class LoteExtraido:
     modelo: Optional[str] = None
     ano_fabricacao: Optional[int] = None
 
+    # V1.2: Veículo canônico no índice de identidade (mesmo veículo em outros editais)
+    vehicle_id: Optional[str] = None
+
     # Metadados
     fonte_pagina: Optional[int] = None
     linha_tabela: Optional[int] = None
@@ -225,9 +317,9 @@ class LoteExtraido:
         if not texto:
             return ""
         # Remove espaços extras e normaliza
-        limpo = re.sub(r'\s+', ' ', str(texto).strip())
+        limpo = _RE_ESPACOS.sub(' ', str(texto).strip())
         # Remove prefixos comuns
-        limpo = re.sub(r'^(lote|item|n[°º.]?)\s*', '', limpo, flags=re.IGNORECASE)
+        limpo = _RE_PREFIXO_LOTE.sub('', limpo)
         return limpo.strip()
 
     def _limpar_descricao(self, texto: str) -> str:
@@ -235,9 +327,9 @@ class LoteExtraido:
         if not texto:
             return ""
         # Remove quebras de linha múltiplas
-        limpo = re.sub(r'\n+', ' ', str(texto))
+        limpo = _RE_QUEBRAS.sub(' ', str(texto))
         # Remove espaços extras
-        limpo = re.sub(r'\s+', ' ', limpo)
+        limpo = _RE_ESPACOS.sub(' ', limpo)
         return limpo.strip()
 
     def _limpar_valor(self, texto: str) -> Dict[str, Any]:
@@ -274,7 +366,7 @@ class LoteExtraido:
                     limpo = limpo.replace('.', '')
 
             # Remove caracteres não numéricos restantes (exceto ponto)
-            limpo = re.sub(r'[^\d.]', '', limpo)
+            limpo = _RE_NAO_NUMERICO.sub('', limpo)
 
             if not limpo:
                 return {'sucesso': False, 'texto_original': texto, 'motivo': 'sem_digitos'}
@@ -287,16 +379,12 @@ class LoteExtraido:
 
     def _extrair_dados_veiculo_do_texto(self):
         """
-        Extrai dados de veículo do texto da descrição usando regex.
+        Extrai dados de veículo do texto da descrição.
 
         Só preenche campos que ainda estão vazios (None).
 
-        Padrões suportados:
-        - Placa: ABC1234, ABC-1234, ABC1D23 (Mercosul)
-        - Chassi: 17 caracteres alfanuméricos
-        - Renavam: 9-11 dígitos
-        - Ano: formatos 2013, 2013/2014, ANO 2013
-        - Marca/Modelo: após palavras-chave específicas
+        V1.2: Padrões pré-compilados e varredura única em campos_veiculo
+        (placa, chassi, renavam, ano, marca/modelo).
         """
         # Usar descrição raw + texto fonte completo para maior cobertura
         texto = ' '.join(filter(None, [
@@ -307,137 +395,24 @@ class LoteExtraido:
         if not texto or len(texto) < 10:
             return
 
-        # === PLACA ===
-        # Formatos: ABC1234, ABC-1234, ABC 1234, ABC1D23 (Mercosul)
-        # IMPORTANTE: Exigir palavra PLACA antes para evitar falsos positivos
-        if not self.placa:
-            # Padrão com palavra PLACA explícita (mais confiável)
-            placa_match = re.search(
-                r'PLACA[:\s]+([A-Z]{3})\s*[-]?\s*(\d{4})\b',
-                texto
-            )
-            if placa_match:
-                self.placa = f"{placa_match.group(1)}{placa_match.group(2)}"
-            else:
-                # Padrão Mercosul com palavra PLACA
-                placa_mercosul = re.search(
-                    r'PLACA[:\s]+([A-Z]{3}\d[A-Z]\d{2})\b',
-                    texto
-                )
-                if placa_mercosul:
-                    self.placa = placa_mercosul.group(1)
-                else:
-                    # Fallback: placa sem palavra-chave, mas com padrão válido
-                    # Excluir palavras comuns que podem ser confundidas (ANO, COR, etc)
-                    placa_fallback = re.search(
-                        r'\b(?!ANO|COR|CEP|UNO|GOL|KIA)([A-Z]{3})\s*[-]?\s*(\d{4})\b',
-                        texto
-                    )
-                    if placa_fallback:
-                        candidata = f"{placa_fallback.group(1)}{placa_fallback.group(2)}"
-                        # Validar que parece uma placa real (não é palavra comum)
-                        palavras_invalidas = ['ANO', 'COR', 'CEP', 'RUA', 'NUM']
-                        if candidata[:3] not in palavras_invalidas:
-                            self.placa = candidata
-
-        # === CHASSI ===
-        # 17 caracteres alfanuméricos (exceto I, O, Q)
-        if not self.chassi:
-            # Preferir com palavra CHASSI
-            chassi_match = re.search(
-                r'CHASSI[:\s]+([A-HJ-NPR-Z0-9]{17})\b',
-                texto
-            )
-            if chassi_match:
-                self.chassi = chassi_match.group(1)
-            else:
-                # Fallback: padrão de chassi sem palavra-chave
-                chassi_fallback = re.search(
-                    r'\b([A-HJ-NPR-Z0-9]{17})\b',
-                    texto
-                )
-                if chassi_fallback:
-                    candidato = chassi_fallback.group(1)
-                    # Verificar se tem mix de letras e números (chassi real)
-                    tem_letra = any(c.isalpha() for c in candidato)
-                    tem_numero = any(c.isdigit() for c in candidato)
-                    if tem_letra and tem_numero:
-                        self.chassi = candidato
-
-        # === RENAVAM ===
-        # 11 dígitos (padrão atual) - exigir palavra RENAVAM para evitar confusão
-        if not self.renavam:
-            renavam_match = re.search(
-                r'RENAVA[MN][:\s]+(\d{9,11})\b',  # RENAVAM ou RENAVAN (typo comum)
-                texto
-            )
-            if renavam_match:
-                self.renavam = renavam_match.group(1).zfill(11)  # Pad to 11 digits
-
-        # === ANO ===
-        if not self.ano_fabricacao:
-            # Formato: ANO 2013/2014, ANO 2013, ANO: 2013
-            ano_match = re.search(
-                r'ANO[:\s]+(\d{4})(?:\s*/\s*(\d{4}))?',
-                texto
-            )
-            if ano_match:
-                try:
-                    ano = int(ano_match.group(1))
-                    if 1900 <= ano <= 2100:
-                        self.ano_fabricacao = ano
-                except ValueError:
-                    pass
-
-        # === MARCA E MODELO ===
-        # Extrair marca/modelo de padrões comuns
-        if not self.marca or not self.modelo:
-            # Lista de marcas conhecidas (ordenadas por especificidade)
-            marcas_conhecidas = [
-                'MERCEDES-BENZ', 'MERCEDES',  # Mais específico primeiro
-                'VOLKSWAGEN', 'VW',
-                'CHEVROLET', 'GM',
-                'FIAT', 'FORD', 'TOYOTA', 'HONDA', 'HYUNDAI', 'RENAULT',
-                'NISSAN', 'JEEP', 'BMW', 'AUDI', 'PEUGEOT', 'CITROEN',
-                'MITSUBISHI', 'KIA', 'SUZUKI', 'YAMAHA', 'SCANIA',
-                'VOLVO', 'IVECO', 'MAN', 'DAF', 'AGRALE', 'MARCOPOLO',
-                'COMIL', 'MASCARELLO', 'CAIO', 'NEOBUS'
-            ]
+        campos = extrair_campos_veiculo(texto)
 
-            # Procurar marca conhecida no texto
-            for marca in marcas_conhecidas:
-                # Usar word boundary para evitar match parcial
-                if re.search(rf'\b{marca}\b', texto):
-                    if not self.marca:
-                        self.marca = marca
-
-                    # Tentar extrair modelo após a marca
-                    if not self.modelo:
-                        # Padrão: MARCA/MODELO ou MARCA MODELO
-                        modelo_match = re.search(
-                            rf'\b{marca}\s*[/\s]\s*([A-Z0-9][A-Z0-9\s\-\.]+?)(?:,|\s+ANO|\s+PLACA|\s+COR|\s+CHASSI|\s+COMB|$)',
-                            texto
-                        )
-                        if modelo_match:
-                            modelo = modelo_match.group(1).strip()
-                            # Limitar tamanho e limpar
-                            if 2 <= len(modelo) <= 50:
-                                self.modelo = modelo.rstrip(' ,.-')
-                    break
+        if not self.placa and campos.placa:
+            self.placa = campos.placa
+        if not self.chassi and campos.chassi:
+            self.chassi = campos.chassi
+        if not self.renavam and campos.renavam:
+            self.renavam = campos.renavam
+        if not self.ano_fabricacao and campos.ano_fabricacao:
+            self.ano_fabricacao = campos.ano_fabricacao
 
-            # Se não encontrou marca conhecida, tentar padrão genérico
+        # Marca conhecida no texto completa marca e/ou modelo; o padrão
+        # genérico (tipo de veículo) só vale se ainda não há marca
+        if campos.marca and (campos.marca_conhecida or not self.marca):
             if not self.marca:
-                # Padrão: MARCA/MODELO após tipo de veículo
-                tipo_veiculo = re.search(
-                    r'(?:VEICULO|AUTOMOVEL|CARRO|CAMINH[AÃ]O|MOTO|ONIBUS|VAN|FURG[AÃ]O|PICKUP|UTILITARIO)[:\s]+([A-Z]+)\s*[/\s]\s*([A-Z0-9][A-Z0-9\s\-\.]+?)(?:,|\s+ANO|\s+PLACA|$)',
-                    texto
-                )
-                if tipo_veiculo:
-                    self.marca = tipo_veiculo.group(1).strip()
-                    if not self.modelo:
-                        modelo = tipo_veiculo.group(2).strip()
-                        if 2 <= len(modelo) <= 50:
-                            self.modelo = modelo.rstrip(' ,.-')
+                self.marca = campos.marca
+            if not self.modelo and campos.modelo:
+                self.modelo = campos.modelo
 
     def gerar_id_interno(self, edital_id: int) -> str:
         """
@@ -460,6 +435,9 @@ class ResultadoClassificacao:
     total_tabelas: int = 0
     processavel: bool = True
     motivo_nao_processavel: Optional[str] = None
+    # V1.2: Modo usado e páginas que passaram por extract_tables() na classificação
+    modo: str = MODO_CLASSIFICACAO_COMPLETO
+    paginas_amostradas: int = 0
 
 
 @dataclass
@@ -470,6 +448,7 @@ class ResultadoExtracao:
     erros: List[Dict[str, Any]] = field(default_factory=list)
     familia_pdf: Optional[FamiliaPDF] = None
     tempo_processamento_ms: int = 0
+    parcial: bool = False               # V1.2: Blocos do LLM perdidos (falha ou orçamento)
 
 
 @dataclass
@@ -489,9 +468,45 @@ class MetricasExecucao:
     llm_lotes_extraidos: int = 0
     llm_cost_usd: float = 0.0
 
+    # V1.2: Execução interrompida pelo orçamento de tempo (--deadline)
+    interrompido_deadline: bool = False
+
+    # V1.2: Lotes cujo veículo já estava no índice (outro edital/fonte)
+    lotes_veiculo_duplicado: int = 0
+
+    # V1.2: Arquivos gravados com extração LLM incompleta (ResultadoExtracao.parcial)
+    arquivos_parciais: int = 0
+
     def finalizar(self):
         self.fim = datetime.now()
 
+    def registrar_familia(self, familia_pdf: Optional[FamiliaPDF]):
+        """Conta um arquivo na família estrutural detectada."""
+        if familia_pdf:
+            chave = familia_pdf.value
+            self.por_familia[chave] = self.por_familia.get(chave, 0) + 1
+
+    def mesclar(self, outra: 'MetricasExecucao') -> 'MetricasExecucao':
+        """
+        V1.2: Soma as métricas de um worker nas métricas da execução.
+
+        Contadores e custo LLM são somados; `inicio`, `fim` e `total_editais`
+        pertencem à execução e não são alterados.
+        """
+        self.total_arquivos += outra.total_arquivos
+        self.total_lotes_extraidos += outra.total_lotes_extraidos
+        self.total_quarentena += outra.total_quarentena
+        for familia, qtd in outra.por_familia.items():
+            self.por_familia[familia] = self.por_familia.get(familia, 0) + qtd
+        self.erros.extend(outra.erros)
+        self.llm_requests += outra.llm_requests
+        self.llm_lotes_extraidos += outra.llm_lotes_extraidos
+        self.llm_cost_usd += outra.llm_cost_usd
+        self.interrompido_deadline = self.interrompido_deadline or outra.interrompido_deadline
+        self.lotes_veiculo_duplicado += outra.lotes_veiculo_duplicado
+        self.arquivos_parciais += outra.arquivos_parciais
+        return self
+
     def to_dict(self) -> Dict[str, Any]:
         return {
             'inicio': self.inicio.isoformat(),
@@ -507,9 +522,144 @@ class MetricasExecucao:
             'llm_requests': self.llm_requests,
             'llm_lotes_extraidos': self.llm_lotes_extraidos,
             'llm_cost_usd': self.llm_cost_usd,
+            # V1.2: Deadline
+            'interrompido_deadline': self.interrompido_deadline,
+            # V1.2: Índice de identidade de veículos
+            'lotes_veiculo_duplicado': self.lotes_veiculo_duplicado,
+            'arquivos_parciais': self.arquivos_parciais,
         }
 
 
+# =============================================================================
+# V1.2: DOCUMENTO PDF PARSEADO UMA ÚNICA VEZ
+# =============================================================================
+
+# PDF de entrada: caminho local ou conteúdo em memória (Storage, Auditor)
+FontePDF = Union[str, 'os.PathLike[str]', bytes, bytearray, memoryview, BinaryIO]
+
+
+def _stream_em_memoria(fonte: Union[bytes, bytearray, memoryview, BinaryIO]) -> BinaryIO:
+    """
+    Stream seekable para o pdfplumber sobre um PDF em memória.
+
+    BytesIO(bytes) compartilha o buffer do objeto imutável (sem cópia);
+    memoryview sobre um bytes inteiro reaproveita o objeto original. Só
+    bytearray/memoryview de fatia são copiados.
+    """
+    if isinstance(fonte, memoryview):
+        if isinstance(fonte.obj, bytes) and fonte.contiguous and fonte.nbytes == len(fonte.obj):
+            fonte = fonte.obj
+        else:
+            fonte = fonte.tobytes()
+    if isinstance(fonte, (bytes, bytearray)):
+        return io.BytesIO(fonte)
+
+    fonte.seek(0)
+    return fonte
+
+
+class ParsedPDF:
+    """
+    PDF aberto uma única vez, com texto e tabelas memoizados por página.
+
+    Classificação, todos os níveis da cascata e o fallback LLM compartilham
+    a mesma instância: cada página passa por extract_text()/extract_tables()
+    no máximo uma vez, em vez de uma vez por etapa.
+
+    Aceita caminho local ou o PDF em memória (bytes, BytesIO, memoryview),
+    que vai direto ao pdfplumber sem passar por arquivo temporário.
+
+    Uso:
+        with ParsedPDF(caminho_pdf) as documento:
+            classificacao = classificador.classificar(documento)
+            texto = documento.texto_pagina(1)
+
+        with ParsedPDF(pdf_bytes, nome='edital.pdf') as documento:
+            ...
+    """
+
+    def __init__(self, fonte: FontePDF, nome: Optional[str] = None):
+        self.fonte = fonte
+        self.caminho_pdf = os.fspath(fonte) if isinstance(fonte, (str, os.PathLike)) else None
+        self.nome = nome or (os.path.basename(self.caminho_pdf) if self.caminho_pdf else '<memória>')
+        self._pdf = None
+        self._textos: Dict[int, str] = {}
+        self._tabelas: Dict[int, List[List]] = {}
+
+    def __enter__(self) -> 'ParsedPDF':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"ParsedPDF({self.caminho_pdf or self.nome!r})"
+
+    @property
+    def pdf(self):
+        """Documento pdfplumber (aberto no primeiro acesso)."""
+        if self._pdf is None:
+            if self.caminho_pdf:
+                self._pdf = pdfplumber.open(self.caminho_pdf)
+            else:
+                self._pdf = pdfplumber.open(_stream_em_memoria(self.fonte))
+        return self._pdf
+
+    @property
+    def total_paginas(self) -> int:
+        return len(self.pdf.pages)
+
+    def texto_pagina(self, num_pagina: int) -> str:
+        """Texto da página (1-indexed), extraído uma única vez."""
+        if num_pagina not in self._textos:
+            self._textos[num_pagina] = self.pdf.pages[num_pagina - 1].extract_text() or ""
+        return self._textos[num_pagina]
+
+    def tabelas_pagina(self, num_pagina: int) -> List[List]:
+        """Tabelas da página (1-indexed), extraídas uma única vez."""
+        if num_pagina not in self._tabelas:
+            self._tabelas[num_pagina] = self.pdf.pages[num_pagina - 1].extract_tables() or []
+        return self._tabelas[num_pagina]
+
+    def tabelas_extraidas(self, num_pagina: int) -> bool:
+        """True se extract_tables() já rodou na página (ex: na classificação)."""
+        return num_pagina in self._tabelas
+
+    @contextmanager
+    def caminho_para_processos(self) -> Iterator[str]:
+        """
+        Caminho que outro processo abre por conta própria: o arquivo local,
+        ou o PDF em memória gravado uma única vez num temporário (removido
+        na saída). As tarefas do pool recebem só o caminho - os bytes não
+        são serializados de novo a cada faixa de páginas.
+        """
+        if self.caminho_pdf:
+            yield self.caminho_pdf
+            return
+
+        arquivo = tempfile.NamedTemporaryFile(prefix='lotes_', suffix='.pdf', delete=False)
+        try:
+            with arquivo:
+                if isinstance(self.fonte, (bytes, bytearray, memoryview)):
+                    arquivo.write(self.fonte)
+                else:
+                    posicao = self.fonte.tell()
+                    shutil.copyfileobj(_stream_em_memoria(self.fonte), arquivo)
+                    self.fonte.seek(posicao)
+            yield arquivo.name
+        finally:
+            os.unlink(arquivo.name)
+
+    def textos(self) -> List[str]:
+        """Texto de todas as páginas, em ordem."""
+        return [self.texto_pagina(n) for n in range(1, self.total_paginas + 1)]
+
+    def close(self):
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
+
+
 # =============================================================================
 # CLASSIFICADOR DE PDF
 # =============================================================================
@@ -523,87 +673,110 @@ class ClassificadorPDF:
     - PDF_TABELA_MEIO_FIM: Tabelas após página 3
     - PDF_NATIVO_SEM_TABELA: Texto extraível mas sem tabelas
     - PDF_ESCANEADO: Sem texto extraível (<100 caracteres em 3 páginas)
+
+    V1.2: Modos de classificação:
+    - 'completo': extract_tables() em todas as páginas
+    - 'rapido' (default): em PDFs com mais de LIMITE_PAGINAS_CLASSIFICACAO_COMPLETA
+      páginas, só as primeiras PAGINA_LIMITE_FAMILIA passam por extract_tables();
+      nas demais, um pré-filtro de texto (densidade + KEYWORDS_LOTES) escolhe as
+      candidatas e no máximo AMOSTRA_PAGINAS_TABELA delas são confirmadas.
+      O custo de detecção de tabelas fica limitado independente do tamanho
+      do PDF, e a extração só roda nas páginas sinalizadas.
     """
 
-    def classificar(self, caminho_pdf: str) -> ResultadoClassificacao:
+    def __init__(self, modo: str = MODO_CLASSIFICACAO_RAPIDO):
+        if modo not in (MODO_CLASSIFICACAO_RAPIDO, MODO_CLASSIFICACAO_COMPLETO):
+            raise ValueError(f"Modo de classificação inválido: {modo}")
+        self.modo = modo
+
+    def classificar(self, fonte: Union[FontePDF, ParsedPDF]) -> ResultadoClassificacao:
         """
         Classifica um PDF em uma das famílias estruturais.
 
         Args:
-            caminho_pdf: Caminho completo para o arquivo PDF
+            fonte: Caminho do PDF, PDF em memória (bytes/BytesIO/memoryview)
+                ou ParsedPDF já aberto (V1.2: texto/tabelas ficam memoizados
+                para a extração)
 
         Returns:
             ResultadoClassificacao com família identificada e metadados
         """
+        if isinstance(fonte, ParsedPDF):
+            return self._classificar_documento(fonte)
+
+        with ParsedPDF(fonte) as documento:
+            return self._classificar_documento(documento)
+
+    def _classificar_documento(self, documento: ParsedPDF) -> ResultadoClassificacao:
+        """Classifica um ParsedPDF (ver classificar)."""
+        caminho_pdf = documento.caminho_pdf or documento.nome
         logger.info(f"Classificando PDF: {caminho_pdf}")
 
         try:
-            with pdfplumber.open(caminho_pdf) as pdf:
-                total_paginas = len(pdf.pages)
-                total_caracteres = 0
-                paginas_com_tabelas = []
-                total_tabelas = 0
-
-                # Analisar todas as páginas
-                for i, pagina in enumerate(pdf.pages):
-                    num_pagina = i + 1
-
-                    # Extrair texto
-                    texto = pagina.extract_text() or ""
-                    total_caracteres += len(texto)
-
-                    # Detectar tabelas
-                    tabelas = pagina.extract_tables() or []
-                    if tabelas:
-                        # Filtrar tabelas relevantes (ignorar cabeçalhos vazios)
-                        tabelas_relevantes = [t for t in tabelas if self._tabela_relevante(t)]
-                        if tabelas_relevantes:
-                            paginas_com_tabelas.append(num_pagina)
-                            total_tabelas += len(tabelas_relevantes)
-
-                # Classificar baseado nas características
-                if total_caracteres < THRESHOLD_CARACTERES_ESCANEADO:
-                    return ResultadoClassificacao(
-                        familia=FamiliaPDF.PDF_ESCANEADO,
-                        total_caracteres=total_caracteres,
-                        total_paginas=total_paginas,
-                        paginas_com_tabelas=paginas_com_tabelas,
-                        total_tabelas=total_tabelas,
-                        processavel=False,
-                        motivo_nao_processavel=f"PDF escaneado - apenas {total_caracteres} caracteres extraídos"
-                    )
+            total_paginas = documento.total_paginas
 
-                if not paginas_com_tabelas:
-                    return ResultadoClassificacao(
-                        familia=FamiliaPDF.PDF_NATIVO_SEM_TABELA,
-                        total_caracteres=total_caracteres,
-                        total_paginas=total_paginas,
-                        paginas_com_tabelas=[],
-                        total_tabelas=0,
-                        processavel=True,  # Pode tentar extração via regex
-                        motivo_nao_processavel=None
-                    )
+            if self.modo == MODO_CLASSIFICACAO_RAPIDO and total_paginas > LIMITE_PAGINAS_CLASSIFICACAO_COMPLETA:
+                modo = MODO_CLASSIFICACAO_RAPIDO
+                total_caracteres, paginas_com_tabelas, total_tabelas, paginas_amostradas = (
+                    self._analisar_por_amostragem(documento, total_paginas)
+                )
+            else:
+                modo = MODO_CLASSIFICACAO_COMPLETO
+                total_caracteres, paginas_com_tabelas, total_tabelas, paginas_amostradas = (
+                    self._analisar_todas_paginas(documento, total_paginas)
+                )
 
-                primeira_tabela = min(paginas_com_tabelas)
+            # Classificar baseado nas características
+            if total_caracteres < THRESHOLD_CARACTERES_ESCANEADO:
+                return ResultadoClassificacao(
+                    familia=FamiliaPDF.PDF_ESCANEADO,
+                    total_caracteres=total_caracteres,
+                    total_paginas=total_paginas,
+                    paginas_com_tabelas=paginas_com_tabelas,
+                    total_tabelas=total_tabelas,
+                    processavel=False,
+                    motivo_nao_processavel=f"PDF escaneado - apenas {total_caracteres} caracteres extraídos",
+                    modo=modo,
+                    paginas_amostradas=paginas_amostradas
+                )
 
-                if primeira_tabela <= PAGINA_LIMITE_FAMILIA:
-                    return ResultadoClassificacao(
-                        familia=FamiliaPDF.PDF_TABELA_INICIO,
-                        total_caracteres=total_caracteres,
-                        total_paginas=total_paginas,
-                        paginas_com_tabelas=paginas_com_tabelas,
-                        total_tabelas=total_tabelas,
-                        processavel=True
-                    )
-                else:
-                    return ResultadoClassificacao(
-                        familia=FamiliaPDF.PDF_TABELA_MEIO_FIM,
-                        total_caracteres=total_caracteres,
-                        total_paginas=total_paginas,
-                        paginas_com_tabelas=paginas_com_tabelas,
-                        total_tabelas=total_tabelas,
-                        processavel=True
-                    )
+            if not paginas_com_tabelas:
+                return ResultadoClassificacao(
+                    familia=FamiliaPDF.PDF_NATIVO_SEM_TABELA,
+                    total_caracteres=total_caracteres,
+                    total_paginas=total_paginas,
+                    paginas_com_tabelas=[],
+                    total_tabelas=0,
+                    processavel=True,  # Pode tentar extração via regex
+                    motivo_nao_processavel=None,
+                    modo=modo,
+                    paginas_amostradas=paginas_amostradas
+                )
+
+            primeira_tabela = min(paginas_com_tabelas)
+
+            if primeira_tabela <= PAGINA_LIMITE_FAMILIA:
+                return ResultadoClassificacao(
+                    familia=FamiliaPDF.PDF_TABELA_INICIO,
+                    total_caracteres=total_caracteres,
+                    total_paginas=total_paginas,
+                    paginas_com_tabelas=paginas_com_tabelas,
+                    total_tabelas=total_tabelas,
+                    processavel=True,
+                    modo=modo,
+                    paginas_amostradas=paginas_amostradas
+                )
+            else:
+                return ResultadoClassificacao(
+                    familia=FamiliaPDF.PDF_TABELA_MEIO_FIM,
+                    total_caracteres=total_caracteres,
+                    total_paginas=total_paginas,
+                    paginas_com_tabelas=paginas_com_tabelas,
+                    total_tabelas=total_tabelas,
+                    processavel=True,
+                    modo=modo,
+                    paginas_amostradas=paginas_amostradas
+                )
 
         except Exception as e:
             logger.error(f"Erro ao classificar PDF {caminho_pdf}: {str(e)}")
@@ -615,6 +788,116 @@ class ClassificadorPDF:
                 motivo_nao_processavel=f"Erro ao abrir PDF: {str(e)}"
             )
 
+    def _analisar_todas_paginas(
+        self,
+        documento: ParsedPDF,
+        total_paginas: int
+    ) -> Tuple[int, List[int], int, int]:
+        """Texto e tabelas de todas as páginas (modo completo)."""
+        total_caracteres = 0
+        paginas_com_tabelas = []
+        total_tabelas = 0
+
+        # Analisar todas as páginas
+        for num_pagina in range(1, total_paginas + 1):
+            # Extrair texto
+            texto = documento.texto_pagina(num_pagina)
+            total_caracteres += len(texto)
+
+            # Detectar tabelas (filtrando relevantes: ignora cabeçalhos vazios)
+            relevantes = self._contar_tabelas_relevantes(documento, num_pagina)
+            if relevantes:
+                paginas_com_tabelas.append(num_pagina)
+                total_tabelas += relevantes
+
+        return total_caracteres, paginas_com_tabelas, total_tabelas, total_paginas
+
+    def _analisar_por_amostragem(
+        self,
+        documento: ParsedPDF,
+        total_paginas: int
+    ) -> Tuple[int, List[int], int, int]:
+        """
+        V1.2: Modo rápido - extract_tables() em no máximo
+        PAGINA_LIMITE_FAMILIA + AMOSTRA_PAGINAS_TABELA páginas.
+
+        1. Primeiras PAGINA_LIMITE_FAMILIA páginas: análise completa (decide
+           PDF_TABELA_INICIO exatamente como o modo completo)
+        2. Demais: só texto (bem mais barato, e fica memoizado para regex/LLM);
+           candidata = densidade mínima + KEYWORDS_LOTES distintas no texto
+           (o cabeçalho de uma tabela relevante aparece no texto da página)
+        3. Amostra: metade das vagas para as candidatas com mais keywords,
+           o resto espaçado uniformemente entre as demais candidatas
+        4. Se alguma candidata da amostra tem tabela relevante, as candidatas
+           fora da amostra também são sinalizadas (a extração confirma)
+
+        Returns:
+            (total_caracteres, paginas_com_tabelas, total_tabelas, paginas_amostradas)
+        """
+        total_caracteres = 0
+        paginas_com_tabelas = []
+        total_tabelas = 0
+        pontuacao: Dict[int, int] = {}
+
+        for num_pagina in range(1, total_paginas + 1):
+            texto = documento.texto_pagina(num_pagina)
+            total_caracteres += len(texto)
+
+            if num_pagina <= PAGINA_LIMITE_FAMILIA:
+                relevantes = self._contar_tabelas_relevantes(documento, num_pagina)
+                if relevantes:
+                    paginas_com_tabelas.append(num_pagina)
+                    total_tabelas += relevantes
+                continue
+
+            if len(texto) < MIN_CARACTERES_PAGINA_CANDIDATA:
+                continue
+            texto_normalizado = self._normalizar_texto(texto)
+            keywords = sum(1 for kw in KEYWORDS_LOTES if kw in texto_normalizado)
+            if keywords >= MIN_KEYWORDS_PAGINA_CANDIDATA:
+                pontuacao[num_pagina] = keywords
+
+        amostra = self._selecionar_amostra(pontuacao)
+        confirmadas = []
+        for num_pagina in amostra:
+            relevantes = self._contar_tabelas_relevantes(documento, num_pagina)
+            if relevantes:
+                confirmadas.append(num_pagina)
+                total_tabelas += relevantes
+
+        if confirmadas:
+            # Candidatas não amostradas: sinalizadas para a extração confirmar
+            paginas_com_tabelas.extend(confirmadas)
+            paginas_com_tabelas.extend(p for p in pontuacao if p not in amostra)
+
+        paginas_amostradas = min(PAGINA_LIMITE_FAMILIA, total_paginas) + len(amostra)
+        logger.debug(
+            f"Classificação rápida: {len(pontuacao)} candidatas, {len(amostra)} amostradas, "
+            f"{len(confirmadas)} confirmadas"
+        )
+        return total_caracteres, sorted(paginas_com_tabelas), total_tabelas, paginas_amostradas
+
+    def _selecionar_amostra(self, pontuacao: Dict[int, int]) -> Set[int]:
+        """Páginas candidatas que passam por extract_tables() no modo rápido."""
+        if len(pontuacao) <= AMOSTRA_PAGINAS_TABELA:
+            return set(pontuacao)
+
+        por_pontuacao = sorted(pontuacao, key=lambda p: (-pontuacao[p], p))
+        amostra = set(por_pontuacao[:AMOSTRA_PAGINAS_TABELA // 2])
+
+        restantes = sorted(p for p in pontuacao if p not in amostra)
+        vagas = AMOSTRA_PAGINAS_TABELA - len(amostra)
+        passo = len(restantes) / vagas
+        amostra.update(restantes[int(i * passo)] for i in range(vagas))
+        return amostra
+
+    def _contar_tabelas_relevantes(self, documento: ParsedPDF, num_pagina: int) -> int:
+        """Número de tabelas relevantes da página (extract_tables memoizado)."""
+        tabelas = documento.tabelas_pagina(num_pagina)
+        if not tabelas:
+            return 0
+        return sum(1 for t in tabelas if self._tabela_relevante(t))
+
     def _tabela_relevante(self, tabela: List[List]) -> bool:
         """
         Verifica se uma tabela é relevante (não é cabeçalho vazio ou lixo).
@@ -685,10 +968,29 @@ class ExtratorTabelas:
     - PDF_NATIVO_SEM_TABELA: Tenta extração via regex (fallback)
     """
 
-    def __init__(self):
-        self.classificador = ClassificadorPDF()
+    def __init__(self, modo_classificacao: str = MODO_CLASSIFICACAO_RAPIDO, workers_paginas: int = 0):
+        """
+        Args:
+            modo_classificacao: 'rapido' (amostragem) ou 'completo' (V1.2)
+            workers_paginas: Processos para extrair páginas de um mesmo PDF em
+                paralelo; 0 = extração serial (V1.2)
+        """
+        self.classificador = ClassificadorPDF(modo_classificacao)
+        self.workers_paginas = workers_paginas
+        self._pool_paginas: Optional[ProcessPoolExecutor] = None
+
+    def fechar(self):
+        """Encerra o pool de extração por páginas (se foi criado)."""
+        if self._pool_paginas is not None:
+            self._pool_paginas.shutdown(wait=True, cancel_futures=True)
+            self._pool_paginas = None
 
-    def extrair(self, caminho_pdf: str, edital_id: int, llm_extractor: 'LLMExtractor' = None) -> ResultadoExtracao:
+    def extrair(
+        self,
+        fonte: Union[FontePDF, ParsedPDF],
+        edital_id: int,
+        llm_extractor: 'LLMExtractor' = None
+    ) -> ResultadoExtracao:
         """
         Extrai lotes de um PDF usando cascata de estratégias.
 
@@ -697,18 +999,35 @@ class ExtratorTabelas:
         2. Regex patterns           → CUSTO: $0
         3. LLM fallback (GPT-4o)    → CUSTO: ~$0.0008
 
+        V1.2: O PDF é parseado uma única vez (ParsedPDF) e compartilhado
+        entre classificação, cascata e LLM.
+
         Args:
-            caminho_pdf: Caminho para o arquivo PDF
+            fonte: Caminho do PDF, PDF em memória (bytes/BytesIO/memoryview)
+                ou ParsedPDF já aberto
             edital_id: ID do edital no banco de dados
             llm_extractor: Instância do LLMExtractor para fallback (opcional)
 
         Returns:
             ResultadoExtracao com lotes extraídos ou erros
         """
+        if isinstance(fonte, ParsedPDF):
+            return self._extrair_documento(fonte, edital_id, llm_extractor)
+
+        with ParsedPDF(fonte) as documento:
+            return self._extrair_documento(documento, edital_id, llm_extractor)
+
+    def _extrair_documento(
+        self,
+        documento: ParsedPDF,
+        edital_id: int,
+        llm_extractor: 'LLMExtractor' = None
+    ) -> ResultadoExtracao:
+        """Cascata de extração sobre um ParsedPDF (ver extrair)."""
         inicio = time.time()
 
         # Classificar PDF
-        classificacao = self.classificador.classificar(caminho_pdf)
+        classificacao = self.classificador.classificar(documento)
         logger.info(f"PDF classificado como: {classificacao.familia.value}")
 
         if not classificacao.processavel:
@@ -725,26 +1044,27 @@ class ExtratorTabelas:
         # === CASCATA DE EXTRAÇÃO ===
         lotes = []
         metodo_usado = None
+        parcial = False
 
         try:
             # NÍVEL 1: pdfplumber (tabelas)
             if classificacao.familia == FamiliaPDF.PDF_TABELA_INICIO:
-                lotes = self._extrair_tabelas_inicio(caminho_pdf, classificacao)
+                lotes = self._extrair_tabelas_inicio(documento, classificacao)
                 if lotes:
                     metodo_usado = "pdfplumber_tabela_inicio"
             elif classificacao.familia == FamiliaPDF.PDF_TABELA_MEIO_FIM:
-                lotes = self._extrair_tabelas_meio_fim(caminho_pdf, classificacao)
+                lotes = self._extrair_tabelas_meio_fim(documento, classificacao)
                 if lotes:
                     metodo_usado = "pdfplumber_tabela_meio_fim"
             elif classificacao.familia == FamiliaPDF.PDF_NATIVO_SEM_TABELA:
-                lotes = self._extrair_via_regex(caminho_pdf)
+                lotes = self._extrair_via_regex(documento)
                 if lotes:
                     metodo_usado = "regex_nativo"
 
             # NÍVEL 2: Regex (se tabelas não funcionaram)
             if not lotes and classificacao.familia in [FamiliaPDF.PDF_TABELA_INICIO, FamiliaPDF.PDF_TABELA_MEIO_FIM]:
                 logger.info("Cascata: tabelas sem lotes, tentando regex...")
-                lotes = self._extrair_via_regex(caminho_pdf)
+                lotes = self._extrair_via_regex(documento)
                 if lotes:
                     metodo_usado = "regex_fallback"
 
@@ -753,12 +1073,14 @@ class ExtratorTabelas:
                 logger.info("Cascata: tentando LLM fallback...")
 
                 # Extrair texto completo para LLM
-                texto_completo = self._extrair_texto_completo(caminho_pdf)
+                texto_completo = self._extrair_texto_completo(documento)
 
                 if texto_completo and len(texto_completo) >= 100:
-                    lotes = llm_extractor.extrair_lotes(texto_completo)
+                    extracao_llm = llm_extractor.extrair(texto_completo)
+                    lotes = extracao_llm.lotes
                     if lotes:
                         metodo_usado = "llm_fallback"
+                        parcial = extracao_llm.parcial
 
             tempo_ms = int((time.time() - inicio) * 1000)
 
@@ -773,13 +1095,14 @@ class ExtratorTabelas:
                     tempo_processamento_ms=tempo_ms
                 )
 
-            logger.info(f"Extração OK: {len(lotes)} lotes via {metodo_usado}")
+            logger.info(f"Extração OK: {len(lotes)} lotes via {metodo_usado}" + (" (parcial)" if parcial else ""))
 
             return ResultadoExtracao(
                 sucesso=True,
                 lotes=lotes,
                 familia_pdf=classificacao.familia,
-                tempo_processamento_ms=tempo_ms
+                tempo_processamento_ms=tempo_ms,
+                parcial=parcial,
             )
 
         except Exception as e:
@@ -794,75 +1117,113 @@ class ExtratorTabelas:
                 tempo_processamento_ms=int((time.time() - inicio) * 1000)
             )
 
-    def _extrair_texto_completo(self, caminho_pdf: str) -> str:
+    def _extrair_texto_completo(self, documento: ParsedPDF) -> str:
         """Extrai texto completo do PDF para uso com LLM."""
         try:
-            with pdfplumber.open(caminho_pdf) as pdf:
-                textos = []
-                for pagina in pdf.pages:
-                    texto = pagina.extract_text() or ""
-                    textos.append(texto)
-                return "\n\n".join(textos)
+            return "\n\n".join(documento.textos())
         except Exception as e:
             logger.warning(f"Erro ao extrair texto completo: {e}")
             return ""
 
     def _extrair_tabelas_inicio(
         self,
-        caminho_pdf: str,
+        documento: ParsedPDF,
         classificacao: ResultadoClassificacao
     ) -> List[LoteExtraido]:
         """Extrai lotes de tabelas nas primeiras páginas, com fallback para todas."""
         lotes = []
 
-        with pdfplumber.open(caminho_pdf) as pdf:
-            # Primeiro: tentar nas primeiras páginas
-            paginas_alvo = [p for p in classificacao.paginas_com_tabelas if p <= PAGINA_LIMITE_FAMILIA]
-
-            for num_pagina in paginas_alvo:
-                pagina = pdf.pages[num_pagina - 1]  # 0-indexed
-                tabelas = pagina.extract_tables() or []
-
-                for tabela in tabelas:
+        # Primeiro: tentar nas primeiras páginas
+        paginas_alvo = [p for p in classificacao.paginas_com_tabelas if p <= PAGINA_LIMITE_FAMILIA]
+
+        for num_pagina in paginas_alvo:
+            for tabela in documento.tabelas_pagina(num_pagina):
+                lotes_tabela = self._processar_tabela(tabela, num_pagina)
+                lotes.extend(lotes_tabela)
+
+        # Fallback: se não encontrou lotes nas primeiras páginas, buscar em TODAS
+        if not lotes:
+            logger.info("Nenhum lote nas primeiras páginas, buscando em todas...")
+            for num_pagina in range(1, documento.total_paginas + 1):
+                if num_pagina in paginas_alvo:
+                    continue  # Já processou
+                for tabela in documento.tabelas_pagina(num_pagina):
                     lotes_tabela = self._processar_tabela(tabela, num_pagina)
                     lotes.extend(lotes_tabela)
 
-            # Fallback: se não encontrou lotes nas primeiras páginas, buscar em TODAS
-            if not lotes:
-                logger.info("Nenhum lote nas primeiras páginas, buscando em todas...")
-                for num_pagina in range(1, len(pdf.pages) + 1):
-                    if num_pagina in paginas_alvo:
-                        continue  # Já processou
-                    pagina = pdf.pages[num_pagina - 1]
-                    tabelas = pagina.extract_tables() or []
-
-                    for tabela in tabelas:
-                        lotes_tabela = self._processar_tabela(tabela, num_pagina)
-                        lotes.extend(lotes_tabela)
-
         return lotes
 
     def _extrair_tabelas_meio_fim(
         self,
-        caminho_pdf: str,
+        documento: ParsedPDF,
         classificacao: ResultadoClassificacao
     ) -> List[LoteExtraido]:
         """Extrai lotes de tabelas no meio/fim do documento."""
+        # V1.2: Catálogos com centenas de páginas de tabela vão para o pool
+        pendentes = [p for p in classificacao.paginas_com_tabelas if not documento.tabelas_extraidas(p)]
+        if self.workers_paginas > 0 and len(pendentes) >= MIN_PAGINAS_EXTRACAO_PARALELA:
+            return self._extrair_paginas_em_paralelo(documento, classificacao.paginas_com_tabelas, pendentes)
+
         lotes = []
 
-        with pdfplumber.open(caminho_pdf) as pdf:
-            # Processar todas as páginas com tabelas
-            for num_pagina in classificacao.paginas_com_tabelas:
-                pagina = pdf.pages[num_pagina - 1]
-                tabelas = pagina.extract_tables() or []
+        # Processar todas as páginas com tabelas
+        for num_pagina in classificacao.paginas_com_tabelas:
+            lotes.extend(self._lotes_da_pagina(documento, num_pagina))
 
-                for tabela in tabelas:
-                    lotes_tabela = self._processar_tabela(tabela, num_pagina)
-                    lotes.extend(lotes_tabela)
+        return lotes
+
+    def _extrair_paginas_em_paralelo(
+        self,
+        documento: ParsedPDF,
+        paginas: List[int],
+        pendentes: List[int]
+    ) -> List[LoteExtraido]:
+        """
+        V1.2: Divide as páginas pendentes em faixas contíguas e extrai cada
+        faixa em um processo (que abre o PDF por conta própria).
+
+        Páginas cujas tabelas já foram extraídas na classificação são
+        processadas aqui mesmo. Os lotes voltam na ordem das páginas, com
+        fonte_pagina preservado. Faixa que falha no pool (worker morto,
+        erro) é refeita serialmente neste processo.
+        """
+        if self._pool_paginas is None:
+            self._pool_paginas = _criar_pool_paginas(self.workers_paginas, self.classificador.modo)
+
+        faixas = [pendentes[i:i + PAGINAS_POR_FAIXA] for i in range(0, len(pendentes), PAGINAS_POR_FAIXA)]
+        logger.info(
+            f"Extraindo {len(pendentes)} páginas em {len(faixas)} faixas "
+            f"({self.workers_paginas} processos): {documento.nome}"
+        )
+
+        lotes_por_pagina: Dict[int, List[LoteExtraido]] = {}
+        with documento.caminho_para_processos() as caminho:
+            futuros = [(faixa, self._pool_paginas.submit(_extrair_faixa_paginas, caminho, faixa)) for faixa in faixas]
+            for faixa, futuro in futuros:
+                try:
+                    lotes_por_pagina.update(futuro.result())
+                except Exception as e:
+                    logger.warning(f"Faixa de páginas {faixa[0]}-{faixa[-1]} falhou no pool ({e}), refazendo serial")
+                    if isinstance(e, BrokenProcessPool):
+                        self.fechar()
+                    for num_pagina in faixa:
+                        lotes_por_pagina[num_pagina] = self._lotes_da_pagina(documento, num_pagina)
+
+        lotes = []
+        for num_pagina in paginas:
+            if num_pagina not in lotes_por_pagina:
+                lotes_por_pagina[num_pagina] = self._lotes_da_pagina(documento, num_pagina)
+            lotes.extend(lotes_por_pagina[num_pagina])
+        return lotes
 
+    def _lotes_da_pagina(self, documento: ParsedPDF, num_pagina: int) -> List[LoteExtraido]:
+        """Lotes de todas as tabelas de uma página."""
+        lotes = []
+        for tabela in documento.tabelas_pagina(num_pagina):
+            lotes.extend(self._processar_tabela(tabela, num_pagina))
         return lotes
 
-    def _extrair_via_regex(self, caminho_pdf: str) -> List[LoteExtraido]:
+    def _extrair_via_regex(self, documento: ParsedPDF) -> List[LoteExtraido]:
         """
         Extração fallback via regex para PDFs sem tabelas detectadas.
 
@@ -872,91 +1233,75 @@ class ExtratorTabelas:
         """
         lotes = []
 
-        with pdfplumber.open(caminho_pdf) as pdf:
-            texto_completo = ""
-            for pagina in pdf.pages:
-                texto_pagina = pagina.extract_text() or ""
-                texto_completo += texto_pagina + "\n"
+        texto_completo = "".join(texto + "\n" for texto in documento.textos())
 
-            # PADRÃO 1: Fátima/BA - "LOTE XX" seguido de bloco com AVALIAÇÃO
-            # Captura blocos completos de cada lote
-            padrao_fatima = r'LOTE\s*(\d+)\s*\n([\s\S]*?)AVALIA[CÇ][AÃ]O[:\s]*([0-9.,]+)'
+        # PADRÃO 1: Fátima/BA - "LOTE XX" seguido de bloco com AVALIAÇÃO
+        # Captura blocos completos de cada lote
+        padrao_fatima = r'LOTE\s*(\d+)\s*\n([\s\S]*?)AVALIA[CÇ][AÃ]O[:\s]*([0-9.,]+)'
 
-            matches = re.findall(padrao_fatima, texto_completo, re.IGNORECASE)
+        matches = re.findall(padrao_fatima, texto_completo, re.IGNORECASE)
 
-            for match in matches:
-                numero, bloco, valor_str = match
+        for match in matches:
+            numero, bloco, valor_str = match
 
-                # Limitar bloco às primeiras linhas relevantes (antes do CHECK LIST)
-                bloco_limpo = bloco.split('CHECK LIST')[0] if 'CHECK LIST' in bloco else bloco
-                linhas = [linha.strip() for linha in bloco_limpo.split('\n') if linha.strip()]
+            # Limitar bloco às primeiras linhas relevantes (antes do CHECK LIST)
+            bloco_limpo = bloco.split('CHECK LIST')[0] if 'CHECK LIST' in bloco else bloco
+            linhas = [linha.strip() for linha in bloco_limpo.split('\n') if linha.strip()]
 
-                # Primeira linha não-vazia é a descrição principal
-                descricao = linhas[0] if linhas else ''
+            # Primeira linha não-vazia é a descrição principal
+            descricao = linhas[0] if linhas else ''
+
+            # Se primeira linha é só "RENAVAM", pegar a segunda
+            if descricao.upper() == 'RENAVAM' and len(linhas) > 1:
+                descricao = linhas[1]
+
+            # Extrair placa, chassi e renavam do bloco (V1.2: padrões pré-compilados)
+            placa, chassi, renavam = extrair_campos_bloco(bloco)
+
+            # Limpar valor
+            try:
+                valor = float(valor_str.replace('.', '').replace(',', '.'))
+            except:
+                valor = None
 
-                # Se primeira linha é só "RENAVAM", pegar a segunda
-                if descricao.upper() == 'RENAVAM' and len(linhas) > 1:
-                    descricao = linhas[1]
+            if len(descricao) >= 5:
+                lote = LoteExtraido(
+                    numero_lote_raw=str(numero).zfill(2),
+                    descricao_raw=descricao,
+                    texto_fonte_completo=descricao[:200],
+                    avaliacao_valor=valor,
+                    placa=placa,
+                    chassi=chassi,
+                    renavam=renavam
+                )
+                lotes.append(lote)
 
-                # Extrair placa do bloco
-                placa_match = re.search(r'PLACA\s*[:\s]?\s*([A-Z]{2,3}[-\s]?\d[A-Z0-9]?\d{2,4})', bloco, re.IGNORECASE)
-                placa = placa_match.group(1).replace(' ', '').replace('-', '') if placa_match else None
+        if lotes:
+            return lotes
 
-                # Extrair chassi
-                chassi_match = re.search(r'CHASSI[:\s]+([A-HJ-NPR-Z0-9]{17})', bloco, re.IGNORECASE)
-                chassi = chassi_match.group(1) if chassi_match else None
+        # PADRÃO 2: Genérico - "LOTE 01: Descrição" ou "LOTE 01 - Descrição"
+        padroes_genericos = [
+            r'(?:LOTE|ITEM)\s*[N°º.]?\s*(\d+)\s*[-:]\s*(.+?)(?=(?:LOTE|ITEM)\s*[N°º.]?\s*\d+|$)',
+            r'^(\d+)\s*[-–]\s*(.+?)(?=^\d+\s*[-–]|$)',
+        ]
 
-                # Extrair renavam (número de 9-11 dígitos após RENAVAM ou em linha própria)
-                renavam_match = re.search(r'RENAVA[MN]?\s*[:\s]*(\d{9,11})', bloco, re.IGNORECASE)
-                if not renavam_match:
-                    # Tentar pegar número solto após linha RENAVAM
-                    renavam_match = re.search(r'RENAVA[MN]\s*\n(\d{9,11})', bloco, re.IGNORECASE)
-                renavam = renavam_match.group(1) if renavam_match else None
+        for padrao in padroes_genericos:
+            matches = re.findall(padrao, texto_completo, re.MULTILINE | re.IGNORECASE | re.DOTALL)
 
-                # Limpar valor
-                try:
-                    valor = float(valor_str.replace('.', '').replace(',', '.'))
-                except:
-                    valor = None
+            for match in matches:
+                numero, descricao = match
+                descricao = descricao[:500].strip()
 
-                if len(descricao) >= 5:
+                if len(descricao) >= 10:
                     lote = LoteExtraido(
-                        numero_lote_raw=str(numero).zfill(2),
+                        numero_lote_raw=str(numero),
                         descricao_raw=descricao,
-                        texto_fonte_completo=descricao[:200],
-                        avaliacao_valor=valor,
-                        placa=placa,
-                        chassi=chassi,
-                        renavam=renavam
+                        texto_fonte_completo=descricao[:200]
                     )
                     lotes.append(lote)
 
             if lotes:
-                return lotes
-
-            # PADRÃO 2: Genérico - "LOTE 01: Descrição" ou "LOTE 01 - Descrição"
-            padroes_genericos = [
-                r'(?:LOTE|ITEM)\s*[N°º.]?\s*(\d+)\s*[-:]\s*(.+?)(?=(?:LOTE|ITEM)\s*[N°º.]?\s*\d+|$)',
-                r'^(\d+)\s*[-–]\s*(.+?)(?=^\d+\s*[-–]|$)',
-            ]
-
-            for padrao in padroes_genericos:
-                matches = re.findall(padrao, texto_completo, re.MULTILINE | re.IGNORECASE | re.DOTALL)
-
-                for match in matches:
-                    numero, descricao = match
-                    descricao = descricao[:500].strip()
-
-                    if len(descricao) >= 10:
-                        lote = LoteExtraido(
-                            numero_lote_raw=str(numero),
-                            descricao_raw=descricao,
-                            texto_fonte_completo=descricao[:200]
-                        )
-                        lotes.append(lote)
-
-                if lotes:
-                    break
+                break
 
         return lotes
 
@@ -1106,10 +1451,143 @@ class ExtratorTabelas:
         return True
 
 
+# =============================================================================
+# V1.2: LLM EM BLOCOS (divisão, limite de taxa e cache)
+# =============================================================================
+
+# Início de lote em linha própria: "LOTE 01", "Lote nº 2", "ITEM 15"
+_RE_MARCADOR_LOTE = re.compile(r'^[ \t]*(?:LOTE|ITEM)\s*(?:N[º°o.]*\s*)?\d+', re.IGNORECASE | re.MULTILINE)
+
+
+def dividir_texto_em_blocos(texto: str, max_chars: int) -> List[str]:
+    """
+    Divide o texto em blocos de até `max_chars`, cortando nos marcadores de
+    lote ("LOTE nn"), para nenhum lote ficar partido entre dois blocos.
+
+    Um trecho entre marcadores maior que o bloco (ou texto sem marcadores)
+    é cortado em quebras de linha.
+    """
+    inicios = [0] + [m.start() for m in _RE_MARCADOR_LOTE.finditer(texto) if m.start() > 0]
+    trechos = [texto[a:b] for a, b in zip(inicios, inicios[1:] + [len(texto)], strict=True)]
+
+    blocos: List[str] = []
+    atual = ''
+    for trecho in trechos:
+        for parte in _cortar_em_linhas(trecho, max_chars):
+            if atual and len(atual) + len(parte) > max_chars:
+                blocos.append(atual)
+                atual = ''
+            atual += parte
+    if atual.strip():
+        blocos.append(atual)
+    return blocos
+
+
+def _cortar_em_linhas(trecho: str, max_chars: int) -> List[str]:
+    """Corta um trecho maior que max_chars em quebras de linha (ou no limite)."""
+    if len(trecho) <= max_chars:
+        return [trecho]
+    partes = []
+    while len(trecho) > max_chars:
+        corte = trecho.rfind('\n', 0, max_chars) + 1 or max_chars
+        partes.append(trecho[:corte])
+        trecho = trecho[corte:]
+    if trecho:
+        partes.append(trecho)
+    return partes
+
+
+class LimitadorTaxa:
+    """Intervalo mínimo entre requisições, compartilhado entre threads."""
+
+    def __init__(self, requisicoes_por_minuto: int = LLM_REQUISICOES_POR_MINUTO):
+        self.intervalo = 60.0 / requisicoes_por_minuto if requisicoes_por_minuto > 0 else 0.0
+        self._lock = threading.Lock()
+        self._proxima = 0.0
+
+    def aguardar(self):
+        with self._lock:
+            agora = time.monotonic()
+            espera = self._proxima - agora
+            self._proxima = max(agora, self._proxima) + self.intervalo
+        if espera > 0:
+            time.sleep(espera)
+
+
+class CacheRespostasLLM:
+    """
+    Cache SQLite das respostas do LLM por bloco.
+
+    Chave = SHA256(modelo + VERSAO_PROMPT_LLM + prompt do bloco): reprocessar
+    um edital (retry, nova execução, nova versão do extrator) não paga de
+    novo pelos blocos que não mudaram.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Workers do modo paralelo podem compartilhar o arquivo
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_respostas (
+                chave TEXT PRIMARY KEY,
+                modelo TEXT NOT NULL,
+                resposta TEXT NOT NULL,
+                criado_em REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def chave(modelo: str, prompt: str) -> str:
+        return hashlib.sha256(f"{modelo}\n{VERSAO_PROMPT_LLM}\n{prompt}".encode()).hexdigest()
+
+    def obter(self, chave: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT resposta FROM llm_respostas WHERE chave = ?", (chave,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def gravar(self, chave: str, modelo: str, dados: dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_respostas (chave, modelo, resposta, criado_em) VALUES (?, ?, ?, ?)",
+                (chave, modelo, json.dumps(dados), time.time()),
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
 # =============================================================================
 # V1.1: EXTRATOR LLM (FALLBACK)
 # =============================================================================
 
+@dataclass
+class ExtracaoLLM:
+    """V1.2: Lotes de uma extração LLM e os blocos que não chegaram a eles."""
+    lotes: List[LoteExtraido] = field(default_factory=list)
+    blocos: int = 0
+    blocos_com_falha: int = 0       # Chamada ou JSON com erro
+    blocos_ignorados: int = 0       # Além do orçamento max_blocos
+
+    @property
+    def parcial(self) -> bool:
+        return bool(self.blocos_com_falha or self.blocos_ignorados)
+
+
+def _normalizar_descricao(descricao: str) -> str:
+    return ' '.join((descricao or '').lower().split())
+
+
 class LLMExtractor:
     """
     Extrator de lotes via LLM (GPT-4o-mini).
@@ -1123,22 +1601,41 @@ class LLMExtractor:
     PRICE_INPUT_PER_1M = 0.15
     PRICE_OUTPUT_PER_1M = 0.60
 
-    def __init__(self, api_key: str = None, model: str = "gpt-4o-mini"):
+    def __init__(
+        self,
+        api_key: str = None,
+        model: str = "gpt-4o-mini",
+        em_blocos: bool = True,
+        cache_path: Optional[str] = None,
+        requisicoes_por_minuto: int = LLM_REQUISICOES_POR_MINUTO,
+    ):
         """
         Inicializa o extrator LLM.
 
         Args:
             api_key: Chave da API OpenAI (se None, usa env OPENAI_API_KEY)
             model: Modelo a usar (default: gpt-4o-mini)
+            em_blocos: V1.2 - texto longo vai em blocos paralelos em vez de truncado
+            cache_path: V1.2 - SQLite de respostas por bloco (None = sem cache;
+                default: env LLM_CACHE_PATH)
+            requisicoes_por_minuto: V1.2 - limite de taxa das chamadas
         """
         self.client = None
         self.model = model
+        self.em_blocos = em_blocos
         self.logger = logging.getLogger("LLMExtractor")
 
         # FinOps: Contadores de tokens
         self.total_input_tokens = 0
         self.total_output_tokens = 0
         self.total_requests = 0
+        self.cache_hits = 0
+
+        # V1.2: Blocos rodam em threads - contadores, limite de taxa e cache compartilhados
+        self._lock = threading.Lock()
+        self.limitador = LimitadorTaxa(requisicoes_por_minuto)
+        cache_path = cache_path or os.getenv("LLM_CACHE_PATH")
+        self.cache = CacheRespostasLLM(cache_path) if cache_path else None
 
         # Graceful degradation
         if not OPENAI_AVAILABLE:
@@ -1167,23 +1664,132 @@ class LLMExtractor:
         Returns:
             Lista de LoteExtraido ou [] em caso de falha
         """
+        return self.extrair(texto_pdf, contexto).lotes
+
+    def extrair(self, texto_pdf: str, contexto: dict = None) -> ExtracaoLLM:
+        """
+        V1.2: Como extrair_lotes, informando os blocos perdidos.
+
+        Returns:
+            ExtracaoLLM (sem lotes e sem blocos se o LLM não foi chamado)
+        """
         # Validações
         if not self.client:
-            return []
+            return ExtracaoLLM()
 
         if not texto_pdf or len(texto_pdf) < 100:
             self.logger.debug("Texto insuficiente para LLM")
-            return []
+            return ExtracaoLLM()
+
+        max_chars = MAX_TOKENS_BLOCO_LLM * CHARS_POR_TOKEN
+        if self.em_blocos and len(texto_pdf) > max_chars:
+            return self.extrair_lotes_em_blocos(texto_pdf, contexto)
 
         # Otimização: limitar texto (economiza tokens)
         texto_otimizado = self._otimizar_texto(texto_pdf, max_chars=8000)
 
+        dados = self._extrair_bloco(texto_otimizado, contexto)
+        if dados is None:
+            return ExtracaoLLM(blocos=1, blocos_com_falha=1)
+
+        lotes = self._converter_para_lotes(dados)
+        if lotes:
+            self.logger.info(f"LLM extraiu {len(lotes)} lotes")
+
+        return ExtracaoLLM(lotes=lotes, blocos=1)
+
+    def extrair_lotes_em_blocos(
+        self,
+        texto_pdf: str,
+        contexto: dict = None,
+        max_blocos: int = MAX_BLOCOS_LLM,
+        simultaneos: int = LLM_BLOCOS_SIMULTANEOS,
+    ) -> ExtracaoLLM:
+        """
+        V1.2: Extrai lotes de documento longo em blocos concorrentes.
+
+        O texto é dividido nos marcadores "LOTE nn" em blocos de até
+        MAX_TOKENS_BLOCO_LLM tokens; até `max_blocos` blocos (orçamento por
+        documento) rodam em `simultaneos` threads sob o limite de taxa.
+        Os lotes voltam na ordem do texto. Repetições exatas (número e
+        descrição) saem; o mesmo número no bloco seguinte é o lote cortado
+        na fronteira e fica com a descrição mais completa. Mesmo número
+        mais adiante é outro lote (seção com numeração própria).
+
+        Blocos com falha ou fora do orçamento são contados no resultado,
+        que fica `parcial`.
+        """
+        if not self.client or not texto_pdf:
+            return ExtracaoLLM()
+
+        blocos = dividir_texto_em_blocos(texto_pdf, MAX_TOKENS_BLOCO_LLM * CHARS_POR_TOKEN)
+        extracao = ExtracaoLLM(blocos=len(blocos))
+        if len(blocos) > max_blocos:
+            self.logger.warning(
+                f"Documento com {len(blocos)} blocos; orçamento de {max_blocos} "
+                f"- {len(blocos) - max_blocos} blocos finais ignorados"
+            )
+            extracao.blocos_ignorados = len(blocos) - max_blocos
+            blocos = blocos[:max_blocos]
+
+        with ThreadPoolExecutor(max_workers=max(1, min(simultaneos, len(blocos)))) as pool:
+            respostas = list(pool.map(lambda bloco: self._extrair_bloco(bloco, contexto), blocos))
+
+        lotes = extracao.lotes
+        vistos: Set[Tuple[str, str]] = set()
+        ultimo_por_numero: Dict[str, Tuple[int, int]] = {}  # numero -> (bloco, posição em lotes)
+        for indice_bloco, dados in enumerate(respostas):
+            if dados is None:
+                extracao.blocos_com_falha += 1
+                continue
+            for lote in self._converter_para_lotes(dados):
+                chave = (lote.numero_lote, _normalizar_descricao(lote.descricao_completa))
+                if chave in vistos:
+                    continue
+                vistos.add(chave)
+
+                anterior = ultimo_por_numero.get(lote.numero_lote)
+                if anterior is not None and anterior[0] == indice_bloco - 1:
+                    # Lote cortado entre dois blocos: fica a descrição mais completa
+                    posicao = anterior[1]
+                    if len(lote.descricao_completa) > len(lotes[posicao].descricao_completa):
+                        lotes[posicao] = lote
+                    ultimo_por_numero[lote.numero_lote] = (indice_bloco, posicao)
+                    continue
+
+                ultimo_por_numero[lote.numero_lote] = (indice_bloco, len(lotes))
+                lotes.append(lote)
+
+        if extracao.blocos_com_falha:
+            self.logger.warning(
+                f"LLM: {extracao.blocos_com_falha} de {len(blocos)} blocos falharam - extração parcial"
+            )
+        self.logger.info(f"LLM extraiu {len(lotes)} lotes em {len(blocos)} blocos")
+        return extracao
+
+    def _extrair_bloco(self, texto: str, contexto: dict = None) -> Optional[dict]:
+        """
+        Uma chamada ao LLM (ou resposta do cache) para um bloco de texto.
+
+        Returns:
+            JSON da resposta, ou None em caso de falha (graceful degradation)
+        """
+        prompt = self._get_user_prompt(texto, contexto)
+        chave = CacheRespostasLLM.chave(self.model, prompt) if self.cache else None
+        if chave:
+            dados = self.cache.obter(chave)
+            if dados is not None:
+                with self._lock:
+                    self.cache_hits += 1
+                return dados
+
         try:
+            self.limitador.aguardar()
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": self._get_system_prompt()},
-                    {"role": "user", "content": self._get_user_prompt(texto_otimizado, contexto)}
+                    {"role": "user", "content": prompt}
                 ],
                 response_format={"type": "json_object"},
                 temperature=0.1,  # Precisão > criatividade
@@ -1192,26 +1798,25 @@ class LLMExtractor:
 
             # FinOps: Registrar tokens
             if hasattr(response, 'usage') and response.usage:
-                self.total_input_tokens += response.usage.prompt_tokens
-                self.total_output_tokens += response.usage.completion_tokens
-                self.total_requests += 1
+                with self._lock:
+                    self.total_input_tokens += response.usage.prompt_tokens
+                    self.total_output_tokens += response.usage.completion_tokens
+                    self.total_requests += 1
 
             # Parse resposta
             content = response.choices[0].message.content
             dados = json.loads(content)
 
-            lotes = self._converter_para_lotes(dados)
-            if lotes:
-                self.logger.info(f"LLM extraiu {len(lotes)} lotes")
-
-            return lotes
-
         except json.JSONDecodeError as e:
             self.logger.error(f"Erro parse JSON: {e}")
-            return []
+            return None
         except Exception as e:
             self.logger.error(f"Erro LLM: {e}")
-            return []
+            return None
+
+        if chave:
+            self.cache.gravar(chave, self.model, dados)
+        return dados
 
     def _get_system_prompt(self) -> str:
         """Prompt de sistema para extração estruturada."""
@@ -1305,88 +1910,350 @@ REGRAS:
             "total_input_tokens": self.total_input_tokens,
             "total_output_tokens": self.total_output_tokens,
             "total_tokens": self.total_input_tokens + self.total_output_tokens,
-            "estimated_cost_usd": self.get_estimated_cost()
+            "estimated_cost_usd": self.get_estimated_cost(),
+            "cache_hits": self.cache_hits
         }
 
 
 # =============================================================================
-# REPOSITÓRIO SUPABASE
+# V1.2: GRAVAÇÃO EM LOTE (lotes_leilao + quarentena + arquivo processado)
 # =============================================================================
 
-class LotesRepository:
+def montar_registro_lote(
+    lote: LoteExtraido,
+    edital_id: int,
+    fonte_arquivo: str,
+    familia_pdf: Optional[FamiliaPDF],
+) -> Dict[str, Any]:
     """
-    Repositório para persistência de lotes no Supabase.
+    Monta a linha de lotes_leilao de um lote extraído.
 
-    Implementa:
-    - Idempotência via id_interno (SHA256)
-    - Upsert para atualização sem duplicatas
-    - Quarentena para registros com falha
+    vehicle_id só entra quando o índice de veículos ligou o lote: sem
+    índice (--sem-indice-veiculos) a gravação não depende da migration 019.
     """
+    hash_fonte = hashlib.sha256(lote.texto_fonte_completo.encode() if lote.texto_fonte_completo else b'').hexdigest()
+
+    registro = {
+        'id_interno': lote.gerar_id_interno(edital_id),
+        'edital_id': edital_id,
+
+        # Dados brutos
+        'numero_lote_raw': lote.numero_lote_raw,
+        'descricao_raw': lote.descricao_raw,
+        'valor_raw': lote.valor_raw,
+        'texto_fonte_completo': lote.texto_fonte_completo,
+
+        # Dados processados
+        'numero_lote': lote.numero_lote,
+        'descricao_completa': lote.descricao_completa,
+        'avaliacao_valor': lote.avaliacao_valor,
+
+        # Dados de veículo
+        'placa': lote.placa,
+        'chassi': lote.chassi,
+        'renavam': lote.renavam,
+        'marca': lote.marca,
+        'modelo': lote.modelo,
+        'ano_fabricacao': lote.ano_fabricacao,
+
+        # Metadados
+        'fonte_tipo': 'pdf_tabela',
+        'fonte_arquivo': fonte_arquivo,
+        'fonte_pagina': lote.fonte_pagina,
+        'hash_conteudo_fonte': hash_fonte,
+        'versao_extrator': VERSAO_EXTRATOR,
+        'familia_pdf': familia_pdf.value if familia_pdf else None,
+    }
+    if lote.vehicle_id is not None:
+        registro['vehicle_id'] = lote.vehicle_id
+    return registro
 
-    def __init__(self, supabase_url: str = None, supabase_key: str = None):
-        """
-        Inicializa conexão com Supabase.
 
-        Se não fornecidos, usa variáveis de ambiente:
-        - SUPABASE_URL
-        - SUPABASE_SERVICE_ROLE_KEY (ou SUPABASE_KEY)
-        """
-        url = supabase_url or os.getenv('SUPABASE_URL')
-        key = supabase_key or os.getenv('SUPABASE_SERVICE_ROLE_KEY') or os.getenv('SUPABASE_KEY')
+@dataclass
+class ResultadoGravacao:
+    """Resultado do flush de um arquivo (GravadorLotes.gravar)."""
+    salvos: int = 0
+    quarentena: int = 0
+    isolados: int = 0               # Lotes rejeitados pelo banco e movidos para quarentena
+    requisicoes: int = 0
+    arquivo_registrado: bool = False
+    erros: List[str] = field(default_factory=list)
 
-        if not url or not key:
-            raise ValueError("SUPABASE_URL e SUPABASE_KEY são obrigatórios")
 
-        self.client: Client = create_client(url, key)
-        logger.info("Conexão com Supabase estabelecida")
+class GravadorLotes:
+    """
+    Escritor em lote de lotes_leilao, compartilhado por LotesRepository e
+    LotesIntegration.
+
+    Um flush por arquivo:
+    1. Upsert dos lotes em chunks de `tamanho_chunk` (on_conflict=id_interno)
+    2. Chunk rejeitado pelo banco (constraint, tipo inválido) é dividido ao
+       meio até isolar as linhas ruins, que vão para lotes_quarentena
+    3. Insert único da quarentena (erros de extração + linhas isoladas)
+    4. Upsert do registro em arquivos_processados_lotes com os totais reais
+
+    Falhas de rede e erros que não são de dado (coluna inexistente,
+    PGRST204, permissão) não são bisseccionados: nenhuma linha resolveria
+    isso sozinha. O chunk conta como erro e o arquivo não é registrado,
+    para ser reprocessado na próxima execução.
+    """
 
-    def salvar_lote(
+    def __init__(self, client: Client, tamanho_chunk: int = TAMANHO_CHUNK_LOTES):
+        self.client = client
+        self.tamanho_chunk = max(1, tamanho_chunk)
+
+    def gravar(
         self,
-        lote: LoteExtraido,
-        edital_id: int,
-        fonte_arquivo: str,
-        familia_pdf: FamiliaPDF
-    ) -> Dict[str, Any]:
+        lotes: List[Dict[str, Any]],
+        quarentena: Optional[List[Dict[str, Any]]] = None,
+        registro_arquivo: Optional[Dict[str, Any]] = None,
+    ) -> ResultadoGravacao:
         """
-        Salva um lote no banco de dados usando upsert.
+        Grava as linhas de um arquivo.
+
+        Args:
+            lotes: Linhas de lotes_leilao (ver montar_registro_lote)
+            quarentena: Linhas de lotes_quarentena já conhecidas
+            registro_arquivo: Linha de arquivos_processados_lotes; os totais
+                de lotes/quarentena são preenchidos com o resultado do flush
 
         Returns:
-            Dict com resultado da operação
+            ResultadoGravacao
         """
-        id_interno = lote.gerar_id_interno(edital_id)
-        hash_fonte = hashlib.sha256(lote.texto_fonte_completo.encode() if lote.texto_fonte_completo else b'').hexdigest()
+        resultado = ResultadoGravacao()
+        quarentena = list(quarentena or [])
 
-        dados = {
-            'id_interno': id_interno,
-            'edital_id': edital_id,
+        # id_interno repetido no mesmo comando faz o Postgres rejeitar o upsert
+        # inteiro ("cannot affect row a second time") - mantém a última ocorrência
+        unicos = list({registro['id_interno']: registro for registro in lotes}.values())
 
-            # Dados brutos
-            'numero_lote_raw': lote.numero_lote_raw,
-            'descricao_raw': lote.descricao_raw,
-            'valor_raw': lote.valor_raw,
-            'texto_fonte_completo': lote.texto_fonte_completo,
-
-            # Dados processados
-            'numero_lote': lote.numero_lote,
-            'descricao_completa': lote.descricao_completa,
-            'avaliacao_valor': lote.avaliacao_valor,
-
-            # Dados de veículo
-            'placa': lote.placa,
-            'chassi': lote.chassi,
-            'renavam': lote.renavam,
-            'marca': lote.marca,
-            'modelo': lote.modelo,
-            'ano_fabricacao': lote.ano_fabricacao,
-
-            # Metadados
-            'fonte_tipo': 'pdf_tabela',
-            'fonte_arquivo': fonte_arquivo,
-            'fonte_pagina': lote.fonte_pagina,
-            'hash_conteudo_fonte': hash_fonte,
-            'versao_extrator': VERSAO_EXTRATOR,
-            'familia_pdf': familia_pdf.value if familia_pdf else None,
-        }
+        for i in range(0, len(unicos), self.tamanho_chunk):
+            self._upsert_com_bisseccao(unicos[i:i + self.tamanho_chunk], resultado, quarentena)
+
+        if quarentena:
+            resultado.requisicoes += 1
+            try:
+                self.client.table('lotes_quarentena').insert(_uniformizar(quarentena)).execute()
+                resultado.quarentena = len(quarentena)
+            except Exception as e:
+                logger.error(f"Erro ao enviar {len(quarentena)} registros para quarentena: {str(e)}")
+                resultado.erros.append(f"quarentena: {e}")
+
+        if registro_arquivo is not None and not resultado.erros:
+            dados = dict(registro_arquivo)
+            dados['total_lotes_extraidos'] = resultado.salvos
+            dados['total_lotes_quarentena'] = resultado.quarentena
+            resultado.requisicoes += 1
+            try:
+                self.client.table('arquivos_processados_lotes').upsert(
+                    dados,
+                    on_conflict='hash_arquivo'
+                ).execute()
+                resultado.arquivo_registrado = True
+            except Exception as e:
+                logger.error(f"Erro ao registrar arquivo: {str(e)}")
+                resultado.erros.append(f"arquivo: {e}")
+
+        logger.debug(
+            f"Flush: {resultado.salvos} lotes, {resultado.quarentena} quarentena "
+            f"({resultado.isolados} isolados), {resultado.requisicoes} requisições"
+        )
+        return resultado
+
+    def _upsert_com_bisseccao(
+        self,
+        registros: List[Dict[str, Any]],
+        resultado: ResultadoGravacao,
+        quarentena: List[Dict[str, Any]],
+    ):
+        """Upsert de um chunk; se o banco rejeitar, divide até isolar as linhas ruins."""
+        resultado.requisicoes += 1
+        try:
+            # Upsert em lote exige as mesmas chaves (vehicle_id é opcional)
+            self.client.table('lotes_leilao').upsert(
+                _uniformizar(registros),
+                on_conflict='id_interno'
+            ).execute()
+            resultado.salvos += len(registros)
+            return
+        except Exception as e:
+            erro = e
+
+        # APIError do PostgREST traz o SQLSTATE em `code`; sem ele é rede/timeout.
+        # Fora das classes de dado (schema, PGRST*, permissão) o chunk inteiro falha
+        codigo = str(getattr(erro, 'code', None) or '')
+        if not codigo.startswith(CLASSES_SQLSTATE_LINHA):
+            logger.error(f"Erro ao salvar {len(registros)} lotes: {str(erro)}")
+            resultado.erros.append(f"lotes_leilao: {erro}")
+            return
+
+        if len(registros) == 1:
+            registro = registros[0]
+            logger.warning(f"Lote rejeitado pelo banco ({registro['id_interno'][:16]}...): {str(erro)}")
+            quarentena.append(_registro_quarentena_persistencia(registro, erro))
+            resultado.isolados += 1
+            return
+
+        meio = len(registros) // 2
+        self._upsert_com_bisseccao(registros[:meio], resultado, quarentena)
+        self._upsert_com_bisseccao(registros[meio:], resultado, quarentena)
+
+
+def _registro_quarentena_persistencia(registro: Dict[str, Any], erro: Exception) -> Dict[str, Any]:
+    """Linha de lotes_quarentena para um lote rejeitado no upsert."""
+    codigo_sql = str(getattr(erro, 'code', '') or '')
+    # Classe 23 = violação de integridade (unique, not null, FK, check)
+    codigo = CodigoErro.CONSTRAINT_VIOLADA if codigo_sql.startswith('23') else CodigoErro.ERRO_BANCO_DADOS
+
+    return {
+        'edital_id': registro.get('edital_id'),
+        'payload_original': json.dumps(registro, default=str),
+        'texto_fonte_completo': registro.get('texto_fonte_completo'),
+        'estagio_falha': EstagioFalha.PERSISTENCIA.value,
+        'codigo_erro': codigo.value,
+        'mensagem_erro': str(erro),
+        'stack_trace': None,
+        'fonte_tipo': 'pdf',
+        'fonte_arquivo': registro.get('fonte_arquivo'),
+        'fonte_pagina': registro.get('fonte_pagina'),
+        'familia_pdf': registro.get('familia_pdf'),
+        'versao_extrator': registro.get('versao_extrator') or VERSAO_EXTRATOR,
+        'status': 'pendente',
+    }
+
+
+def _uniformizar(registros: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Insert em lote do PostgREST exige as mesmas chaves em todas as linhas."""
+    colunas = list(dict.fromkeys(k for registro in registros for k in registro))
+    return [{k: registro.get(k) for k in colunas} for registro in registros]
+
+
+@dataclass
+class PlanoReextracao:
+    """
+    V1.2: Editais a (re)processar, da diferença entre os PDFs do Storage e o
+    manifesto de arquivos_processados_lotes.
+    """
+    editais: List[Dict] = field(default_factory=list)   # Na ordem de prazo do leilão
+    novos: int = 0              # Arquivo sem registro
+    versao_antiga: int = 0      # Processado por outro VERSAO_EXTRATOR
+    com_falha: int = 0          # Status em STATUS_ARQUIVO_REPROCESSAR
+    em_dia: int = 0             # Pulados sem download
+    adiados: int = 0            # Falha recente, ainda no backoff
+    esgotados: int = 0          # MAX_TENTATIVAS_ARQUIVO atingido
+    hashes_em_dia: Set[str] = field(default_factory=set)    # Não reprocessar nesta execução
+    tentativas: Dict[str, int] = field(default_factory=dict)  # hash -> falhas seguidas
+
+
+def _backoff_vencido(processado_em: Optional[str], tentativas: int, agora: Optional[datetime]) -> bool:
+    """Se já passou a espera exponencial desde a última falha registrada."""
+    try:
+        ultima = datetime.fromisoformat(processado_em)
+    except (TypeError, ValueError):
+        return True
+    if agora is None:
+        agora = datetime.now(timezone.utc) if ultima.tzinfo else datetime.now()
+    espera = timedelta(hours=BACKOFF_TENTATIVA_HORAS * 2 ** (tentativas - 1))
+    return agora >= ultima + espera
+
+
+def motivo_reextracao(
+    registro: Optional[Dict[str, Any]],
+    agora: Optional[datetime] = None,
+) -> Optional[str]:
+    """
+    Motivo para (re)processar um arquivo dado seu registro no manifesto:
+    'novo', 'versao_antiga', 'com_falha' (ver MOTIVOS_REEXTRACAO), ou
+    'adiado' (falha ainda no backoff), 'esgotado' (MAX_TENTATIVAS_ARQUIVO)
+    e None se está em dia - esses três não são reprocessados.
+    """
+    if registro is None:
+        return 'novo'
+    if registro.get('versao_extrator') != VERSAO_EXTRATOR:
+        return 'versao_antiga'
+    if registro.get('status') not in STATUS_ARQUIVO_REPROCESSAR:
+        return None
+    tentativas = registro.get('tentativas') or 0
+    if tentativas >= MAX_TENTATIVAS_ARQUIVO:
+        return 'esgotado'
+    if tentativas and not _backoff_vencido(registro.get('processado_em'), tentativas, agora):
+        return 'adiado'
+    return 'com_falha'
+
+
+def motivo_reextracao_edital(
+    storage_path: str,
+    registros: List[Dict[str, Any]],
+    agora: Optional[datetime] = None,
+) -> Optional[str]:
+    """
+    Motivo do edital a partir de todos os seus arquivos no manifesto.
+
+    storage_path de arquivo (.pdf) sem registro próprio conta como 'novo';
+    storage_path de pasta só é 'novo' se nenhum arquivo do edital foi
+    registrado. Havendo registros, vale o motivo mais urgente entre eles.
+    """
+    nome = os.path.basename(storage_path)
+    if not registros or (
+        nome.lower().endswith('.pdf') and all(r['nome_arquivo'] != nome for r in registros)
+    ):
+        return 'novo'
+    motivos = {motivo_reextracao(r, agora) for r in registros}
+    for motivo in MOTIVOS_REEXTRACAO + ('adiado', 'esgotado'):
+        if motivo in motivos:
+            return motivo
+    return None
+
+
+# =============================================================================
+# REPOSITÓRIO SUPABASE
+# =============================================================================
+
+class LotesRepository:
+    """
+    Repositório para persistência de lotes no Supabase.
+
+    Implementa:
+    - Idempotência via id_interno (SHA256)
+    - Upsert para atualização sem duplicatas
+    - Quarentena para registros com falha
+    """
+
+    # V1.2: Coluna tentativas (migration 021); desligada se ausente no banco
+    _tentativas_disponivel: bool = True
+
+    def __init__(self, supabase_url: str = None, supabase_key: str = None):
+        """
+        Inicializa conexão com Supabase.
+
+        Se não fornecidos, usa variáveis de ambiente:
+        - SUPABASE_URL
+        - SUPABASE_SERVICE_ROLE_KEY (ou SUPABASE_KEY)
+        """
+        url = supabase_url or os.getenv('SUPABASE_URL')
+        key = supabase_key or os.getenv('SUPABASE_SERVICE_ROLE_KEY') or os.getenv('SUPABASE_KEY')
+
+        if not url or not key:
+            raise ValueError("SUPABASE_URL e SUPABASE_KEY são obrigatórios")
+
+        self.client: Client = create_client(url, key)
+        logger.info("Conexão com Supabase estabelecida")
+
+    def salvar_lote(
+        self,
+        lote: LoteExtraido,
+        edital_id: int,
+        fonte_arquivo: str,
+        familia_pdf: FamiliaPDF
+    ) -> Dict[str, Any]:
+        """
+        Salva um lote no banco de dados usando upsert.
+
+        Returns:
+            Dict com resultado da operação
+        """
+        dados = montar_registro_lote(lote, edital_id, fonte_arquivo, familia_pdf)
+        id_interno = dados['id_interno']
 
         try:
             result = self.client.table('lotes_leilao').upsert(
@@ -1415,7 +2282,31 @@ class LotesRepository:
         """
         Envia um registro para quarentena.
         """
-        dados = {
+        dados = self._montar_registro_quarentena(
+            edital_id, payload, estagio, codigo, mensagem, fonte_arquivo, familia_pdf, stack_trace
+        )
+
+        try:
+            result = self.client.table('lotes_quarentena').insert(dados).execute()
+            logger.info(f"Registro enviado para quarentena: {codigo.value}")
+            return {'sucesso': True}
+        except Exception as e:
+            logger.error(f"Erro ao enviar para quarentena: {str(e)}")
+            return {'sucesso': False, 'erro': str(e)}
+
+    def _montar_registro_quarentena(
+        self,
+        edital_id: int,
+        payload: Dict[str, Any],
+        estagio: EstagioFalha,
+        codigo: CodigoErro,
+        mensagem: str,
+        fonte_arquivo: str,
+        familia_pdf: Optional[FamiliaPDF] = None,
+        stack_trace: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Monta a linha de lotes_quarentena."""
+        return {
             'edital_id': edital_id,
             'payload_original': json.dumps(payload),
             'texto_fonte_completo': payload.get('texto_fonte_completo'),
@@ -1430,14 +2321,6 @@ class LotesRepository:
             'status': 'pendente'
         }
 
-        try:
-            result = self.client.table('lotes_quarentena').insert(dados).execute()
-            logger.info(f"Registro enviado para quarentena: {codigo.value}")
-            return {'sucesso': True}
-        except Exception as e:
-            logger.error(f"Erro ao enviar para quarentena: {str(e)}")
-            return {'sucesso': False, 'erro': str(e)}
-
     def registrar_arquivo_processado(
         self,
         edital_id: int,
@@ -1453,7 +2336,36 @@ class LotesRepository:
         """
         Registra um arquivo como processado para idempotência.
         """
-        dados = {
+        dados = self._montar_registro_arquivo(
+            edital_id, nome_arquivo, hash_arquivo, tipo_detectado, familia_pdf,
+            total_lotes, total_quarentena, status, tempo_ms
+        )
+
+        try:
+            result = self.client.table('arquivos_processados_lotes').upsert(
+                dados,
+                on_conflict='hash_arquivo'
+            ).execute()
+            return {'sucesso': True}
+        except Exception as e:
+            logger.error(f"Erro ao registrar arquivo: {str(e)}")
+            return {'sucesso': False, 'erro': str(e)}
+
+    def _montar_registro_arquivo(
+        self,
+        edital_id: int,
+        nome_arquivo: str,
+        hash_arquivo: str,
+        tipo_detectado: str,
+        familia_pdf: Optional[FamiliaPDF],
+        total_lotes: int,
+        total_quarentena: int,
+        status: str,
+        tempo_ms: int,
+        tentativas: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Monta a linha de arquivos_processados_lotes."""
+        registro = {
             'edital_id': edital_id,
             'nome_arquivo': nome_arquivo,
             'hash_arquivo': hash_arquivo,
@@ -1466,16 +2378,76 @@ class LotesRepository:
             'processado_em': datetime.now().isoformat(),
             'tempo_processamento_ms': tempo_ms
         }
+        if tentativas is not None and self._tentativas_disponivel:
+            registro['tentativas'] = tentativas
+        return registro
 
-        try:
-            result = self.client.table('arquivos_processados_lotes').upsert(
-                dados,
-                on_conflict='hash_arquivo'
-            ).execute()
-            return {'sucesso': True}
-        except Exception as e:
-            logger.error(f"Erro ao registrar arquivo: {str(e)}")
-            return {'sucesso': False, 'erro': str(e)}
+    def salvar_resultado_arquivo(
+        self,
+        edital_id: int,
+        nome_arquivo: str,
+        hash_arquivo: str,
+        resultado: ResultadoExtracao,
+        tamanho_chunk: int = TAMANHO_CHUNK_LOTES,
+        tentativas_anteriores: int = 0,
+    ) -> ResultadoGravacao:
+        """
+        V1.2: Persiste o resultado de um arquivo em um único flush.
+
+        Lotes em upserts de `tamanho_chunk`, erros de extração na quarentena
+        e o registro em arquivos_processados_lotes (ver GravadorLotes).
+        Falha ou extração parcial soma uma tentativa às
+        `tentativas_anteriores` do manifesto; falha só com
+        CODIGOS_ERRO_PERMANENTE vira STATUS_ERRO_PERMANENTE.
+        """
+        familia_pdf = resultado.familia_pdf
+        lotes = []
+        quarentena = []
+
+        if resultado.sucesso:
+            lotes = [
+                montar_registro_lote(lote, edital_id, nome_arquivo, familia_pdf)
+                for lote in resultado.lotes
+            ]
+        else:
+            for erro in resultado.erros:
+                codigo_erro = erro['codigo']
+                # Tentar mapear o código para o enum
+                codigo_enum = CodigoErro[codigo_erro] if codigo_erro in CodigoErro.__members__ else CodigoErro.ESTRUTURA_INESPERADA
+                quarentena.append(self._montar_registro_quarentena(
+                    edital_id=edital_id,
+                    payload={'arquivo': nome_arquivo},
+                    estagio=EstagioFalha.EXTRACAO,
+                    codigo=codigo_enum,
+                    mensagem=erro['mensagem'],
+                    fonte_arquivo=nome_arquivo,
+                    familia_pdf=familia_pdf
+                ))
+
+        registro_arquivo = self._montar_registro_arquivo(
+            edital_id=edital_id,
+            nome_arquivo=nome_arquivo,
+            hash_arquivo=hash_arquivo,
+            tipo_detectado=familia_pdf.value if familia_pdf else 'desconhecido',
+            familia_pdf=familia_pdf,
+            total_lotes=0,
+            total_quarentena=0,
+            status=self._status_arquivo(resultado),
+            tempo_ms=resultado.tempo_processamento_ms,
+            tentativas=0 if resultado.sucesso and not resultado.parcial else tentativas_anteriores + 1,
+        )
+
+        return GravadorLotes(self.client, tamanho_chunk).gravar(lotes, quarentena, registro_arquivo)
+
+    @staticmethod
+    def _status_arquivo(resultado: ResultadoExtracao) -> str:
+        """'processado', 'parcial', 'erro' ou STATUS_ERRO_PERMANENTE (não adianta repetir)."""
+        if resultado.sucesso:
+            return 'parcial' if resultado.parcial else 'processado'
+        codigos = {erro['codigo'] for erro in resultado.erros}
+        if codigos and codigos <= CODIGOS_ERRO_PERMANENTE:
+            return STATUS_ERRO_PERMANENTE
+        return 'erro'
 
     def arquivo_ja_processado(self, hash_arquivo: str) -> bool:
         """Verifica se um arquivo já foi processado."""
@@ -1487,24 +2459,308 @@ class LotesRepository:
         except:
             return False
 
-    def buscar_editais_para_processar(self, limite: int = 100) -> List[Dict]:
+    def carregar_manifesto_arquivos(
+        self,
+        tamanho_pagina: int = TAMANHO_PAGINA_CONSULTA,
+    ) -> Dict[Tuple[int, str], Dict[str, Any]]:
+        """
+        V1.2: Carrega arquivos_processados_lotes inteiro, paginado, em vez de
+        uma consulta por hash.
+
+        Returns:
+            {(edital_id, nome_arquivo): registro mais recente}
         """
-        Busca editais que ainda não tiveram lotes extraídos.
+        manifesto: Dict[Tuple[int, str], Dict[str, Any]] = {}
+        inicio = 0
+        while True:
+            colunas = 'edital_id, nome_arquivo, hash_arquivo, status, versao_extrator, processado_em'
+            if self._tentativas_disponivel:
+                colunas += ', tentativas'
+            try:
+                result = self.client.table('arquivos_processados_lotes').select(
+                    colunas
+                ).order(
+                    'id'
+                ).range(inicio, inicio + tamanho_pagina - 1).execute()
+            except Exception as e:
+                # Sem migration 021 - segue sem contar tentativas
+                if self._tentativas_disponivel and 'tentativas' in str(e):
+                    logger.warning(
+                        "Coluna tentativas ausente em arquivos_processados_lotes "
+                        "(aplique migration 021); falhas reprocessadas sem backoff"
+                    )
+                    self._tentativas_disponivel = False
+                    continue
+                raise
+
+            registros = result.data or []
+            for registro in registros:
+                chave = (registro['edital_id'], registro['nome_arquivo'])
+                anterior = manifesto.get(chave)
+                if anterior is None or (registro.get('processado_em') or '') >= (anterior.get('processado_em') or ''):
+                    manifesto[chave] = registro
+
+            if len(registros) < tamanho_pagina:
+                return manifesto
+            inicio += tamanho_pagina
+
+    def _iterar_editais_com_pdf(
+        self,
+        pular_passados: bool,
+        hoje: str,
+        tamanho_pagina: int,
+    ):
+        """
+        Editais com storage_path por prazo, paginados (desempate por id para a
+        paginação ser estável): leilões a partir de hoje primeiro (data mais
+        próxima, depois maior score e valor_estimado); vencidos ou sem data
+        só no fim, ou descartados no próprio banco com pular_passados=True.
+        """
+        colunas = 'id, id_interno, titulo, storage_path, data_leilao, score, valor_estimado'
+
+        def futuros(query):
+            return query.gte(
+                'data_leilao', hoje
+            ).order(
+                'data_leilao'
+            ).order(
+                'score', desc=True, nullsfirst=False
+            ).order(
+                'valor_estimado', desc=True, nullsfirst=False
+            )
 
-        Retorna editais com status 'valid' que têm PDFs mas não têm
-        registros na tabela arquivos_processados_lotes.
+        def passados(query):
+            return query.or_(
+                f'data_leilao.lt.{hoje},data_leilao.is.null'
+            ).order(
+                'data_leilao', desc=True, nullsfirst=False
+            )
+
+        for filtrar in (futuros,) if pular_passados else (futuros, passados):
+            inicio = 0
+            while True:
+                query = self.client.table('editais_leilao').select(colunas).not_.is_('storage_path', 'null')
+                result = filtrar(query).order('id').range(inicio, inicio + tamanho_pagina - 1).execute()
+                editais = result.data or []
+                yield from editais
+                if len(editais) < tamanho_pagina:
+                    break
+                inicio += tamanho_pagina
+
+    def planejar_reextracao(
+        self,
+        limite: int = 100,
+        pular_passados: bool = False,
+        hoje: Optional[str] = None,
+        tamanho_pagina: int = TAMANHO_PAGINA_CONSULTA,
+    ) -> PlanoReextracao:
         """
-        try:
-            result = self.client.table('editais_leilao').select(
-                'id, id_interno, titulo, storage_path'
-            ).not_.is_(
-                'storage_path', 'null'
-            ).limit(limite).execute()
+        V1.2: Planeja a execução a partir do manifesto de arquivos processados.
+
+        Carrega o manifesto em lote e percorre os editais com PDF (ordem por
+        prazo de _iterar_editais_com_pdf) até juntar `limite`
+        editais com arquivo novo, processado por versão anterior do extrator
+        ou com status de falha. Arquivos em dia não contam para o limite e
+        não são baixados. Trocar VERSAO_EXTRATOR reprocessa exatamente os
+        arquivos da versão anterior.
+
+        Cada edital é avaliado por todos os seus arquivos no manifesto
+        (motivo_reextracao_edital). Falhas esperam um backoff exponencial
+        e param em MAX_TENTATIVAS_ARQUIVO. Erros de consulta sobem para o
+        chamador: plano vazio por falha não se confunde com "nada a fazer".
+        """
+        hoje = hoje or datetime.now().date().isoformat()
+        plano = PlanoReextracao()
+
+        manifesto = self.carregar_manifesto_arquivos(tamanho_pagina)
+        por_edital: Dict[int, List[Dict[str, Any]]] = {}
+        for registro in manifesto.values():
+            por_edital.setdefault(registro['edital_id'], []).append(registro)
+            motivo = motivo_reextracao(registro)
+            if motivo not in MOTIVOS_REEXTRACAO:
+                plano.hashes_em_dia.add(registro['hash_arquivo'])
+            elif motivo == 'com_falha':
+                plano.tentativas[registro['hash_arquivo']] = registro.get('tentativas') or 0
+
+        for edital in self._iterar_editais_com_pdf(pular_passados, hoje, tamanho_pagina):
+            motivo = motivo_reextracao_edital(edital['storage_path'], por_edital.get(edital['id'], []))
+            if motivo is None:
+                plano.em_dia += 1
+                continue
+            if motivo == 'adiado':
+                plano.adiados += 1
+                continue
+            if motivo == 'esgotado':
+                plano.esgotados += 1
+                continue
 
-            return result.data
-        except Exception as e:
-            logger.error(f"Erro ao buscar editais: {str(e)}")
-            return []
+            if motivo == 'novo':
+                plano.novos += 1
+            elif motivo == 'versao_antiga':
+                plano.versao_antiga += 1
+            else:
+                plano.com_falha += 1
+            plano.editais.append(edital)
+            if len(plano.editais) >= limite:
+                break
+
+        return plano
+
+
+# =============================================================================
+# V1.2: EXECUÇÃO PARALELA (WORKERS DE EXTRAÇÃO)
+# =============================================================================
+
+@dataclass
+class ArquivoPendente:
+    """PDF obtido (diretório local ou Storage) aguardando extração e persistência."""
+    edital_id: int
+    nome_arquivo: str
+    hash_arquivo: str
+    caminho_pdf: Optional[str] = None       # PDF em diretório local
+    conteudo: Optional[bytes] = None        # PDF baixado do Storage, em memória
+    tentativas: int = 0
+
+    @property
+    def fonte(self) -> FontePDF:
+        """Entrada para ExtratorTabelas.extrair (bytes têm prioridade)."""
+        return self.conteudo if self.conteudo is not None else self.caminho_pdf
+
+
+class TimeoutArquivoError(ExtracaoError):
+    """Extração de um PDF excedeu TIMEOUT_ARQUIVO_SEGUNDOS."""
+    pass
+
+
+# Estado por processo: cada worker cria seu extrator (e LLM) uma única vez
+_extrator_worker: Optional['ExtratorTabelas'] = None
+_llm_worker: Optional['LLMExtractor'] = None
+
+
+def _inicializar_worker(
+    enable_llm: bool = False,
+    modo_classificacao: str = MODO_CLASSIFICACAO_RAPIDO,
+    workers_paginas: int = 0,
+):
+    """Initializer do pool: instancia ExtratorTabelas/LLMExtractor no worker."""
+    global _extrator_worker, _llm_worker
+    _extrator_worker = ExtratorTabelas(modo_classificacao, workers_paginas)
+    _llm_worker = None
+    if enable_llm:
+        llm = LLMExtractor()
+        _llm_worker = llm if llm.client else None
+
+
+def _resultado_falha(codigo: CodigoErro, mensagem: str) -> ResultadoExtracao:
+    """ResultadoExtracao de falha (timeout, worker morto) para ir à quarentena."""
+    return ResultadoExtracao(
+        sucesso=False,
+        erros=[{'codigo': codigo.value, 'mensagem': mensagem}],
+    )
+
+
+def _extrair_em_worker(
+    fonte: FontePDF,
+    edital_id: int,
+    timeout_segundos: Optional[float] = TIMEOUT_ARQUIVO_SEGUNDOS,
+) -> Tuple[ResultadoExtracao, MetricasExecucao]:
+    """
+    Extrai um PDF dentro de um worker do pool.
+
+    Não acessa o banco: devolve o resultado e as métricas parciais do arquivo
+    (família, requests/custo LLM) para o processo principal persistir e mesclar.
+    O timeout usa SIGALRM, que só existe na thread principal de processos
+    POSIX (no Windows ou em pool de threads não há limite).
+    """
+    if _extrator_worker is None:
+        _inicializar_worker()
+
+    metricas = MetricasExecucao(total_arquivos=1)
+    llm_antes = _llm_worker.get_token_stats() if _llm_worker else None
+
+    usar_alarme = (
+        bool(timeout_segundos)
+        and hasattr(signal, 'SIGALRM')
+        and threading.current_thread() is threading.main_thread()
+    )
+    estourou = []
+
+    def _ao_estourar(signum, frame):
+        estourou.append(True)
+        raise TimeoutArquivoError(f"Extração excedeu {timeout_segundos:.0f}s")
+
+    if usar_alarme:
+        handler_anterior = signal.signal(signal.SIGALRM, _ao_estourar)
+        signal.setitimer(signal.ITIMER_REAL, timeout_segundos)
+
+    try:
+        resultado = _extrator_worker.extrair(fonte, edital_id, llm_extractor=_llm_worker)
+    except Exception as e:
+        resultado = _resultado_falha(CodigoErro.PDF_CORROMPIDO, f"Falha ao abrir PDF: {e}")
+    finally:
+        if usar_alarme:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, handler_anterior)
+
+    # A cascata captura exceções genéricas; o timeout pode ter virado
+    # ESTRUTURA_INESPERADA lá dentro - normaliza a mensagem
+    if estourou:
+        logger.warning(f"Timeout de {timeout_segundos:.0f}s no PDF do edital {edital_id}")
+        resultado = _resultado_falha(
+            CodigoErro.ESTRUTURA_INESPERADA,
+            f"Timeout: extração excedeu {timeout_segundos:.0f}s",
+        )
+
+    metricas.registrar_familia(resultado.familia_pdf)
+    if llm_antes is not None:
+        llm_depois = _llm_worker.get_token_stats()
+        metricas.llm_requests = llm_depois['total_requests'] - llm_antes['total_requests']
+        metricas.llm_cost_usd = llm_depois['estimated_cost_usd'] - llm_antes['estimated_cost_usd']
+
+    return resultado, metricas
+
+
+def _criar_pool_extracao(
+    workers: int,
+    tarefas_por_worker: int = TAREFAS_POR_WORKER,
+    enable_llm: bool = False,
+    modo_classificacao: str = MODO_CLASSIFICACAO_RAPIDO,
+    workers_paginas: int = 0,
+):
+    """
+    Pool de processos para extração.
+
+    Usa 'spawn' (max_tasks_per_child exige start method sem fork): cada
+    worker é descartado após `tarefas_por_worker` PDFs, devolvendo ao SO a
+    memória que o pdfplumber não libera.
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_inicializar_worker,
+        initargs=(enable_llm, modo_classificacao, workers_paginas),
+        max_tasks_per_child=tarefas_por_worker,
+    )
+
+
+def _extrair_faixa_paginas(caminho_pdf: str, paginas: List[int]) -> Dict[int, List[LoteExtraido]]:
+    """
+    Executa no pool de páginas: abre o PDF e extrai os lotes das páginas
+    da faixa. Retorna {página: lotes} para o processo pai remontar em ordem.
+    """
+    extrator = _extrator_worker or ExtratorTabelas()
+    with ParsedPDF(caminho_pdf) as documento:
+        return {num_pagina: extrator._lotes_da_pagina(documento, num_pagina) for num_pagina in paginas}
+
+
+def _criar_pool_paginas(workers: int, modo_classificacao: str = MODO_CLASSIFICACAO_RAPIDO):
+    """Pool de processos para as faixas de páginas de um PDF grande (spawn, sem reciclagem)."""
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_inicializar_worker,
+        initargs=(False, modo_classificacao),
+    )
 
 
 # =============================================================================
@@ -1525,16 +2781,52 @@ class LotesExtractorV1:
     5. Persistência ou quarentena
     """
 
-    def __init__(self, enable_llm: bool = True):
+    # V1.2: Linhas por upsert em lotes_leilao
+    tamanho_chunk: int = TAMANHO_CHUNK_LOTES
+    # V1.2: Modo do ClassificadorPDF (também repassado aos workers)
+    modo_classificacao: str = MODO_CLASSIFICACAO_RAPIDO
+    # V1.2: Processos por PDF para catálogos com muitas páginas de tabela
+    workers_paginas: int = 0
+    extrator: Optional[ExtratorTabelas] = None
+    # V1.2: Hashes em dia no manifesto (idempotência sem consulta por arquivo)
+    hashes_em_dia: Set[str] = frozenset()
+    # V1.2: Falhas seguidas de cada hash com_falha do plano (hash -> tentativas)
+    tentativas_arquivos: Dict[str, int] = {}
+    # V1.2: Índice de identidade de veículos (None = desativado)
+    indice_veiculos: Optional['VehicleIndex'] = None
+
+    def __init__(
+        self,
+        enable_llm: bool = True,
+        tamanho_chunk: int = TAMANHO_CHUNK_LOTES,
+        modo_classificacao: str = MODO_CLASSIFICACAO_RAPIDO,
+        workers_paginas: int = 0,
+        indice_veiculos: bool = True,
+    ):
         """
         Inicializa o orquestrador.
 
         Args:
             enable_llm: Se True, habilita LLM fallback (default: True)
+            tamanho_chunk: Linhas por upsert em lotes_leilao (V1.2)
+            modo_classificacao: 'rapido' (amostragem) ou 'completo' (V1.2)
+            workers_paginas: Processos para extrair as páginas de um mesmo PDF
+                em paralelo; 0 = serial (V1.2)
+            indice_veiculos: Liga cada lote ao veículo canônico no índice de
+                identidade (VEHICLE_INDEX_PATH) (V1.2)
         """
         self.repository = LotesRepository()
-        self.extrator = ExtratorTabelas()
+        self.extrator = ExtratorTabelas(modo_classificacao, workers_paginas)
         self.metricas = MetricasExecucao()
+        self.tamanho_chunk = tamanho_chunk
+        self.modo_classificacao = modo_classificacao
+        self.workers_paginas = workers_paginas
+
+        # V1.2: Índice de identidade de veículos
+        if indice_veiculos and INDICE_VEICULOS_DISPONIVEL:
+            self.indice_veiculos = VehicleIndex.from_env()
+        elif indice_veiculos:
+            logger.info("Índice de veículos: DESATIVADO (connectors.common indisponível)")
 
         # V1.1: LLM Fallback
         self.llm_extractor = None
@@ -1548,7 +2840,9 @@ class LotesExtractorV1:
     def executar(
         self,
         limite_editais: int = 100,
-        diretorio_pdfs: Optional[str] = None
+        diretorio_pdfs: Optional[str] = None,
+        deadline_segundos: Optional[float] = None,
+        pular_passados: bool = False,
     ) -> MetricasExecucao:
         """
         Executa o pipeline de extração de lotes.
@@ -1556,6 +2850,9 @@ class LotesExtractorV1:
         Args:
             limite_editais: Número máximo de editais a processar
             diretorio_pdfs: Diretório local com PDFs (opcional, senão baixa do Storage)
+            deadline_segundos: Orçamento de tempo; ao esgotar, para antes do
+                próximo edital (V1.2)
+            pular_passados: Não busca editais com leilão já realizado (V1.2)
 
         Returns:
             MetricasExecucao com estatísticas da execução
@@ -1564,19 +2861,31 @@ class LotesExtractorV1:
         logger.info(f"Limite de editais: {limite_editais}")
 
         self.metricas = MetricasExecucao()
+        inicio = time.monotonic()
 
         try:
-            # Buscar editais pendentes
-            editais = self.repository.buscar_editais_para_processar(limite_editais)
-            self.metricas.total_editais = len(editais)
-            logger.info(f"Editais encontrados: {len(editais)}")
+            self._carregar_indice_veiculos()
 
-            for edital in editais:
+            # Buscar editais pendentes (V1.2: ordenados por prazo do leilão)
+            editais = self._planejar(limite_editais, pular_passados)
+
+            for i, edital in enumerate(editais):
+                if deadline_segundos and time.monotonic() - inicio >= deadline_segundos:
+                    self.metricas.interrompido_deadline = True
+                    logger.warning(
+                        f"Deadline de {deadline_segundos:.0f}s esgotado após {i} editais; "
+                        f"{len(editais) - i} ficam para a próxima execução"
+                    )
+                    break
                 self._processar_edital(edital, diretorio_pdfs)
 
         except Exception as e:
             logger.error(f"Erro fatal na execução: {str(e)}")
             self.metricas.erros.append(str(e))
+        finally:
+            if self.extrator is not None:
+                self.extrator.fechar()
+            self._salvar_indice_veiculos()
 
         self.metricas.finalizar()
 
@@ -1586,29 +2895,253 @@ class LotesExtractorV1:
             self.metricas.llm_requests = llm_stats['total_requests']
             self.metricas.llm_cost_usd = llm_stats['estimated_cost_usd']
 
-        # Log final
+        self._logar_resumo()
+        return self.metricas
+
+    def executar_paralelo(
+        self,
+        limite_editais: int = 100,
+        diretorio_pdfs: Optional[str] = None,
+        workers: Optional[int] = None,
+        downloads: int = DOWNLOADS_SIMULTANEOS,
+        timeout_arquivo: Optional[float] = TIMEOUT_ARQUIVO_SEGUNDOS,
+        tarefas_por_worker: int = TAREFAS_POR_WORKER,
+        deadline_segundos: Optional[float] = None,
+        pular_passados: bool = False,
+    ) -> MetricasExecucao:
+        """
+        V1.2: Executa o pipeline em lote usando todos os núcleos.
+
+        - Downloads do Storage (e hash/idempotência) em pool de threads
+        - Classificação + extração em pool de processos, com timeout por
+          arquivo e reciclagem de workers
+        - Persistência no processo principal (único escritor no banco)
+        - Métricas de cada worker mescladas em self.metricas
+
+        No máximo 2 PDFs por worker ficam baixados/em extração ao mesmo tempo,
+        para limitar a memória (PDFs do Storage trafegam como bytes). Se um worker morrer (OOM,
+        segfault no pdfminer), o pool é recriado e os arquivos em voo têm uma
+        nova tentativa; na segunda falha vão para quarentena.
+
+        Args:
+            limite_editais: Número máximo de editais a processar
+            diretorio_pdfs: Diretório local com PDFs (opcional, senão baixa do Storage)
+            workers: Processos de extração (default: número de CPUs)
+            downloads: Threads de download simultâneas
+            timeout_arquivo: Tempo máximo de extração por PDF, em segundos
+            tarefas_por_worker: PDFs processados antes de reciclar o worker
+            deadline_segundos: Orçamento de tempo; ao esgotar, não inicia novos
+                editais e aguarda os que estão em voo
+            pular_passados: Não busca editais com leilão já realizado
+
+        Returns:
+            MetricasExecucao com estatísticas da execução
+        """
+        workers = workers or os.cpu_count() or 1
+        enable_llm = bool(self.llm_extractor and self.llm_extractor.client)
+
+        logger.info("=== INICIANDO EXTRAÇÃO DE LOTES V1 (PARALELO) ===")
+        logger.info(f"Limite de editais: {limite_editais} | workers: {workers} | downloads: {downloads}")
+
+        self.metricas = MetricasExecucao()
+        inicio = time.monotonic()
+
+        try:
+            self._carregar_indice_veiculos()
+            editais = self._planejar(limite_editais, pular_passados)
+
+            pendentes = iter(editais)
+            janela = workers * 2
+            baixando: Dict[Any, Dict] = {}
+            extraindo: Dict[Any, ArquivoPendente] = {}
+            iniciados = 0
+
+            pool_io = ThreadPoolExecutor(max_workers=downloads, thread_name_prefix='lotes_download')
+            pool = _criar_pool_extracao(
+                workers, tarefas_por_worker, enable_llm, self.modo_classificacao, self.workers_paginas
+            )
+
+            def _submeter(arquivo: ArquivoPendente):
+                futuro = pool.submit(_extrair_em_worker, arquivo.fonte, arquivo.edital_id, timeout_arquivo)
+                extraindo[futuro] = arquivo
+
+            try:
+                while True:
+                    # Alimenta downloads enquanto houver espaço na janela
+                    while pendentes is not None and len(baixando) + len(extraindo) < janela:
+                        if deadline_segundos and time.monotonic() - inicio >= deadline_segundos:
+                            self.metricas.interrompido_deadline = True
+                            logger.warning(
+                                f"Deadline de {deadline_segundos:.0f}s esgotado após {iniciados} editais; "
+                                f"{len(editais) - iniciados} ficam para a próxima execução"
+                            )
+                            pendentes = None
+                            break
+                        edital = next(pendentes, None)
+                        if edital is None:
+                            pendentes = None
+                            break
+                        baixando[pool_io.submit(self._obter_pdf, edital, diretorio_pdfs)] = edital
+                        iniciados += 1
+
+                    if not baixando and not extraindo:
+                        break
+
+                    prontos, _ = wait(list(baixando) + list(extraindo), return_when=FIRST_COMPLETED)
+
+                    for futuro in prontos:
+                        if futuro in baixando:
+                            edital = baixando.pop(futuro)
+                            try:
+                                arquivo = futuro.result()
+                            except Exception as e:
+                                logger.error(f"Erro ao obter PDF do edital {edital.get('id')}: {e}")
+                                self.metricas.erros.append(f"edital {edital.get('id')}: {e}")
+                                continue
+                            if arquivo:
+                                _submeter(arquivo)
+                            continue
+
+                        if futuro not in extraindo:
+                            # Futuro do pool antigo, já reenviado após BrokenProcessPool
+                            continue
+
+                        arquivo = extraindo.pop(futuro)
+                        try:
+                            resultado, metricas_worker = futuro.result()
+                        except BrokenProcessPool:
+                            logger.error("Worker de extração morreu; recriando pool de processos")
+                            pool.shutdown(wait=False, cancel_futures=True)
+                            pool = _criar_pool_extracao(
+                                workers, tarefas_por_worker, enable_llm,
+                                self.modo_classificacao, self.workers_paginas
+                            )
+                            afetados = [arquivo] + list(extraindo.values())
+                            extraindo.clear()
+                            for afetado in afetados:
+                                if afetado.tentativas < 1:
+                                    afetado.tentativas += 1
+                                    _submeter(afetado)
+                                else:
+                                    self._finalizar_arquivo(afetado, _resultado_falha(
+                                        CodigoErro.PDF_CORROMPIDO,
+                                        "Worker de extração morreu duas vezes processando o arquivo",
+                                    ), MetricasExecucao(total_arquivos=1))
+                            continue
+                        except Exception as e:
+                            resultado = _resultado_falha(CodigoErro.ESTRUTURA_INESPERADA, f"Erro no worker: {e}")
+                            metricas_worker = MetricasExecucao(total_arquivos=1)
+
+                        self._finalizar_arquivo(arquivo, resultado, metricas_worker)
+
+            finally:
+                pool_io.shutdown(wait=True)
+                pool.shutdown(wait=True, cancel_futures=True)
+
+        except Exception as e:
+            logger.error(f"Erro fatal na execução: {str(e)}")
+            self.metricas.erros.append(str(e))
+        finally:
+            self._salvar_indice_veiculos()
+
+        self.metricas.finalizar()
+        self._logar_resumo()
+        return self.metricas
+
+    def _planejar(self, limite_editais: int, pular_passados: bool) -> List[Dict]:
+        """V1.2: Plano de (re)extração; guarda os hashes em dia para _obter_pdf."""
+        plano = self.repository.planejar_reextracao(limite_editais, pular_passados=pular_passados)
+        self.hashes_em_dia = plano.hashes_em_dia
+        self.tentativas_arquivos = plano.tentativas
+        self.metricas.total_editais = len(plano.editais)
+        logger.info(
+            f"Editais a processar: {len(plano.editais)} ({plano.novos} novos, "
+            f"{plano.versao_antiga} de versão anterior, {plano.com_falha} com falha; "
+            f"{plano.em_dia} em dia, {plano.adiados} em backoff e "
+            f"{plano.esgotados} sem tentativas pulados)"
+        )
+        return plano.editais
+
+    def _carregar_indice_veiculos(self):
+        """V1.2: Traz do espelho no banco os veículos vistos por outras execuções."""
+        if self.indice_veiculos is None:
+            return
+        novas = self.indice_veiculos.pull_mirror(self.repository.client)
+        logger.info(f"Índice de veículos: {len(self.indice_veiculos)} veículos ({novas} chaves do espelho)")
+
+    def _salvar_indice_veiculos(self):
+        """V1.2: Grava o índice local e envia as alterações ao espelho."""
+        if self.indice_veiculos is None:
+            return
+        self.indice_veiculos.flush()
+        self.indice_veiculos.push_mirror(self.repository.client)
+
+    def _vincular_veiculos(self, edital_id: int, lotes: List[LoteExtraido]) -> int:
+        """
+        V1.2: Liga cada lote ao vehicle_id canônico do índice de identidade.
+
+        Veículo já visto em outro edital (releilão, edital republicado) ou
+        em outra fonte tem os campos vazios completados a partir do registro
+        canônico, em vez de ficar com o que a linha deste PDF trouxe. Placa
+        e renavam não são completados: o índice guarda só a chave
+        normalizada (placa Mercosul no formato antigo, renavam com zeros),
+        que não é o valor impresso no documento.
+
+        Returns:
+            Quantidade de lotes cujo veículo já estava no índice
+        """
+        duplicados = 0
+        for lote in lotes:
+            match = self.indice_veiculos.resolve(
+                placa=lote.placa,
+                chassi=lote.chassi,
+                renavam=lote.renavam,
+                fonte='lotes_leilao',
+                referencia=lote.gerar_id_interno(edital_id),
+                marca=lote.marca,
+                modelo=lote.modelo,
+                ano=lote.ano_fabricacao,
+            )
+            if match is None:
+                continue
+            lote.vehicle_id = match.vehicle_id
+            if match.duplicate:
+                duplicados += 1
+            canonico = match.vehicle
+            lote.chassi = lote.chassi or canonico.chassi
+            lote.marca = lote.marca or canonico.marca
+            lote.modelo = lote.modelo or canonico.modelo
+            lote.ano_fabricacao = lote.ano_fabricacao or canonico.ano
+        return duplicados
+
+    def _logar_resumo(self):
+        """Log final da execução."""
         logger.info(f"=== EXTRAÇÃO FINALIZADA ===")
         logger.info(f"Total lotes extraídos: {self.metricas.total_lotes_extraidos}")
         logger.info(f"Total quarentena: {self.metricas.total_quarentena}")
         logger.info(f"Por família: {self.metricas.por_familia}")
+        if self.metricas.lotes_veiculo_duplicado:
+            logger.info(f"Lotes com veículo já indexado: {self.metricas.lotes_veiculo_duplicado}")
+        if self.metricas.arquivos_parciais:
+            logger.info(f"Arquivos com extração LLM parcial (reprocessados depois): {self.metricas.arquivos_parciais}")
 
         # V1.1: Log LLM
-        if self.llm_extractor and self.metricas.llm_requests > 0:
+        if self.metricas.llm_requests > 0:
             logger.info(f"LLM requests: {self.metricas.llm_requests}")
             logger.info(f"LLM custo estimado: ${self.metricas.llm_cost_usd:.4f}")
 
-        return self.metricas
-
-    def _download_do_storage(self, storage_path: str) -> Optional[str]:
+    def _download_do_storage(self, storage_path: str) -> Optional[bytes]:
         """
-        Baixa PDF do Supabase Storage para arquivo temporário.
+        Baixa PDF do Supabase Storage.
+
+        V1.2: Devolve o conteúdo em memória - o pdfplumber lê direto de
+        bytes, sem arquivo temporário (escrita, fsync e cleanup).
 
         Args:
             storage_path: Caminho do arquivo no bucket (ex: "PNCP_123/edital.pdf")
 
         Returns:
-            Caminho do arquivo temporário local, ou None se falhar.
-            IMPORTANTE: Caller deve deletar o arquivo após uso.
+            Bytes do PDF, ou None se falhar.
         """
         try:
             logger.info(f"Baixando do Storage: {storage_path}")
@@ -1622,141 +3155,124 @@ class LotesExtractorV1:
                 logger.warning(f"Download vazio para: {storage_path}")
                 return None
 
-            # Criar arquivo temporário com extensão .pdf
-            fd, temp_path = tempfile.mkstemp(suffix='.pdf', prefix='lotes_')
-
-            try:
-                with os.fdopen(fd, 'wb') as f:
-                    f.write(response)
-
-                logger.info(f"Download OK: {storage_path} -> {temp_path} ({len(response)} bytes)")
-                return temp_path
-
-            except Exception as e:
-                # Se falhar ao escrever, fechar e remover
-                os.close(fd)
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
-                raise e
+            logger.info(f"Download OK: {storage_path} ({len(response)} bytes)")
+            return response
 
         except Exception as e:
             logger.error(f"Erro no download de {storage_path}: {str(e)}")
             return None
 
-    def _processar_edital(
+    def _obter_pdf(
         self,
         edital: Dict,
         diretorio_pdfs: Optional[str]
-    ):
-        """Processa um edital individual."""
+    ) -> Optional[ArquivoPendente]:
+        """
+        Localiza ou baixa o PDF do edital e verifica idempotência pelo hash.
+
+        Seguro para threads (só I/O, não altera métricas).
+
+        Returns:
+            ArquivoPendente, ou None se não houver PDF ou ele já foi processado
+        """
         edital_id = edital['id']
         storage_path = edital.get('storage_path')
 
         if not storage_path:
             logger.warning(f"Edital {edital_id} sem PDF")
-            return
+            return None
 
-        # Determinar caminho do PDF
-        arquivo_temporario = False
+        nome_arquivo = os.path.basename(storage_path)
 
         if diretorio_pdfs:
             # Usa diretório local
-            caminho_pdf = os.path.join(diretorio_pdfs, os.path.basename(storage_path))
+            caminho_pdf = os.path.join(diretorio_pdfs, nome_arquivo)
             if not os.path.exists(caminho_pdf):
                 logger.warning(f"PDF não encontrado localmente: {caminho_pdf}")
-                return
+                return None
+
+            # Calcular hash do arquivo para idempotência
+            with open(caminho_pdf, 'rb') as f:
+                hash_arquivo = hashlib.sha256(f.read()).hexdigest()
+
+            arquivo = ArquivoPendente(edital_id, nome_arquivo, hash_arquivo, caminho_pdf=caminho_pdf)
         else:
-            # Download do Supabase Storage
-            caminho_pdf = self._download_do_storage(storage_path)
-            if not caminho_pdf:
+            # Download do Supabase Storage (V1.2: em memória)
+            conteudo = self._download_do_storage(storage_path)
+            if not conteudo:
                 logger.warning(f"Falha no download: {storage_path}")
-                return
-            arquivo_temporario = True
-
-        # Calcular hash do arquivo para idempotência
-        with open(caminho_pdf, 'rb') as f:
-            hash_arquivo = hashlib.sha256(f.read()).hexdigest()
-
-        # Verificar se já foi processado
-        if self.repository.arquivo_ja_processado(hash_arquivo):
-            logger.info(f"Arquivo já processado: {os.path.basename(caminho_pdf)}")
-            # Cleanup antes de retornar
-            if arquivo_temporario and os.path.exists(caminho_pdf):
-                os.unlink(caminho_pdf)
-            return
+                return None
 
-        self.metricas.total_arquivos += 1
+            hash_arquivo = hashlib.sha256(conteudo).hexdigest()
+            arquivo = ArquivoPendente(edital_id, nome_arquivo, hash_arquivo, conteudo=conteudo)
 
-        # Extrair lotes (V1.1: passa LLM extractor para cascata)
-        resultado = self.extrator.extrair(caminho_pdf, edital_id, llm_extractor=self.llm_extractor)
+        # Verificar se já foi processado (V1.2: pelo manifesto do plano, sem consulta)
+        if arquivo.hash_arquivo in self.hashes_em_dia:
+            logger.info(f"Arquivo já processado: {arquivo.nome_arquivo}")
+            return None
 
-        # Atualizar métricas por família
-        if resultado.familia_pdf:
-            familia_key = resultado.familia_pdf.value
-            self.metricas.por_familia[familia_key] = self.metricas.por_familia.get(familia_key, 0) + 1
+        return arquivo
 
-        total_lotes = 0
-        total_quarentena = 0
+    def _processar_edital(
+        self,
+        edital: Dict,
+        diretorio_pdfs: Optional[str]
+    ):
+        """Processa um edital individual (modo serial)."""
+        arquivo = self._obter_pdf(edital, diretorio_pdfs)
+        if not arquivo:
+            return
 
-        if resultado.sucesso:
-            # Salvar lotes extraídos
-            for lote in resultado.lotes:
-                res = self.repository.salvar_lote(
-                    lote=lote,
-                    edital_id=edital_id,
-                    fonte_arquivo=os.path.basename(caminho_pdf),
-                    familia_pdf=resultado.familia_pdf
-                )
-                if res['sucesso']:
-                    total_lotes += 1
-                else:
-                    total_quarentena += 1
-        else:
-            # Enviar para quarentena
-            for erro in resultado.erros:
-                codigo_erro = erro['codigo']
-                # Tentar mapear o código para o enum
-                try:
-                    codigo_enum = CodigoErro[codigo_erro] if codigo_erro in CodigoErro.__members__ else CodigoErro.ESTRUTURA_INESPERADA
-                except:
-                    codigo_enum = CodigoErro.ESTRUTURA_INESPERADA
+        # Extrair lotes (V1.1: passa LLM extractor para cascata)
+        resultado = self.extrator.extrair(
+            arquivo.fonte, arquivo.edital_id, llm_extractor=self.llm_extractor
+        )
 
-                self.repository.enviar_quarentena(
-                    edital_id=edital_id,
-                    payload={'arquivo': os.path.basename(caminho_pdf)},
-                    estagio=EstagioFalha.EXTRACAO,
-                    codigo=codigo_enum,
-                    mensagem=erro['mensagem'],
-                    fonte_arquivo=os.path.basename(caminho_pdf),
-                    familia_pdf=resultado.familia_pdf
-                )
-                total_quarentena += 1
+        metricas_arquivo = MetricasExecucao(total_arquivos=1)
+        metricas_arquivo.registrar_familia(resultado.familia_pdf)
+        self._finalizar_arquivo(arquivo, resultado, metricas_arquivo)
 
-        # Registrar arquivo processado
-        self.repository.registrar_arquivo_processado(
-            edital_id=edital_id,
-            nome_arquivo=os.path.basename(caminho_pdf),
-            hash_arquivo=hash_arquivo,
-            tipo_detectado=resultado.familia_pdf.value if resultado.familia_pdf else 'desconhecido',
-            familia_pdf=resultado.familia_pdf,
-            total_lotes=total_lotes,
-            total_quarentena=total_quarentena,
-            status='processado' if resultado.sucesso else 'erro',
-            tempo_ms=resultado.tempo_processamento_ms
-        )
+    def _finalizar_arquivo(
+        self,
+        arquivo: ArquivoPendente,
+        resultado: ResultadoExtracao,
+        metricas_arquivo: MetricasExecucao,
+    ):
+        """Mescla métricas do arquivo e persiste o resultado."""
+        self.metricas.mesclar(metricas_arquivo)
+        self._persistir_resultado(arquivo, resultado)
 
-        self.metricas.total_lotes_extraidos += total_lotes
-        self.metricas.total_quarentena += total_quarentena
+    def _persistir_resultado(self, arquivo: ArquivoPendente, resultado: ResultadoExtracao):
+        """
+        Grava lotes (ou quarentena) e registra o arquivo como processado.
 
-        logger.info(f"Edital {edital_id}: {total_lotes} lotes, {total_quarentena} quarentena")
+        V1.2: Chamado apenas pelo processo principal - no modo paralelo os
+        workers só extraem, e este é o único escritor no banco. Cada arquivo
+        é um único flush em lote (LotesRepository.salvar_resultado_arquivo).
+        """
+        if self.indice_veiculos is not None and resultado.sucesso:
+            self.metricas.lotes_veiculo_duplicado += self._vincular_veiculos(arquivo.edital_id, resultado.lotes)
+        if resultado.parcial:
+            self.metricas.arquivos_parciais += 1
+
+        gravacao = self.repository.salvar_resultado_arquivo(
+            edital_id=arquivo.edital_id,
+            nome_arquivo=arquivo.nome_arquivo,
+            hash_arquivo=arquivo.hash_arquivo,
+            resultado=resultado,
+            tamanho_chunk=self.tamanho_chunk,
+            tentativas_anteriores=self.tentativas_arquivos.get(arquivo.hash_arquivo, 0),
+        )
 
-        # Cleanup: remover arquivo temporário se baixou do Storage
-        if arquivo_temporario and caminho_pdf and os.path.exists(caminho_pdf):
-            try:
-                os.unlink(caminho_pdf)
-                logger.debug(f"Arquivo temporário removido: {caminho_pdf}")
-            except Exception as e:
-                logger.warning(f"Falha ao remover temporário {caminho_pdf}: {e}")
+        self.metricas.total_lotes_extraidos += gravacao.salvos
+        self.metricas.total_quarentena += gravacao.quarentena
+        for erro in gravacao.erros:
+            self.metricas.erros.append(f"edital {arquivo.edital_id}: {erro}")
+
+        logger.info(
+            f"Edital {arquivo.edital_id}: {gravacao.salvos} lotes, {gravacao.quarentena} quarentena "
+            f"({gravacao.requisicoes} requisições)"
+        )
 
 
 # =============================================================================
@@ -1772,6 +3288,21 @@ def main():
     parser.add_argument('--diretorio', type=str, help='Diretório local com PDFs')
     parser.add_argument('--verbose', action='store_true', help='Modo verbose')
     parser.add_argument('--sem-llm', action='store_true', help='Desabilita LLM fallback (apenas pdfplumber + regex)')
+    parser.add_argument('--deadline', type=parse_duracao, help='Orçamento de tempo (ex: 20m, 1h30m, 90s)')
+    parser.add_argument('--excluir-data-passada', action='store_true',
+                        help='Não processa editais com leilão já realizado')
+    parser.add_argument('--workers', type=int,
+                        help='Modo paralelo: processos de extração (0 = número de CPUs)')
+    parser.add_argument('--timeout-arquivo', type=float, default=TIMEOUT_ARQUIVO_SEGUNDOS,
+                        help='Modo paralelo: tempo máximo de extração por PDF (segundos)')
+    parser.add_argument('--tamanho-chunk', type=int, default=TAMANHO_CHUNK_LOTES,
+                        help='Lotes por upsert em lotes_leilao')
+    parser.add_argument('--classificacao-completa', action='store_true',
+                        help='Detecta tabelas em todas as páginas (desliga a amostragem em PDFs grandes)')
+    parser.add_argument('--workers-paginas', type=int, default=0,
+                        help='Processos por PDF para catálogos com muitas páginas de tabela (0 = serial)')
+    parser.add_argument('--sem-indice-veiculos', action='store_true',
+                        help='Não consulta o índice de identidade de veículos (deduplicação entre editais)')
 
     args = parser.parse_args()
 
@@ -1779,11 +3310,30 @@ def main():
         logging.getLogger().setLevel(logging.DEBUG)
 
     # V1.1: Passar flag enable_llm
-    extrator = LotesExtractorV1(enable_llm=not args.sem_llm)
-    metricas = extrator.executar(
-        limite_editais=args.limite,
-        diretorio_pdfs=args.diretorio
+    extrator = LotesExtractorV1(
+        enable_llm=not args.sem_llm,
+        tamanho_chunk=args.tamanho_chunk,
+        modo_classificacao=MODO_CLASSIFICACAO_COMPLETO if args.classificacao_completa else MODO_CLASSIFICACAO_RAPIDO,
+        workers_paginas=args.workers_paginas,
+        indice_veiculos=not args.sem_indice_veiculos,
     )
+    if args.workers is not None:
+        # V1.2: Downloads em threads, extração em processos, escrita no principal
+        metricas = extrator.executar_paralelo(
+            limite_editais=args.limite,
+            diretorio_pdfs=args.diretorio,
+            workers=args.workers or None,
+            timeout_arquivo=args.timeout_arquivo,
+            deadline_segundos=args.deadline,
+            pular_passados=args.excluir_data_passada,
+        )
+    else:
+        metricas = extrator.executar(
+            limite_editais=args.limite,
+            diretorio_pdfs=args.diretorio,
+            deadline_segundos=args.deadline,
+            pular_passados=args.excluir_data_passada,
+        )
 
     print("\n" + "="*60)
     print("RESULTADO DA EXTRAÇÃO V1.1")
@@ -11,6 +11,9 @@ Data: 2026-01-26
 Autor: Tech Lead (Claude Code)
 
 Changelog:
+- V1.2.0: PDF em memória vai direto ao pdfplumber (sem NamedTemporaryFile)
+- V1.2.0: Lotes, quarentena e registro do arquivo gravados em um único flush
+          em lote (GravadorLotes, compartilhado com LotesRepository)
 - V1.1.0: Idempotência via tabela arquivos_processados_lotes
 - V1.1.0: Skip de PDFs já processados (usa hash SHA256)
 - V1.0.0: Versão inicial
@@ -25,8 +28,6 @@ Funcionalidades:
 
 import hashlib
 import logging
-import os
-import tempfile
 from datetime import datetime
 from io import BytesIO
 from typing import Any, Dict, List, Optional, Union
@@ -38,12 +39,16 @@ from supabase import Client
 from .lotes_extractor_v1 import (
     ClassificadorPDF,
     ExtratorTabelas,
+    GravadorLotes,
+    ParsedPDF,
     LoteExtraido,
     ResultadoExtracao,
     FamiliaPDF,
     EstagioFalha,
     CodigoErro,
+    TAMANHO_CHUNK_LOTES,
     VERSAO_EXTRATOR,
+    montar_registro_lote,
 )
 
 logger = logging.getLogger('LotesIntegration')
@@ -57,14 +62,20 @@ class LotesIntegration:
     extrair o link do leiloeiro.
     """
 
-    def __init__(self, supabase_client: Optional[Client] = None):
+    def __init__(
+        self,
+        supabase_client: Optional[Client] = None,
+        tamanho_chunk: int = TAMANHO_CHUNK_LOTES,
+    ):
         """
         Inicializa o módulo de integração.
 
         Args:
             supabase_client: Cliente Supabase já conectado (opcional)
+            tamanho_chunk: Lotes por upsert em lotes_leilao (V1.2)
         """
         self.client = supabase_client
+        self.tamanho_chunk = tamanho_chunk
         self.extrator = ExtratorTabelas()
         self.classificador = ClassificadorPDF()
 
@@ -91,10 +102,9 @@ class LotesIntegration:
         Returns:
             Hash SHA256 em hexadecimal
         """
-        pdf_bytesio.seek(0)
-        hash_sha256 = hashlib.sha256(pdf_bytesio.read()).hexdigest()
-        pdf_bytesio.seek(0)  # Reset para leitura posterior
-        return hash_sha256
+        # V1.2: getbuffer() expõe o buffer interno (sem copiar o PDF)
+        with pdf_bytesio.getbuffer() as buffer:
+            return hashlib.sha256(buffer).hexdigest()
 
     def _verificar_arquivo_processado(self, hash_arquivo: str) -> Optional[Dict[str, Any]]:
         """
@@ -160,20 +170,10 @@ class LotesIntegration:
             return False
 
         try:
-            dados = {
-                'edital_id': edital_id,
-                'nome_arquivo': nome_arquivo,
-                'hash_arquivo': hash_arquivo,
-                'tipo_detectado': tipo_detectado,
-                'familia_pdf': familia_pdf,
-                'total_lotes_extraidos': total_lotes,
-                'total_lotes_quarentena': total_quarentena,
-                'status': status,
-                'mensagem_status': mensagem,
-                'versao_extrator': VERSAO_EXTRATOR,
-                'processado_em': datetime.now().isoformat(),
-                'tempo_processamento_ms': tempo_ms,
-            }
+            dados = self._montar_registro_arquivo(
+                edital_id, nome_arquivo, hash_arquivo, tipo_detectado, familia_pdf,
+                total_lotes, total_quarentena, status, mensagem, tempo_ms,
+            )
 
             # UPSERT: Se o hash já existir, atualiza (reprocessamento com --force)
             self.client.table('arquivos_processados_lotes').upsert(
@@ -188,6 +188,35 @@ class LotesIntegration:
             logger.error(f"Erro ao registrar arquivo processado: {e}")
             return False
 
+    def _montar_registro_arquivo(
+        self,
+        edital_id: int,
+        nome_arquivo: str,
+        hash_arquivo: str,
+        tipo_detectado: str,
+        familia_pdf: Optional[str],
+        total_lotes: int,
+        total_quarentena: int,
+        status: str,
+        mensagem: Optional[str],
+        tempo_ms: int,
+    ) -> Dict[str, Any]:
+        """Monta a linha de arquivos_processados_lotes."""
+        return {
+            'edital_id': edital_id,
+            'nome_arquivo': nome_arquivo,
+            'hash_arquivo': hash_arquivo,
+            'tipo_detectado': tipo_detectado,
+            'familia_pdf': familia_pdf,
+            'total_lotes_extraidos': total_lotes,
+            'total_lotes_quarentena': total_quarentena,
+            'status': status,
+            'mensagem_status': mensagem,
+            'versao_extrator': VERSAO_EXTRATOR,
+            'processado_em': datetime.now().isoformat(),
+            'tempo_processamento_ms': tempo_ms,
+        }
+
     def extrair_lotes_de_bytesio(
         self,
         pdf_bytesio: BytesIO,
@@ -209,37 +238,25 @@ class LotesIntegration:
         """
         logger.info(f"Extraindo lotes de {arquivo_nome} (edital_id={edital_id})")
 
-        # Salvar em arquivo temporário para processamento
-        # (pdfplumber funciona melhor com arquivo)
-        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
-            tmp.write(pdf_bytesio.getvalue())
-            tmp_path = tmp.name
+        # V1.2: pdfplumber lê direto do BytesIO - sem arquivo temporário
+        with ParsedPDF(pdf_bytesio, nome=arquivo_nome) as documento:
+            resultado = self.extrator.extrair(documento, edital_id)
 
-        try:
-            resultado = self.extrator.extrair(tmp_path, edital_id)
+        # Atualizar métricas
+        self.metricas['total_pdfs'] += 1
+        if resultado.familia_pdf:
+            familia = resultado.familia_pdf.value
+            self.metricas['por_familia'][familia] = \
+                self.metricas['por_familia'].get(familia, 0) + 1
 
-            # Atualizar métricas
-            self.metricas['total_pdfs'] += 1
-            if resultado.familia_pdf:
-                familia = resultado.familia_pdf.value
-                self.metricas['por_familia'][familia] = \
-                    self.metricas['por_familia'].get(familia, 0) + 1
+        if resultado.sucesso:
+            self.metricas['total_lotes'] += len(resultado.lotes)
+            logger.info(f"  Extraídos {len(resultado.lotes)} lotes de {arquivo_nome}")
+        else:
+            self.metricas['total_quarentena'] += 1
+            logger.warning(f"  Falha na extração de {arquivo_nome}: {resultado.erros}")
 
-            if resultado.sucesso:
-                self.metricas['total_lotes'] += len(resultado.lotes)
-                logger.info(f"  Extraídos {len(resultado.lotes)} lotes de {arquivo_nome}")
-            else:
-                self.metricas['total_quarentena'] += 1
-                logger.warning(f"  Falha na extração de {arquivo_nome}: {resultado.erros}")
-
-            return resultado
-
-        finally:
-            # Limpar arquivo temporário
-            try:
-                os.unlink(tmp_path)
-            except:
-                pass
+        return resultado
 
     def salvar_lotes_supabase(
         self,
@@ -264,61 +281,20 @@ class LotesIntegration:
             logger.warning("Cliente Supabase não configurado - lotes não salvos")
             return {'sucesso': False, 'motivo': 'sem_cliente_supabase'}
 
-        salvos = 0
-        erros = 0
-
-        for lote in lotes:
-            try:
-                id_interno = lote.gerar_id_interno(edital_id)
-                hash_fonte = hashlib.sha256(
-                    lote.texto_fonte_completo.encode() if lote.texto_fonte_completo else b''
-                ).hexdigest()
-
-                dados = {
-                    'id_interno': id_interno,
-                    'edital_id': edital_id,
-
-                    # Dados brutos
-                    'numero_lote_raw': lote.numero_lote_raw,
-                    'descricao_raw': lote.descricao_raw,
-                    'valor_raw': lote.valor_raw,
-                    'texto_fonte_completo': lote.texto_fonte_completo,
-
-                    # Dados processados
-                    'numero_lote': lote.numero_lote,
-                    'descricao_completa': lote.descricao_completa,
-                    'avaliacao_valor': lote.avaliacao_valor,
-
-                    # Dados de veículo
-                    'placa': lote.placa,
-                    'chassi': lote.chassi,
-                    'renavam': lote.renavam,
-                    'marca': lote.marca,
-                    'modelo': lote.modelo,
-                    'ano_fabricacao': lote.ano_fabricacao,
-
-                    # Metadados
-                    'fonte_tipo': 'pdf_tabela',
-                    'fonte_arquivo': arquivo_nome,
-                    'fonte_pagina': lote.fonte_pagina,
-                    'hash_conteudo_fonte': hash_fonte,
-                    'versao_extrator': VERSAO_EXTRATOR,
-                    'familia_pdf': familia_pdf.value if familia_pdf else None,
-                }
-
-                self.client.table('lotes_leilao').upsert(
-                    dados,
-                    on_conflict='id_interno'
-                ).execute()
-
-                salvos += 1
-
-            except Exception as e:
-                logger.error(f"Erro ao salvar lote: {e}")
-                erros += 1
-
-        logger.info(f"Lotes salvos: {salvos}, erros: {erros}")
-        return {'sucesso': True, 'salvos': salvos, 'erros': erros}
+        registros = [
+            montar_registro_lote(lote, edital_id, arquivo_nome, familia_pdf)
+            for lote in lotes
+        ]
+        gravacao = GravadorLotes(self.client, self.tamanho_chunk).gravar(registros)
+        erros = len(registros) - gravacao.salvos
+
+        logger.info(f"Lotes salvos: {gravacao.salvos}, erros: {erros} ({gravacao.requisicoes} requisições)")
+        return {
+            'sucesso': not gravacao.erros,
+            'salvos': gravacao.salvos,
+            'erros': erros,
+            'quarentena': gravacao.quarentena,
+        }
 
     def enviar_quarentena(
         self,
@@ -340,28 +316,32 @@ class LotesIntegration:
         if not self.client:
             return False
 
-        try:
-            for erro in resultado.erros:
-                dados = {
-                    'edital_id': edital_id,
-                    'payload_original': {'arquivo': arquivo_nome},
-                    'estagio_falha': EstagioFalha.EXTRACAO.value,
-                    'codigo_erro': erro.get('codigo', 'DESCONHECIDO'),
-                    'mensagem_erro': erro.get('mensagem', 'Erro desconhecido'),
-                    'fonte_tipo': 'pdf',
-                    'fonte_arquivo': arquivo_nome,
-                    'familia_pdf': resultado.familia_pdf.value if resultado.familia_pdf else None,
-                    'versao_extrator': VERSAO_EXTRATOR,
-                    'status': 'pendente',
-                }
-
-                self.client.table('lotes_quarentena').insert(dados).execute()
-
-            return True
+        registros = self._montar_registros_quarentena(edital_id, arquivo_nome, resultado)
+        gravacao = GravadorLotes(self.client, self.tamanho_chunk).gravar([], registros)
+        return not gravacao.erros
 
-        except Exception as e:
-            logger.error(f"Erro ao enviar para quarentena: {e}")
-            return False
+    def _montar_registros_quarentena(
+        self,
+        edital_id: int,
+        arquivo_nome: str,
+        resultado: ResultadoExtracao,
+    ) -> List[Dict[str, Any]]:
+        """Monta uma linha de lotes_quarentena por erro da extração."""
+        return [
+            {
+                'edital_id': edital_id,
+                'payload_original': {'arquivo': arquivo_nome},
+                'estagio_falha': EstagioFalha.EXTRACAO.value,
+                'codigo_erro': erro.get('codigo', 'DESCONHECIDO'),
+                'mensagem_erro': erro.get('mensagem', 'Erro desconhecido'),
+                'fonte_tipo': 'pdf',
+                'fonte_arquivo': arquivo_nome,
+                'familia_pdf': resultado.familia_pdf.value if resultado.familia_pdf else None,
+                'versao_extrator': VERSAO_EXTRATOR,
+                'status': 'pendente',
+            }
+            for erro in resultado.erros
+        ]
 
     def processar_pdf_completo(
         self,
@@ -446,45 +426,46 @@ class LotesIntegration:
             'skip_ja_processado': False,
         }
 
-        total_quarentena = 0
-
-        if resultado.sucesso and resultado.lotes and salvar_banco:
-            # Salvar lotes
-            res_salvar = self.salvar_lotes_supabase(
-                lotes=resultado.lotes,
-                edital_id=edital_id,
-                arquivo_nome=arquivo_nome,
-                familia_pdf=resultado.familia_pdf,
-            )
-            stats['lotes_salvos'] = res_salvar.get('salvos', 0)
-
-        elif not resultado.sucesso and salvar_banco:
-            # Enviar para quarentena
-            self.enviar_quarentena(
-                edital_id=edital_id,
-                arquivo_nome=arquivo_nome,
-                resultado=resultado,
-            )
-            total_quarentena = 1
-
         stats['tempo_ms'] = int((time.time() - inicio) * 1000)
 
-        # V1.1: Registrar arquivo como processado
-        if salvar_banco:
-            status_final = 'processado' if resultado.sucesso else 'erro'
-            self._registrar_arquivo_processado(
+        # V1.2: Lotes + quarentena + registro do arquivo em um único flush
+        if salvar_banco and self.client:
+            lotes_registros = []
+            quarentena = []
+            if resultado.sucesso:
+                lotes_registros = [
+                    montar_registro_lote(lote, edital_id, arquivo_nome, resultado.familia_pdf)
+                    for lote in resultado.lotes
+                ]
+            else:
+                quarentena = self._montar_registros_quarentena(edital_id, arquivo_nome, resultado)
+
+            registro_arquivo = self._montar_registro_arquivo(
                 edital_id=edital_id,
                 nome_arquivo=arquivo_nome,
                 hash_arquivo=hash_arquivo,
                 tipo_detectado='pdf_nativo',  # TODO: detectar tipo real
                 familia_pdf=stats['familia_pdf'],
                 total_lotes=len(resultado.lotes),
-                total_quarentena=total_quarentena,
-                status=status_final,
+                total_quarentena=len(quarentena),
+                status='processado' if resultado.sucesso else 'erro',
                 mensagem=resultado.erros[0].get('mensagem') if resultado.erros else None,
                 tempo_ms=stats['tempo_ms'],
             )
 
+            gravacao = GravadorLotes(self.client, self.tamanho_chunk).gravar(
+                lotes_registros, quarentena, registro_arquivo
+            )
+            stats['lotes_salvos'] = gravacao.salvos
+            stats['lotes_quarentena'] = gravacao.quarentena
+            logger.info(
+                f"  Flush {arquivo_nome}: {gravacao.salvos} lotes, {gravacao.quarentena} quarentena "
+                f"({gravacao.requisicoes} requisições)"
+            )
+
+        elif salvar_banco:
+            logger.warning("Cliente Supabase não configurado - lotes não salvos")
+
         return stats
 
     def get_metricas(self) -> Dict[str, Any]:
@@ -11,14 +11,25 @@ Data: 2026-01-26
 =============================================================================
 """
 
+import json
 import os
+import re
 import sys
+import threading
+from unittest.mock import MagicMock
+
 import pytest
 
 # Adicionar path do projeto
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src', 'extractors'))
 
-from lotes_extractor_v1 import LLMExtractor, LoteExtraido
+from lotes_extractor_v1 import (
+    LLMExtractor,
+    LoteExtraido,
+    MAX_TOKENS_BLOCO_LLM,
+    CHARS_POR_TOKEN,
+    dividir_texto_em_blocos,
+)
 
 
 # =============================================================================
@@ -452,3 +463,166 @@ class TestLLMExtractorRobustez:
         lotes = extractor._converter_para_lotes(dados)
         assert len(lotes) == 1
         assert lotes[0].numero_lote == "1"
+
+
+# =============================================================================
+# TESTES DO MODO EM BLOCOS (V1.2)
+# =============================================================================
+
+def _catalogo(n_lotes, tamanho_descricao=300):
+    """Texto de catálogo com N lotes de ~tamanho_descricao caracteres cada."""
+    return "EDITAL DE LEILÃO - RELAÇÃO DE LOTES\n" + "".join(
+        f"LOTE {i:02d}\nVEICULO FIAT UNO PLACA ABC{i:04d} " + "X" * tamanho_descricao + "\n"
+        for i in range(1, n_lotes + 1)
+    )
+
+
+def _cliente_fake(chamadas):
+    """Cliente OpenAI simulado: devolve um lote por marcador LOTE nn do prompt."""
+    lock = threading.Lock()
+
+    def create(**kwargs):
+        prompt = kwargs['messages'][1]['content']
+        with lock:
+            chamadas.append(prompt)
+        lotes = [
+            {"numero": numero, "descricao": f"Veículo do lote {numero}"}
+            for numero in re.findall(r'^LOTE (\d+)', prompt, re.MULTILINE)
+        ]
+        response = MagicMock()
+        response.usage.prompt_tokens = 100
+        response.usage.completion_tokens = 10
+        response.choices[0].message.content = json.dumps({"lotes": lotes})
+        return response
+
+    cliente = MagicMock()
+    cliente.chat.completions.create.side_effect = create
+    return cliente
+
+
+def _extrator_com_cliente(chamadas, **kwargs):
+    extractor = LLMExtractor(api_key="", requisicoes_por_minuto=0, **kwargs)
+    extractor.client = _cliente_fake(chamadas)
+    return extractor
+
+
+class TestLLMExtractorBlocos:
+    """Testes da extração em blocos com cache."""
+
+    def test_divisao_nao_parte_lotes(self):
+        """Cada bloco respeita o limite e começa no preâmbulo ou em um LOTE."""
+        texto = _catalogo(60)
+        blocos = dividir_texto_em_blocos(texto, 2000)
+
+        assert len(blocos) > 1
+        assert "".join(blocos) == texto
+        assert all(len(b) <= 2000 for b in blocos)
+        assert all(b.startswith("LOTE ") for b in blocos[1:])
+
+    def test_trecho_maior_que_bloco_cortado_em_linhas(self):
+        """Texto sem marcadores é cortado em quebras de linha."""
+        texto = "linha de texto sem lote\n" * 500
+        blocos = dividir_texto_em_blocos(texto, 1000)
+
+        assert "".join(blocos) == texto
+        assert all(len(b) <= 1000 and b.endswith("\n") for b in blocos)
+
+    def test_catalogo_longo_extrai_todos_os_lotes(self):
+        """Lotes além dos 8000 caracteres não se perdem."""
+        chamadas = []
+        extractor = _extrator_com_cliente(chamadas)
+        texto = _catalogo(120)
+        assert len(texto) > MAX_TOKENS_BLOCO_LLM * CHARS_POR_TOKEN * 2
+
+        lotes = extractor.extrair_lotes(texto)
+
+        assert [lote.numero_lote for lote in lotes] == [f"{i:02d}" for i in range(1, 121)]
+        assert len(chamadas) > 1
+        assert extractor.total_requests == len(chamadas)
+
+    def test_lote_repetido_deduplicado(self):
+        """Lote presente em dois blocos aparece uma vez, com a descrição maior."""
+        extractor = LLMExtractor(api_key="")
+        extractor.client = MagicMock()
+        respostas = iter([
+            {"lotes": [{"numero": "01", "descricao": "Veículo curto"}]},
+            {"lotes": [{"numero": "01", "descricao": "Veículo com descrição completa"},
+                       {"numero": "02", "descricao": "Outro veículo"}]},
+        ])
+        extractor._extrair_bloco = lambda texto, contexto=None: next(respostas)
+
+        extracao = extractor.extrair_lotes_em_blocos(_catalogo(60), simultaneos=1, max_blocos=2)
+
+        assert [lote.numero_lote for lote in extracao.lotes] == ["01", "02"]
+        assert extracao.lotes[0].descricao_completa == "Veículo com descrição completa"
+
+    def test_mesmo_numero_em_outra_secao_nao_e_descartado(self):
+        """Mesmo número em bloco não adjacente é outro lote; repetição exata sai."""
+        extractor = LLMExtractor(api_key="")
+        extractor.client = MagicMock()
+        respostas = iter([
+            {"lotes": [{"numero": "01", "descricao": "Fiat Uno 2010"}]},
+            {"lotes": [{"numero": "02", "descricao": "Gol 2012"}]},
+            {"lotes": [{"numero": "01", "descricao": "Sucata de ferro"},
+                       {"numero": "02", "descricao": "GOL  2012"}]},
+        ])
+        extractor._extrair_bloco = lambda texto, contexto=None: next(respostas)
+
+        extracao = extractor.extrair_lotes_em_blocos(_catalogo(90), simultaneos=1, max_blocos=3)
+
+        assert [(lote.numero_lote, lote.descricao_completa) for lote in extracao.lotes] == [
+            ("01", "Fiat Uno 2010"), ("02", "Gol 2012"), ("01", "Sucata de ferro"),
+        ]
+
+    def test_bloco_com_falha_marca_parcial(self):
+        """Bloco sem resposta é contado e a extração fica parcial."""
+        chamadas = []
+        extractor = _extrator_com_cliente(chamadas)
+        original = extractor._extrair_bloco
+        falhas = iter([False, True])
+        extractor._extrair_bloco = lambda texto, contexto=None: (
+            None if next(falhas, False) else original(texto, contexto)
+        )
+
+        extracao = extractor.extrair_lotes_em_blocos(_catalogo(120), simultaneos=1, max_blocos=3)
+
+        assert extracao.blocos_com_falha == 1 and extracao.blocos_ignorados > 0
+        assert extracao.parcial
+        assert extracao.lotes
+
+    def test_orcamento_de_blocos(self):
+        """Blocos além de max_blocos não são enviados."""
+        chamadas = []
+        extractor = _extrator_com_cliente(chamadas)
+
+        extracao = extractor.extrair_lotes_em_blocos(_catalogo(120), max_blocos=2)
+
+        assert len(chamadas) == 2
+        assert extracao.blocos_ignorados == extracao.blocos - 2 and extracao.parcial
+
+    def test_cache_evita_nova_chamada(self, tmp_path):
+        """Segunda execução com o mesmo cache não chama o LLM."""
+        cache_path = str(tmp_path / "llm_cache.sqlite")
+        texto = _catalogo(50)
+
+        primeira = []
+        lotes_1 = _extrator_com_cliente(primeira, cache_path=cache_path).extrair_lotes(texto)
+
+        segunda = []
+        extractor = _extrator_com_cliente(segunda, cache_path=cache_path)
+        lotes_2 = extractor.extrair_lotes(texto)
+
+        assert primeira and segunda == []
+        assert extractor.cache_hits == len(primeira)
+        assert [lote.numero_lote for lote in lotes_2] == [lote.numero_lote for lote in lotes_1]
+
+    def test_cache_separado_por_modelo(self, tmp_path):
+        """Outro modelo não reaproveita respostas do cache."""
+        cache_path = str(tmp_path / "llm_cache.sqlite")
+        texto = _catalogo(50)
+        _extrator_com_cliente([], cache_path=cache_path).extrair_lotes(texto)
+
+        chamadas = []
+        _extrator_com_cliente(chamadas, cache_path=cache_path, model="gpt-4o").extrair_lotes(texto)
+
+        assert chamadas
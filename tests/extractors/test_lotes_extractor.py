@@ -23,16 +23,35 @@ import os
 # Ajustar path para importar o módulo
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src', 'extractors'))
 
+from unittest.mock import MagicMock
+
 from lotes_extractor_v1 import (
+    LotesExtractorV1,
+    LotesRepository,
     LoteExtraido,
+    ParsedPDF,
     ClassificadorPDF,
     ExtratorTabelas,
     FamiliaPDF,
     CodigoErro,
     EstagioFalha,
     ResultadoClassificacao,
-    VERSAO_EXTRATOR
+    MetricasExecucao,
+    PlanoReextracao,
+    GravadorLotes,
+    ResultadoGravacao,
+    montar_registro_lote,
+    VERSAO_EXTRATOR,
+    AMOSTRA_PAGINAS_TABELA,
+    PAGINA_LIMITE_FAMILIA,
+    MODO_CLASSIFICACAO_COMPLETO,
+    MODO_CLASSIFICACAO_RAPIDO,
+    MAX_TENTATIVAS_ARQUIVO,
+    STATUS_ERRO_PERMANENTE,
+    ResultadoExtracao,
+    motivo_reextracao,
 )
+from campos_veiculo import extrair_campos_bloco, extrair_campos_veiculo
 
 
 # =============================================================================
@@ -423,6 +442,882 @@ class TestResultadoClassificacao:
         assert resultado.motivo_nao_processavel == "PDF escaneado"
 
 
+# =============================================================================
+# TESTES: Agendamento por prazo (V1.2)
+# =============================================================================
+
+class TestAgendamentoPorPrazo:
+    """Testes da priorização por data do leilão e do --deadline."""
+
+    def test_deadline_interrompe_execucao(self):
+        """Testa que deadline esgotado para antes do próximo edital."""
+        extrator = LotesExtractorV1.__new__(LotesExtractorV1)
+        extrator.llm_extractor = None
+        extrator.repository = MagicMock()
+        extrator.repository.planejar_reextracao.return_value = PlanoReextracao(
+            editais=[{'id': i} for i in range(3)]
+        )
+        extrator._processar_edital = MagicMock()
+
+        metricas = extrator.executar(limite_editais=3, deadline_segundos=1e-9)
+
+        assert metricas.interrompido_deadline is True
+        extrator._processar_edital.assert_not_called()
+
+
+# =============================================================================
+# TESTES: ParsedPDF (V1.2)
+# =============================================================================
+
+class _PaginaFake:
+    """Página pdfplumber simulada que conta as extrações."""
+
+    def __init__(self, texto, tabelas, contador):
+        self._texto = texto
+        self._tabelas = tabelas
+        self._contador = contador
+
+    def extract_text(self):
+        self._contador['texto'] += 1
+        return self._texto
+
+    def extract_tables(self):
+        self._contador['tabelas'] += 1
+        return self._tabelas
+
+
+def _pdf_fake(monkeypatch, paginas):
+    """Substitui pdfplumber.open por um documento com as páginas dadas."""
+    import lotes_extractor_v1
+
+    contador = {'open': 0, 'texto': 0, 'tabelas': 0}
+    pdf = MagicMock()
+    pdf.pages = [_PaginaFake(texto, tabelas, contador) for texto, tabelas in paginas]
+
+    def abrir(_caminho):
+        contador['open'] += 1
+        return pdf
+
+    monkeypatch.setattr(lotes_extractor_v1.pdfplumber, 'open', abrir)
+    return contador
+
+
+TABELA_LOTES = [
+    ['Lote', 'Descrição', 'Valor'],
+    ['01', 'FIAT UNO MILLE 2010 PLACA ABC1234', 'R$ 5.000,00'],
+]
+
+
+class TestParsedPDF:
+    """Testes do parse único por arquivo."""
+
+    def test_cascata_parseia_cada_pagina_uma_vez(self, monkeypatch):
+        """Testa que classificação + extração abrem o PDF e extraem cada página uma vez."""
+        texto = 'EDITAL DE LEILÃO ' * 20
+        contador = _pdf_fake(monkeypatch, [(texto, [TABELA_LOTES]), (texto, [])])
+
+        resultado = ExtratorTabelas().extrair('/tmp/edital.pdf', edital_id=1)
+
+        assert resultado.sucesso is True
+        assert contador == {'open': 1, 'texto': 2, 'tabelas': 2}
+
+    def test_regex_e_llm_reusam_texto(self, monkeypatch):
+        """Testa que regex e texto para LLM não extraem o texto de novo."""
+        contador = _pdf_fake(monkeypatch, [('pagina um', []), ('pagina dois', [])])
+        extrator = ExtratorTabelas()
+
+        with ParsedPDF('/tmp/edital.pdf') as documento:
+            extrator.classificador.classificar(documento)
+            extrator._extrair_via_regex(documento)
+            texto_llm = extrator._extrair_texto_completo(documento)
+
+        assert texto_llm == 'pagina um\n\npagina dois'
+        assert contador['texto'] == 2
+
+    def test_pdf_em_memoria_vai_direto_ao_pdfplumber(self, monkeypatch):
+        """Testa que bytes/BytesIO/memoryview abrem como stream, sem arquivo temporário."""
+        import io
+        import lotes_extractor_v1
+
+        abertos = []
+        monkeypatch.setattr(lotes_extractor_v1.pdfplumber, 'open', lambda fonte: abertos.append(fonte) or MagicMock())
+        conteudo = b'%PDF-1.4 conteudo'
+        stream = io.BytesIO(conteudo)
+        stream.seek(5)
+
+        for fonte in (conteudo, memoryview(conteudo), stream):
+            assert ParsedPDF(fonte).pdf is not None
+
+        assert all(isinstance(a, io.BytesIO) for a in abertos)
+        assert [a.getvalue() for a in abertos] == [conteudo] * 3
+        assert abertos[2] is stream and stream.tell() == 0
+
+    def test_caminho_local_continua_aceito(self, monkeypatch):
+        """Testa que caminho de diretório local é repassado como caminho."""
+        import lotes_extractor_v1
+
+        abertos = []
+        monkeypatch.setattr(lotes_extractor_v1.pdfplumber, 'open', lambda fonte: abertos.append(fonte) or MagicMock())
+
+        documento = ParsedPDF('/dados/pdfs/edital.pdf')
+        assert documento.pdf is not None
+
+        assert abertos == ['/dados/pdfs/edital.pdf']
+        assert documento.nome == 'edital.pdf'
+
+    def test_download_do_storage_fica_em_memoria(self, monkeypatch):
+        """Testa que o PDF do Storage segue como bytes, com o nome real do arquivo."""
+        extrator = LotesExtractorV1.__new__(LotesExtractorV1)
+        extrator.repository = MagicMock()
+        extrator.repository.client.storage.from_.return_value.download.return_value = b'%PDF-1.4'
+        extrator.repository.arquivo_ja_processado.return_value = False
+
+        arquivo = extrator._obter_pdf({'id': 7, 'storage_path': 'PNCP_7/edital.pdf'}, None)
+
+        assert arquivo.fonte == b'%PDF-1.4'
+        assert arquivo.caminho_pdf is None
+        assert arquivo.nome_arquivo == 'edital.pdf'
+
+
+# =============================================================================
+# TESTES: Plano de (re)extração (V1.2)
+# =============================================================================
+
+def _repositorio_manifesto(manifesto, futuros, passados=()):
+    """LotesRepository sem conexão real, paginando as listas dadas por .range()."""
+    repo = LotesRepository.__new__(LotesRepository)
+    repo.client = MagicMock()
+    consultas = []
+
+    def tabela(nome):
+        query = MagicMock()
+        estado = {'linhas': list(manifesto) if nome == 'arquivos_processados_lotes' else list(futuros)}
+        for metodo in ('select', 'is_', 'gte', 'order'):
+            getattr(query, metodo).return_value = query
+        query.not_ = query
+
+        def filtro_passados(*_):
+            estado['linhas'] = list(passados)
+            return query
+
+        def paginar(inicio, fim):
+            consultas.append((nome, inicio, fim))
+            query.execute.return_value = MagicMock(data=estado['linhas'][inicio:fim + 1])
+            return query
+
+        query.or_.side_effect = filtro_passados
+        query.range.side_effect = paginar
+        return query
+
+    repo.client.table.side_effect = tabela
+    return repo, consultas
+
+
+def _registro(edital_id, versao=None, status='processado', tentativas=0, nome=None):
+    return {
+        'edital_id': edital_id, 'nome_arquivo': nome or f'edital_{edital_id}.pdf',
+        'hash_arquivo': f'h{edital_id}{nome or ""}', 'status': status,
+        'versao_extrator': versao or VERSAO_EXTRATOR, 'processado_em': '2026-02-01T00:00:00',
+        'tentativas': tentativas,
+    }
+
+
+def _edital(edital_id):
+    return {'id': edital_id, 'storage_path': f'PNCP_{edital_id}/edital_{edital_id}.pdf'}
+
+
+class TestPlanoReextracao:
+    """Testes do planejador pelo manifesto de arquivos processados."""
+
+    def test_so_novos_versao_antiga_e_falhas(self):
+        """Testa que arquivos em dia são pulados e não contam no limite."""
+        manifesto = [
+            _registro(1),
+            _registro(2, versao='lotes_extractor_v0'),
+            _registro(3, status='erro'),
+        ]
+        repo, _ = _repositorio_manifesto(manifesto, [_edital(i) for i in range(1, 5)])
+
+        plano = repo.planejar_reextracao(limite=10, hoje='2026-03-01')
+
+        assert [e['id'] for e in plano.editais] == [2, 3, 4]
+        assert (plano.novos, plano.versao_antiga, plano.com_falha, plano.em_dia) == (1, 1, 1, 1)
+        assert plano.hashes_em_dia == {'h1'}
+
+    def test_paginacao_sem_consulta_por_arquivo(self):
+        """Testa manifesto e editais carregados em páginas, parando no limite."""
+        manifesto = [_registro(i) for i in range(5)]
+        futuros = [_edital(i) for i in range(12)]
+        repo, consultas = _repositorio_manifesto(manifesto, futuros, passados=[_edital(99)])
+
+        plano = repo.planejar_reextracao(limite=3, hoje='2026-03-01', tamanho_pagina=4)
+
+        assert [e['id'] for e in plano.editais] == [5, 6, 7]
+        assert consultas == [
+            ('arquivos_processados_lotes', 0, 3),
+            ('arquivos_processados_lotes', 4, 7),
+            ('editais_leilao', 0, 3),
+            ('editais_leilao', 4, 7),
+        ]
+
+    def test_vencidos_completam_o_plano(self):
+        """Testa que vencidos entram depois dos futuros e pular_passados os descarta."""
+        repo, _ = _repositorio_manifesto([], [_edital(1)], passados=[_edital(2)])
+
+        plano = repo.planejar_reextracao(limite=5, hoje='2026-03-01')
+        assert [e['id'] for e in plano.editais] == [1, 2]
+
+        repo, _ = _repositorio_manifesto([], [_edital(1)], passados=[_edital(2)])
+        plano = repo.planejar_reextracao(limite=5, hoje='2026-03-01', pular_passados=True)
+        assert [e['id'] for e in plano.editais] == [1]
+
+    def test_backoff_e_limite_de_tentativas(self):
+        """Testa que falha recente espera o backoff e falha esgotada não volta."""
+        manifesto = [
+            _registro(1, status='erro', tentativas=1),
+            _registro(2, status='erro', tentativas=MAX_TENTATIVAS_ARQUIVO),
+            _registro(3, status='erro', tentativas=2),
+            _registro(4, status=STATUS_ERRO_PERMANENTE),
+        ]
+        repo, _ = _repositorio_manifesto(manifesto, [_edital(i) for i in range(1, 5)])
+
+        # Última falha em 2026-02-01: backoff já vencido
+        plano = repo.planejar_reextracao(limite=10, hoje='2026-01-01')
+        assert [e['id'] for e in plano.editais] == [1, 3]
+        assert plano.tentativas == {'h1': 1, 'h3': 2}
+        assert plano.esgotados == 1 and plano.em_dia == 1
+        assert {'h2', 'h4'} <= plano.hashes_em_dia
+
+        # 1ª falha espera 1h; 2ª falha espera 2h
+        from datetime import datetime
+        assert motivo_reextracao(manifesto[0], agora=datetime(2026, 2, 1, 0, 30)) == 'adiado'
+        assert motivo_reextracao(manifesto[2], agora=datetime(2026, 2, 1, 1, 30)) == 'adiado'
+        assert motivo_reextracao(manifesto[2], agora=datetime(2026, 2, 1, 2)) == 'com_falha'
+
+    def test_status_e_tentativas_gravados(self):
+        """Testa que falha soma tentativa, sucesso zera e erro permanente não volta à fila."""
+        repo = LotesRepository.__new__(LotesRepository)
+        falha = ResultadoExtracao(sucesso=False, erros=[{'codigo': 'TABELA_NAO_ENCONTRADA', 'mensagem': 'x'}])
+        corrompido = ResultadoExtracao(sucesso=False, erros=[{'codigo': 'PDF_CORROMPIDO', 'mensagem': 'x'}])
+
+        assert repo._status_arquivo(falha) == 'erro'
+        assert repo._status_arquivo(corrompido) == STATUS_ERRO_PERMANENTE
+        assert repo._status_arquivo(ResultadoExtracao(sucesso=True)) == 'processado'
+        # LLM com blocos perdidos: lotes gravados e arquivo volta à fila
+        assert repo._status_arquivo(ResultadoExtracao(sucesso=True, parcial=True)) == 'parcial'
+
+        registro = repo._montar_registro_arquivo(1, 'a.pdf', 'h', 'x', None, 0, 0, 'erro', 0, tentativas=3)
+        assert registro['tentativas'] == 3
+        repo._tentativas_disponivel = False
+        registro = repo._montar_registro_arquivo(1, 'a.pdf', 'h', 'x', None, 0, 0, 'erro', 0, tentativas=3)
+        assert 'tentativas' not in registro
+
+    def test_varios_arquivos_por_edital(self):
+        """Testa que o edital é avaliado por todos os arquivos registrados, não só pelo storage_path."""
+        manifesto = [
+            _registro(1, nome='edital.pdf'),
+            _registro(1, status='erro', nome='anexo.pdf'),
+            _registro(2, nome='edital.pdf'),
+            _registro(2, nome='anexo.pdf'),
+            _registro(4, nome='edital.pdf'),
+        ]
+        editais = [
+            {'id': 1, 'storage_path': 'PNCP_1/2026'},
+            {'id': 2, 'storage_path': 'PNCP_2/2026'},
+            {'id': 3, 'storage_path': 'PNCP_3/2026'},
+            {'id': 4, 'storage_path': 'PNCP_4/novo.pdf'},
+        ]
+        repo, _ = _repositorio_manifesto(manifesto, editais)
+
+        plano = repo.planejar_reextracao(limite=10, hoje='2026-03-01')
+
+        assert [(e['id'], e['storage_path']) for e in plano.editais] == [
+            (1, 'PNCP_1/2026'), (3, 'PNCP_3/2026'), (4, 'PNCP_4/novo.pdf'),
+        ]
+        assert (plano.novos, plano.com_falha, plano.em_dia) == (2, 1, 1)
+
+    def test_erro_de_consulta_sobe(self):
+        """Testa que falha ao ler o manifesto não vira plano vazio silencioso."""
+        repo = LotesRepository.__new__(LotesRepository)
+        repo.client = MagicMock()
+        repo.client.table.side_effect = ConnectionError('supabase fora')
+
+        with pytest.raises(ConnectionError):
+            repo.planejar_reextracao(limite=10, hoje='2026-03-01')
+
+    def test_sem_coluna_tentativas(self):
+        """Testa que o manifesto segue sem a coluna tentativas (migration 021 pendente)."""
+        repo, _ = _repositorio_manifesto([_registro(1)], [_edital(1)])
+        original = repo.client.table.side_effect
+
+        def tabela(nome):
+            query = original(nome)
+            selecionar = query.select
+
+            def select(colunas):
+                if 'tentativas' in colunas:
+                    raise Exception('column arquivos_processados_lotes.tentativas does not exist')
+                return selecionar(colunas)
+
+            query.select = select
+            return query
+
+        repo.client.table.side_effect = tabela
+        plano = repo.planejar_reextracao(limite=10, hoje='2026-03-01')
+
+        assert repo._tentativas_disponivel is False
+        assert plano.em_dia == 1
+
+    def test_hash_em_dia_nao_e_reprocessado(self, tmp_path):
+        """Testa a idempotência de _obter_pdf pelos hashes do plano."""
+        import hashlib
+
+        (tmp_path / 'edital.pdf').write_bytes(b'%PDF-1.4')
+        extrator = LotesExtractorV1.__new__(LotesExtractorV1)
+        extrator.repository = MagicMock()
+        extrator.hashes_em_dia = {hashlib.sha256(b'%PDF-1.4').hexdigest()}
+
+        assert extrator._obter_pdf({'id': 1, 'storage_path': 'PNCP_1/edital.pdf'}, str(tmp_path)) is None
+        extrator.repository.arquivo_ja_processado.assert_not_called()
+
+
+# =============================================================================
+# TESTES: Execução paralela (V1.2)
+# =============================================================================
+
+def _extrator_paralelo(tmp_path, n_editais):
+    """Orquestrador sem Supabase com N PDFs locais de conteúdo distinto."""
+    for i in range(n_editais):
+        (tmp_path / f'edital_{i}.pdf').write_bytes(f'pdf {i}'.encode())
+
+    extrator = LotesExtractorV1.__new__(LotesExtractorV1)
+    extrator.llm_extractor = None
+    extrator.repository = MagicMock()
+    extrator.repository.planejar_reextracao.return_value = PlanoReextracao(
+        editais=[{'id': i, 'storage_path': f'PNCP_{i}/edital_{i}.pdf'} for i in range(n_editais)]
+    )
+    extrator.repository.arquivo_ja_processado.return_value = False
+    extrator.repository.salvar_resultado_arquivo.side_effect = lambda **kw: ResultadoGravacao(
+        salvos=len(kw['resultado'].lotes), quarentena=len(kw['resultado'].erros)
+    )
+    return extrator
+
+
+class TestExecucaoParalela:
+    """Testes do modo em lote (downloads em threads, extração em processos)."""
+
+    def test_mesclar_metricas(self):
+        """Testa que contadores, famílias e custo LLM dos workers são somados."""
+        total = MetricasExecucao(total_editais=5)
+        total.registrar_familia(FamiliaPDF.PDF_TABELA_INICIO)
+        worker = MetricasExecucao(total_arquivos=2, llm_requests=3, llm_cost_usd=0.5, erros=['x'])
+        worker.registrar_familia(FamiliaPDF.PDF_TABELA_INICIO)
+        worker.registrar_familia(FamiliaPDF.PDF_ESCANEADO)
+
+        total.mesclar(worker)
+
+        assert total.total_editais == 5
+        assert total.total_arquivos == 2
+        assert total.por_familia == {'PDF_TABELA_INICIO': 2, 'PDF_ESCANEADO': 1}
+        assert total.llm_requests == 3
+        assert total.llm_cost_usd == 0.5
+        assert total.erros == ['x']
+
+    def test_persistencia_no_processo_principal(self, monkeypatch, tmp_path):
+        """Testa que workers só extraem e o processo principal grava e mescla métricas."""
+        import threading
+        import lotes_extractor_v1
+        from concurrent.futures import ThreadPoolExecutor
+
+        texto = 'EDITAL DE LEILÃO ' * 20
+        _pdf_fake(monkeypatch, [(texto, [TABELA_LOTES])])
+        # Pool de threads no lugar do de processos (monkeypatch não atravessa spawn)
+        monkeypatch.setattr(
+            lotes_extractor_v1, '_criar_pool_extracao',
+            lambda workers, tarefas, llm, *_: ThreadPoolExecutor(
+                workers, initializer=lotes_extractor_v1._inicializar_worker
+            ),
+        )
+        extrator = _extrator_paralelo(tmp_path, 3)
+        threads_escrita = []
+        gravar = extrator.repository.salvar_resultado_arquivo.side_effect
+
+        def salvar_resultado_arquivo(**kwargs):
+            threads_escrita.append(threading.current_thread())
+            return gravar(**kwargs)
+
+        extrator.repository.salvar_resultado_arquivo.side_effect = salvar_resultado_arquivo
+
+        metricas = extrator.executar_paralelo(limite_editais=3, diretorio_pdfs=str(tmp_path), workers=2)
+
+        assert metricas.total_arquivos == 3
+        assert metricas.total_lotes_extraidos == 3
+        assert metricas.por_familia == {'PDF_TABELA_INICIO': 3}
+        assert threads_escrita == [threading.main_thread()] * 3
+
+    def test_timeout_por_arquivo(self, monkeypatch):
+        """Testa que PDF lento vira falha de timeout em vez de travar o worker."""
+        import time
+        import lotes_extractor_v1
+
+        lento = MagicMock()
+        lento.extrair.side_effect = lambda *a, **k: time.sleep(5)
+        monkeypatch.setattr(lotes_extractor_v1, '_extrator_worker', lento)
+        monkeypatch.setattr(lotes_extractor_v1, '_llm_worker', None)
+
+        resultado, metricas = lotes_extractor_v1._extrair_em_worker('/tmp/lento.pdf', 1, timeout_segundos=0.05)
+
+        assert resultado.sucesso is False
+        assert 'Timeout' in resultado.erros[0]['mensagem']
+        assert metricas.total_arquivos == 1
+
+    def test_worker_morto_duas_vezes_vai_para_quarentena(self, monkeypatch, tmp_path):
+        """Testa que o pool é recriado e o arquivo tem uma única nova tentativa."""
+        import lotes_extractor_v1
+        from concurrent.futures import Future
+        from concurrent.futures.process import BrokenProcessPool
+
+        pools = []
+
+        def pool_quebrado(workers, tarefas, llm, *_):
+            pool = MagicMock()
+
+            def submit(*args):
+                futuro = Future()
+                futuro.set_exception(BrokenProcessPool('worker morreu'))
+                return futuro
+
+            pool.submit.side_effect = submit
+            pools.append(pool)
+            return pool
+
+        monkeypatch.setattr(lotes_extractor_v1, '_criar_pool_extracao', pool_quebrado)
+        extrator = _extrator_paralelo(tmp_path, 1)
+
+        metricas = extrator.executar_paralelo(limite_editais=1, diretorio_pdfs=str(tmp_path), workers=1)
+
+        assert len(pools) == 3
+        assert metricas.total_quarentena == 1
+        resultado = extrator.repository.salvar_resultado_arquivo.call_args.kwargs['resultado']
+        assert resultado.erros[0]['codigo'] == CodigoErro.PDF_CORROMPIDO.value
+
+
+# =============================================================================
+# TESTES: GravadorLotes (V1.2)
+# =============================================================================
+
+class _ErroBanco(Exception):
+    """APIError do PostgREST simulado (SQLSTATE em `code`)."""
+
+    def __init__(self, code):
+        super().__init__(f'erro {code}')
+        self.code = code
+
+
+def _cliente_fake(linhas_ruins=(), erro_rede=False, erro_schema=None):
+    """Cliente Supabase que rejeita upserts contendo id_interno de `linhas_ruins`."""
+    chamadas = {'lotes_leilao': [], 'lotes_quarentena': [], 'arquivos_processados_lotes': []}
+    client = MagicMock()
+
+    def table(nome):
+        tabela = MagicMock()
+
+        def gravar(dados, **kwargs):
+            chamadas[nome].append(dados)
+            if nome == 'lotes_leilao':
+                if erro_rede:
+                    raise ConnectionError('timeout')
+                if erro_schema:
+                    raise _ErroBanco(erro_schema)
+                if any(r['id_interno'] in linhas_ruins for r in dados):
+                    raise _ErroBanco('23502')
+            return MagicMock()
+
+        tabela.upsert.side_effect = gravar
+        tabela.insert.side_effect = gravar
+        return tabela
+
+    client.table.side_effect = table
+    return client, chamadas
+
+
+def _registros(n):
+    return [
+        montar_registro_lote(
+            LoteExtraido(numero_lote_raw=str(i), descricao_raw=f'VEICULO FIAT UNO {i}'),
+            edital_id=1, fonte_arquivo='edital.pdf', familia_pdf=FamiliaPDF.PDF_TABELA_INICIO,
+        )
+        for i in range(n)
+    ]
+
+
+class TestGravadorLotes:
+    """Testes do upsert em chunks com bissecção para quarentena."""
+
+    def test_upsert_em_chunks_e_registro_no_mesmo_flush(self):
+        """Testa que 1200 lotes viram 3 upserts + 1 registro do arquivo."""
+        client, chamadas = _cliente_fake()
+
+        gravacao = GravadorLotes(client, tamanho_chunk=500).gravar(
+            _registros(1200), registro_arquivo={'hash_arquivo': 'abc'}
+        )
+
+        assert [len(c) for c in chamadas['lotes_leilao']] == [500, 500, 200]
+        assert gravacao.salvos == 1200
+        assert gravacao.requisicoes == 4
+        assert chamadas['arquivos_processados_lotes'][0]['total_lotes_extraidos'] == 1200
+
+    def test_bisseccao_isola_linha_ruim(self):
+        """Testa que só a linha rejeitada vai para quarentena."""
+        registros = _registros(8)
+        ruim = registros[5]['id_interno']
+        client, chamadas = _cliente_fake(linhas_ruins={ruim})
+
+        gravacao = GravadorLotes(client, tamanho_chunk=8).gravar(
+            registros, registro_arquivo={'hash_arquivo': 'abc'}
+        )
+
+        assert gravacao.salvos == 7
+        assert gravacao.isolados == 1
+        quarentena = chamadas['lotes_quarentena'][0]
+        assert len(quarentena) == 1
+        assert quarentena[0]['codigo_erro'] == CodigoErro.CONSTRAINT_VIOLADA.value
+        assert quarentena[0]['estagio_falha'] == EstagioFalha.PERSISTENCIA.value
+        assert chamadas['arquivos_processados_lotes'][0]['total_lotes_quarentena'] == 1
+
+    def test_erro_de_rede_nao_registra_arquivo(self):
+        """Testa que falha de rede não bissecciona nem marca o arquivo como processado."""
+        client, chamadas = _cliente_fake(erro_rede=True)
+
+        gravacao = GravadorLotes(client, tamanho_chunk=500).gravar(
+            _registros(10), registro_arquivo={'hash_arquivo': 'abc'}
+        )
+
+        assert len(chamadas['lotes_leilao']) == 1
+        assert gravacao.erros
+        assert chamadas['arquivos_processados_lotes'] == []
+
+    def test_erro_de_schema_nao_bissecciona(self):
+        """Testa que coluna inexistente falha o chunk uma vez, sem quarentena por linha."""
+        for codigo in ('42703', 'PGRST204'):
+            client, chamadas = _cliente_fake(erro_schema=codigo)
+
+            gravacao = GravadorLotes(client, tamanho_chunk=500).gravar(
+                _registros(10), registro_arquivo={'hash_arquivo': 'abc'}
+            )
+
+            assert len(chamadas['lotes_leilao']) == 1
+            assert gravacao.isolados == 0 and chamadas['lotes_quarentena'] == []
+            assert gravacao.erros
+            assert chamadas['arquivos_processados_lotes'] == []
+
+    def test_id_interno_repetido_deduplicado(self):
+        """Testa que id_interno repetido no arquivo não quebra o upsert."""
+        client, chamadas = _cliente_fake()
+        registros = _registros(3)
+
+        GravadorLotes(client).gravar(registros + registros[:1])
+
+        assert len(chamadas['lotes_leilao'][0]) == 3
+
+
+# =============================================================================
+# TESTES: Campos de veículo pré-compilados (V1.2)
+# =============================================================================
+
+class TestCamposVeiculo:
+    """Testes da varredura única de placa/chassi/renavam/ano/marca."""
+
+    def test_varredura_unica_extrai_todos_os_campos(self):
+        """Testa que uma descrição completa preenche todos os campos."""
+        campos = extrair_campos_veiculo(
+            'FIAT/UNO MILLE, ANO 2010/2011, PLACA ABC-1234, CHASSI 9BD15802AB6123456, RENAVAM 123456789'
+        )
+
+        assert campos.placa == 'ABC1234'
+        assert campos.chassi == '9BD15802AB6123456'
+        assert campos.renavam == '00123456789'
+        assert campos.ano_fabricacao == 2010
+        assert (campos.marca, campos.modelo) == ('FIAT', 'UNO MILLE')
+
+    def test_campo_nao_consome_texto_do_proximo(self):
+        """Testa que o match da placa não esconde o ANO que vem logo depois."""
+        campos = extrair_campos_veiculo('PLACA ANO 2013 VEICULO SEM DOCUMENTO')
+
+        assert campos.placa == 'ANO2013'
+        assert campos.ano_fabricacao == 2013
+
+    def test_marca_por_prioridade_e_palavra_inteira(self):
+        """Testa prioridade da lista de marcas e limite de palavra na trie."""
+        assert extrair_campos_veiculo('CAMINHAO MERCEDES-BENZ 1113').marca == 'MERCEDES-BENZ'
+        assert extrair_campos_veiculo('FORD KA E FIAT PALIO').marca == 'FIAT'
+        assert extrair_campos_veiculo('MANUAL DO PROPRIETARIO').marca is None
+
+    def test_campos_bloco(self):
+        """Testa extração de bloco livre (padrão Fátima/BA)."""
+        placa, chassi, renavam = extrair_campos_bloco('placa: abc 1234\nRENAVAM\n12345678901')
+
+        assert placa == 'abc1234'
+        assert chassi is None
+        assert renavam == '12345678901'
+
+    def test_lote_sem_dict_por_instancia(self):
+        """Testa que LoteExtraido usa __slots__."""
+        lote = LoteExtraido(numero_lote_raw='1', descricao_raw='VW GOL 1.0 PLACA ABC1234')
+
+        assert not hasattr(lote, '__dict__')
+        assert lote.placa == 'ABC1234'
+
+
+# =============================================================================
+# TESTES: Classificação por amostragem (V1.2)
+# =============================================================================
+
+TEXTO_CLAUSULA = 'DAS CONDIÇÕES GERAIS DO LEILÃO E DAS OBRIGAÇÕES DO ARREMATANTE. ' * 5
+TEXTO_PAGINA_LOTES = 'Lote Descrição Valor 01 FIAT UNO MILLE 2010 PLACA ABC1234 R$ 5.000,00 ' * 4
+
+
+class TestClassificacaoAmostragem:
+    """Testes do modo rápido do ClassificadorPDF."""
+
+    def _paginas_anexo(self, total, paginas_lotes):
+        return [
+            (TEXTO_PAGINA_LOTES, [TABELA_LOTES]) if n in paginas_lotes else (TEXTO_CLAUSULA, [])
+            for n in range(1, total + 1)
+        ]
+
+    def test_tabela_no_fim_de_anexo_grande(self, monkeypatch):
+        """Testa que o modo rápido acha a tabela da página 150 sem varrer as 300."""
+        contador = _pdf_fake(monkeypatch, self._paginas_anexo(300, {150, 151}))
+
+        resultado = ClassificadorPDF(MODO_CLASSIFICACAO_RAPIDO).classificar('/tmp/anexo.pdf')
+
+        assert resultado.familia == FamiliaPDF.PDF_TABELA_MEIO_FIM
+        assert resultado.paginas_com_tabelas == [150, 151]
+        assert resultado.modo == MODO_CLASSIFICACAO_RAPIDO
+        assert contador['tabelas'] == PAGINA_LIMITE_FAMILIA + 2
+
+    def test_deteccao_de_tabelas_limitada(self, monkeypatch):
+        """Testa que extract_tables() roda em no máximo 3 + AMOSTRA páginas, com 200 candidatas."""
+        contador = _pdf_fake(monkeypatch, self._paginas_anexo(200, set(range(1, 201))))
+
+        resultado = ClassificadorPDF().classificar('/tmp/anexo.pdf')
+
+        assert contador['tabelas'] == PAGINA_LIMITE_FAMILIA + AMOSTRA_PAGINAS_TABELA
+        assert resultado.paginas_amostradas == contador['tabelas']
+        # Candidatas fora da amostra ficam sinalizadas para a extração
+        assert resultado.paginas_com_tabelas == list(range(1, 201))
+
+    def test_concorda_com_modo_completo(self, monkeypatch):
+        """Testa família e páginas iguais às do modo completo."""
+        for paginas_lotes in ({2}, {40, 41, 90}, set()):
+            _pdf_fake(monkeypatch, self._paginas_anexo(120, paginas_lotes))
+            rapido = ClassificadorPDF(MODO_CLASSIFICACAO_RAPIDO).classificar('/tmp/anexo.pdf')
+            completo = ClassificadorPDF(MODO_CLASSIFICACAO_COMPLETO).classificar('/tmp/anexo.pdf')
+
+            assert rapido.familia == completo.familia
+            assert rapido.paginas_com_tabelas == completo.paginas_com_tabelas
+
+    def test_pdf_pequeno_usa_modo_completo(self, monkeypatch):
+        """Testa que PDFs curtos continuam com extract_tables() em todas as páginas."""
+        contador = _pdf_fake(monkeypatch, self._paginas_anexo(10, {8}))
+
+        resultado = ClassificadorPDF().classificar('/tmp/edital.pdf')
+
+        assert resultado.modo == MODO_CLASSIFICACAO_COMPLETO
+        assert contador['tabelas'] == 10
+
+    def test_extracao_so_nas_paginas_sinalizadas(self, monkeypatch):
+        """Testa que a cascata extrai os lotes sem extract_tables() nas páginas de cláusulas."""
+        contador = _pdf_fake(monkeypatch, self._paginas_anexo(300, {150}))
+
+        resultado = ExtratorTabelas().extrair('/tmp/anexo.pdf', edital_id=1)
+
+        assert resultado.sucesso is True
+        assert len(resultado.lotes) == 1
+        assert contador['tabelas'] == PAGINA_LIMITE_FAMILIA + 1
+
+    def test_modo_invalido(self):
+        """Testa que modo desconhecido é rejeitado."""
+        with pytest.raises(ValueError):
+            ClassificadorPDF('aproximado')
+
+
+# =============================================================================
+# TESTES: Extração paralela por páginas (V1.2)
+# =============================================================================
+
+class TestExtracaoPorPaginas:
+    """Testes da extração de um catálogo grande em faixas de páginas."""
+
+    def _catalogo(self, monkeypatch, total=300, paginas_lotes=range(50, 250)):
+        paginas = [
+            (TEXTO_PAGINA_LOTES, [[
+                ['Lote', 'Descrição', 'Valor'],
+                [str(n), f'FIAT UNO MILLE 2010 PLACA ABC{n:04d}', 'R$ 5.000,00'],
+            ]]) if n in paginas_lotes else (TEXTO_CLAUSULA, [])
+            for n in range(1, total + 1)
+        ]
+        return _pdf_fake(monkeypatch, paginas)
+
+    def _pool_em_threads(self, monkeypatch, falhar_primeira=False):
+        """Pool de threads no lugar do de processos (monkeypatch não atravessa spawn)."""
+        import lotes_extractor_v1
+        from concurrent.futures import Future, ThreadPoolExecutor
+
+        class _Pool(ThreadPoolExecutor):
+            falhas = [falhar_primeira]
+
+            def submit(self, funcao, *args):
+                if self.falhas.pop() if self.falhas else False:
+                    futuro = Future()
+                    futuro.set_exception(RuntimeError('worker morreu'))
+                    return futuro
+                return super().submit(funcao, *args)
+
+        monkeypatch.setattr(lotes_extractor_v1, '_criar_pool_paginas', lambda workers, modo: _Pool(workers))
+
+    def test_lotes_em_ordem_de_pagina(self, monkeypatch):
+        """Testa que as faixas voltam na ordem das páginas, com fonte_pagina."""
+        contador = self._catalogo(monkeypatch)
+        self._pool_em_threads(monkeypatch)
+        extrator = ExtratorTabelas(workers_paginas=4)
+
+        resultado = extrator.extrair('/tmp/catalogo.pdf', edital_id=1)
+        extrator.fechar()
+
+        paginas = [lote.fonte_pagina for lote in resultado.lotes]
+        assert paginas == list(range(50, 250))
+        assert resultado.lotes[0].placa == 'ABC0050'
+        # Cada faixa abre o PDF por conta própria; nenhuma página extraída duas vezes
+        assert contador['open'] > 1
+        assert contador['tabelas'] == PAGINA_LIMITE_FAMILIA + 200
+
+    def test_faixa_com_falha_refeita_serial(self, monkeypatch):
+        """Testa que uma faixa perdida no pool é refeita no processo atual."""
+        self._catalogo(monkeypatch)
+        self._pool_em_threads(monkeypatch, falhar_primeira=True)
+        extrator = ExtratorTabelas(workers_paginas=2)
+
+        resultado = extrator.extrair('/tmp/catalogo.pdf', edital_id=1)
+        extrator.fechar()
+
+        assert [lote.fonte_pagina for lote in resultado.lotes] == list(range(50, 250))
+
+    def test_serial_sem_workers_paginas(self, monkeypatch):
+        """Testa que workers_paginas=0 mantém a extração no processo atual."""
+        contador = self._catalogo(monkeypatch)
+
+        resultado = ExtratorTabelas().extrair('/tmp/catalogo.pdf', edital_id=1)
+
+        assert len(resultado.lotes) == 200
+        assert contador['open'] == 1
+
+    def test_caminho_para_processos(self):
+        """Testa o caminho repassado aos processos de página (temporário só para memória)."""
+        import io
+
+        with ParsedPDF('/tmp/edital.pdf').caminho_para_processos() as caminho:
+            assert caminho == '/tmp/edital.pdf'
+
+        stream = io.BytesIO(b'%PDF-1.4')
+        stream.seek(3)
+        for fonte in (b'%PDF-1.4', memoryview(b'%PDF-1.4'), stream):
+            with ParsedPDF(fonte).caminho_para_processos() as caminho:
+                with open(caminho, 'rb') as arquivo:
+                    assert arquivo.read() == b'%PDF-1.4'
+            assert not os.path.exists(caminho)
+        assert stream.tell() == 3
+
+    def test_pdf_em_memoria_vai_uma_vez_ao_pool(self, monkeypatch):
+        """Testa que todas as faixas recebem o mesmo caminho, não os bytes do PDF."""
+        import lotes_extractor_v1
+
+        self._catalogo(monkeypatch)
+        self._pool_em_threads(monkeypatch)
+        fontes = []
+        original = lotes_extractor_v1._extrair_faixa_paginas
+
+        def faixa(fonte, paginas):
+            fontes.append(fonte)
+            return original(fonte, paginas)
+
+        monkeypatch.setattr(lotes_extractor_v1, '_extrair_faixa_paginas', faixa)
+        extrator = ExtratorTabelas(workers_paginas=4)
+
+        resultado = extrator.extrair(b'%PDF-1.4 catalogo', edital_id=1)
+        extrator.fechar()
+
+        assert len(resultado.lotes) == 200
+        assert len(fontes) > 1 and len(set(fontes)) == 1
+        assert isinstance(fontes[0], str) and not os.path.exists(fontes[0])
+
+
+# =============================================================================
+# TESTES: Índice de identidade de veículos (V1.2)
+# =============================================================================
+
+class TestIndiceVeiculos:
+    """Testes da ligação dos lotes ao veículo canônico."""
+
+    def _extrator(self):
+        from connectors.common.vehicle_index import VehicleIndex
+
+        extrator = LotesExtractorV1.__new__(LotesExtractorV1)
+        extrator.indice_veiculos = VehicleIndex()
+        return extrator
+
+    def test_releilao_reaproveita_campos_do_canonico(self):
+        """Testa que o mesmo veículo em outro edital herda marca/modelo/ano."""
+        extrator = self._extrator()
+        original = LoteExtraido(
+            numero_lote_raw='1', descricao_raw='VW/GOL 1.0 ANO 2010 PLACA ABC1234 CHASSI 9BWZZZ377VT004251'
+        )
+        releilao = LoteExtraido(numero_lote_raw='7', descricao_raw='SUCATA PLACA ABC-1234')
+
+        assert extrator._vincular_veiculos(10, [original]) == 0
+        assert extrator._vincular_veiculos(20, [releilao]) == 1
+
+        assert releilao.vehicle_id == original.vehicle_id
+        assert releilao.chassi == '9BWZZZ377VT004251'
+        assert releilao.ano_fabricacao == 2010
+        registro = montar_registro_lote(releilao, 20, 'edital.pdf', FamiliaPDF.PDF_TABELA_INICIO)
+        assert registro['vehicle_id'] == original.vehicle_id
+
+    def test_sem_indice_nao_envia_vehicle_id(self):
+        """Testa que lote sem vehicle_id não leva a coluna (migration 019 opcional)."""
+        client, chamadas = _cliente_fake()
+        registros = _registros(3)
+        assert all('vehicle_id' not in r for r in registros)
+
+        GravadorLotes(client).gravar(registros)
+        assert all('vehicle_id' not in r for r in chamadas['lotes_leilao'][0])
+
+        registros[1]['vehicle_id'] = 'v1'
+        GravadorLotes(client).gravar(registros)
+        assert [r['vehicle_id'] for r in chamadas['lotes_leilao'][1]] == [None, 'v1', None]
+
+    def test_reprocessar_mesmo_edital_nao_duplica(self):
+        """Testa que reextrair o mesmo arquivo não conta duplicatas."""
+        extrator = self._extrator()
+        lote = LoteExtraido(numero_lote_raw='1', descricao_raw='FIAT UNO PLACA ABC1234')
+
+        extrator._vincular_veiculos(10, [lote])
+        assert extrator._vincular_veiculos(10, [lote]) == 0
+
+    def test_placa_e_renavam_nao_vem_da_chave_normalizada(self):
+        """Testa que placa Mercosul e renavam não são trocados pela chave do índice."""
+        extrator = self._extrator()
+        original = LoteExtraido(numero_lote_raw='1', descricao_raw='FIAT UNO PLACA ABC1D23 RENAVAM 123456789')
+        extrator._vincular_veiculos(10, [original])
+        releilao = LoteExtraido(numero_lote_raw='2', descricao_raw='FIAT UNO RENAVAM 123456789')
+
+        assert extrator._vincular_veiculos(20, [releilao]) == 1
+        assert releilao.vehicle_id == original.vehicle_id
+        assert original.placa == 'ABC1D23'
+        assert releilao.placa is None  # 'ABC1323' (chave do índice) não existe
+
+
 # =============================================================================
 # ENTRY POINT
 # =============================================================================
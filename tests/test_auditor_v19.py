@@ -0,0 +1,565 @@
+"""
+Testes do Cloud Auditor V19 - componentes sem dependencia de rede.
+===================================================================
+Verifica que:
+1. Write-back em lote acumula resultados e grava 1 chamada por lote
+2. Journal local sobrevive a falha de flush e e reaplicado na execucao seguinte
+   (um journal por execucao; reaplicar nao conta o leiloeiro de novo)
+3. Fila de editais pagina por keyset com colunas projetadas
+4. Validacao de acessibilidade em lote usa o LinkChecker
+5. Excel/CSV lidos em streaming, com parada no primeiro link da whitelist
+6. Fila por prazo (leilao mais proximo primeiro) e --deadline
+7. Cache negativo por manifesto de arquivos (pula no_link inalterado)
+"""
+import json
+import sys
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.cloud_auditor_v19 import (
+    AuditorConfig,
+    ExcelExtractorV19,
+    LinkProveniencia,
+    SupabaseRepositoryV19,
+    URLValidatorV19,
+    WriteBackV19,
+    prefetch_limitado,
+    prioridade_edital,
+)
+
+
+def _repo_fake(aplicar_ok: bool = True) -> SupabaseRepositoryV19:
+    """Repositorio sem credenciais, com Supabase simulado."""
+    repo = SupabaseRepositoryV19(AuditorConfig())
+    repo.enable_supabase = True
+    repo.client = MagicMock()
+    repo.aplicar_resultados_lote = MagicMock(return_value=aplicar_ok)
+    return repo
+
+
+def _proveniencia(url: str = "https://www.megaleiloes.com.br/leilao/1") -> LinkProveniencia:
+    return LinkProveniencia(
+        candidato_raw=url,
+        url_validada=url,
+        valido=True,
+        origem_tipo="pdf_anexo",
+        origem_ref="pdf:edital.pdf:page=1",
+        evidencia_trecho=url,
+        confianca=100,
+    )
+
+
+class TestWriteBackV19:
+    """Testes do write-back em lote (V19.6)."""
+
+    def test_flush_a_cada_batch_size(self, tmp_path):
+        """QG: 5 editais com batch=2 devem gerar 3 chamadas (2 + 2 + flush final)."""
+        repo = _repo_fake()
+        wb = WriteBackV19(repo, batch_size=2, journal_path=str(tmp_path / "j.jsonl"))
+
+        for i in range(5):
+            wb.registrar_processado(f"pncp-{i}", run_id="run_1")
+        assert repo.aplicar_resultados_lote.call_count == 2
+
+        wb.fechar()
+        assert repo.aplicar_resultados_lote.call_count == 3
+        assert wb.buffer == []
+
+    def test_payload_contem_campos_idempotencia(self, tmp_path):
+        """QG: Cada item deve carregar auditor_v19_processed_at e run_id."""
+        repo = _repo_fake()
+        wb = WriteBackV19(repo, batch_size=10, journal_path=str(tmp_path / "j.jsonl"))
+
+        wb.registrar_processado("pncp-1", run_id="run_1", resultado="no_link")
+        wb.fechar()
+
+        itens, _ = repo.aplicar_resultados_lote.call_args[0]
+        dados = itens[0]["dados"]
+        assert itens[0]["pncp_id"] == "pncp-1"
+        assert dados["auditor_v19_run_id"] == "run_1"
+        assert dados["auditor_v19_result"] == "no_link"
+        assert dados["auditor_v19_processed_at"]
+
+    def test_leiloeiros_agregados_por_dominio(self, tmp_path):
+        """QG: Mesmo dominio em N editais vira 1 registro com qtd=N."""
+        repo = _repo_fake()
+        wb = WriteBackV19(repo, batch_size=10, journal_path=str(tmp_path / "j.jsonl"))
+
+        wb.registrar_link("pncp-1", _proveniencia("https://www.megaleiloes.com.br/a"), "run_1")
+        wb.registrar_link("pncp-2", _proveniencia("https://megaleiloes.com.br/b"), "run_1")
+        wb.fechar()
+
+        _, leiloeiros = repo.aplicar_resultados_lote.call_args[0]
+        assert len(leiloeiros) == 1
+        assert leiloeiros[0]["dominio"] == "megaleiloes.com.br"
+        assert leiloeiros[0]["qtd"] == 2
+        assert leiloeiros[0]["pncp_ids"] == ["pncp-1", "pncp-2"]
+
+    def test_leiloeiro_conta_edital_uma_vez(self, tmp_path):
+        """QG: Mesmo edital repetido no buffer (journal recuperado) conta 1 vez."""
+        repo = _repo_fake()
+        wb = WriteBackV19(repo, batch_size=10, journal_path=str(tmp_path / "j.jsonl"))
+
+        wb.registrar_link("pncp-1", _proveniencia(), "run_antigo")
+        wb.registrar_link("pncp-1", _proveniencia(), "run_1")
+        wb.fechar()
+
+        _, leiloeiros = repo.aplicar_resultados_lote.call_args[0]
+        assert leiloeiros[0]["qtd"] == 1
+        assert leiloeiros[0]["pncp_ids"] == ["pncp-1"]
+
+    def test_journal_truncado_apos_flush_ok(self, tmp_path):
+        """QG: Journal deve ficar vazio apos flush confirmado e sumir no fechamento."""
+        wb = WriteBackV19(_repo_fake(), batch_size=1, journal_path=str(tmp_path / "j.jsonl"))
+
+        wb.registrar_processado("pncp-1", run_id="run_1")
+        assert wb.journal_path.read_text() == ""
+
+        wb.fechar()
+        assert not wb.journal_path.exists()
+
+    def test_journal_reaplicado_apos_falha(self, tmp_path):
+        """QG: Resultados de flush falho devem ser reaplicados na proxima execucao."""
+        journal = tmp_path / "j.jsonl"
+
+        wb_falho = WriteBackV19(_repo_fake(aplicar_ok=False), batch_size=10, journal_path=str(journal))
+        wb_falho.registrar_processado("pncp-1", run_id="run_antigo")
+        assert wb_falho.fechar() is False
+        linhas = [json.loads(linha) for linha in wb_falho.journal_path.read_text().splitlines()]
+        assert linhas[0]["pncp_id"] == "pncp-1"
+
+        repo = _repo_fake()
+        wb = WriteBackV19(repo, batch_size=10, journal_path=str(journal))
+        assert wb.recuperar_journal() == 1
+
+        itens, _ = repo.aplicar_resultados_lote.call_args[0]
+        assert itens[0]["dados"]["auditor_v19_run_id"] == "run_antigo"
+        assert not wb_falho.journal_path.exists()
+        assert wb.journal_path.read_text() == ""
+
+    def test_journal_de_execucao_viva_nao_e_recuperado(self, tmp_path):
+        """QG: Execucoes simultaneas usam journals separados e nao se recuperam."""
+        journal = tmp_path / "j.jsonl"
+        repo_a, repo_b = _repo_fake(aplicar_ok=False), _repo_fake()
+        wb_a = WriteBackV19(repo_a, batch_size=10, journal_path=str(journal))
+        wb_b = WriteBackV19(repo_b, batch_size=1, journal_path=str(journal))
+
+        wb_a.registrar_processado("pncp-a", run_id="run_a")
+        assert wb_a.journal_path != wb_b.journal_path
+        if sys.platform != "win32":  # trava do journal e POSIX
+            assert wb_b.recuperar_journal() == 0
+
+        wb_b.registrar_processado("pncp-b", run_id="run_b")
+        assert "pncp-a" in wb_a.journal_path.read_text()
+
+        wb_a.fechar()
+        assert WriteBackV19(_repo_fake(), journal_path=str(journal)).recuperar_journal() == 1
+
+    def test_journal_ignora_linha_truncada(self, tmp_path):
+        """QG: Linha parcial (crash durante write) nao deve impedir recuperacao."""
+        journal = tmp_path / "j.jsonl"
+        journal.write_text(
+            json.dumps({"pncp_id": "pncp-1", "dados": {"auditor_v19_result": "no_link"}})
+            + "\n{\"pncp_id\": \"pncp-2\", \"da"
+        )
+
+        repo = _repo_fake()
+        wb = WriteBackV19(repo, batch_size=10, journal_path=str(journal))
+        assert wb.recuperar_journal() == 1
+
+    def test_ultimo_resultado_por_edital_vence(self, tmp_path):
+        """QG: Edital repetido no buffer deve ser gravado uma unica vez."""
+        repo = _repo_fake()
+        wb = WriteBackV19(repo, batch_size=10, journal_path=str(tmp_path / "j.jsonl"))
+
+        wb.registrar_processado("pncp-1", run_id="run_1", resultado="error")
+        wb.registrar_processado("pncp-1", run_id="run_1", resultado="no_link")
+        wb.fechar()
+
+        itens, _ = repo.aplicar_resultados_lote.call_args[0]
+        assert len(itens) == 1
+        assert itens[0]["dados"]["auditor_v19_result"] == "no_link"
+
+    def test_supabase_desativado_nao_registra(self, tmp_path):
+        """QG: Sem Supabase, write-back nao aceita resultados nem cria journal."""
+        journal = tmp_path / "j.jsonl"
+        repo = SupabaseRepositoryV19(AuditorConfig())
+        wb = WriteBackV19(repo, batch_size=10, journal_path=str(journal))
+
+        assert wb.registrar_processado("pncp-1", run_id="run_1") is False
+        assert not wb.journal_path.exists()
+        assert not journal.exists()
+
+    def test_fallback_update_individual_sem_rpc(self):
+        """QG: Sem a RPC (migration 017), cai para UPDATE individual por edital."""
+        repo = SupabaseRepositoryV19(AuditorConfig())
+        repo.enable_supabase = True
+        repo.client = MagicMock()
+        repo.client.rpc.return_value.execute.side_effect = Exception(
+            "PGRST202: Could not find the function public.auditor_v19_aplicar_resultados"
+        )
+        repo.registrar_leiloeiro_url = MagicMock(return_value=True)
+
+        itens = [
+            {"pncp_id": "pncp-1", "dados": {"auditor_v19_result": "no_link"}},
+            {"pncp_id": "pncp-2", "dados": {"auditor_v19_result": "no_link"}},
+        ]
+        assert repo.aplicar_resultados_lote(itens, []) is True
+        assert repo.client.table.return_value.update.call_count == 2
+        assert repo._rpc_writeback_disponivel is False
+
+    def test_fallback_leiloeiro_soma_so_editais_novos(self):
+        """QG: Sem a RPC, reaplicar o lote nao soma de novo os mesmos editais."""
+        repo = SupabaseRepositoryV19(AuditorConfig())
+        repo.enable_supabase = True
+        repo.client = MagicMock()
+        repo._rpc_writeback_disponivel = False
+        contados = set()
+
+        def upsert(linhas, **kwargs):
+            novas = [linha for linha in linhas if (linha["dominio"], linha["pncp_id"]) not in contados]
+            contados.update((linha["dominio"], linha["pncp_id"]) for linha in novas)
+            return MagicMock(execute=MagicMock(return_value=MagicMock(data=novas)))
+
+        repo.client.table.return_value.upsert.side_effect = upsert
+        repo.client.table.return_value.select.return_value.eq.return_value.execute.return_value.data = [
+            {"dominio": "megaleiloes.com.br", "qtd_ocorrencias": 5}
+        ]
+        leiloeiros = [{"dominio": "megaleiloes.com.br", "url_exemplo": "https://megaleiloes.com.br/a",
+                       "qtd": 2, "pncp_ids": ["pncp-1", "pncp-2"]}]
+
+        for _ in range(2):
+            repo.client.table.return_value.update.reset_mock()
+            assert repo.aplicar_resultados_lote([], leiloeiros) is True
+
+        # Segunda aplicacao: nenhum edital novo, contagem fica em 5 + 0
+        update = repo.client.table.return_value.update.call_args[0][0]
+        assert update["qtd_ocorrencias"] == 5
+
+
+def _repo_paginado(paginas):
+    """Repositorio cujo client devolve as paginas em sequencia."""
+    repo = SupabaseRepositoryV19(AuditorConfig())
+    repo.enable_supabase = True
+    repo.client = MagicMock()
+    query = MagicMock()
+    for metodo in ("select", "or_", "is_", "order", "limit", "gte"):
+        getattr(query, metodo).return_value = query
+    query.execute.side_effect = [MagicMock(data=p) for p in paginas]
+    repo.client.table.return_value = query
+    return repo, query
+
+
+def _editais(ids):
+    return [{"id": i, "pncp_id": f"p{i}", "created_at": f"2026-01-{i:02d}T00:00:00+00:00"} for i in ids]
+
+
+class TestFilaEditaisV19:
+    """Testes da fila em streaming (keyset + prefetch) - V19.6."""
+
+    def test_keyset_segue_cursor_da_ultima_linha(self):
+        """QG: Segunda pagina deve filtrar por (created_at, id) da ultima linha."""
+        repo, query = _repo_paginado([_editais([9, 8]), _editais([7])])
+
+        ids = [e["id"] for e in repo.iterar_editais(limite=None, page_size=2)]
+        assert ids == [9, 8, 7]
+
+        filtro_pagina_2 = query.or_.call_args_list[-1][0][0]
+        assert 'created_at.lt."2026-01-08T00:00:00+00:00"' in filtro_pagina_2
+        assert "id.lt.8" in filtro_pagina_2
+        assert "link_leiloeiro.is.null" in filtro_pagina_2
+
+    def test_projeta_apenas_colunas_necessarias(self):
+        """QG: Nao deve usar select('*')."""
+        repo, query = _repo_paginado([_editais([1])])
+        list(repo.iterar_editais(page_size=5))
+        colunas = query.select.call_args[0][0]
+        assert colunas != "*"
+        for coluna in ("id", "pncp_id", "titulo", "descricao", "data_leilao", "created_at"):
+            assert coluna in colunas
+
+    def test_limite_corta_ultima_pagina(self):
+        """QG: limite=3 com page_size=2 pede 2 + 1."""
+        repo, query = _repo_paginado([_editais([9, 8]), _editais([7])])
+        ids = [e["id"] for e in repo.iterar_editais(limite=3, page_size=2)]
+        assert ids == [9, 8, 7]
+        assert [c[0][0] for c in query.limit.call_args_list] == [2, 1]
+
+    def test_idempotencia_respeitada(self):
+        """QG: Sem --force, filtra auditor_v19_processed_at nulo."""
+        repo, query = _repo_paginado([[]])
+        list(repo.iterar_editais(incluir_ja_processados=False))
+        query.is_.assert_called_with("auditor_v19_processed_at", "null")
+
+    def test_prefetch_preserva_ordem(self):
+        """QG: prefetch_limitado entrega os itens na ordem do iterador."""
+        itens = list(prefetch_limitado(iter(range(50)), max_itens=3))
+        assert itens == list(range(50))
+
+    def test_prefetch_repassa_excecao(self):
+        """QG: Erro na produtora deve chegar ao consumidor."""
+        def gerador():
+            yield 1
+            raise RuntimeError("falha na pagina 2")
+
+        fila = prefetch_limitado(gerador(), max_itens=2)
+        assert next(fila) == 1
+        with pytest.raises(RuntimeError, match="pagina 2"):
+            next(fila)
+
+
+    def test_prefetch_consumidor_parado_libera_produtora(self):
+        """QG: Consumidor que para com a fila cheia nao prende a produtora no fim."""
+        import threading
+        import time
+
+        antes = set(threading.enumerate())
+        fila = prefetch_limitado(iter(range(2)), max_itens=1)
+        assert next(fila) == 0
+        produtora = next(t for t in threading.enumerate() if t not in antes)
+
+        time.sleep(0.2)  # item 1 na fila cheia; produtora tenta entregar o fim
+        fila.close()
+
+        produtora.join(timeout=2)
+        assert not produtora.is_alive()
+
+
+class TestValidacaoAcessibilidadeV19:
+    """Testes da validacao de acessibilidade em lote (V19.6)."""
+
+    def test_lote_delega_ao_link_checker(self):
+        """QG: N URLs viram 1 chamada check_many; repetidas usam cache em memoria."""
+        validator = URLValidatorV19()
+        validator.link_checker = MagicMock()
+        validator.link_checker.check_many.return_value = {
+            "https://a.com/x": MagicMock(ok=True),
+            "https://b.com/y": MagicMock(ok=False),
+        }
+
+        resultado = validator.validar_acessibilidade_lote(["https://a.com/x", "https://b.com/y"])
+        assert resultado == {"https://a.com/x": True, "https://b.com/y": False}
+        assert validator.link_checker.check_many.call_count == 1
+
+        assert validator.validar_acessibilidade("https://a.com/x") is True
+        assert validator.link_checker.check_many.call_count == 1
+
+
+def _xlsx(linhas) -> BytesIO:
+    import openpyxl
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    for linha in linhas:
+        ws.append(linha)
+    buffer = BytesIO()
+    wb.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+class TestExcelCsvStreamingV19:
+    """Testes da extracao de URLs de planilhas em streaming (V19.6)."""
+
+    def test_csv_proveniencia_linha_coluna(self):
+        """QG: origem_ref aponta linha de dados e nome da coluna (como no pandas)."""
+        extractor = ExcelExtractorV19(URLValidatorV19())
+        csv_bytes = BytesIO(
+            "lote,descricao,site\n1,Fiat Uno,\n2,Gol,https://www.superbid.net/leilao/9\n".encode("utf-8")
+        )
+
+        resultados = extractor.extrair_urls_csv_bytesio(csv_bytes, "lotes.csv")
+        assert resultados[0].url_validada == "https://www.superbid.net/leilao/9"
+        assert resultados[0].origem_ref == "csv_anexo:lotes.csv:row=2:col=site"
+
+    def test_csv_latin1(self):
+        """QG: CSV em latin-1 cai para o encoding seguinte."""
+        extractor = ExcelExtractorV19(URLValidatorV19())
+        csv_bytes = BytesIO("endereço\nwww.leiloeiro-exemplo.com.br/edital\n".encode("latin-1"))
+
+        resultados = extractor.extrair_urls_csv_bytesio(csv_bytes, "lotes.csv")
+        assert resultados[0].url_validada == "https://www.leiloeiro-exemplo.com.br/edital"
+
+    def test_xlsx_read_only(self):
+        """QG: .xlsx e lido sem DataFrame e ignora o cabecalho."""
+        extractor = ExcelExtractorV19(URLValidatorV19())
+        planilha = _xlsx([
+            ["lote", "link"],
+            [1, None],
+            [2, "Acesse https://www.superbid.net/lote/2"],
+        ])
+
+        resultados = extractor.extrair_urls_excel_bytesio(planilha, "lotes.xlsx")
+        assert resultados[0].url_validada == "https://www.superbid.net/lote/2"
+        assert resultados[0].origem_ref == "xlsx_anexo:lotes.xlsx:row=2:col=link"
+
+    def test_para_no_primeiro_link_whitelist(self):
+        """QG: Linhas depois de um link da whitelist nao sao lidas."""
+        extractor = ExcelExtractorV19(URLValidatorV19())
+        lidas = []
+
+        def linhas():
+            for i in range(1000):
+                lidas.append(i)
+                valor = "https://www.superbid.net/x" if i == 3 else f"item {i}"
+                yield ["col"], (valor,)
+
+        resultados = extractor._extrair_urls_linhas(linhas(), "grande.csv", "csv_anexo")
+        assert resultados[0].confianca == 100
+        assert lidas == [0, 1, 2, 3]
+
+
+class TestFilaPorPrazoV19:
+    """Testes da fila por prazo e do orcamento de tempo (V19.6)."""
+
+    def test_futuros_depois_vencidos(self):
+        """QG: Fase 1 filtra data_leilao >= hoje em ordem asc; fase 2 traz vencidos/sem data."""
+        futuros = [{"id": 1, "data_leilao": "2026-03-02T10:00:00"}]
+        vencidos = _editais([5])
+        repo, query = _repo_paginado([futuros, vencidos])
+
+        ids = [e["id"] for e in repo.iterar_editais(page_size=10, ordem="prazo", hoje="2026-03-01")]
+        assert ids == [1, 5]
+
+        filtro_fase_1 = query.or_.call_args_list[0][0][0]
+        filtro_fase_2 = query.or_.call_args_list[1][0][0]
+        assert 'data_leilao.gte."2026-03-01"' in filtro_fase_1
+        assert "data_leilao.is.null" in filtro_fase_2
+        assert query.order.call_args_list[0][0][0] == "data_leilao"
+
+    def test_pular_passados_no_servidor(self):
+        """QG: Com pular_passados, vencidos nem sao buscados."""
+        repo, query = _repo_paginado([[]])
+        list(repo.iterar_editais(ordem="prazo", pular_passados=True, hoje="2026-03-01"))
+        assert query.execute.call_count == 1
+
+    def test_keyset_por_data_leilao(self):
+        """QG: Cursor da fase por prazo usa (data_leilao, id) da ultima linha do servidor."""
+        pagina_1 = [
+            {"id": 1, "data_leilao": "2026-03-02T10:00:00", "score": 10},
+            {"id": 2, "data_leilao": "2026-03-02T15:00:00", "score": 90},
+        ]
+        repo, query = _repo_paginado([pagina_1, [], []])
+        ids = [e["id"] for e in repo.iterar_editais(page_size=2, ordem="prazo", hoje="2026-03-01")]
+
+        # Mesmo dia: maior score primeiro
+        assert ids == [2, 1]
+        filtro_pagina_2 = query.or_.call_args_list[1][0][0]
+        assert 'data_leilao.gt."2026-03-02T15:00:00"' in filtro_pagina_2
+        assert "id.gt.2" in filtro_pagina_2
+
+    def test_prioridade_dia_score_valor(self):
+        """QG: Dia mais proximo vence; no mesmo dia, score e depois valor_estimado."""
+        editais = [
+            {"id": "sem_data"},
+            {"id": "dia2", "data_leilao": "2026-03-02", "score": 99},
+            {"id": "dia1_barato", "data_leilao": "2026-03-01", "score": 50, "valor_estimado": 100},
+            {"id": "dia1_caro", "data_leilao": "2026-03-01", "score": 50, "valor_estimado": 9000},
+        ]
+        ordem = [e["id"] for e in sorted(editais, key=prioridade_edital)]
+        assert ordem == ["dia1_caro", "dia1_barato", "dia2", "sem_data"]
+
+    def test_deadline_para_antes_do_proximo_edital(self, tmp_path):
+        """QG: Orcamento esgotado encerra a fila sem processar e sem erro."""
+        from src.core.cloud_auditor_v19 import AuditorV19
+
+        config = AuditorConfig(
+            deadline_segundos=1e-9,
+            writeback_journal_path=str(tmp_path / "j.jsonl"),
+        )
+        auditor = AuditorV19(config, extrair_lotes=False)
+        auditor.repo.iterar_editais = MagicMock(return_value=iter(_editais([1, 2])))
+        auditor._processar_edital = MagicMock()
+
+        stats = auditor.executar(limite=2)
+
+        assert stats["interrompido_deadline"] is True
+        auditor._processar_edital.assert_not_called()
+
+
+def _auditor_manifesto(tmp_path, arquivos):
+    from src.core.cloud_auditor_v19 import AuditorV19
+
+    config = AuditorConfig(writeback_journal_path=str(tmp_path / "j.jsonl"))
+    auditor = AuditorV19(config, extrair_lotes=False)
+    auditor.repo.listar_arquivos_storage = MagicMock(return_value=arquivos)
+    auditor.repo.baixar_arquivo = MagicMock(return_value=None)
+    return auditor
+
+
+ARQUIVOS_EDITAL = [{"path": "p1/edital.pdf", "name": "edital.pdf", "etag": "abc", "size": 10}]
+
+
+class TestCacheManifestoV19:
+    """Testes do cache negativo por manifesto (V19.6)."""
+
+    def test_no_link_inalterado_nao_baixa_arquivos(self, tmp_path):
+        """QG: Mesmo manifesto + no_link anterior = nenhum download."""
+        from src.core.cloud_auditor_v19 import EDITAL_INALTERADO
+
+        auditor = _auditor_manifesto(tmp_path, ARQUIVOS_EDITAL)
+        edital = {"id": 1, "pncp_id": "p1", "titulo": "Leilao"}
+        edital["auditor_v19_manifest_hash"] = auditor._hash_manifesto(edital, ARQUIVOS_EDITAL)
+        edital["auditor_v19_result"] = "no_link"
+
+        assert auditor._processar_edital(edital) is EDITAL_INALTERADO
+        auditor.repo.baixar_arquivo.assert_not_called()
+        assert auditor.metrics.editais_manifesto_inalterado == 1
+
+    def test_anexo_novo_invalida(self, tmp_path):
+        """QG: Arquivo novo no Storage muda o hash e o edital e reprocessado."""
+        novos = ARQUIVOS_EDITAL + [{"path": "p1/lotes.xlsx", "name": "lotes.xlsx", "etag": "def"}]
+        auditor = _auditor_manifesto(tmp_path, novos)
+        edital = {"id": 1, "pncp_id": "p1", "auditor_v19_result": "no_link"}
+        edital["auditor_v19_manifest_hash"] = auditor._hash_manifesto(edital, ARQUIVOS_EDITAL)
+
+        auditor._processar_edital(edital)
+        assert auditor.repo.baixar_arquivo.call_count == 2
+        assert auditor._manifesto_atual != edital["auditor_v19_manifest_hash"]
+
+    def test_nova_versao_extrator_invalida(self, tmp_path, monkeypatch):
+        """QG: Mudar VERSAO_EXTRATOR_LINKS muda o hash do mesmo manifesto."""
+        import src.core.cloud_auditor_v19 as auditor_mod
+
+        auditor = _auditor_manifesto(tmp_path, ARQUIVOS_EDITAL)
+        edital = {"id": 1, "pncp_id": "p1"}
+        hash_antigo = auditor._hash_manifesto(edital, ARQUIVOS_EDITAL)
+
+        monkeypatch.setattr(auditor_mod, "VERSAO_EXTRATOR_LINKS", "links_v99")
+        assert auditor._hash_manifesto(edital, ARQUIVOS_EDITAL) != hash_antigo
+
+    def test_hash_gravado_apenas_em_no_link(self):
+        """QG: no_link grava o hash; error limpa (nunca vira cache negativo)."""
+        repo = SupabaseRepositoryV19(AuditorConfig())
+        assert repo.montar_dados_processado_v19("r", "no_link", "h1")["auditor_v19_manifest_hash"] == "h1"
+        assert repo.montar_dados_processado_v19("r", "error", "h1")["auditor_v19_manifest_hash"] is None
+
+    def test_candidato_rejeitado_grava_hash(self, tmp_path):
+        """QG: Link rejeitado (no_link) grava o manifesto; link valido limpa."""
+        from src.core.cloud_auditor_v19 import AuditorV19
+
+        config = AuditorConfig(writeback_journal_path=str(tmp_path / "j.jsonl"))
+        auditor = AuditorV19(config, extrair_lotes=False)
+        auditor.repo.iterar_editais = MagicMock(return_value=iter(_editais([1])))
+        auditor.writeback.registrar = MagicMock(return_value=True)
+        rejeitado = _proveniencia()
+        rejeitado.valido = False
+        rejeitado.url_validada = None
+
+        def processar(edital):
+            auditor._manifesto_atual = "h1"
+            return {"pncp_id": edital["pncp_id"], "proveniencia": rejeitado, "fonte": "pdf"}
+
+        auditor._processar_edital = processar
+        auditor.executar(limite=1)
+
+        dados = auditor.writeback.registrar.call_args.args[1]
+        assert dados["auditor_v19_result"] == "no_link"
+        assert dados["auditor_v19_manifest_hash"] == "h1"
+        valido = auditor.repo.montar_dados_link_v19(_proveniencia(), "r", "h1")
+        assert valido["auditor_v19_manifest_hash"] is None
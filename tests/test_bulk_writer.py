@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Testes do BulkUpsertWriter (upsert em lote via PostgREST).
+
+Testes para garantir que:
+1. As linhas vão em chunks (arrays JSON) com merge-duplicates e on_conflict
+2. Um chunk rejeitado é bisectado até isolar só as linhas ruins
+3. Erros transitórios são repetidos e não disparam bisecção
+4. Chave repetida no mesmo upsert é enviada uma vez só
+5. Upserts simultâneos no mesmo writer contam só as próprias requisições
+6. Só erro de dado (400/409/422) bisecta; 401/403/404 falham o chunk uma vez
+
+Uso:
+    pytest tests/test_bulk_writer.py -v
+"""
+
+import json
+import sys
+import threading
+from pathlib import Path
+
+import httpx
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from connectors.common import bulk_writer
+from connectors.common.bulk_writer import BulkUpsertWriter
+
+
+def _writer(handler, **kwargs):
+    kwargs.setdefault("chunk_size", 10)
+    return BulkUpsertWriter(
+        "https://proj.supabase.co", "chave", "leiloeiro_lotes",
+        on_conflict="id_interno", key_field="id_interno",
+        transport=httpx.MockTransport(handler), **kwargs,
+    )
+
+
+def _rows(n):
+    return [{"id_interno": f"lj|{i}", "titulo": f"Lote {i}"} for i in range(n)]
+
+
+class TestBulkUpsert:
+    """Testes do upsert em chunks."""
+
+    def test_chunks_em_array(self):
+        """QG: 25 linhas com chunk de 10 = 3 requisições com o header de upsert."""
+        recebidos = []
+        lock = threading.Lock()
+
+        def handler(request):
+            with lock:
+                recebidos.append((request, json.loads(request.content)))
+            return httpx.Response(201)
+
+        result = _writer(handler).upsert(_rows(25))
+
+        assert result.written == 25 and result.requests == 3
+        assert sorted(len(corpo) for _, corpo in recebidos) == [5, 10, 10]
+        request = recebidos[0][0]
+        assert "resolution=merge-duplicates" in request.headers["Prefer"]
+        assert request.url.params["on_conflict"] == "id_interno"
+        assert [o.index for o in result.outcomes] == list(range(25))
+
+    def test_bisseccao_isola_linha_ruim(self):
+        """QG: Uma linha inválida falha sozinha; as outras 9 do chunk gravam."""
+        def handler(request):
+            corpo = json.loads(request.content)
+            if any(r["id_interno"] == "lj|3" for r in corpo):
+                return httpx.Response(400, json={"message": "invalid input syntax"})
+            return httpx.Response(201)
+
+        result = _writer(handler).upsert(_rows(10))
+
+        assert result.written == 9
+        assert result.failed_keys == ["lj|3"]
+        assert result.outcomes[3].status == 400
+        assert result.bisections > 0
+
+    def test_erro_transitorio_repetido_sem_bisseccao(self, monkeypatch):
+        """QG: 503 é repetido; se persistir, o chunk inteiro falha sem dividir."""
+        monkeypatch.setattr(bulk_writer.time, "sleep", lambda s: None)
+        tentativas = []
+
+        def handler(request):
+            tentativas.append(1)
+            return httpx.Response(503 if len(tentativas) < 2 else 201)
+
+        assert _writer(handler).upsert(_rows(4)).written == 4
+        assert len(tentativas) == 2
+
+        result = _writer(lambda r: httpx.Response(503), max_retries=2).upsert(_rows(4))
+        assert result.failed == 4 and result.requests == 2 and result.bisections == 0
+
+    def test_erro_nao_de_dado_sem_bisseccao(self):
+        """QG: 401/403/404 falham o chunk inteiro com uma única requisição."""
+        for status in (401, 403, 404):
+            result = _writer(lambda r, s=status: httpx.Response(s)).upsert(_rows(8))
+
+            assert result.failed == 8 and result.written == 0
+            assert result.requests == 1 and result.bisections == 0
+            assert {o.status for o in result.outcomes} == {status}
+
+    def test_chave_repetida_enviada_uma_vez(self):
+        """QG: Mesmo id_interno duas vezes: vai só a última versão."""
+        corpos = []
+
+        def handler(request):
+            corpos.append(json.loads(request.content))
+            return httpx.Response(201)
+
+        rows = _rows(2) + [{"id_interno": "lj|0", "titulo": "Versão nova"}]
+        result = _writer(handler).upsert(rows)
+
+        assert corpos == [[rows[1], rows[2]]]
+        assert result.written == 3
+
+    def test_contagem_por_chamada_em_threads(self):
+        """QG: Duas threads no mesmo writer: cada resultado conta só as suas requisições."""
+        barreira = threading.Barrier(2)
+
+        def handler(request):
+            corpo = json.loads(request.content)
+            if corpo[0]["titulo"] == "Lote 0":
+                barreira.wait(timeout=5)
+            return httpx.Response(201)
+
+        writer = _writer(handler, max_in_flight=1)
+        resultados = {}
+
+        def escrever(nome, n):
+            resultados[nome] = writer.upsert(_rows(n))
+
+        threads = [
+            threading.Thread(target=escrever, args=("um", 5)),
+            threading.Thread(target=escrever, args=("tres", 25)),
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=10)
+
+        assert resultados["um"].requests == 1
+        assert resultados["tres"].requests == 3
+
+    def test_schema_no_content_profile(self):
+        """QG: schema='raw' vira o header Content-Profile."""
+        headers = {}
+
+        def handler(request):
+            headers.update(request.headers)
+            return httpx.Response(201)
+
+        _writer(handler, schema="raw").upsert(_rows(1))
+        assert headers["content-profile"] == "raw"
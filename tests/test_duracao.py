@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Testes do parser de duracao compartilhado (--deadline).
+
+Testes para garantir que:
+1. --deadline aceita 20m, 1h30m, 90s, 2h e segundos puros
+2. Valores invalidos viram ArgumentTypeError (mensagem de uso do argparse)
+
+Uso:
+    pytest tests/test_duracao.py -v
+"""
+
+import argparse
+
+import pytest
+
+from duracao import parse_duracao
+
+
+class TestParseDuracao:
+    """Testes de parse_duracao."""
+
+    def test_formatos_aceitos(self):
+        """QG: --deadline aceita 20m, 1h30m, 90s, 2h e segundos puros."""
+        assert parse_duracao("20m") == 1200
+        assert parse_duracao("1h30m") == 5400
+        assert parse_duracao("90s") == 90
+        assert parse_duracao("2h") == 7200
+        assert parse_duracao("45") == 45
+        assert parse_duracao("2.5") == 2.5
+
+    @pytest.mark.parametrize("valor", ["vinte", "", "10x"])
+    def test_valor_invalido(self, valor):
+        """QG: Duracao invalida vira ArgumentTypeError."""
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_duracao(valor)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Testes da paginação do LeiloeiroAPIClient (serial x concorrente).
+
+Testes para garantir que:
+1. O modo concorrente devolve os mesmos lotes, na mesma ordem, que o serial
+2. A proteção contra página repetida continua valendo
+3. O rate limit é global entre os workers
+4. max_pages limita as páginas despachadas
+5. Retries também passam pelo rate limit compartilhado
+
+Uso:
+    pytest tests/test_leiloesjudiciais_api_client.py -v
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from connectors.leiloesjudiciais import api_client
+from connectors.leiloesjudiciais.api_client import LeiloeiroAPIClient
+from connectors.leiloesjudiciais.session import SessionManager
+
+TOTAL_PAGINAS = {1: 5, 2: 3}
+
+
+def _transport(requisicoes, repetir_a_partir=None, atraso=0.0):
+    """API fake: tipo 1 tem 5 páginas, tipo 2 tem 3; 2 lotes por página."""
+    lock = threading.Lock()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        tipo = int(request.url.params["tipo"])
+        pagina = int(request.url.params["pg"])
+        with lock:
+            requisicoes.append((tipo, pagina, time.monotonic()))
+        if atraso:
+            time.sleep(atraso)
+        if repetir_a_partir and pagina >= repetir_a_partir:
+            pagina = repetir_a_partir - 1
+        itens = [{"lote_id": f"{tipo}-{pagina}-{i}"} for i in range(2)]
+        return httpx.Response(200, json={
+            "items": itens, "currentPage": pagina, "totalPages": TOTAL_PAGINAS[tipo],
+        })
+    return httpx.MockTransport(handler)
+
+
+def _cliente(requisicoes, concorrencia, rps=1000, **kwargs):
+    session = SessionManager(max_connections=concorrencia, transport=_transport(requisicoes, **kwargs))
+    return LeiloeiroAPIClient(requests_per_second=rps, session=session, max_concurrent=concorrencia)
+
+
+class TestPaginacaoConcorrente:
+    """Testes do fan-out de páginas."""
+
+    def test_mesma_ordem_do_serial(self):
+        """QG: Lotes concorrentes == seriais, em ordem (tipo, página)."""
+        serial, _ = _cliente([], 1).fetch_all_tipos(tipos=[1, 2])
+        concorrente, stats = _cliente([], 4).fetch_all_tipos(tipos=[1, 2])
+
+        assert [i["lote_id"] for i in concorrente] == [i["lote_id"] for i in serial]
+        assert [i["_tipo_busca"] for i in concorrente] == [i["_tipo_busca"] for i in serial]
+        assert len(concorrente) == 16
+        assert stats.pages_fetched == 8
+
+    def test_pagina_repetida_interrompe_tipo(self):
+        """QG: Página repetida (bug da API) encerra o tipo como no modo serial."""
+        requisicoes = []
+        for concorrencia in (1, 4):
+            itens, stats = _cliente(requisicoes, concorrencia, repetir_a_partir=3).fetch_all_pages(tipo=1)
+            assert [i["lote_id"] for i in itens] == ["1-1-0", "1-1-1", "1-2-0", "1-2-1"]
+            assert stats.truncated == 1
+            assert stats.failed == 0
+
+    def test_max_pages_limita_despacho(self):
+        """QG: Só as páginas até max_pages são requisitadas."""
+        requisicoes = []
+        _cliente(requisicoes, 4).fetch_all_tipos(tipos=[1, 2], max_pages_per_tipo=2)
+        assert sorted((t, p) for t, p, _ in requisicoes) == [(1, 1), (1, 2), (2, 1), (2, 2)]
+
+    def test_rate_limit_global_entre_workers(self):
+        """QG: 4 workers a 20 req/s não passam de 20 req/s somados."""
+        requisicoes = []
+        _cliente(requisicoes, 4, rps=20, atraso=0.02).fetch_all_tipos(tipos=[1, 2])
+        instantes = sorted(t for _, _, t in requisicoes)
+        intervalos = [b - a for a, b in zip(instantes[:-1], instantes[1:], strict=True)]
+        assert min(intervalos) >= 0.05 * 0.8
+
+    def test_concorrencia_sobrepoe_latencia(self):
+        """QG: Com latência alta, 4 workers terminam bem antes do serial."""
+        inicio = time.monotonic()
+        _cliente([], 1, atraso=0.05).fetch_all_tipos(tipos=[1, 2])
+        serial = time.monotonic() - inicio
+
+        inicio = time.monotonic()
+        _cliente([], 4, atraso=0.05).fetch_all_tipos(tipos=[1, 2])
+        concorrente = time.monotonic() - inicio
+
+        assert concorrente < serial * 0.75
+
+    def test_retry_passa_pelo_rate_limit(self, monkeypatch):
+        """QG: Cada retry consome um horário do rate limit, como a primeira tentativa."""
+        respostas = iter([503, 500, 200])
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            status = next(respostas)
+            if status != 200:
+                return httpx.Response(status)
+            return httpx.Response(200, json={"items": [], "currentPage": 1, "totalPages": 1})
+
+        session = SessionManager(transport=httpx.MockTransport(handler))
+        client = LeiloeiroAPIClient(requests_per_second=1000, session=session, max_concurrent=1)
+        chamadas = []
+        monkeypatch.setattr(client, "_apply_rate_limit", lambda: chamadas.append(1))
+        monkeypatch.setattr(api_client.time, "sleep", lambda s: None)
+
+        assert client.get_lotes(page=1).success
+        assert len(chamadas) == 3
+        assert client.stats.total_requests == 3
+        assert client.stats.rate_limited == 1
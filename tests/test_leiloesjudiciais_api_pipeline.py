@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Testes do run_api_pipeline em streaming.
+
+Testes para garantir que:
+1. Os lotes de uma página chegam ao JSONL antes da próxima página ser buscada
+2. O upsert acompanha o fetch (lotes pequenos, não tudo no fim)
+3. O relatório continua com os mesmos contadores por fase
+
+Uso:
+    pytest tests/test_leiloesjudiciais_api_pipeline.py -v
+"""
+
+import json
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from connectors.leiloesjudiciais import run_api_pipeline
+
+
+def _item(lote_id, tipo=1, titulo=None, data="2030-03-10 14:00:00"):
+    return {
+        "lote_id": lote_id, "leilao_id": 77, "_tipo_busca": tipo,
+        "nm_titulo_lote": titulo or f"Fiat Uno {lote_id}", "id_categoria": tipo,
+        "dt_fechamento": data, "nm_categoria": "Veículos", "vl_lanceminimo": "1000,00",
+    }
+
+
+PAGINAS = [
+    (1, 1, 2, [_item(1), _item(2, data=None)]),
+    (1, 2, 2, [_item(3)]),
+    (2, 1, 1, [_item(4, tipo=2, titulo="Sucata de moto Honda"), _item(5, tipo=2, titulo="Geladeira")]),
+]
+
+
+def _patch_paginas(monkeypatch, ao_gerar=None):
+    def iter_pages(self, **kwargs):
+        for pagina in PAGINAS:
+            if ao_gerar:
+                ao_gerar(pagina)
+            yield pagina
+    monkeypatch.setattr(run_api_pipeline.LeiloeiroAPIClient, "iter_pages", iter_pages)
+
+
+class TestPipelineStreaming:
+    """Testes do fluxo página a página."""
+
+    def test_jsonl_escrito_antes_da_proxima_pagina(self, monkeypatch, tmp_path):
+        """QG: Ao buscar a página 2, o lote válido da página 1 já está no disco."""
+        linhas_no_disco = []
+
+        def ao_gerar(pagina):
+            arquivos = list((tmp_path / "out").glob("valid_*.jsonl"))
+            linhas_no_disco.append(len(arquivos[0].read_text().splitlines()) if arquivos else 0)
+
+        _patch_paginas(monkeypatch, ao_gerar)
+        run_api_pipeline.run_pipeline(output_dir=str(tmp_path / "out"), vehicle_index=False, delta=False)
+
+        assert linhas_no_disco == [0, 1, 2]
+
+    def test_upsert_acompanha_o_fetch(self, monkeypatch, tmp_path):
+        """QG: Com flush por tempo imediato, cada página com válidos gera um upsert."""
+        monkeypatch.setenv("SUPABASE_URL", "https://proj.supabase.co")
+        monkeypatch.setenv("SUPABASE_SERVICE_KEY", "chave")
+        monkeypatch.setattr(run_api_pipeline, "PERSIST_FLUSH_SECONDS", 0.0)
+        upserts = []
+        monkeypatch.setattr(
+            run_api_pipeline, "_persist_to_supabase",
+            lambda lots, *a, **kw: upserts.append([lot.lote_id_original for lot in lots]) or (len(lots), 0),
+        )
+        _patch_paginas(monkeypatch)
+
+        report = run_api_pipeline.run_pipeline(
+            dry_run=False, persist=True, output_dir=str(tmp_path / "out"), vehicle_index=False, delta=False,
+        )
+
+        assert upserts == [["1"], ["3"], ["4"]]
+        assert report.validate["persisted"] == 3
+
+    def test_relatorio_por_fase(self, monkeypatch, tmp_path):
+        """QG: Contadores de fetch/pré-filtro/validação e arquivos do relatório."""
+        _patch_paginas(monkeypatch)
+        report = run_api_pipeline.run_pipeline(output_dir=str(tmp_path / "out"), vehicle_index=False, delta=False)
+
+        assert report.fetch["items_fetched"] == 5
+        assert report.normalize["total_input"] == 4
+        assert report.validate == {
+            "total_input": 4, "valid": 3, "quarantine": 1, "valid_rate": 75.0,
+            "errors_by_code": {"MISSING_DATA_LEILAO": 1},
+        }
+        quarentena = [json.loads(linha) for linha in Path(report.files["quarantine"]).read_text().splitlines()]
+        assert sorted(r["stage"] for r in quarentena) == ["pre_filter", "validation"]
+        assert {e["code"] for e in report.top_errors} == {"MISSING_DATA_LEILAO", "CATEGORY_EXCLUDED"}
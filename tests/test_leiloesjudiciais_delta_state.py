@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Testes da ingestão incremental (delta) do pipeline da API leiloesjudiciais.
+
+Testes para garantir que:
+1. Itens são classificados em novo/alterado/inalterado/removido
+2. Campos voláteis (visitas) não fazem o lote parecer alterado
+3. Ausência só vira remoção com listagem completa (sem tipo truncado)
+4. Lote removido que volta é reprocessado
+5. O pipeline só normaliza novos/alterados e o estado só avança com persistência
+
+Uso:
+    pytest tests/test_leiloesjudiciais_delta_state.py -v
+"""
+
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from connectors.leiloesjudiciais import run_api_pipeline
+from connectors.leiloesjudiciais.delta_state import DeltaState, item_key, payload_hash
+
+
+def _item(lote_id, valor="1000,00", visitas=1):
+    return {
+        "lote_id": lote_id, "leilao_id": 77, "nm_titulo_lote": f"Sucata de veículo {lote_id}",
+        "vl_lanceminimo": valor, "nu_visitas": visitas, "_tipo_busca": 1,
+        "dt_fechamento": "2030-03-10 14:00:00", "nm_categoria": "Veículos",
+    }
+
+
+class TestClassificacao:
+    """Testes do DeltaState."""
+
+    def test_novo_alterado_inalterado_removido(self):
+        """QG: Segunda execução separa as quatro classes."""
+        state = DeltaState(":memory:")
+        state.commit([_item(1), _item(2), _item(3)], {"1|77": "leiloesjudiciais|A"})
+
+        plan = state.classify([_item(1), _item(2, valor="900,00"), _item(4)])
+        assert [item_key(i) for i in plan.new] == ["4|77"]
+        assert [item_key(i) for i in plan.changed] == ["2|77"]
+        assert plan.unchanged_keys == ["1|77"]
+        assert [r.key for r in plan.disappeared] == ["3|77"]
+
+    def test_campo_volatil_ignorado(self):
+        """QG: Só o contador de visitas mudou: lote inalterado."""
+        assert payload_hash(_item(1, visitas=1)) == payload_hash(_item(1, visitas=500))
+        state = DeltaState(":memory:")
+        state.commit([_item(1, visitas=1)])
+        assert state.classify([_item(1, visitas=500)]).unchanged_keys == ["1|77"]
+
+    def test_listagem_parcial_nao_remove(self):
+        """QG: Com max_pages/erros, lote ausente não é removido."""
+        state = DeltaState(":memory:")
+        state.commit([_item(1), _item(2)])
+        assert state.classify([_item(1)], complete=False).disappeared == []
+
+    def test_removido_que_volta_e_reprocessado(self, tmp_path):
+        """QG: Lote tombstoned que reaparece vira alterado, e o estado persiste."""
+        caminho = str(tmp_path / "delta.sqlite")
+        state = DeltaState(caminho)
+        state.commit([_item(1)], {"1|77": "leiloesjudiciais|A"})
+        state.mark_removed(["1|77"])
+        state.close()
+
+        reaberto = DeltaState(caminho)
+        assert reaberto.classify([]).disappeared == []
+        plan = reaberto.classify([_item(1)])
+        assert [item_key(i) for i in plan.changed] == ["1|77"]
+        reaberto.close()
+
+
+class TestPipelineIncremental:
+    """Testes do run_pipeline com o estado incremental."""
+
+    def _rodar(self, monkeypatch, tmp_path, items, truncado=False, **kwargs):
+        monkeypatch.setenv("LEILOEIRO_DELTA_STATE_PATH", str(tmp_path / "delta.sqlite"))
+
+        def iter_pages(self, **kw):
+            yield 1, 1, 1, list(items)
+            if truncado:
+                self.stats.truncated += 1
+
+        monkeypatch.setattr(run_api_pipeline.LeiloeiroAPIClient, "iter_pages", iter_pages)
+        return run_api_pipeline.run_pipeline(
+            output_dir=str(tmp_path / "out"), vehicle_index=False, **kwargs
+        )
+
+    def test_dry_run_nao_avanca_estado(self, monkeypatch, tmp_path):
+        """QG: Dry run mostra o delta sem gravar o estado."""
+        items = [_item(1), _item(2)]
+        self._rodar(monkeypatch, tmp_path, items)
+        report = self._rodar(monkeypatch, tmp_path, items)
+        assert report.delta["new"] == 2
+        assert report.normalize["total_input"] == 2
+
+    def test_persist_processa_so_o_delta(self, monkeypatch, tmp_path):
+        """QG: Após uma execução com persist, só o lote alterado é normalizado."""
+        arquivados = []
+        monkeypatch.setenv("SUPABASE_URL", "https://proj.supabase.co")
+        monkeypatch.setenv("SUPABASE_SERVICE_KEY", "chave")
+        monkeypatch.setattr(run_api_pipeline, "_persist_to_supabase", lambda lots, *a, **kw: (len(lots), 0))
+        monkeypatch.setattr(run_api_pipeline, "_tombstone_in_supabase", lambda ids: arquivados.extend(ids) or len(ids))
+
+        self._rodar(monkeypatch, tmp_path, [_item(1), _item(2), _item(3)], dry_run=False, persist=True)
+        report = self._rodar(
+            monkeypatch, tmp_path, [_item(1), _item(2, valor="500,00")], dry_run=False, persist=True
+        )
+
+        assert report.delta["new"] == 0
+        assert report.delta["changed"] == 1
+        assert report.delta["unchanged"] == 1
+        assert report.delta["disappeared"] == 1
+        assert report.normalize["total_input"] == 1
+        assert report.delta["tombstoned"] == 1
+        assert arquivados == [run_api_pipeline.APILotNormalizer().normalize(_item(3)).id_interno]
+
+    def test_listagem_truncada_nao_gera_tombstone(self, monkeypatch, tmp_path):
+        """QG: Tipo interrompido por página repetida não remove os ausentes."""
+        arquivados = []
+        monkeypatch.setenv("SUPABASE_URL", "https://proj.supabase.co")
+        monkeypatch.setenv("SUPABASE_SERVICE_KEY", "chave")
+        monkeypatch.setattr(run_api_pipeline, "_persist_to_supabase", lambda lots, *a, **kw: (len(lots), 0))
+        monkeypatch.setattr(run_api_pipeline, "_tombstone_in_supabase", lambda ids: arquivados.extend(ids) or len(ids))
+
+        self._rodar(monkeypatch, tmp_path, [_item(1), _item(2), _item(3)], dry_run=False, persist=True)
+        report = self._rodar(monkeypatch, tmp_path, [_item(1)], truncado=True, dry_run=False, persist=True)
+
+        assert report.delta["listing_complete"] is False
+        assert report.delta["disappeared"] == 0
+        assert report.delta["tombstoned"] == 0
+        assert arquivados == []
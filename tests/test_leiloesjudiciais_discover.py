@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Testes da descoberta em streaming via sitemap (leiloesjudiciais).
+
+Testes para garantir que:
+1. O parsing em streaming devolve o mesmo resultado do modo antigo
+   (namespace, categorias, ordenação por lastmod e max_lots)
+2. Sitemap-index: filhos (inclusive .xml.gz) são lidos e filhos
+   inalterados são pulados no modo incremental
+3. A marca d'água por leilão devolve só lotes modificados
+4. Leilões truncados por max_lots ou com falha no fetch não avançam a marca
+5. Erro inesperado na descoberta devolve lista vazia e o erro no relatório
+
+Uso:
+    pytest tests/test_leiloesjudiciais_discover.py -v
+"""
+
+import gzip
+import sys
+from pathlib import Path
+
+import httpx
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from connectors.leiloesjudiciais.config import config
+from connectors.leiloesjudiciais.discover import LeilaoDiscovery, SitemapWatermarks
+from connectors.leiloesjudiciais.session import SessionManager
+
+BASE = config.BASE_URL
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def _urlset(entradas):
+    corpo = "".join(
+        f"<url><loc>{BASE}{loc}</loc><lastmod>{lastmod}</lastmod></url>" for loc, lastmod in entradas
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset {NS}>{corpo}</urlset>'
+
+
+def _index(filhos):
+    corpo = "".join(
+        f"<sitemap><loc>{BASE}/{nome}</loc><lastmod>{lastmod}</lastmod></sitemap>" for nome, lastmod in filhos
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex {NS}>{corpo}</sitemapindex>'
+
+
+def _discovery(documentos, requisicoes=None):
+    def handler(request):
+        caminho = request.url.path.lstrip("/")
+        if requisicoes is not None:
+            requisicoes.append(caminho)
+        corpo = documentos.get(caminho)
+        if corpo is None:
+            return httpx.Response(404)
+        if caminho.endswith(".gz"):
+            return httpx.Response(200, content=gzip.compress(corpo.encode()))
+        return httpx.Response(200, text=corpo)
+
+    session = SessionManager(transport=httpx.MockTransport(handler))
+    return LeilaoDiscovery(session=session)
+
+
+class TestStreaming:
+    """Testes do parsing em streaming."""
+
+    def test_ordenacao_e_limite(self):
+        """QG: Lotes mais recentes primeiro, categorias contadas à parte."""
+        discovery = _discovery({"sitemap.xml": _urlset([
+            ("/lote/10/1", "2026-01-01"),
+            ("/veiculos/carros", "2026-01-05"),
+            ("/lote/10/2", "2026-01-03"),
+            ("/lote/11/3", "2026-01-02"),
+        ])})
+        lots, report = discovery.discover_from_sitemap(max_lots=2, save_report=False)
+
+        assert [lot.lote_id for lot in lots] == ["2", "3"]
+        assert report.total_urls_found == 4
+        assert report.lot_urls_found == 3
+        assert report.category_urls == 1
+
+    def test_sitemap_index_com_filho_gzip(self):
+        """QG: Filhos do sitemap-index (inclusive .xml.gz) são lidos."""
+        discovery = _discovery({
+            "sitemap.xml": _index([("a.xml", "2026-01-01"), ("b.xml.gz", "2026-01-01")]),
+            "a.xml": _urlset([("/lote/10/1", "2026-01-01")]),
+            "b.xml.gz": _urlset([("/lote/20/2", "2026-01-02")]),
+        })
+        lots, report = discovery.discover_from_sitemap(save_report=False)
+
+        assert sorted(lot.lote_id for lot in lots) == ["1", "2"]
+        assert report.sitemaps_fetched == 3
+
+    def test_consumidor_para_antes_do_fim(self):
+        """QG: Parar de consumir não trava os workers do sitemap-index."""
+        filhos = [(f"s{i}.xml", "2026-01-01") for i in range(6)]
+        documentos = {"sitemap.xml": _index(filhos)}
+        for i in range(6):
+            documentos[f"s{i}.xml"] = _urlset([(f"/lote/{i}/{j}", "2026-01-01") for j in range(50)])
+        entradas = _discovery(documentos).iter_sitemap_entries()
+
+        assert next(entradas)["loc"].startswith(f"{BASE}/lote/")
+        entradas.close()
+
+    def test_falha_no_fetch_devolve_lista_vazia(self, monkeypatch):
+        """QG: Exceção durante a busca vira erro no relatório, sem UnboundLocalError."""
+        discovery = _discovery({})
+
+        def falha(report=None, watermarks=None):
+            raise httpx.ConnectError("boom")
+            yield  # pragma: no cover
+
+        monkeypatch.setattr(discovery, "iter_sitemap_entries", falha)
+        lots, report = discovery.discover_from_sitemap(save_report=False)
+
+        assert lots == []
+        assert report.errors == ["Erro na descoberta: boom"]
+
+
+class TestIncremental:
+    """Testes da marca d'água de lastmod."""
+
+    def test_so_lotes_modificados(self):
+        """QG: Segunda execução devolve só o lote do leilão modificado."""
+        marcas = SitemapWatermarks(":memory:")
+        documentos = {"sitemap.xml": _urlset([("/lote/10/1", "2026-01-01"), ("/lote/11/2", "2026-01-01")])}
+        discovery = _discovery(documentos)
+        assert len(list(discovery.discover_incremental(marcas))) == 2
+        discovery.commit_watermarks(marcas)
+
+        documentos["sitemap.xml"] = _urlset([("/lote/10/1", "2026-01-01"), ("/lote/11/2", "2026-01-02T10:00:00Z")])
+        lots = list(discovery.discover_incremental(marcas))
+        assert [lot.lote_id for lot in lots] == ["2"]
+
+    def test_filho_inalterado_nao_e_baixado(self):
+        """QG: Sitemap filho com lastmod igual ao da marca é pulado."""
+        marcas = SitemapWatermarks(":memory:")
+        documentos = {
+            "sitemap.xml": _index([("a.xml", "2026-01-01"), ("b.xml", "2026-01-01")]),
+            "a.xml": _urlset([("/lote/10/1", "2026-01-01")]),
+            "b.xml": _urlset([("/lote/20/2", "2026-01-01")]),
+        }
+        discovery = _discovery(documentos)
+        list(discovery.discover_incremental(marcas))
+        discovery.commit_watermarks(marcas)
+
+        requisicoes = []
+        documentos["sitemap.xml"] = _index([("a.xml", "2026-01-01"), ("b.xml", "2026-01-03")])
+        documentos["b.xml"] = _urlset([("/lote/20/2", "2026-01-03")])
+        discovery = _discovery(documentos, requisicoes)
+        lots = list(discovery.discover_incremental(marcas))
+
+        assert [lot.lote_id for lot in lots] == ["2"]
+        assert sorted(requisicoes) == ["b.xml", "sitemap.xml"]
+
+    def test_truncado_e_falha_nao_avancam(self, tmp_path):
+        """QG: Leilão cortado por max_lots ou com fetch falho volta na próxima execução."""
+        caminho = str(tmp_path / "marcas.sqlite")
+        marcas = SitemapWatermarks(caminho)
+        discovery = _discovery({"sitemap.xml": _urlset([
+            ("/lote/10/1", "2026-01-01"), ("/lote/11/2", "2026-01-01"),
+            ("/lote/12/3", "2026-01-01"), ("/lote/12/4", "2026-01-01"),
+        ])})
+        lots = list(discovery.discover_incremental(marcas, max_lots=3))
+        assert [lot.lote_id for lot in lots] == ["1", "2", "3"]
+        discovery.commit_watermarks(marcas, failed_leiloes={"11"})
+        marcas.close()
+
+        reaberto = SitemapWatermarks(caminho)
+        lots = list(discovery.discover_incremental(reaberto))
+        assert [lot.lote_id for lot in lots] == ["2", "3", "4"]
+        reaberto.close()
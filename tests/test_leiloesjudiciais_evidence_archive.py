@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Testes do EvidenceArchive (evidências HTML em shards comprimidos).
+
+Testes para garantir que:
+1. Páginas voltam iguais por URL, por sha256 e na iteração sequencial
+2. Blocos são comprimidos e vários registros dividem um frame
+3. A mesma versão de uma página não é gravada duas vezes; uma versão nova é
+4. Um shard com o último bloco truncado não derruba a leitura
+5. LeilaoParser e ParserV2 gravam no arquivo (não em .html avulsos)
+6. Shards zstd (quando instalado) voltam iguais, como os gzip
+
+Uso:
+    pytest tests/test_leiloesjudiciais_evidence_archive.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from connectors.leiloesjudiciais.evidence_archive import EvidenceArchive, EvidenceReader, body_hash
+from connectors.leiloesjudiciais.parse import LeilaoParser
+from connectors.leiloesjudiciais.parser_v2 import ParserV2
+
+
+def _pagina(n: int) -> str:
+    boilerplate = "<nav>menu</nav>" * 200
+    return f"<html><head><title>Lote {n} - CORDEIRO/RJ</title></head><body>{boilerplate}<p>{n}</p></body></html>"
+
+
+def _url(n: int) -> str:
+    return f"https://www.leiloesjudiciais.com.br/lote/{n // 10}/{n}"
+
+
+class TestEvidenceArchive:
+    """Testes de escrita e leitura do arquivo."""
+
+    def test_ida_e_volta_zstd(self, tmp_path):
+        """QG: codec zstd grava shard .jsonl.zst e o leitor devolve as páginas."""
+        pytest.importorskip("zstandard")
+
+        with EvidenceArchive(str(tmp_path), codec="zstd", block_max_records=4) as archive:
+            for n in range(6):
+                archive.append(_url(n), _pagina(n), "0", str(n))
+        assert archive.codec == "zstd"
+        assert [p.name for p in tmp_path.iterdir() if p.name.endswith(".jsonl.zst")]
+
+        with EvidenceReader(str(tmp_path)) as reader:
+            assert reader.get(_url(5)).body == _pagina(5)
+            assert [r.url for r in reader.iter_records()] == [_url(n) for n in range(6)]
+
+    def test_ida_e_volta(self, tmp_path):
+        """QG: 10 páginas em blocos de 4 - get, get_by_hash e iter_records."""
+        with EvidenceArchive(str(tmp_path), block_max_records=4) as archive:
+            for n in range(10):
+                archive.append(_url(n), _pagina(n), str(n // 10), str(n))
+            assert archive.records_written == 8  # 2 ainda no bloco pendente
+
+        assert archive.records_written == 10
+        assert archive.compression_ratio > 10
+        shards = [p for p in tmp_path.iterdir() if p.name.endswith((".jsonl.zst", ".jsonl.gz"))]
+        assert len(shards) == 1
+
+        with EvidenceReader(str(tmp_path)) as reader:
+            assert len(reader) == 10
+            assert reader.get(_url(7)).body == _pagina(7)
+            assert reader.get_by_hash(body_hash(_pagina(3))).url == _url(3)
+            assert reader.get("https://x.test/nada") is None
+            registros = list(reader.iter_records())
+            assert [r.url for r in registros] == [_url(n) for n in range(10)]
+            assert registros[5].lote_id == "5" and registros[5].sha256 == body_hash(_pagina(5))
+            assert [r.url for r in reader.iter_records(leilao_id="0")] == [_url(n) for n in range(10)]
+
+    def test_deduplicacao_e_versao_nova(self, tmp_path):
+        """QG: mesma url+conteúdo não regrava; conteúdo novo vira a versão atual."""
+        with EvidenceArchive(str(tmp_path)) as archive:
+            archive.append(_url(1), _pagina(1))
+            assert archive.append(_url(1), _pagina(1)).duplicate
+
+        with EvidenceArchive(str(tmp_path)) as archive:
+            assert archive.append(_url(1), _pagina(1)).duplicate
+            assert not archive.append(_url(1), _pagina(2)).duplicate
+
+        with EvidenceReader(str(tmp_path)) as reader:
+            assert len(reader) == 2
+            assert reader.get(_url(1)).body == _pagina(2)
+            assert reader.urls() == [_url(1)]
+
+    def test_shard_truncado(self, tmp_path):
+        """QG: bloco final incompleto - iteração devolve os blocos inteiros."""
+        with EvidenceArchive(str(tmp_path), block_max_records=2) as archive:
+            for n in range(4):
+                archive.append(_url(n), _pagina(n))
+
+        shard = next(p for p in tmp_path.iterdir() if p.name.endswith((".jsonl.zst", ".jsonl.gz")))
+        conteudo = shard.read_bytes()
+        shard.write_bytes(conteudo[:-10])
+
+        with EvidenceReader(str(tmp_path)) as reader:
+            assert [r.url for r in reader.iter_records()] == [_url(0), _url(1)]
+            assert reader.get(_url(0)).body == _pagina(0)
+
+
+class TestParsersNoArquivo:
+    """Testes da integração com os parsers."""
+
+    def test_parsers_gravam_no_arquivo(self, tmp_path):
+        """QG: save_html vai para o arquivo; close grava o bloco pendente."""
+        v1 = LeilaoParser(html_output_dir=str(tmp_path), backend="regex")
+        v1.parse(_url(1), _pagina(1), save_html=True)
+        v1.close()
+        assert v1.get_saved_htmls()[0]["sha256"] == body_hash(_pagina(1))
+
+        v2 = ParserV2(html_output_dir=str(tmp_path))
+        v2.parse(_url(2), _pagina(2), save_html=True)
+        v2.close()
+
+        assert not list(tmp_path.glob("*.html"))
+        with EvidenceReader(str(tmp_path)) as reader:
+            assert reader.get(_url(1)).body == _pagina(1)
+            assert reader.get(_url(2)).leilao_id == "0"
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Testes do LeilaoFetcher (páginas de lote do conector leiloesjudiciais).
+
+Testes para garantir que:
+1. fetch_many devolve os resultados na ordem das URLs, mesmo em paralelo
+2. O rate limit é por host: hosts diferentes se sobrepõem, o mesmo host não
+3. Páginas com ETag/Last-Modified são revalidadas com GET condicional e o
+   304 devolve o HTML do cache
+4. Tombstones (404/410) persistem entre execuções no FetchCache
+
+Uso:
+    pytest tests/test_leiloesjudiciais_fetch.py -v
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from connectors.leiloesjudiciais.config import Config
+from connectors.leiloesjudiciais.fetch import FetchCache, FetchStatus, HostRateLimiter, LeilaoFetcher
+from connectors.leiloesjudiciais.session import SessionManager
+
+
+def _session(handler, rate: float = 1000.0) -> SessionManager:
+    cfg = Config(REQUESTS_PER_SECOND=rate, RETRY_BACKOFF_FACTOR=0.0)
+    return SessionManager(cfg, transport=httpx.MockTransport(handler))
+
+
+class TestFetchMany:
+    """Testes do fetch concorrente."""
+
+    def test_ordem_preservada_em_paralelo(self):
+        """QG: resultados na ordem das URLs, com respostas fora de ordem."""
+        def handler(request: httpx.Request) -> httpx.Response:
+            n = int(request.url.path.rsplit("/", 1)[-1])
+            time.sleep(0.02 * (5 - n))
+            return httpx.Response(200, text=f"<html>{n}</html>")
+
+        with _session(handler) as session:
+            fetcher = LeilaoFetcher(session.config, session=session, max_workers=5)
+            urls = [f"https://h{n}.test/lote/{n}" for n in range(5)]
+            progresso = []
+            results, stats = fetcher.fetch_many(urls, progress_callback=lambda u, i, t: progresso.append(i))
+
+        assert [r.content for r in results] == [f"<html>{n}</html>" for n in range(5)]
+        assert sorted(progresso) == [1, 2, 3, 4, 5]
+        assert stats.successful == 5
+
+    def test_rate_limit_por_host(self):
+        """QG: 4 workers, 2 hosts a 10 req/s - cada host fica no seu ritmo."""
+        instantes = {}
+        lock = threading.Lock()
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            with lock:
+                instantes.setdefault(request.url.host, []).append(time.monotonic())
+            return httpx.Response(200, text="ok")
+
+        with _session(handler, rate=10.0) as session:
+            fetcher = LeilaoFetcher(session.config, session=session, max_workers=4)
+            urls = [f"https://{h}.test/lote/{n}" for n in range(3) for h in ("a", "b")]
+            inicio = time.monotonic()
+            results, _ = fetcher.fetch_many(urls)
+            duracao = time.monotonic() - inicio
+
+        assert all(r.status == FetchStatus.SUCCESS for r in results)
+        for host_instantes in instantes.values():
+            host_instantes.sort()
+            intervalos = [b - a for a, b in zip(host_instantes[:-1], host_instantes[1:], strict=True)]
+            assert min(intervalos) >= 0.08
+        # Serial global seriam 6 requisições a 10 req/s (~0.5s)
+        assert duracao < 0.35
+
+    def test_token_bucket_sem_rate(self):
+        """QG: rate <= 0 desliga o limite."""
+        limiter = HostRateLimiter(0)
+        inicio = time.monotonic()
+        for _ in range(100):
+            limiter.acquire("https://x.test/")
+        assert time.monotonic() - inicio < 0.1
+
+
+class TestFetchCache:
+    """Testes do cache de respostas e tombstones."""
+
+    def test_get_condicional_304(self, tmp_path):
+        """QG: segunda execução manda If-None-Match e usa o HTML do cache."""
+        requisicoes = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requisicoes.append(request)
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, text="<html>lote</html>", headers={"ETag": '"v1"'})
+
+        url = "https://site.test/lote/1/2"
+        path = str(tmp_path / "fetch_cache.sqlite")
+        for _ in range(2):
+            cache = FetchCache(path)
+            with _session(handler) as session:
+                fetcher = LeilaoFetcher(session.config, session=session, cache=cache)
+                result = fetcher.fetch(url)
+            cache.close()
+            assert result.status == FetchStatus.SUCCESS
+            assert result.content == "<html>lote</html>"
+
+        assert "if-none-match" not in requisicoes[0].headers
+        assert requisicoes[1].headers["if-none-match"] == '"v1"'
+        assert result.from_cache and result.status_code == 304
+        assert fetcher.get_stats_dict()["not_modified"] == 1
+
+    def test_tombstone_persistente(self, tmp_path):
+        """QG: 404 numa execução não é buscado de novo na seguinte."""
+        requisicoes = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requisicoes.append(request)
+            return httpx.Response(404)
+
+        url = "https://site.test/lote/9/9"
+        path = str(tmp_path / "fetch_cache.sqlite")
+        with _session(handler) as session:
+            cache = FetchCache(path)
+            assert LeilaoFetcher(session.config, session=session, cache=cache).fetch(url).status == FetchStatus.TOMBSTONE
+            cache.close()
+
+            cache = FetchCache(path)
+            fetcher = LeilaoFetcher(session.config, session=session, cache=cache)
+            assert fetcher.fetch(url).status == FetchStatus.TOMBSTONE
+            assert fetcher.get_stats_dict()["tombstones_skipped"] == 1
+            cache.close()
+
+        assert len(requisicoes) == 1
+
+        # Tombstone expirado volta a ser buscado
+        cache = FetchCache(path, tombstone_ttl=0)
+        assert not cache.is_tombstone(url, now=time.time() + 1)
+        cache.close()
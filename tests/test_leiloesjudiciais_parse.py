@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Testes do parsing HTML (LeilaoParser, ParserV2 e backends HTML).
+
+Testes para garantir que:
+1. Todo backend instalado (selectolax/lxml/bs4) gera o mesmo ParsedLot
+2. Texto de script/style/template/comentário não vira valor do lote
+3. Backend rápido que falha num documento cai para BeautifulSoup
+4. Os padrões de valor do ParserV2 pegam a primeira ocorrência de cada tipo
+5. Evidências .html avulsas (formato antigo) voltam como (url, html)
+6. selectolax extrai os mesmos nós que bs4 (quando instalado)
+
+Uso:
+    pytest tests/test_leiloesjudiciais_parse.py -v
+"""
+
+import dataclasses
+import sys
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from connectors.leiloesjudiciais import html_backend
+from connectors.leiloesjudiciais.html_backend import available_backends, extract_nodes, resolve_backend
+from connectors.leiloesjudiciais.parse import LeilaoParser, read_html_evidence
+from connectors.leiloesjudiciais.parser_v2 import ParserV2
+
+URL = "https://www.leiloesjudiciais.com.br/lote/123/456"
+
+PAGINA = """<!DOCTYPE html><html><head><meta charset="utf-8">
+<title>FIAT/OGGI CS 1983/1983 - CORDEIRO/RJ - Leilões Judiciais</title>
+<meta property="og:title"><meta property="og:title" content="ignorado">
+<meta property="og:image" content="https://cdn.test/og.jpg">
+<meta name="description" content="Oggi &amp; cia">
+<script type="application/ld+json">{"name": "Oggi", "image": ["https://cdn.test/ld.jpg"]}</script>
+<script>var preco = "R$ 1,00";</script><style>.a{}</style>
+</head><body>
+<!-- R$ 2,00 --><template>R$ 3,00</template>
+<p>Avaliação: R$ <b>12.500,00</b></p>
+<img src="/img/f1.jpg"><img src="https://cdn.test/logo.png"><img src="" data-src="https://cdn.test/f2.jpg">
+</body></html>"""
+
+
+def _campos(lot) -> dict:
+    campos = dataclasses.asdict(lot)
+    campos.pop("extraction_timestamp")
+    return campos
+
+
+class TestBackends:
+    """Testes dos backends HTML do LeilaoParser."""
+
+    def test_backends_equivalentes(self):
+        """QG: todos os backends instalados geram o mesmo ParsedLot."""
+        backends = available_backends()
+        if not backends:
+            pytest.skip("nenhum backend HTML instalado")
+
+        resultados = {
+            b: _campos(LeilaoParser(backend=b).parse(URL, PAGINA, save_html=False))
+            for b in backends
+        }
+        referencia = resultados[backends[-1]]
+        for backend, campos in resultados.items():
+            assert campos == referencia, backend
+
+        assert referencia["cidade"] == "Cordeiro" and referencia["uf"] == "RJ"
+        assert referencia["og_title"] is None  # primeira og:title sem content
+        assert referencia["og_description"] == "Oggi & cia"
+        assert referencia["json_ld_data"] == {"name": "Oggi", "image": ["https://cdn.test/ld.jpg"]}
+        assert referencia["valor_avaliacao"] == 12500.0  # ignora script/comentário/template
+        assert referencia["imagens"] == [
+            "https://cdn.test/og.jpg",
+            "https://cdn.test/ld.jpg",
+            "https://www.leiloesjudiciais.com.br/img/f1.jpg",
+            "https://cdn.test/f2.jpg",
+        ]
+
+    def test_selectolax_igual_bs4(self):
+        """QG: _extract_selectolax devolve os mesmos nós que _extract_bs4."""
+        pytest.importorskip("selectolax")
+        pytest.importorskip("bs4")
+
+        rapido = html_backend._extract_selectolax(PAGINA)
+        referencia = html_backend._extract_bs4(PAGINA)
+
+        assert rapido.title == referencia.title
+        assert rapido.meta == referencia.meta
+        assert rapido.json_ld == referencia.json_ld
+        assert rapido.images == referencia.images
+        assert rapido.text.split() == referencia.text.split()
+
+    def test_fallback_para_bs4(self, monkeypatch):
+        """QG: exceção no backend rápido refaz o documento com bs4."""
+        if not html_backend.HAS_BS4:
+            pytest.skip("bs4 não instalado")
+
+        def falha(html):
+            raise ValueError("documento rejeitado")
+
+        monkeypatch.setitem(html_backend._EXTRACTORS, "lxml", falha)
+        nodes = extract_nodes(PAGINA, "lxml")
+        assert nodes.backend == "bs4"
+        assert nodes.meta["og:image"] == "https://cdn.test/og.jpg"
+
+    def test_resolve_backend(self, monkeypatch):
+        """QG: regex desliga a árvore; nome desconhecido é erro; env escolhe."""
+        assert resolve_backend("regex") is None
+        with pytest.raises(ValueError):
+            resolve_backend("html5lib")
+        monkeypatch.setenv("LEILOEIRO_HTML_BACKEND", "regex")
+        assert LeilaoParser().backend is None
+
+
+class TestParserV2:
+    """Testes do ParserV2."""
+
+    def test_valores_primeira_ocorrencia(self):
+        """QG: cada tipo de valor usa o primeiro match; valor só sem avaliação."""
+        html = (
+            '<h2 class="titulo-lote">GOL 1.0 - CAMPINAS/SP</h2>'
+            '<script>{"valor": 99, "valorAvaliacao": 15000, "lance_minimo": 0,'
+            ' "lanceMinimo": 8000, "LANCE_ATUAL": 9.500, "valor_avaliacao": 1}</script>'
+        )
+        lot = ParserV2().parse(URL, html)
+        assert lot.titulo == "GOL 1.0 - CAMPINAS/SP"
+        assert lot.cidade == "Campinas" and lot.uf == "SP"
+        assert lot.valor_avaliacao == 15000.0
+        assert lot.valor_lance_minimo is None  # primeiro lance_minimo é 0
+        assert lot.valor_lance_atual == 9500.0
+
+    def test_imagens_limitadas(self):
+        """QG: para na décima imagem aceita, na ordem do HTML."""
+        imgs = "".join(f'<img src="https://cdn.test/{n}.jpg">' for n in range(15))
+        lot = ParserV2().parse(URL, f"<title>X</title>{imgs}")
+        assert lot.imagens == [f"https://cdn.test/{n}.jpg" for n in range(10)]
+
+
+class TestEvidencias:
+    """Testes do reprocessamento de evidências HTML."""
+
+    def test_html_avulso(self, tmp_path):
+        """QG: read_html_evidence devolve a URL e o HTML sem o cabeçalho."""
+        salvo = tmp_path / "123_456_abc.html"
+        salvo.write_text(f"<!-- URL: {URL} -->\n<!-- Timestamp: 2026-01-01T00:00:00 -->\n{PAGINA}", encoding="utf-8")
+        assert read_html_evidence(str(salvo)) == (URL, PAGINA)
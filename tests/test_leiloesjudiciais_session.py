@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Testes do SessionManager (sessão HTTP keep-alive do conector leiloesjudiciais).
+
+Testes para garantir que:
+1. API client, fetcher e discovery reaproveitam o mesmo client por host
+2. Headers de Config.get_headers() vão em todas as requisições, sem os
+   headers de conexão (inválidos em HTTP/2)
+3. Accept-Encoding só anuncia compressões decodificáveis
+
+Uso:
+    pytest tests/test_leiloesjudiciais_session.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import httpx
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from connectors.leiloesjudiciais.api_client import LeiloeiroAPIClient
+from connectors.leiloesjudiciais.config import config
+from connectors.leiloesjudiciais.discover import LeilaoDiscovery
+from connectors.leiloesjudiciais.fetch import FetchStatus, LeilaoFetcher
+from connectors.leiloesjudiciais.session import BROTLI_AVAILABLE, SessionManager
+
+
+def _transport(requisicoes):
+    """Servidor fake: API responde uma página, sitemap e lotes respondem 200."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        requisicoes.append(request)
+        if request.url.host.startswith("api."):
+            return httpx.Response(200, json={"items": [{"lote_id": 1}], "currentPage": 1, "totalPages": 1})
+        return httpx.Response(200, text="<urlset></urlset>")
+    return httpx.MockTransport(handler)
+
+
+class TestSessionManager:
+    """Testes da sessão compartilhada."""
+
+    def test_um_client_por_host_compartilhado(self):
+        """QG: API, fetcher e discovery usam a mesma sessão (um client por host)."""
+        requisicoes = []
+        with SessionManager(transport=_transport(requisicoes)) as session:
+            api = LeiloeiroAPIClient(requests_per_second=1000, session=session)
+            fetcher = LeilaoFetcher(session=session)
+            discovery = LeilaoDiscovery(session=session)
+
+            assert api.get_lotes(page=1).success
+            assert api.get_lotes(page=2).success
+            assert fetcher.fetch(f"{config.BASE_URL}/lote/1/2").status == FetchStatus.SUCCESS
+            assert discovery._fetch_page(config.SITEMAP_URL) == "<urlset></urlset>"
+
+            assert session.hosts == 2
+            assert session.client_for(config.SITEMAP_URL) is session.client_for(f"{config.BASE_URL}/lote/1/2")
+        assert len(requisicoes) == 4
+
+    def test_headers_da_config_sem_connection(self):
+        """QG: User-Agent da config vai em toda requisição; Connection não."""
+        requisicoes = []
+        with SessionManager(transport=_transport(requisicoes)) as session:
+            LeilaoFetcher(session=session).fetch(f"{config.BASE_URL}/lote/1/2")
+
+        headers = requisicoes[0].headers
+        assert headers["user-agent"] == config.USER_AGENT
+        assert headers["accept-language"] == config.ACCEPT_LANGUAGE
+        assert "connection" not in {nome.lower() for nome in session.headers}
+
+    def test_accept_encoding_decodificavel(self):
+        """QG: br só é anunciado com brotli instalado."""
+        session = SessionManager()
+        assert ("br" in session.headers["Accept-Encoding"]) == BROTLI_AVAILABLE
+        session.close()
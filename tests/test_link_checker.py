@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Testes do LinkChecker (verificador de links em lote).
+
+Testes para garantir que:
+1. check_many valida N URLs com um único client (sem rede: httpx.MockTransport)
+2. Redirects registram status inicial e URL final com uma única requisição
+3. Cache SQLite evita nova requisição dentro do TTL e expira fora dele
+4. Concorrência por host respeita MAX_PER_HOST, sem segurar vaga global
+5. A API síncrona reaproveita o mesmo client entre chamadas até close()
+
+Uso:
+    pytest tests/test_link_checker.py -v
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from connectors.common.link_checker import LinkChecker, LinkVerdict, VerdictCache
+
+
+def _transport(contador=None):
+    """Servidor fake: /ok -> 200, /antigo -> 301 /novo, /quebrado -> 404, /sem-head -> 405 no HEAD."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        if contador is not None:
+            contador.append((request.method, str(request.url)))
+        path = request.url.path
+        if path == "/antigo":
+            return httpx.Response(301, headers={"location": "/novo"})
+        if path in ("/ok", "/novo"):
+            return httpx.Response(200)
+        if path == "/sem-head":
+            return httpx.Response(405 if request.method == "HEAD" else 200)
+        return httpx.Response(404)
+    return httpx.MockTransport(handler)
+
+
+class TestCheckMany:
+    """Testes da API em lote."""
+
+    def test_vereditos_por_url(self):
+        """QG: Cada URL recebe veredito ok/quebrado."""
+        checker = LinkChecker(transport=_transport())
+        v = checker.check_many([
+            "https://a.com/ok",
+            "https://b.com/quebrado",
+        ])
+        assert v["https://a.com/ok"].ok is True
+        assert v["https://b.com/quebrado"].ok is False
+        assert v["https://b.com/quebrado"].status_final == 404
+
+    def test_redirect_em_uma_requisicao(self):
+        """QG: Status inicial 301 e URL final vêm do mesmo request."""
+        chamadas = []
+        checker = LinkChecker(transport=_transport(chamadas))
+        v = checker.check("https://a.com/antigo")
+
+        assert v.status_inicial == 301
+        assert v.status_final == 200
+        assert v.final_url == "https://a.com/novo"
+        # HEAD /antigo + HEAD /novo (redirect seguido pelo client)
+        assert len(chamadas) == 2
+
+    def test_fallback_get_quando_head_nao_suportado(self):
+        """QG: 405 no HEAD refaz com GET."""
+        checker = LinkChecker(transport=_transport())
+        assert checker.check("https://a.com/sem-head").ok is True
+
+    def test_duplicadas_verificadas_uma_vez(self):
+        """QG: URL repetida no lote gera uma única requisição."""
+        chamadas = []
+        checker = LinkChecker(transport=_transport(chamadas))
+        checker.check_many(["https://a.com/ok"] * 5)
+        assert len(chamadas) == 1
+
+    def test_erro_de_conexao_vira_veredito_negativo(self):
+        """QG: ConnectError não propaga - vira ok=False com erro registrado."""
+        def handler(request):
+            raise httpx.ConnectError("recusado", request=request)
+
+        checker = LinkChecker(transport=httpx.MockTransport(handler), max_retries=1)
+        v = checker.check("https://fora.com/x")
+        assert v.ok is False
+        assert v.error == "ConnectError"
+
+    def test_limite_por_host(self):
+        """QG: Nunca mais que max_per_host requisições simultâneas no mesmo host."""
+        ativos = {"agora": 0, "pico": 0}
+
+        async def handler(request):
+            ativos["agora"] += 1
+            ativos["pico"] = max(ativos["pico"], ativos["agora"])
+            await asyncio.sleep(0.01)
+            ativos["agora"] -= 1
+            return httpx.Response(200)
+
+        checker = LinkChecker(transport=httpx.MockTransport(handler), max_per_host=2)
+        checker.check_many([f"https://a.com/{i}" for i in range(10)])
+        assert ativos["pico"] == 2
+
+    def test_host_ocupado_nao_segura_vaga_global(self):
+        """QG: URLs esperando um host lento não bloqueiam outro host."""
+        concluidas = []
+
+        async def handler(request):
+            if request.url.host == "lento.com":
+                await asyncio.sleep(0.02)
+            concluidas.append(request.url.host)
+            return httpx.Response(200)
+
+        checker = LinkChecker(transport=httpx.MockTransport(handler), max_concurrency=2, max_per_host=1)
+        checker.check_many([f"https://lento.com/{i}" for i in range(5)] + ["https://rapido.com/x"])
+        assert concluidas.index("rapido.com") == 0
+        checker.close()
+
+    def test_client_reaproveitado_entre_chamadas(self):
+        """QG: check() de URLs avulsas usa o mesmo client até close()."""
+        checker = LinkChecker(transport=_transport())
+        checker.check("https://a.com/ok")
+        client = checker._client
+        checker.check("https://b.com/ok")
+        assert checker._client is client
+
+        checker.close()
+        assert client.is_closed
+        # Depois de close() um novo uso abre outro loop/client
+        assert checker.check("https://a.com/ok").ok is True
+        checker.close()
+
+    def test_api_async_no_loop_de_quem_chama(self):
+        """QG: check_many_async funciona dentro de um event loop externo."""
+        checker = LinkChecker(transport=_transport())
+        v = asyncio.run(checker.check_many_async(["https://a.com/ok"]))
+        assert v["https://a.com/ok"].ok is True
+
+
+class TestVerdictCache:
+    """Testes do cache SQLite persistente."""
+
+    def test_cache_persiste_entre_instancias(self, tmp_path):
+        """QG: Segunda execução não faz requisição para URL já validada."""
+        cache_path = str(tmp_path / "links.sqlite")
+        LinkChecker(cache_path=cache_path, transport=_transport()).check("https://a.com/ok")
+
+        chamadas = []
+        checker = LinkChecker(cache_path=cache_path, transport=_transport(chamadas))
+        v = checker.check("https://a.com/ok")
+
+        assert v.ok is True
+        assert v.from_cache is True
+        assert chamadas == []
+
+    def test_ttl_negativo_menor_que_positivo(self, tmp_path):
+        """QG: Veredito negativo expira antes do positivo."""
+        cache = VerdictCache(str(tmp_path / "links.sqlite"), ttl_ok=1000, ttl_fail=10)
+        agora = time.time()
+        cache.put_many([
+            LinkVerdict(url="https://a.com/ok", ok=True, checked_at=agora - 100),
+            LinkVerdict(url="https://a.com/x", ok=False, checked_at=agora - 100),
+        ])
+
+        validos = cache.get_many(["https://a.com/ok", "https://a.com/x"], now=agora)
+        assert list(validos) == ["https://a.com/ok"]
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Testes do VehicleIndex (índice de identidade de veículos).
+
+Testes para garantir que:
+1. Placa/chassi/renavam são normalizados (Mercosul colide com a placa antiga)
+2. O mesmo veículo em outra referência vira duplicata do vehicle_id canônico
+3. Reprocessar a mesma referência não conta como duplicata
+4. O índice local (SQLite) persiste entre instâncias
+5. Espelho: push envia só o que mudou e pull traz chaves de outra máquina
+
+Uso:
+    pytest tests/test_vehicle_index.py -v
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from connectors.common.vehicle_index import (
+    MIRROR_KEYS_TABLE,
+    MIRROR_TABLE,
+    VehicleIndex,
+    keys_from_text,
+    normalize_chassi,
+    normalize_placa,
+    normalize_renavam,
+)
+
+
+class TestNormalizacao:
+    """Testes das chaves normalizadas."""
+
+    def test_placa_mercosul_vira_formato_antigo(self):
+        """QG: ABC1D23 e ABC-1323 são a mesma chave."""
+        assert normalize_placa("abc1d23") == "ABC1323"
+        assert normalize_placa("ABC-1323") == "ABC1323"
+        assert normalize_placa("AB12345") is None
+
+    def test_chassi_e_renavam(self):
+        """QG: Chassi exige 17 caracteres válidos; renavam completa 11 dígitos."""
+        assert normalize_chassi("9bd 178226f5123456") == "9BD178226F5123456"
+        assert normalize_chassi("9BD178226F512345O") is None  # letra O não existe em chassi
+        assert normalize_renavam("123.456.789") == "00123456789"
+        assert normalize_renavam("00000000000") is None
+
+    def test_chaves_em_texto_livre(self):
+        """QG: Só valores precedidos da palavra-chave são aceitos."""
+        chaves = keys_from_text("Fiat Uno, placa ABC-1D23, chassi 9BD178226F5123456, ano 2010")
+        assert chaves == {"placa": "ABC-1D23", "chassi": "9BD178226F5123456", "renavam": None}
+
+
+class TestResolve:
+    """Testes da ligação ocorrência -> veículo canônico."""
+
+    def test_duplicata_em_outra_referencia(self):
+        """QG: Mesma placa em outro edital aponta para o mesmo vehicle_id."""
+        indice = VehicleIndex()
+        primeiro = indice.resolve(placa="ABC1234", fonte="lotes_leilao", referencia="edital-1", marca="FIAT")
+        segundo = indice.resolve(placa="ABC-1234", fonte="leiloesjudiciais", referencia="lj-9")
+
+        assert primeiro.duplicate is False
+        assert segundo.duplicate is True
+        assert segundo.vehicle_id == primeiro.vehicle_id
+        assert segundo.vehicle.marca == "FIAT"
+        assert segundo.vehicle.ocorrencias == 2
+
+    def test_mesma_referencia_nao_e_duplicata(self):
+        """QG: Reprocessar o mesmo lote não conta como duplicata."""
+        indice = VehicleIndex()
+        indice.resolve(placa="ABC1234", referencia="edital-1")
+        match = indice.resolve(placa="ABC1234", referencia="edital-1")
+        assert match.duplicate is False
+        assert indice.stats["duplicados"] == 0
+
+    def test_reprocessar_referencia_que_nao_e_a_primeira(self):
+        """QG: Rodar de novo o segundo edital não soma ocorrências."""
+        indice = VehicleIndex()
+        indice.resolve(placa="ABC1234", referencia="edital-1")
+        assert indice.resolve(placa="ABC1234", referencia="edital-2").duplicate is True
+        for _ in range(3):
+            match = indice.resolve(placa="ABC1234", referencia="edital-2")
+            assert match.duplicate is False
+        assert match.vehicle.ocorrencias == 2
+        assert indice.stats["duplicados"] == 1
+
+    def test_chave_nova_ligada_ao_canonico(self):
+        """QG: Chassi visto junto com placa conhecida passa a achar o veículo sozinho."""
+        indice = VehicleIndex()
+        primeiro = indice.resolve(placa="ABC1234", referencia="a")
+        indice.resolve(placa="ABC1234", chassi="9BD178226F5123456", referencia="b")
+
+        match = indice.resolve(chassi="9BD178226F5123456", referencia="c")
+        assert match.vehicle_id == primeiro.vehicle_id
+        assert match.matched_key == "chassi"
+
+    def test_sem_chave_valida(self):
+        """QG: Sem placa/chassi/renavam válidos não há identidade."""
+        indice = VehicleIndex()
+        assert indice.resolve(placa="SEM PLACA", referencia="a") is None
+        assert len(indice) == 0
+
+
+class TestPersistencia:
+    """Testes do SQLite local e do espelho no banco."""
+
+    def test_indice_persiste_entre_instancias(self, tmp_path):
+        """QG: Veículos e chaves gravados no flush voltam na próxima execução."""
+        caminho = str(tmp_path / "indice.sqlite")
+        indice = VehicleIndex(caminho)
+        primeiro = indice.resolve(renavam="123456789", referencia="a", ano=2012)
+        indice.close()
+
+        reaberto = VehicleIndex(caminho)
+        match = reaberto.resolve(renavam="00123456789", referencia="b")
+        assert match.vehicle_id == primeiro.vehicle_id
+        assert match.duplicate is True
+        assert match.vehicle.ano == 2012
+        reaberto.close()
+
+        # A referência "b" já foi vista: nova execução não conta de novo
+        terceira = VehicleIndex(caminho)
+        match = terceira.resolve(renavam="123456789", referencia="b")
+        assert match.duplicate is False
+        assert match.vehicle.ocorrencias == 2
+        terceira.close()
+
+    def test_push_envia_so_alteracoes(self):
+        """QG: Segundo push sem novas ocorrências não chama o banco."""
+        client = MagicMock()
+        indice = VehicleIndex()
+        indice.resolve(placa="ABC1234", chassi="9BD178226F5123456", referencia="a")
+
+        assert indice.push_mirror(client) == 1
+        tabelas = [c.args[0] for c in client.table.call_args_list]
+        assert tabelas == [MIRROR_TABLE, MIRROR_KEYS_TABLE]
+
+        client.reset_mock()
+        assert indice.push_mirror(client) == 0
+        client.table.assert_not_called()
+
+    def test_pull_traz_chaves_de_outra_maquina(self):
+        """QG: Chave do espelho liga a ocorrência local ao vehicle_id remoto."""
+        paginas = {
+            MIRROR_TABLE: [{"vehicle_id": "vei_remoto", "placa": "ABC1234", "marca": "VW",
+                            "fonte": "discovery", "referencia": "x", "ocorrencias": 3,
+                            "primeiro_visto": "2026-01-01T00:00:00+00:00", "ultimo_visto": None}],
+            MIRROR_KEYS_TABLE: [{"tipo": "placa", "valor": "ABC1234", "vehicle_id": "vei_remoto"}],
+        }
+        client = MagicMock()
+
+        def table(nome):
+            tabela = MagicMock()
+            consulta = tabela.select.return_value.order.return_value
+            consulta.order.return_value = consulta
+            consulta.range.return_value.execute.return_value.data = paginas[nome]
+            return tabela
+
+        client.table.side_effect = table
+        indice = VehicleIndex()
+
+        assert indice.pull_mirror(client) == 1
+        match = indice.resolve(placa="ABC1C34", referencia="y")
+        assert match.vehicle_id == "vei_remoto"
+        assert match.duplicate is True
+        assert match.vehicle.marca == "VW"